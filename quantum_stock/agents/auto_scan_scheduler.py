@@ -19,10 +19,17 @@ import schedule
 from datetime import datetime, timedelta
 from typing import Dict, List, Callable, Optional, Any
 from dataclasses import dataclass, field
+import numpy as np
 import pandas as pd
-import json
 import os
 
+try:
+    from ..indicators.panel import PanelIndicatorEngine
+    from ..utils.journal import Journal
+except ImportError:
+    from indicators.panel import PanelIndicatorEngine
+    from utils.journal import Journal
+
 
 @dataclass
 class ScanResult:
@@ -49,6 +56,10 @@ class ScanResult:
             'confidence': self.confidence,
             'summary': self.summary
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ScanResult':
+        return cls(**dict(data, timestamp=datetime.fromisoformat(data['timestamp'])))
 
 
 class AutoScanScheduler:
@@ -85,33 +96,46 @@ class AutoScanScheduler:
             'accuracy_tracking': {}
         }
         
+        # Snapshot + append-only journal of watchlist changes and scans
+        self._journal = Journal(self.storage_path, snapshot=self._snapshot)
         self._load_history()
     
     def _load_history(self):
         """Load scan history from file"""
         try:
-            if os.path.exists(self.storage_path):
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.learning_stats = data.get('learning_stats', self.learning_stats)
-                    self.watchlist = data.get('watchlist', [])
+            data, records = self._journal.load()
+            if data is not None:
+                self.learning_stats = data.get('learning_stats', self.learning_stats)
+                self.watchlist = data.get('watchlist', [])
+                if data.get('last_scan'):
+                    self.last_scan_time = datetime.fromisoformat(data['last_scan'])
+                self.scan_history = [ScanResult.from_dict(r)
+                                     for r in data.get('scan_history', [])]
+            
+            for record in records:
+                if record['op'] == 'watchlist':
+                    self.watchlist = record['watchlist']
+                elif record['op'] == 'scan':
+                    self.learning_stats = record['learning_stats']
+                    self.last_scan_time = datetime.fromisoformat(record['last_scan'])
+                    self.scan_history.extend(ScanResult.from_dict(r) for r in record['results'])
+            self.scan_history = self.scan_history[-500:]
         except Exception as e:
             print(f"Error loading scan history: {e}")
     
-    def _save_history(self):
-        """Save scan history to file"""
+    def _snapshot(self) -> Dict:
+        """Full state for journal compaction"""
+        return {
+            'learning_stats': self.learning_stats,
+            'watchlist': self.watchlist,
+            'last_scan': self.last_scan_time.isoformat() if self.last_scan_time else None,
+            'scan_history': [r.to_dict() for r in self.scan_history[-100:]]  # Keep last 100
+        }
+    
+    def _save_history(self, record: Dict):
+        """Append a watchlist change or scan to the history journal"""
         try:
-            os.makedirs(os.path.dirname(self.storage_path), exist_ok=True)
-            
-            data = {
-                'learning_stats': self.learning_stats,
-                'watchlist': self.watchlist,
-                'last_scan': self.last_scan_time.isoformat() if self.last_scan_time else None,
-                'scan_history': [r.to_dict() for r in self.scan_history[-100:]]  # Keep last 100
-            }
-            
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._journal.append(record)
         except Exception as e:
             print(f"Error saving scan history: {e}")
     
@@ -131,7 +155,7 @@ class AutoScanScheduler:
     def set_watchlist(self, symbols: List[str]):
         """Set list of symbols to scan"""
         self.watchlist = [s.upper().strip() for s in symbols]
-        self._save_history()
+        self._save_history({'op': 'watchlist', 'watchlist': self.watchlist})
         print(f"✅ Watchlist updated: {len(self.watchlist)} symbols")
     
     def add_callback(self, callback: Callable[[List[ScanResult]], None]):
@@ -202,9 +226,22 @@ class AutoScanScheduler:
         
         results: List[ScanResult] = []
         
+        # Fetch all symbols, then calculate indicators in one panel pass
+        frames: Dict[str, pd.DataFrame] = {}
         for symbol in self.watchlist:
+            df = self._fetch_data(symbol)
+            if df is not None and not df.empty:
+                frames[symbol] = df
+        
+        try:
+            indicators = self._calculate_indicators_panel(frames) if frames else {}
+        except Exception as e:
+            print(f"❌ Error calculating indicators: {e}")
+            indicators = {}
+        
+        for symbol in indicators:
             try:
-                result = self._scan_symbol(symbol)
+                result = self._scan_symbol(symbol, frames[symbol], indicators[symbol])
                 if result:
                     results.append(result)
                     
@@ -222,7 +259,16 @@ class AutoScanScheduler:
         if len(self.scan_history) > 500:
             self.scan_history = self.scan_history[-500:]
         
-        self._save_history()
+        signals_count = sum(len(r.signals) for r in results)
+        insights_count = sum(len(r.insights) for r in results)
+        self.learning_stats['signals_generated'] += signals_count
+        
+        self._save_history({
+            'op': 'scan',
+            'last_scan': self.last_scan_time.isoformat(),
+            'learning_stats': self.learning_stats,
+            'results': [r.to_dict() for r in results]
+        })
         
         # Notify callbacks
         for callback in self.callbacks:
@@ -232,25 +278,24 @@ class AutoScanScheduler:
                 print(f"❌ Callback error: {e}")
         
         # Summary
-        signals_count = sum(len(r.signals) for r in results)
-        insights_count = sum(len(r.insights) for r in results)
-        self.learning_stats['signals_generated'] += signals_count
-        
         print(f"\n📈 Scan Complete: {len(results)} stocks, {signals_count} signals, {insights_count} insights")
         print(f"⏰ Next scan in {self.scan_interval_minutes} minutes")
         
         return results
     
-    def _scan_symbol(self, symbol: str) -> Optional[ScanResult]:
-        """Scan a single symbol"""
+    def _scan_symbol(self, symbol: str, df: pd.DataFrame = None,
+                     indicators: Dict = None) -> Optional[ScanResult]:
+        """Scan a single symbol (data and indicators are fetched if not given)"""
         try:
             # Fetch data
-            df = self._fetch_data(symbol)
+            if df is None:
+                df = self._fetch_data(symbol)
             if df is None or df.empty:
                 return None
             
             # Calculate indicators
-            indicators = self._calculate_indicators(df)
+            if indicators is None:
+                indicators = self._calculate_indicators(df)
             
             # Get Deep Flow Intelligence
             from .deep_flow_intelligence import get_deep_flow_intelligence
@@ -304,48 +349,53 @@ class AutoScanScheduler:
     
     def _calculate_indicators(self, df: pd.DataFrame) -> Dict:
         """Calculate technical indicators"""
-        close = df['close'].values
-        high = df['high'].values if 'high' in df.columns else close
-        low = df['low'].values if 'low' in df.columns else close
-        volume = df['volume'].values if 'volume' in df.columns else [0] * len(close)
+        return self._calculate_indicators_panel({'_': df})['_']
+    
+    def _calculate_indicators_panel(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """Calculate technical indicators for all symbols in one panel pass
+        
+        Returns:
+            {symbol: indicator dict}
+        """
+        # Symbols without volume data count as zero volume
+        frames = {
+            symbol: df if 'volume' in df.columns else df.assign(volume=0.0)
+            for symbol, df in frames.items()
+        }
+        
+        engine = PanelIndicatorEngine.from_frames(frames)
+        close = engine.close
         
         # Current values
-        current_price = close[-1]
-        prev_price = close[-2] if len(close) > 1 else current_price
+        current_price = close.iloc[-1]
+        prev_price = close.iloc[-2].where(engine.bars > 1, current_price) if len(close) > 1 else current_price
         change_pct = (current_price - prev_price) / prev_price * 100
         
         # RSI
-        delta = pd.Series(close).diff()
-        gain = delta.where(delta > 0, 0).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        current_rsi = rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50
+        current_rsi = engine.rsi(14, smoothing='sma').iloc[-1].fillna(50)
         
         # MACD
-        exp1 = pd.Series(close).ewm(span=12).mean()
-        exp2 = pd.Series(close).ewm(span=26).mean()
-        macd = exp1 - exp2
-        signal = macd.ewm(span=9).mean()
-        current_macd = macd.iloc[-1] if not pd.isna(macd.iloc[-1]) else 0
-        current_signal = signal.iloc[-1] if not pd.isna(signal.iloc[-1]) else 0
+        macd = engine.macd(12, 26, 9, adjust=True)
+        current_macd = macd['macd'].iloc[-1].fillna(0)
+        current_signal = macd['signal'].iloc[-1].fillna(0)
         
         # Volume
-        avg_volume = pd.Series(volume).rolling(20).mean().iloc[-1]
-        volume_ratio = volume[-1] / avg_volume if avg_volume > 0 else 1
+        current_volume = engine.volume.iloc[-1]
+        avg_volume = engine.sma(20, field='volume').iloc[-1]
+        volume_ratio = (current_volume / avg_volume).where(avg_volume > 0, 1)
         
         # Trend
-        sma20 = pd.Series(close).rolling(20).mean().iloc[-1]
-        sma50 = pd.Series(close).rolling(50).mean().iloc[-1]
-        
-        if current_price > sma20 > sma50:
-            trend = "UPTREND"
-        elif current_price < sma20 < sma50:
-            trend = "DOWNTREND"
-        else:
-            trend = "SIDEWAYS"
+        sma20 = engine.sma(20).iloc[-1]
+        sma50 = engine.sma(50).iloc[-1]
+        
+        trend = np.select(
+            [(current_price > sma20) & (sma20 > sma50),
+             (current_price < sma20) & (sma20 < sma50)],
+            ["UPTREND", "DOWNTREND"],
+            default="SIDEWAYS"
+        )
         
-        return {
+        table = pd.DataFrame({
             'price': current_price,
             'change_pct': change_pct,
             'rsi': current_rsi,
@@ -354,9 +404,13 @@ class AutoScanScheduler:
             'macd_hist': current_macd - current_signal,
             'sma20': sma20,
             'sma50': sma50,
-            'volume': volume[-1],
-            'volume_ratio': volume_ratio,
-            'trend': trend
+            'volume': current_volume,
+            'volume_ratio': volume_ratio
+        })
+        
+        return {
+            symbol: dict(row, trend=str(trend[j]))
+            for j, (symbol, row) in enumerate(zip(table.index, table.to_dict('records')))
         }
     
     def _generate_signals(self, indicators: Dict) -> List[Dict]:
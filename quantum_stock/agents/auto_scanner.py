@@ -19,6 +19,13 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 from loguru import logger
 
+try:
+    from ..data.market_store import load_history
+    from ..indicators.panel import PanelIndicatorEngine
+except ImportError:
+    from data.market_store import load_history
+    from indicators.panel import PanelIndicatorEngine
+
 
 @dataclass
 class ScanResult:
@@ -41,12 +48,17 @@ class AutoScanner:
         self,
         data_dir: str = "data/historical",
         scan_interval: int = 300,  # 5 minutes
-        min_score: float = 2.0
+        min_score: float = 2.0,
+        lookback: int = 250
     ):
         self.data_dir = Path(data_dir)
         self.scan_interval = scan_interval
         self.min_score = min_score
 
+        # Bars loaded per symbol: long enough for the adjust=True MACD /
+        # EMA20 to converge, so scores match the full-history values
+        self.lookback = max(60, lookback)
+
         # Callbacks
         self.on_signal_callbacks: List[Callable] = []
 
@@ -86,26 +98,10 @@ class AutoScanner:
         parquet_files = list(self.data_dir.glob("*.parquet"))
         logger.info(f"Scanning {len(parquet_files)} stocks")
 
-        results = []
-
-        # Scan in batches for performance
-        batch_size = 50
-        for i in range(0, len(parquet_files), batch_size):
-            batch = parquet_files[i:i+batch_size]
-
-            # Process batch
-            batch_results = await asyncio.gather(
-                *[self._scan_symbol(f.stem) for f in batch],
-                return_exceptions=True
-            )
-
-            # Collect results
-            for result in batch_results:
-                if isinstance(result, ScanResult) and result.score >= self.min_score:
-                    results.append(result)
-
-        # Sort by score
-        results.sort(key=lambda x: abs(x.score), reverse=True)
+        # Indicators and scores for the whole universe in one panel pass
+        results = await asyncio.to_thread(
+            self._scan_universe, [f.stem for f in parquet_files]
+        )
 
         # Store results
         self.scan_results = {r.symbol: r for r in results}
@@ -125,89 +121,122 @@ class AutoScanner:
             f"(Top: {results[0].symbol if results else 'N/A'})"
         )
 
+    def _scan_universe(self, symbols: List[str]) -> List[ScanResult]:
+        """Score all symbols at once; signals above min_score, strongest first"""
+        frames = {}
+        for symbol in symbols:
+            try:
+                df = load_history(symbol, str(self.data_dir), days=self.lookback)
+            except Exception as e:
+                logger.debug(f"Error loading {symbol}: {e}")
+                continue
+            if df is not None and len(df) >= 30:
+                frames[symbol] = df
+
+        if not frames:
+            return []
+
+        engine = PanelIndicatorEngine.from_frames(frames)
+        table = self._calculate_indicators_panel(engine)
+        scores = pd.Series(
+            [self._calculate_score(indicators, None) for indicators in table.to_dict('records')],
+            index=table.index
+        )
+
+        picks = PanelIndicatorEngine.screen(
+            table, where=scores >= self.min_score, rank_by=scores.abs()
+        )
+
+        now = datetime.now()
+        return [
+            self._make_result(symbol, indicators, scores[symbol], now)
+            for symbol, indicators in zip(picks.index, picks.to_dict('records'))
+        ]
+
     async def _scan_symbol(self, symbol: str) -> Optional[ScanResult]:
         """Scan single symbol"""
         try:
             # Load data
-            file_path = self.data_dir / f"{symbol}.parquet"
-            if not file_path.exists():
-                return None
+            df = load_history(symbol, str(self.data_dir), days=self.lookback)
 
-            df = pd.read_parquet(file_path)
-
-            if len(df) < 30:
+            if df is None or len(df) < 30:
                 return None
 
             # Get latest data
             latest = df.iloc[-1]
-            last_30 = df.iloc[-30:]
 
             # Calculate indicators
-            indicators = self._calculate_indicators(last_30)
+            indicators = self._calculate_indicators(df)
 
             # Score signal
             score = self._calculate_score(indicators, latest)
 
-            # Determine signal
-            if score >= 2.5:
-                signal = "STRONG_BUY"
-            elif score >= 1.0:
-                signal = "BUY"
-            elif score <= -2.5:
-                signal = "STRONG_SELL"
-            elif score <= -1.0:
-                signal = "SELL"
-            else:
-                signal = "HOLD"
-
-            return ScanResult(
-                symbol=symbol,
-                score=score,
-                signal=signal,
-                indicators=indicators,
-                timestamp=datetime.now()
-            )
+            return self._make_result(symbol, indicators, score, datetime.now())
 
         except Exception as e:
             logger.debug(f"Error scanning {symbol}: {e}")
             return None
 
+    @staticmethod
+    def _make_result(symbol: str, indicators: Dict, score: float,
+                     timestamp: datetime) -> ScanResult:
+        """Build a ScanResult from indicators and score"""
+        # Determine signal
+        if score >= 2.5:
+            signal = "STRONG_BUY"
+        elif score >= 1.0:
+            signal = "BUY"
+        elif score <= -2.5:
+            signal = "STRONG_SELL"
+        elif score <= -1.0:
+            signal = "SELL"
+        else:
+            signal = "HOLD"
+
+        return ScanResult(
+            symbol=symbol,
+            score=score,
+            signal=signal,
+            indicators=indicators,
+            timestamp=timestamp
+        )
+
     def _calculate_indicators(self, df: pd.DataFrame) -> Dict:
         """Calculate technical indicators"""
-        indicators = {}
-
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        indicators['rsi'] = 100 - (100 / (1 + rs.iloc[-1]))
-
-        # MACD
-        ema_12 = df['close'].ewm(span=12).mean()
-        ema_26 = df['close'].ewm(span=26).mean()
-        macd = ema_12 - ema_26
-        signal_line = macd.ewm(span=9).mean()
-        indicators['macd'] = macd.iloc[-1]
-        indicators['macd_signal'] = signal_line.iloc[-1]
-        indicators['macd_histogram'] = macd.iloc[-1] - signal_line.iloc[-1]
-
-        # Moving averages
-        indicators['sma_20'] = df['close'].rolling(20).mean().iloc[-1]
-        indicators['ema_20'] = df['close'].ewm(span=20).mean().iloc[-1]
-
-        # Volume
-        indicators['volume_avg'] = df['volume'].rolling(20).mean().iloc[-1]
-        indicators['volume_ratio'] = df['volume'].iloc[-1] / indicators['volume_avg']
-
-        # Momentum
-        indicators['roc_5'] = (df['close'].iloc[-1] / df['close'].iloc[-6] - 1) * 100
-        indicators['roc_20'] = (df['close'].iloc[-1] / df['close'].iloc[-21] - 1) * 100
-
-        # Current price
-        indicators['current_price'] = df['close'].iloc[-1]
-
-        return indicators
+        engine = PanelIndicatorEngine.from_frames({'_': df})
+        return self._calculate_indicators_panel(engine).iloc[0].to_dict()
+
+    def _calculate_indicators_panel(self, engine: PanelIndicatorEngine) -> pd.DataFrame:
+        """Calculate technical indicators for every symbol of a panel
+
+        Returns:
+            DataFrame indexed by symbol, one column per indicator
+        """
+        close = engine.close
+        macd = engine.macd(12, 26, 9, adjust=True)
+        volume_avg = engine.sma(20, field='volume')
+
+        table = engine.latest(
+            # RSI
+            rsi=engine.rsi(14, smoothing='sma'),
+            # MACD
+            macd=macd['macd'],
+            macd_signal=macd['signal'],
+            macd_histogram=macd['histogram'],
+            # Moving averages
+            sma_20=engine.sma(20),
+            ema_20=engine.ema(20, adjust=True),
+            # Volume
+            volume_avg=volume_avg,
+            volume_ratio=engine.volume / volume_avg,
+            # Momentum
+            roc_5=(close / close.shift(5) - 1) * 100,
+            roc_20=(close / close.shift(20) - 1) * 100,
+            # Current price
+            current_price=close
+        )
+
+        return table
 
     def _calculate_score(self, indicators: Dict, latest: pd.Series) -> float:
         """Calculate signal score"""
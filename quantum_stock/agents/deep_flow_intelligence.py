@@ -21,9 +21,13 @@ from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-import json
 import os
 
+try:
+    from ..utils.journal import Journal
+except ImportError:
+    from utils.journal import Journal
+
 
 class FlowSignalType(Enum):
     """Types of flow signals"""
@@ -90,32 +94,27 @@ class DeepFlowIntelligence:
             'iceberg_chunk_count': 10,        # >10 same-size orders
         }
         
+        # Snapshot + append-only journal of learning updates
+        self._journal = Journal(self.storage_path, snapshot=self._snapshot)
         self._load()
     
     def _load(self):
         """Load historical insights"""
         try:
-            if os.path.exists(self.storage_path):
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.learning_data = data.get('learning_data', {})
+            data, records = self._journal.load()
+            if data is not None:
+                self.learning_data = data.get('learning_data', {})
+            for record in records:
+                self._apply_learning(record['symbol'], record['signal_types'])
         except Exception as e:
             print(f"Error loading flow intelligence: {e}")
     
-    def _save(self):
-        """Save insights and learning data"""
-        try:
-            os.makedirs(os.path.dirname(self.storage_path), exist_ok=True)
-            
-            data = {
-                'learning_data': self.learning_data,
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Error saving flow intelligence: {e}")
+    def _snapshot(self) -> Dict:
+        """Full state for journal compaction"""
+        return {
+            'learning_data': self.learning_data,
+            'last_updated': datetime.now().isoformat()
+        }
     
     def analyze(self, symbol: str, df: pd.DataFrame, 
                 flow_data: Dict = None) -> List[FlowInsight]:
@@ -633,6 +632,20 @@ class DeepFlowIntelligence:
     
     def _learn_from_insights(self, symbol: str, insights: List[FlowInsight]):
         """Learn from insights to improve accuracy"""
+        counts: Dict[str, int] = {}
+        for insight in insights:
+            sig_type = insight.signal_type.value
+            counts[sig_type] = counts.get(sig_type, 0) + 1
+        
+        self._apply_learning(symbol, counts)
+        
+        try:
+            self._journal.append({'symbol': symbol, 'signal_types': counts})
+        except Exception as e:
+            print(f"Error saving flow intelligence: {e}")
+    
+    def _apply_learning(self, symbol: str, counts: Dict[str, int]):
+        """Add per-type signal counts to the learning data"""
         if symbol not in self.learning_data:
             self.learning_data[symbol] = {
                 'total_signals': 0,
@@ -641,15 +654,12 @@ class DeepFlowIntelligence:
             }
         
         ld = self.learning_data[symbol]
-        ld['total_signals'] += len(insights)
+        ld['total_signals'] += sum(counts.values())
         
-        for insight in insights:
-            sig_type = insight.signal_type.value
+        for sig_type, count in counts.items():
             if sig_type not in ld['signal_types']:
                 ld['signal_types'][sig_type] = 0
-            ld['signal_types'][sig_type] += 1
-        
-        self._save()
+            ld['signal_types'][sig_type] += count
     
     def get_summary(self, symbol: str) -> Dict:
         """Get summary of insights for symbol"""
@@ -4,12 +4,19 @@ Provides persistent memory for agents to learn from past analyses
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 from datetime import datetime, timedelta
-import json
+from bisect import bisect_left
+from itertools import count, islice, takewhile
+import heapq
 import os
 from enum import Enum
 
+try:
+    from ..utils.journal import Journal
+except ImportError:
+    from utils.journal import Journal
+
 
 class MemoryType(Enum):
     """Types of memories stored by agents"""
@@ -62,6 +69,45 @@ class Memory:
         )
 
 
+class _TimeIndex:
+    """Memories in timestamp order, with a parallel list of sort keys"""
+    
+    __slots__ = ('times', 'items')
+    
+    def __init__(self):
+        self.times: List[datetime] = []
+        self.items: List[Memory] = []
+    
+    def add(self, memory: Memory):
+        # Equal timestamps go before existing ones, so newest() yields them
+        # in insertion order
+        t = memory.timestamp
+        if not self.times or t > self.times[-1]:
+            self.times.append(t)
+            self.items.append(memory)
+        else:
+            i = bisect_left(self.times, t)
+            self.times.insert(i, t)
+            self.items.insert(i, memory)
+    
+    def remove(self, memory: Memory) -> bool:
+        i = bisect_left(self.times, memory.timestamp)
+        while i < len(self.items) and self.times[i] == memory.timestamp:
+            if self.items[i] is memory:
+                del self.times[i]
+                del self.items[i]
+                return True
+            i += 1
+        return False
+    
+    def newest(self) -> Iterator[Memory]:
+        return reversed(self.items)
+
+
+# Index owner of shared memories
+_SHARED = '__shared__'
+
+
 class AgentMemorySystem:
     """
     Centralized memory system for all agents.
@@ -70,69 +116,199 @@ class AgentMemorySystem:
     2. Learn from prediction outcomes
     3. Share knowledge between agents
     4. Recognize recurring patterns
+    
+    Persisted as a JSON snapshot at storage_path plus an append-only
+    journal of changes (see utils.journal).
+    
+    Memories are indexed by (owner, symbol, type), each index kept in
+    timestamp order, so recall walks only the matching memories newest
+    first and stops at the limit. Expiring memories sit in a heap that
+    cleanup_expired pops.
     """
     
     def __init__(self, storage_path: str = "agent_memory.json"):
         self.storage_path = storage_path
         self.memories: Dict[str, List[Memory]] = {}  # agent_name -> memories
-        self.shared_memories: List[Memory] = []  # Shared across agents
         self.pattern_cache: Dict[str, Dict[str, Any]] = {}  # symbol -> patterns
+        
+        # (owner, symbol or None, type or None) -> time-ordered memories;
+        # memories[agent] and shared_memories are the (owner, None, None) lists
+        self._indexes: Dict[Tuple[str, Optional[str], Optional[MemoryType]], _TimeIndex] = {}
+        self._by_id: Dict[str, List[Memory]] = {}
+        self._owner_counts: Dict[int, int] = {}  # id(memory) -> owners holding it
+        self._expiry: List[Tuple[datetime, int, str, Memory]] = []
+        self._expiry_counter = count()
+        self.shared_memories: List[Memory] = self._index_for(_SHARED, None, None).items
+        
+        self._journal = Journal(storage_path, snapshot=self._snapshot)
         self._load()
     
     def _load(self):
         """Load memories from persistent storage"""
-        if os.path.exists(self.storage_path):
-            try:
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
+        try:
+            data, records = self._journal.load()
+            
+            if data is not None:
                 # Load agent memories
                 for agent_name, memories in data.get('agent_memories', {}).items():
-                    self.memories[agent_name] = [
-                        Memory.from_dict(m) for m in memories
-                    ]
+                    self._index_for(agent_name, None, None)
+                    for m in memories:
+                        self._add(agent_name, Memory.from_dict(m))
                 
-                # Load shared memories
-                self.shared_memories = [
-                    Memory.from_dict(m) for m in data.get('shared_memories', [])
-                ]
+                # Load shared memories (same object as the agent's copy)
+                for m in data.get('shared_memories', []):
+                    memory = Memory.from_dict(m)
+                    for candidate in self._by_id.get(memory.memory_id, []):
+                        if candidate.timestamp == memory.timestamp:
+                            memory = candidate
+                            break
+                    self._add(_SHARED, memory)
                 
                 # Load pattern cache
                 self.pattern_cache = data.get('pattern_cache', {})
+            
+            # Changes made after the snapshot
+            for record in records:
+                self._apply(record)
                 
-            except Exception as e:
-                print(f"Error loading memory: {e}")
+        except Exception as e:
+            print(f"Error loading memory: {e}")
     
-    def _save(self):
-        """Save memories to persistent storage"""
+    def _snapshot(self) -> Dict[str, Any]:
+        """Full state for journal compaction"""
+        return {
+            'agent_memories': {
+                name: [m.to_dict() for m in memories]
+                for name, memories in self.memories.items()
+            },
+            'shared_memories': [m.to_dict() for m in self.shared_memories],
+            'pattern_cache': self.pattern_cache,
+            'last_updated': datetime.now().isoformat()
+        }
+    
+    def _append(self, record: Dict[str, Any]):
+        """Persist an applied change"""
         try:
-            data = {
-                'agent_memories': {
-                    name: [m.to_dict() for m in memories]
-                    for name, memories in self.memories.items()
-                },
-                'shared_memories': [m.to_dict() for m in self.shared_memories],
-                'pattern_cache': self.pattern_cache,
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-                
+            self._journal.append(record)
         except Exception as e:
             print(f"Error saving memory: {e}")
     
-    def store(self, agent_name: str, memory: Memory, shared: bool = False):
-        """Store a memory for an agent"""
-        if agent_name not in self.memories:
-            self.memories[agent_name] = []
+    def _apply(self, record: Dict[str, Any]) -> bool:
+        """Apply one journal record to the in-memory state"""
+        op = record['op']
+        
+        if op == 'store':
+            memory = record['memory']
+            if not isinstance(memory, Memory):
+                memory = Memory.from_dict(memory)
+            self._add(record['agent'], memory)
+            if record['shared']:
+                self._add(_SHARED, memory)
+            return True
+        
+        if op == 'outcome':
+            memories = self._by_id.get(record['memory_id'])
+            if not memories:
+                return False
+            for memory in memories:
+                memory.outcome = record['outcome']
+            return True
+        
+        if op == 'pattern':
+            symbol = record['symbol']
+            if symbol not in self.pattern_cache:
+                self.pattern_cache[symbol] = {
+                    'patterns': [],
+                    'last_updated': record['pattern']['discovered_at']
+                }
+            # Keep only recent patterns
+            patterns = self.pattern_cache[symbol]['patterns']
+            patterns.append(record['pattern'])
+            self.pattern_cache[symbol]['patterns'] = patterns[-50:]
+            return True
+        
+        raise ValueError(f"Unknown memory journal record: {op}")
+    
+    def _index_for(self, owner: str, symbol: Optional[str],
+                   memory_type: Optional[MemoryType]) -> _TimeIndex:
+        key = (owner, symbol, memory_type)
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = _TimeIndex()
+            if symbol is None and memory_type is None and owner != _SHARED:
+                self.memories[owner] = index.items
+        return index
+    
+    @staticmethod
+    def _index_keys(memory: Memory):
+        return ((None, None), (memory.symbol, None),
+                (None, memory.memory_type), (memory.symbol, memory.memory_type))
+    
+    def _add(self, owner: str, memory: Memory):
+        """Add a memory to the owner's indexes"""
+        for symbol, memory_type in self._index_keys(memory):
+            self._index_for(owner, symbol, memory_type).add(memory)
+        
+        owners = self._owner_counts.get(id(memory), 0)
+        if owners == 0:
+            self._by_id.setdefault(memory.memory_id, []).append(memory)
+        self._owner_counts[id(memory)] = owners + 1
+        
+        if memory.expires_at is not None:
+            heapq.heappush(self._expiry,
+                           (memory.expires_at, next(self._expiry_counter), owner, memory))
+    
+    def _remove(self, owner: str, memory: Memory) -> bool:
+        """Remove a memory from the owner's indexes"""
+        if not self._index_for(owner, None, None).remove(memory):
+            return False
         
-        self.memories[agent_name].append(memory)
+        for symbol, memory_type in self._index_keys(memory)[1:]:
+            key = (owner, symbol, memory_type)
+            self._indexes[key].remove(memory)
+            if not self._indexes[key].items:
+                del self._indexes[key]
         
-        if shared:
-            self.shared_memories.append(memory)
+        # Shared memories are also held by their agent
+        owners = self._owner_counts.pop(id(memory)) - 1
+        if owners:
+            self._owner_counts[id(memory)] = owners
+        else:
+            same_id = self._by_id[memory.memory_id]
+            same_id[:] = [m for m in same_id if m is not memory]
+            if not same_id:
+                del self._by_id[memory.memory_id]
+        return True
+    
+    def _iter_recall(self, agent_name: str, symbol: Optional[str],
+                     memory_type: Optional[MemoryType],
+                     include_shared: bool) -> Iterator[Memory]:
+        """Unexpired matching memories, most recent first"""
+        owners = [agent_name, _SHARED] if include_shared else [agent_name]
+        streams = [self._indexes[key].newest() for key in
+                   ((owner, symbol, memory_type) for owner in owners)
+                   if key in self._indexes]
+        if not streams:
+            return
+        
+        merged = streams[0] if len(streams) == 1 else \
+            heapq.merge(*streams, key=lambda m: m.timestamp, reverse=True)
         
-        self._save()
+        now = datetime.now()
+        seen = set()
+        for memory in merged:
+            if memory.expires_at is not None and memory.expires_at <= now:
+                continue
+            if id(memory) in seen:
+                continue
+            seen.add(id(memory))
+            yield memory
+    
+    def store(self, agent_name: str, memory: Memory, shared: bool = False):
+        """Store a memory for an agent"""
+        self._apply({'op': 'store', 'agent': agent_name, 'memory': memory, 'shared': shared})
+        self._append({'op': 'store', 'agent': agent_name,
+                      'memory': memory.to_dict(), 'shared': shared})
     
     def recall(self, agent_name: str, symbol: str = None, 
                memory_type: MemoryType = None,
@@ -141,49 +317,26 @@ class AgentMemorySystem:
         """
         Recall memories for an agent.
         Can filter by symbol and memory type.
-        """
-        memories = self.memories.get(agent_name, [])
-        
-        if include_shared:
-            memories = memories + self.shared_memories
-        
-        # Filter expired memories
-        now = datetime.now()
-        memories = [m for m in memories 
-                   if m.expires_at is None or m.expires_at > now]
-        
-        # Filter by symbol
-        if symbol:
-            memories = [m for m in memories if m.symbol == symbol]
-        
-        # Filter by type
-        if memory_type:
-            memories = [m for m in memories if m.memory_type == memory_type]
         
-        # Sort by timestamp (most recent first)
-        memories.sort(key=lambda m: m.timestamp, reverse=True)
-        
-        return memories[:limit]
+        Returns up to limit unexpired memories, most recent first (a shared
+        memory stored by the agent itself is returned once).
+        """
+        return list(islice(
+            self._iter_recall(agent_name, symbol or None, memory_type or None, include_shared),
+            limit
+        ))
     
     def record_outcome(self, memory_id: str, outcome: Dict[str, Any]):
         """
         Record the actual outcome of a prediction for learning.
         This is crucial for feedback loops.
         """
-        for agent_memories in self.memories.values():
-            for memory in agent_memories:
-                if memory.memory_id == memory_id:
-                    memory.outcome = outcome
-                    self._save()
-                    return True
+        record = {'op': 'outcome', 'memory_id': memory_id, 'outcome': outcome}
+        if not self._apply(record):
+            return False
         
-        for memory in self.shared_memories:
-            if memory.memory_id == memory_id:
-                memory.outcome = outcome
-                self._save()
-                return True
-        
-        return False
+        self._append(record)
+        return True
     
     def get_prediction_accuracy(self, agent_name: str, 
                                  symbol: str = None,
@@ -192,16 +345,14 @@ class AgentMemorySystem:
         Calculate prediction accuracy for an agent.
         Used for agent self-improvement.
         """
-        memories = self.recall(
-            agent_name, 
-            symbol=symbol,
-            memory_type=MemoryType.PREDICTION,
-            limit=1000,
-            include_shared=False
-        )
-        
         cutoff = datetime.now() - timedelta(days=lookback_days)
-        memories = [m for m in memories if m.timestamp > cutoff and m.outcome]
+        
+        # Newest first, so stop at the cutoff
+        recent = islice(
+            self._iter_recall(agent_name, symbol or None, MemoryType.PREDICTION, False),
+            1000
+        )
+        memories = [m for m in takewhile(lambda m: m.timestamp > cutoff, recent) if m.outcome]
         
         if not memories:
             return {'accuracy': 0.5, 'sample_size': 0}
@@ -260,22 +411,13 @@ class AgentMemorySystem:
     
     def store_pattern(self, symbol: str, pattern: Dict[str, Any]):
         """Store a recognized pattern for a symbol"""
-        if symbol not in self.pattern_cache:
-            self.pattern_cache[symbol] = {
-                'patterns': [],
-                'last_updated': datetime.now().isoformat()
-            }
-        
-        self.pattern_cache[symbol]['patterns'].append({
-            **pattern,
-            'discovered_at': datetime.now().isoformat()
-        })
-        
-        # Keep only recent patterns
-        self.pattern_cache[symbol]['patterns'] = \
-            self.pattern_cache[symbol]['patterns'][-50:]
-        
-        self._save()
+        record = {
+            'op': 'pattern',
+            'symbol': symbol,
+            'pattern': {**pattern, 'discovered_at': datetime.now().isoformat()}
+        }
+        self._apply(record)
+        self._append(record)
     
     def get_patterns(self, symbol: str) -> List[Dict[str, Any]]:
         """Get recognized patterns for a symbol"""
@@ -289,16 +431,12 @@ class AgentMemorySystem:
         """
         context = {}
         
-        for agent_name, memories in self.memories.items():
+        for agent_name in self.memories:
             if agent_name == requesting_agent:
                 continue
             
-            recent_analysis = None
-            for memory in reversed(memories):
-                if memory.symbol == symbol and \
-                   memory.memory_type == MemoryType.ANALYSIS:
-                    recent_analysis = memory
-                    break
+            index = self._indexes.get((agent_name, symbol, MemoryType.ANALYSIS))
+            recent_analysis = index.items[-1] if index and index.items else None
             
             if recent_analysis:
                 context[agent_name] = {
@@ -311,21 +449,23 @@ class AgentMemorySystem:
         return context
     
     def cleanup_expired(self):
-        """Remove expired memories"""
+        """Remove expired memories (pops only the expired ones off the heap)"""
         now = datetime.now()
+        removed = 0
         
-        for agent_name in self.memories:
-            self.memories[agent_name] = [
-                m for m in self.memories[agent_name]
-                if m.expires_at is None or m.expires_at > now
-            ]
+        while self._expiry and self._expiry[0][0] <= now:
+            _, _, owner, memory = heapq.heappop(self._expiry)
+            if self._remove(owner, memory):
+                removed += 1
         
-        self.shared_memories = [
-            m for m in self.shared_memories
-            if m.expires_at is None or m.expires_at > now
-        ]
+        # Bulk change: fold into a new snapshot
+        if removed:
+            try:
+                self._journal.compact()
+            except Exception as e:
+                print(f"Error saving memory: {e}")
         
-        self._save()
+        return removed
     
     def get_summary_stats(self) -> Dict[str, Any]:
         """Get summary statistics about the memory system"""
@@ -18,9 +18,11 @@ Features:
 """
 
 import asyncio
+import time
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Any, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -36,6 +38,17 @@ except ImportError:
     NewsArticle = None
     SentimentAnalyzer = None
 
+try:
+    from ..data.market_store import load_history
+    from ..indicators.panel import PanelIndicatorEngine, rolling_mean
+except ImportError:
+    from data.market_store import load_history
+    from indicators.panel import PanelIndicatorEngine, rolling_mean
+
+
+# Per-symbol scan stages, timed in NewsAwareScanner.last_scan_timings
+SCAN_STAGES = ('load', 'technical', 'news', 'combine')
+
 
 @dataclass
 class NewsAwareScanResult:
@@ -55,7 +68,6 @@ class NewsAwareScanResult:
     news_sentiment: float  # -1 to 1
     news_confidence: float
     news_count: int
-    recent_headlines: List[str] = field(default_factory=list)
 
     # Combined Signal
     final_signal: str  # STRONG_BUY, BUY, HOLD, SELL, STRONG_SELL
@@ -65,6 +77,9 @@ class NewsAwareScanResult:
     # Alert priority
     alert_level: str  # CRITICAL, HIGH, MEDIUM, LOW
 
+    # News headlines (defaulted field must come last)
+    recent_headlines: List[str] = field(default_factory=list)
+
     def to_dict(self) -> Dict:
         return {
             'symbol': self.symbol,
@@ -100,13 +115,27 @@ class NewsAwareScanner:
                  data_dir: str = "data/historical",
                  scan_interval: int = 300,  # 5 minutes
                  news_check_interval: int = 180,  # 3 minutes (check news more frequently!)
-                 min_signal_score: float = 2.0):
+                 min_signal_score: float = 2.0,
+                 max_concurrency: int = 8,
+                 lookback: int = 250,
+                 chunk_size: int = 64):
 
         self.data_dir = Path(data_dir)
         self.scan_interval = scan_interval
         self.news_check_interval = news_check_interval
         self.min_signal_score = min_signal_score
 
+        # Data loading and indicator math run on worker threads so the
+        # news monitoring loop keeps running during a full-market scan
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Only the last `lookback` bars are loaded (enough for SMA50 and a
+        # converged MACD), and the universe is scanned `chunk_size` symbols
+        # at a time so memory stays bounded and results stream per chunk
+        self.lookback = max(60, lookback)
+        self.chunk_size = max(1, chunk_size)
+
         # News engine
         self.news_engine = None
         if NewsTradingEngine:
@@ -122,6 +151,10 @@ class NewsAwareScanner:
         self.news_cache: Dict[str, List[NewsArticle]] = {}
         self.sentiment_cache: Dict[str, SentimentResult] = {}
 
+        # Last scan stats: total seconds per stage (summed over symbols)
+        self.last_scan_timings: Dict[str, float] = {}
+        self.last_scan_duration = 0.0
+
         # Vietnam market hours: 9:00-11:30, 13:00-14:45
         self.market_hours = [
             (9, 0, 11, 30),
@@ -174,8 +207,18 @@ class NewsAwareScanner:
     def stop(self):
         """Stop scanner"""
         self.is_running = False
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
         print("🛑 Scanner stopped")
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="news-scan"
+            )
+        return self._executor
+
     async def _news_monitoring_loop(self):
         """Monitor news continuously"""
         while self.is_running:
@@ -281,37 +324,74 @@ class NewsAwareScanner:
         print(f"{'='*70}")
 
         # Get all parquet files
-        parquet_files = list(self.data_dir.glob("*.parquet"))
+        parquet_files = sorted(self.data_dir.glob("*.parquet"))
 
         if not parquet_files:
             print("⚠️ No data files found")
             return
 
         results = []
-
-        # Scan in batches
-        batch_size = 50
-        for i in range(0, len(parquet_files), batch_size):
-            batch = parquet_files[i:i+batch_size]
-
-            for file_path in batch:
-                symbol = file_path.stem.upper()
-
+        timings = {stage: 0.0 for stage in SCAN_STAGES}
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def load(file_path: Path):
+            symbol = file_path.stem.upper()
+            async with semaphore:
                 try:
-                    result = await self._scan_symbol(symbol, file_path)
-                    if result:
-                        results.append(result)
-
-                        # Trigger callbacks for strong signals
-                        if result.signal_strength >= 0.7:
-                            for callback in self.signal_callbacks:
-                                try:
-                                    await callback(result)
-                                except Exception as e:
-                                    print(f"   ❌ Callback error: {e}")
+                    df, load_time = await loop.run_in_executor(
+                        executor, self._load_frame, symbol, file_path
+                    )
+                    timings['load'] += load_time
+                    return symbol, df
+                except Exception as e:
+                    print(f"   ❌ Error loading {symbol}: {e}")
+                    return symbol, None
+
+        for i in range(0, len(parquet_files), self.chunk_size):
+            chunk = parquet_files[i:i + self.chunk_size]
+
+            # 1. Load the chunk on worker threads, at most max_concurrency in flight
+            frames = {}
+            for symbol, df in await asyncio.gather(*(load(path) for path in chunk)):
+                if df is not None:
+                    frames[symbol] = df
+            if not frames:
+                continue
+
+            # 2. Indicators for the chunk in one panel pass
+            t0 = time.perf_counter()
+            try:
+                technical = await loop.run_in_executor(
+                    executor, self._calculate_technical_panel, frames
+                )
+            except Exception as e:
+                print(f"   ❌ Error calculating indicators: {e}")
+                continue
+            finally:
+                timings['technical'] += time.perf_counter() - t0
 
+            # 3. News + combine per symbol; callbacks fire as each chunk is ready
+            for symbol, tech_indicators in technical.items():
+                try:
+                    result = self._analyze_symbol(symbol, tech_indicators, timings)
                 except Exception as e:
                     print(f"   ❌ Error scanning {symbol}: {e}")
+                    continue
+                results.append(result)
+
+                # Trigger callbacks for strong signals
+                if result.signal_strength >= 0.7:
+                    for callback in self.signal_callbacks:
+                        try:
+                            await callback(result)
+                        except Exception as e:
+                            print(f"   ❌ Callback error: {e}")
+
+        self.last_scan_timings = timings
+        self.last_scan_duration = time.perf_counter() - started
 
         # Summary
         strong_signals = [r for r in results if r.signal_strength >= 0.7]
@@ -321,6 +401,8 @@ class NewsAwareScanner:
         print(f"   Total scanned: {len(results)}")
         print(f"   Strong signals: {len(strong_signals)}")
         print(f"   Critical alerts: {len(critical_alerts)}")
+        stage_times = ", ".join(f"{stage} {timings[stage]:.1f}s" for stage in SCAN_STAGES)
+        print(f"   Duration: {self.last_scan_duration:.1f}s ({stage_times})")
 
         if critical_alerts:
             print(f"\n🚨 CRITICAL ALERTS:")
@@ -329,115 +411,123 @@ class NewsAwareScanner:
 
         return results
 
-    async def _scan_symbol(self, symbol: str, file_path: Path) -> Optional[NewsAwareScanResult]:
-        """Scan single symbol with news + technical"""
-        try:
-            # Load data
-            df = pd.read_parquet(file_path)
-
-            if df.empty or len(df) < 50:
-                return None
-
-            # Standardize columns
-            df.columns = [c.lower() for c in df.columns]
-
-            # Calculate technical indicators
-            tech_indicators = self._calculate_technical(df)
-
-            # Get news sentiment (from cache if available)
-            news_sentiment = 0.0
-            news_confidence = 0.0
-            news_count = 0
-            headlines = []
+    def _load_frame(self, symbol: str, file_path: Path) -> Tuple[Optional[pd.DataFrame], float]:
+        """Load the last `lookback` bars of one symbol (runs on a worker thread)
 
-            if symbol in self.sentiment_cache:
-                sentiment = self.sentiment_cache[symbol]
-                news_sentiment = sentiment.sentiment_score
-                news_confidence = sentiment.confidence
-
-            if symbol in self.news_cache:
-                news_count = len(self.news_cache[symbol])
-                headlines = [a.title for a in self.news_cache[symbol][:3]]
-
-            # Combined analysis
-            final_signal, strength, reasoning, alert_level = self._combined_analysis(
-                tech_indicators, news_sentiment, news_confidence, news_count
-            )
-
-            return NewsAwareScanResult(
-                symbol=symbol,
-                timestamp=datetime.now(),
-                price=tech_indicators['price'],
-                change_pct=tech_indicators['change_pct'],
-                rsi=tech_indicators['rsi'],
-                macd_signal=tech_indicators['macd_signal'],
-                volume_ratio=tech_indicators['volume_ratio'],
-                trend=tech_indicators['trend'],
-                news_sentiment=news_sentiment,
-                news_confidence=news_confidence,
-                news_count=news_count,
-                recent_headlines=headlines,
-                final_signal=final_signal,
-                signal_strength=strength,
-                reasoning=reasoning,
-                alert_level=alert_level
-            )
+        Returns:
+            (DataFrame with lowercase columns or None, load seconds)
+        """
+        t0 = time.perf_counter()
+        df = load_history(symbol, str(file_path.parent), days=self.lookback)
+
+        if df is None or df.empty or len(df) < 50:
+            return None, time.perf_counter() - t0
+
+        # Standardize columns
+        df.columns = [c.lower() for c in df.columns]
+        return df, time.perf_counter() - t0
+
+    def _analyze_symbol(self, symbol: str, tech_indicators: Dict,
+                        timings: Dict[str, float]) -> NewsAwareScanResult:
+        """Match cached news to a symbol and combine with its technicals"""
+        t0 = time.perf_counter()
+
+        # Get news sentiment (from cache if available)
+        news_sentiment = 0.0
+        news_confidence = 0.0
+        news_count = 0
+        headlines = []
+
+        if symbol in self.sentiment_cache:
+            sentiment = self.sentiment_cache[symbol]
+            news_sentiment = sentiment.sentiment_score
+            news_confidence = sentiment.confidence
+
+        if symbol in self.news_cache:
+            news_count = len(self.news_cache[symbol])
+            headlines = [a.title for a in self.news_cache[symbol][:3]]
+
+        t1 = time.perf_counter()
+        timings['news'] += t1 - t0
+
+        # Combined analysis
+        final_signal, strength, reasoning, alert_level = self._combined_analysis(
+            tech_indicators, news_sentiment, news_confidence, news_count
+        )
+        timings['combine'] += time.perf_counter() - t1
+
+        return NewsAwareScanResult(
+            symbol=symbol,
+            timestamp=datetime.now(),
+            price=tech_indicators['price'],
+            change_pct=tech_indicators['change_pct'],
+            rsi=tech_indicators['rsi'],
+            macd_signal=tech_indicators['macd_signal'],
+            volume_ratio=tech_indicators['volume_ratio'],
+            trend=tech_indicators['trend'],
+            news_sentiment=news_sentiment,
+            news_confidence=news_confidence,
+            news_count=news_count,
+            recent_headlines=headlines,
+            final_signal=final_signal,
+            signal_strength=strength,
+            reasoning=reasoning,
+            alert_level=alert_level
+        )
 
-        except Exception as e:
-            print(f"Error scanning {symbol}: {e}")
-            return None
+    def _calculate_technical_panel(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, Dict]:
+        """Calculate technical indicators for many symbols in one panel pass
 
-    def _calculate_technical(self, df: pd.DataFrame) -> Dict:
-        """Calculate technical indicators"""
-        close = df['close'].values
-        volume = df['volume'].values if 'volume' in df.columns else np.ones(len(close))
+        Returns:
+            {symbol: indicator dict}
+        """
+        engine = PanelIndicatorEngine.from_frames(frames)
+        close = engine.close
+        volume = engine.volume if engine.volume is not None else close.notna().astype(float)
+        bars = engine.bars
 
         # Current values
-        price = close[-1]
-        prev_price = close[-2] if len(close) > 1 else price
+        price = close.iloc[-1]
+        prev_price = close.iloc[-2].where(bars > 1, price) if len(close) > 1 else price
         change_pct = (price - prev_price) / prev_price * 100
 
         # RSI
-        delta = pd.Series(close).diff()
-        gain = delta.where(delta > 0, 0).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        current_rsi = rsi.iloc[-1] if len(rsi) > 0 and not pd.isna(rsi.iloc[-1]) else 50
+        rsi = engine.rsi(14, smoothing='sma').iloc[-1].fillna(50)
 
         # MACD
-        exp1 = pd.Series(close).ewm(span=12).mean()
-        exp2 = pd.Series(close).ewm(span=26).mean()
-        macd = exp1 - exp2
-        signal = macd.ewm(span=9).mean()
-
-        macd_val = macd.iloc[-1] if len(macd) > 0 and not pd.isna(macd.iloc[-1]) else 0
-        signal_val = signal.iloc[-1] if len(signal) > 0 and not pd.isna(signal.iloc[-1]) else 0
-
-        macd_signal = "BULLISH" if macd_val > signal_val else "BEARISH"
+        macd = engine.macd(12, 26, 9, adjust=True)
+        macd_val = macd['macd'].iloc[-1].fillna(0)
+        signal_val = macd['signal'].iloc[-1].fillna(0)
+        macd_signal = np.where(macd_val > signal_val, "BULLISH", "BEARISH")
 
         # Volume
-        avg_vol = pd.Series(volume).rolling(20).mean().iloc[-1] if len(volume) > 20 else volume[-1]
-        volume_ratio = volume[-1] / avg_vol if avg_vol > 0 else 1
+        current_volume = volume.iloc[-1]
+        avg_vol = rolling_mean(volume, 20).iloc[-1].where(bars > 20, current_volume)
+        volume_ratio = (current_volume / avg_vol).where(avg_vol > 0, 1)
 
         # Trend
-        sma20 = pd.Series(close).rolling(20).mean().iloc[-1] if len(close) > 20 else price
-        sma50 = pd.Series(close).rolling(50).mean().iloc[-1] if len(close) > 50 else price
+        sma20 = engine.sma(20).iloc[-1].where(bars > 20, price)
+        sma50 = engine.sma(50).iloc[-1].where(bars > 50, price)
 
-        if price > sma20 > sma50:
-            trend = "UPTREND"
-        elif price < sma20 < sma50:
-            trend = "DOWNTREND"
-        else:
-            trend = "SIDEWAYS"
+        trend = np.select(
+            [(price > sma20) & (sma20 > sma50), (price < sma20) & (sma20 < sma50)],
+            ["UPTREND", "DOWNTREND"],
+            default="SIDEWAYS"
+        )
 
+        price, change_pct, rsi, volume_ratio = (
+            x.to_numpy() for x in (price, change_pct, rsi, volume_ratio)
+        )
         return {
-            'price': price,
-            'change_pct': change_pct,
-            'rsi': current_rsi,
-            'macd_signal': macd_signal,
-            'volume_ratio': volume_ratio,
-            'trend': trend
+            symbol: {
+                'price': price[j],
+                'change_pct': change_pct[j],
+                'rsi': rsi[j],
+                'macd_signal': str(macd_signal[j]),
+                'volume_ratio': volume_ratio[j],
+                'trend': str(trend[j])
+            }
+            for j, symbol in enumerate(close.columns)
         }
 
     def _combined_analysis(self, tech: Dict, news_sentiment: float,
@@ -18,6 +18,11 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 
+try:
+    from ..utils.journal import Journal
+except ImportError:
+    from utils.journal import Journal
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -91,8 +96,14 @@ class AgentPerformanceTracker:
     - Performance metrics
     - Historical analysis
     - A/B testing support
+    
+    Persisted as a snapshot (performance.json) plus an append-only
+    journal of signals and outcomes (see utils.journal).
     """
     
+    # Records kept in snapshots
+    SNAPSHOT_LIMIT = 1000
+    
     def __init__(self, storage_path: str = "agent_performance"):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(exist_ok=True)
@@ -101,6 +112,9 @@ class AgentPerformanceTracker:
         self.outcomes: List[SignalOutcome] = []
         self.metrics: Dict[str, AgentMetrics] = {}
         
+        self._journal = Journal(str(self.storage_path / 'performance.json'),
+                                snapshot=self._snapshot)
+        
         # Load existing data
         self._load_data()
     
@@ -126,7 +140,7 @@ class AgentPerformanceTracker:
         )
         
         self.signals.append(signal)
-        self._save_signals()
+        self._append({'op': 'signal', 'signal': self._signal_to_dict(signal)})
         
         logger.info(f"Recorded signal: {agent_name} {action} {symbol} @ {price}")
         return signal_id
@@ -171,7 +185,11 @@ class AgentPerformanceTracker:
         
         self.outcomes.append(outcome)
         self._update_metrics(signal.agent_name)
-        self._save_outcomes()
+        self._append({
+            'op': 'outcome',
+            'outcome': self._outcome_to_dict(outcome),
+            'metrics': self.metrics[signal.agent_name].to_dict()
+        })
         
         logger.info(f"Recorded outcome: {signal.agent_name} {signal.symbol} "
                    f"{'✅' if was_correct else '❌'} {return_pct:.2%}")
@@ -238,8 +256,6 @@ class AgentPerformanceTracker:
             consistency_score=consistency,
             last_updated=datetime.now()
         )
-        
-        self._save_metrics()
     
     def get_metrics(self, agent_name: str = None) -> Dict[str, AgentMetrics]:
         """Get metrics for agent(s)"""
@@ -304,53 +320,96 @@ class AgentPerformanceTracker:
             }
         }
     
-    def _save_signals(self):
-        """Save signals to file"""
-        data = []
-        for s in self.signals[-1000:]:  # Keep last 1000
-            data.append({
-                'agent_name': s.agent_name,
-                'symbol': s.symbol,
-                'action': s.action,
-                'confidence': s.confidence,
-                'timestamp': s.timestamp.isoformat(),
-                'price_at_signal': s.price_at_signal,
-                'reasoning': s.reasoning,
-                'metadata': s.metadata
-            })
-        
-        with open(self.storage_path / 'signals.json', 'w') as f:
-            json.dump(data, f, indent=2)
+    @staticmethod
+    def _signal_to_dict(s: AgentSignal) -> Dict:
+        return {
+            'agent_name': s.agent_name,
+            'symbol': s.symbol,
+            'action': s.action,
+            'confidence': s.confidence,
+            'timestamp': s.timestamp.isoformat(),
+            'price_at_signal': s.price_at_signal,
+            'reasoning': s.reasoning,
+            'metadata': s.metadata
+        }
     
-    def _save_outcomes(self):
-        """Save outcomes to file"""
-        data = []
-        for o in self.outcomes[-1000:]:
-            data.append({
-                'signal_id': o.signal_id,
-                'agent_name': o.agent_name,
-                'symbol': o.symbol,
-                'action': o.action,
-                'entry_price': o.entry_price,
-                'exit_price': o.exit_price,
-                'return_pct': o.return_pct,
-                'holding_period_days': o.holding_period_days,
-                'was_correct': o.was_correct,
-                'timestamp': o.timestamp.isoformat()
-            })
-        
-        with open(self.storage_path / 'outcomes.json', 'w') as f:
-            json.dump(data, f, indent=2)
+    @staticmethod
+    def _outcome_to_dict(o: SignalOutcome) -> Dict:
+        return {
+            'signal_id': o.signal_id,
+            'agent_name': o.agent_name,
+            'symbol': o.symbol,
+            'action': o.action,
+            'entry_price': o.entry_price,
+            'exit_price': o.exit_price,
+            'return_pct': o.return_pct,
+            'holding_period_days': o.holding_period_days,
+            'was_correct': o.was_correct,
+            'timestamp': o.timestamp.isoformat()
+        }
     
-    def _save_metrics(self):
-        """Save metrics to file"""
-        data = {name: m.to_dict() for name, m in self.metrics.items()}
-        
-        with open(self.storage_path / 'metrics.json', 'w') as f:
-            json.dump(data, f, indent=2)
+    @staticmethod
+    def _signal_from_dict(item: Dict) -> AgentSignal:
+        item = dict(item, timestamp=datetime.fromisoformat(item['timestamp']))
+        return AgentSignal(**item)
+    
+    @staticmethod
+    def _outcome_from_dict(item: Dict) -> SignalOutcome:
+        item = dict(item, timestamp=datetime.fromisoformat(item['timestamp']))
+        return SignalOutcome(**item)
+    
+    @staticmethod
+    def _metrics_from_dict(m: Dict) -> AgentMetrics:
+        m = dict(m, last_updated=datetime.fromisoformat(m['last_updated']))
+        return AgentMetrics(**m)
+    
+    def _snapshot(self) -> Dict:
+        """Full state for journal compaction (last SNAPSHOT_LIMIT records)"""
+        return {
+            'signals': [self._signal_to_dict(s) for s in self.signals[-self.SNAPSHOT_LIMIT:]],
+            'outcomes': [self._outcome_to_dict(o) for o in self.outcomes[-self.SNAPSHOT_LIMIT:]],
+            'metrics': {name: m.to_dict() for name, m in self.metrics.items()}
+        }
+    
+    def _append(self, record: Dict):
+        """Persist a new signal or outcome"""
+        try:
+            self._journal.append(record)
+        except Exception as e:
+            logger.warning(f"Failed to save performance data: {e}")
     
     def _load_data(self):
-        """Load existing data from files"""
+        """Load existing data from the snapshot and journal"""
+        try:
+            state, records = self._journal.load()
+        except Exception as e:
+            logger.warning(f"Failed to load performance data: {e}")
+            return
+        
+        if state is None:
+            self._load_legacy_files()
+        else:
+            try:
+                self.signals = [self._signal_from_dict(i) for i in state.get('signals', [])]
+                self.outcomes = [self._outcome_from_dict(i) for i in state.get('outcomes', [])]
+                self.metrics = {name: self._metrics_from_dict(m)
+                                for name, m in state.get('metrics', {}).items()}
+            except Exception as e:
+                logger.warning(f"Failed to load performance snapshot: {e}")
+        
+        for record in records:
+            try:
+                if record['op'] == 'signal':
+                    self.signals.append(self._signal_from_dict(record['signal']))
+                elif record['op'] == 'outcome':
+                    outcome = self._outcome_from_dict(record['outcome'])
+                    self.outcomes.append(outcome)
+                    self.metrics[outcome.agent_name] = self._metrics_from_dict(record['metrics'])
+            except Exception as e:
+                logger.warning(f"Skipping bad performance record: {e}")
+    
+    def _load_legacy_files(self):
+        """Import signals.json / outcomes.json / metrics.json from older versions"""
         # Load signals
         signals_file = self.storage_path / 'signals.json'
         if signals_file.exists():
@@ -386,6 +445,12 @@ class AgentPerformanceTracker:
                     self.metrics[name] = AgentMetrics(**m)
             except Exception as e:
                 logger.warning(f"Failed to load metrics: {e}")
+        
+        if self.signals or self.outcomes or self.metrics:
+            try:
+                self._journal.compact()
+            except Exception as e:
+                logger.warning(f"Failed to migrate performance data: {e}")
 
 
 # ============================================
@@ -204,6 +204,20 @@ class RiskDoctor(BaseAgent):
             else:
                 risk_factors.append(5)
 
+        # 9. Portfolio VaR concentration (PortfolioView on the live covariance
+        # engine, e.g. the circuit breaker's risk_portfolio). Skipped while the
+        # portfolio carries no risk yet (flat book or too few bars).
+        portfolio = context.get('risk_portfolio')
+        if (portfolio is not None and stock_data.symbol in portfolio.engine.assets
+                and portfolio.portfolio_volatility() > 0):
+            component = portfolio.component_var(0.95)
+            share = component[stock_data.symbol] / sum(component.values())
+            if share > 0.4:
+                risk_factors.append(20)
+                warnings.append(f"Chiếm {share:.0%} VaR danh mục - Rủi ro tập trung")
+            elif share > 0.25:
+                risk_factors.append(10)
+
         # Calculate total risk score
         risk_score = min(100, sum(risk_factors))
 
@@ -15,7 +15,10 @@ import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, Dict, List, Tuple
+from functools import lru_cache
+from typing import Optional, Dict, List, Sequence, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -39,6 +42,266 @@ class RegimeAnalysis:
     position_multiplier: float  # 0.5 = reduce, 1.0 = normal, 1.5 = increase
 
 
+# ---------------------------------------------------------------------------
+# Batched kernels. Rows are symbols, columns are bars; histories are
+# right-aligned (bars before a symbol's first bar are NaN).
+# ---------------------------------------------------------------------------
+
+def _right_align(prices: np.ndarray) -> np.ndarray:
+    """Move each row's NaN (missing bars) to the front, keeping bar order"""
+    missing = ~np.isfinite(prices)
+    if not missing.any():
+        return prices
+    order = np.argsort(~missing, axis=1, kind='stable')
+    return np.take_along_axis(np.where(missing, np.nan, prices), order, axis=1)
+
+
+@lru_cache(maxsize=32)
+def _rs_layout(n_returns: int):
+    """
+    Block layout for R/S analysis of n_returns returns
+
+    Scale n (4 .. max_k - 1) splits the returns into n_returns // n blocks
+    of n. The blocks of every scale are laid end to end, so one reduceat
+    pass over the gathered returns covers all scales.
+
+    Returns:
+        (scales, positions in the returns, block starts, block lengths,
+         block of each position, first block of each scale)
+    """
+    max_k = min(n_returns // 2, 50)
+    scales = np.arange(4, max(max_k, 4))
+    positions, block_len, scale_start = [], [], []
+    for n in scales:
+        n_blocks = n_returns // n
+        scale_start.append(len(block_len))
+        positions.append(np.arange(n_blocks * n))
+        block_len.extend([n] * n_blocks)
+
+    block_len = np.array(block_len, dtype=np.int64)
+    block_start = np.concatenate([[0], np.cumsum(block_len)[:-1]]).astype(np.int64)
+    positions = np.concatenate(positions) if positions else np.zeros(0, dtype=np.int64)
+    block_of = np.repeat(np.arange(len(block_len)), block_len)
+    return scales, positions, block_start, block_len, block_of, np.array(scale_start, dtype=np.int64)
+
+
+def _hurst_rs(prices: np.ndarray) -> np.ndarray:
+    """
+    Hurst exponent (R/S analysis) of each row of a (symbols x prices) matrix
+
+    Same method as MarketRegimeDetector.calculate_hurst_exponent: mean R/S
+    of the non-flat blocks at each scale, H = slope of log(R/S) on log(n)
+    over scales with at least one such block (0.5 with fewer than 3).
+    """
+    n_rows, length = prices.shape
+    hurst = np.full(n_rows, 0.5)
+    if length < 20 or n_rows == 0:
+        return hurst
+
+    returns = np.diff(np.log(prices), axis=1)
+    scales, positions, block_start, block_len, block_of, scale_start = _rs_layout(returns.shape[1])
+    if len(scales) == 0:
+        return hurst
+
+    x = returns[:, positions]
+    dev = x - (np.add.reduceat(x, block_start, axis=1) / block_len)[:, block_of]
+
+    # Cumulative deviation restarted at each block
+    cumdev = np.cumsum(dev, axis=1)
+    offset = np.zeros((n_rows, len(block_start)))
+    offset[:, 1:] = cumdev[:, block_start[1:] - 1]
+    cumdev -= offset[:, block_of]
+
+    R = np.maximum.reduceat(cumdev, block_start, axis=1) - np.minimum.reduceat(cumdev, block_start, axis=1)
+    S = np.sqrt(np.add.reduceat(dev * dev, block_start, axis=1) / (block_len - 1))
+    flat = ~(S > 0)
+    rs = np.where(flat, 0.0, R / np.where(flat, 1.0, S))
+
+    count = np.add.reduceat(~flat, scale_start, axis=1)
+    used = count > 0
+    log_rs = np.log(np.where(used, np.add.reduceat(rs, scale_start, axis=1) / np.maximum(count, 1), 1.0))
+
+    # Least-squares slope over the scales used by each row
+    w = used.astype(np.float64)
+    log_n = np.log(scales)
+    sw = w.sum(axis=1)
+    mean_x = (w * log_n).sum(axis=1) / np.maximum(sw, 1)
+    mean_y = (w * log_rs).sum(axis=1) / np.maximum(sw, 1)
+    dx = (log_n - mean_x[:, None]) * w
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (dx * (log_rs - mean_y[:, None])).sum(axis=1) / (dx * dx).sum(axis=1)
+
+    return np.where(sw >= 3, np.clip(slope, 0.0, 1.0), 0.5)
+
+
+def _window_std(returns: np.ndarray, window: int) -> np.ndarray:
+    """np.std of every trailing window of each row (NaN if it holds NaN)"""
+    n_rows, n = returns.shape
+    out = np.full((n_rows, max(n - window + 1, 0)), np.nan)
+    if n < window or window < 1:
+        return out
+    step = max(1, (1 << 22) // (n * window))   # bound the temporaries
+    for i in range(0, n_rows, step):
+        out[i:i + step] = sliding_window_view(returns[i:i + step], window, axis=1).std(axis=-1)
+    return out
+
+
+def _wilder(x: np.ndarray, start: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder smoothing (prev * (period - 1) + x) / period along each row,
+    seeded with `start` at column `period`; columns before it are 0
+    """
+    out = np.zeros(x.shape)
+    out[:, period] = start
+    if x.shape[1] > period + 1:
+        out[:, period + 1:] = lfilter([1.0 / period], [1.0, -(period - 1) / period],
+                                      x[:, period + 1:], axis=1,
+                                      zi=(start * (period - 1) / period)[:, None])[0]
+    return out
+
+
+def _dx(smoothed: np.ndarray) -> np.ndarray:
+    """DX from smoothed (true range, +DM, -DM) along the last axis"""
+    atr = np.where(smoothed[..., 0] == 0, 1e-10, smoothed[..., 0])
+    plus_di = 100 * smoothed[..., 1] / atr
+    minus_di = 100 * smoothed[..., 2] / atr
+    di_sum = plus_di + minus_di
+    di_sum = np.where(di_sum == 0, 1e-10, di_sum)
+    return 100 * np.abs(plus_di - minus_di) / di_sum
+
+
+def _directional_moves(move: np.ndarray) -> np.ndarray:
+    """(true range, +DM, -DM) of close-to-close moves (close used as high/low)"""
+    move = np.nan_to_num(move)
+    return np.stack([np.abs(move), np.where(move > 0, move, 0.0), np.where(move < 0, -move, 0.0)], axis=-1)
+
+
+class _TrendState:
+    """
+    ADX-like trend strength per symbol (calculate_trend_strength), kept
+    as Wilder smoothing state so it can advance one bar at a time
+    """
+
+    def __init__(self, prices: np.ndarray, period: int = 14):
+        """
+        Args:
+            prices: (symbols x bars) right-aligned history
+            period: Smoothing period
+        """
+        n_rows, n_bars = prices.shape
+        self.period = period
+        self.bars = np.isfinite(prices).sum(axis=1)
+        self.last = prices[:, -1].copy() if n_bars else np.full(n_rows, np.nan)
+        self.warmup = np.zeros((n_rows, period, 3))   # moves of bars 1..period
+        self.smoothed = np.zeros((n_rows, 3))
+        self.adx = np.zeros(n_rows)
+        if n_bars < 2:
+            return
+
+        # Left-align so every row's history starts at column 0
+        left = np.take_along_axis(prices, np.argsort(~np.isfinite(prices), axis=1, kind='stable'), axis=1)
+        moves = np.zeros((n_rows, n_bars, 3))
+        moves[:, 1:] = _directional_moves(np.diff(left, axis=1))
+
+        head = min(period, n_bars - 1)
+        self.warmup[:, :head] = moves[:, 1:head + 1]
+        if n_bars < period + 1:
+            return
+
+        smoothed = np.stack([_wilder(moves[..., k], moves[:, 1:period + 1, k].mean(axis=1), period)
+                             for k in range(3)], axis=-1)
+        dx = _dx(smoothed)
+        adx = _wilder(dx, dx[:, 1:period + 1].mean(axis=1), period)
+
+        last = np.maximum(self.bars - 1, 0)[:, None]
+        self.smoothed = np.take_along_axis(smoothed, last[..., None], axis=1)[:, 0]
+        self.adx = np.take_along_axis(adx, last, axis=1)[:, 0]
+
+    @property
+    def value(self) -> np.ndarray:
+        """Trend strength (0 until period + 1 bars)"""
+        return np.where(self.bars >= self.period + 1, self.adx, 0.0)
+
+    def step(self, prices: np.ndarray):
+        """Advance symbols with a finite price by one bar"""
+        p = self.period
+        active = np.isfinite(prices)
+        i = self.bars
+        moves = _directional_moves(prices - self.last)
+
+        warm = active & (i >= 1) & (i <= p)
+        rows = np.flatnonzero(warm)
+        self.warmup[rows, i[rows] - 1] = moves[rows]
+
+        seed = np.flatnonzero(active & (i == p))
+        if len(seed):
+            self.smoothed[seed] = self.warmup[seed].mean(axis=1)
+            self.adx[seed] = _dx(self.smoothed[seed]) / p
+
+        grow = np.flatnonzero(active & (i > p))
+        if len(grow):
+            self.smoothed[grow] = (self.smoothed[grow] * (p - 1) + moves[grow]) / p
+            self.adx[grow] = (self.adx[grow] * (p - 1) + _dx(self.smoothed[grow])) / p
+
+        self.bars = self.bars + active
+        self.last = np.where(active, prices, self.last)
+
+
+def _volatility_percentile(current: np.ndarray, history: np.ndarray) -> np.ndarray:
+    """Percentile of current volatility among the finite historical values"""
+    n_hist = np.isfinite(history).sum(axis=1)
+    below = (history < current[:, None]).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentile = (below / n_hist) * 100
+    return np.where(np.isfinite(current) & (n_hist > 0), percentile, 50.0)
+
+
+@dataclass
+class RegimeBatch:
+    """Regime metrics for many symbols at one bar (arrays aligned with symbols)"""
+    symbols: List
+    regime: np.ndarray                  # MarketRegime values
+    hurst_exponent: np.ndarray
+    volatility_percentile: np.ndarray
+    trend_strength: np.ndarray
+    confidence: np.ndarray
+    position_multiplier: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.regime)
+
+    def analysis(self, i: int) -> 'RegimeAnalysis':
+        """RegimeAnalysis of symbol i (rounded like detect_regime)"""
+        regime = MarketRegime(self.regime[i])
+        return RegimeAnalysis(
+            regime=regime,
+            hurst_exponent=round(float(self.hurst_exponent[i]), 4),
+            volatility_percentile=round(float(self.volatility_percentile[i]), 2),
+            trend_strength=round(float(self.trend_strength[i]), 2),
+            confidence=round(float(self.confidence[i]), 4),
+            recommended_strategies=list(MarketRegimeDetector.REGIME_STRATEGIES[regime]),
+            position_multiplier=float(self.position_multiplier[i])
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per symbol"""
+        return pd.DataFrame({
+            'regime': self.regime,
+            'hurst_exponent': self.hurst_exponent,
+            'volatility_percentile': self.volatility_percentile,
+            'trend_strength': self.trend_strength,
+            'confidence': self.confidence,
+            'position_multiplier': self.position_multiplier
+        }, index=self.symbols)
+
+    def strategy_weights(self) -> pd.DataFrame:
+        """get_strategy_weights for every symbol (symbols x strategies)"""
+        table = pd.DataFrame({r.value: w for r, w in MarketRegimeDetector.STRATEGY_WEIGHTS.items()}).T
+        weights = table.loc[self.regime]
+        weights.index = self.symbols
+        return weights
+
+
 class MarketRegimeDetector:
     """
     Advanced Market Regime Detection System
@@ -52,6 +315,47 @@ class MarketRegimeDetector:
     Reference: Mandelbrot (1968), Hurst (1951)
     """
     
+    REGIME_STRATEGIES = {
+        MarketRegime.VOLATILE: ["Volatility Trading", "Options", "Hedging"],
+        MarketRegime.QUIET: ["Range Trading", "Mean Reversion", "Premium Selling"],
+        MarketRegime.TRENDING: ["Momentum", "Trend Following", "Breakout"],
+        MarketRegime.MEAN_REVERTING: ["Mean Reversion", "Pairs Trading", "RSI Oversold/Overbought"],
+        MarketRegime.NEUTRAL: ["Balanced", "Diversified", "Wait for Signal"]
+    }
+
+    STRATEGY_WEIGHTS = {
+        MarketRegime.TRENDING: {
+            "momentum": 0.70,
+            "mean_reversion": 0.10,
+            "volatility": 0.10,
+            "hedging": 0.10
+        },
+        MarketRegime.MEAN_REVERTING: {
+            "momentum": 0.10,
+            "mean_reversion": 0.70,
+            "volatility": 0.10,
+            "hedging": 0.10
+        },
+        MarketRegime.VOLATILE: {
+            "momentum": 0.15,
+            "mean_reversion": 0.15,
+            "volatility": 0.40,
+            "hedging": 0.30
+        },
+        MarketRegime.QUIET: {
+            "momentum": 0.30,
+            "mean_reversion": 0.40,
+            "volatility": 0.20,
+            "hedging": 0.10
+        },
+        MarketRegime.NEUTRAL: {
+            "momentum": 0.25,
+            "mean_reversion": 0.25,
+            "volatility": 0.25,
+            "hedging": 0.25
+        }
+    }
+
     def __init__(self, lookback_hurst: int = 100, lookback_vol: int = 20):
         self.lookback_hurst = lookback_hurst
         self.lookback_vol = lookback_vol
@@ -65,61 +369,10 @@ class MarketRegimeDetector:
         H = 0.5: Random walk
         H < 0.5: Mean-reverting (anti-persistent)
         
-        Implementation: Rescaled Range (R/S) method
+        Implementation: Rescaled Range (R/S) method, all scales in one
+        pass (see _hurst_rs)
         """
-        if len(prices) < 20:
-            return 0.5  # Default to random walk
-            
-        # Log returns
-        returns = np.diff(np.log(prices))
-        
-        # Calculate R/S for different time scales
-        max_k = min(len(returns) // 2, 50)
-        if max_k < 4:
-            return 0.5
-            
-        rs_values = []
-        n_values = []
-        
-        for n in range(4, max_k):
-            # Split into subseries
-            num_subseries = len(returns) // n
-            if num_subseries < 1:
-                continue
-                
-            rs_n = []
-            for i in range(num_subseries):
-                subseries = returns[i*n:(i+1)*n]
-                
-                # Mean-adjusted cumulative deviation
-                mean_adj = subseries - np.mean(subseries)
-                cumdev = np.cumsum(mean_adj)
-                
-                # Range
-                R = np.max(cumdev) - np.min(cumdev)
-                
-                # Standard deviation
-                S = np.std(subseries, ddof=1)
-                
-                if S > 0:
-                    rs_n.append(R / S)
-            
-            if len(rs_n) > 0:
-                rs_values.append(np.mean(rs_n))
-                n_values.append(n)
-        
-        if len(rs_values) < 3:
-            return 0.5
-            
-        # Linear regression to find H
-        log_n = np.log(n_values)
-        log_rs = np.log(rs_values)
-        
-        # H is the slope
-        slope, _ = np.polyfit(log_n, log_rs, 1)
-        
-        # Clamp to valid range
-        return np.clip(slope, 0.0, 1.0)
+        return float(_hurst_rs(np.asarray(prices, dtype=np.float64)[None, :])[0])
     
     def calculate_volatility_percentile(self, prices: np.ndarray) -> float:
         """
@@ -127,84 +380,24 @@ class MarketRegimeDetector:
         
         Returns: 0-100 percentile (100 = highest volatility)
         """
+        prices = np.asarray(prices, dtype=np.float64)
         if len(prices) < self.lookback_vol + 1:
             return 50.0
             
-        # Calculate rolling volatility
-        returns = np.diff(np.log(prices))
-        current_vol = np.std(returns[-self.lookback_vol:]) * np.sqrt(252)  # Annualized
-        
-        # Compare to history
-        historical_vols = []
-        for i in range(len(returns) - self.lookback_vol):
-            vol = np.std(returns[i:i+self.lookback_vol]) * np.sqrt(252)
-            historical_vols.append(vol)
+        # Rolling volatility; the last window is the current one
+        returns = np.diff(np.log(prices))[None, :]
+        vols = _window_std(returns, self.lookback_vol) * np.sqrt(252)  # Annualized
         
-        if len(historical_vols) == 0:
-            return 50.0
-            
-        # Percentile rank
-        percentile = (np.sum(np.array(historical_vols) < current_vol) / len(historical_vols)) * 100
-        
-        return percentile
+        return float(_volatility_percentile(vols[:, -1], vols[:, :-1])[0])
     
     def calculate_trend_strength(self, prices: np.ndarray, period: int = 14) -> float:
         """
-        Calculate trend strength (ADX-like measure)
+        Calculate trend strength (ADX-like measure, close used as high/low)
         
         Returns: 0-100 (higher = stronger trend)
         """
-        if len(prices) < period + 1:
-            return 0.0
-            
-        high = prices  # Simplified: using close as proxy
-        low = prices
-        close = prices
-        
-        # True Range components
-        plus_dm = np.zeros(len(prices))
-        minus_dm = np.zeros(len(prices))
-        tr = np.zeros(len(prices))
-        
-        for i in range(1, len(prices)):
-            up_move = high[i] - high[i-1]
-            down_move = low[i-1] - low[i]
-            
-            plus_dm[i] = up_move if up_move > down_move and up_move > 0 else 0
-            minus_dm[i] = down_move if down_move > up_move and down_move > 0 else 0
-            
-            tr[i] = max(
-                high[i] - low[i],
-                abs(high[i] - close[i-1]),
-                abs(low[i] - close[i-1])
-            )
-        
-        # Smoothed averages
-        def smooth_avg(arr, period):
-            result = np.zeros(len(arr))
-            result[period] = np.mean(arr[1:period+1])
-            for i in range(period+1, len(arr)):
-                result[i] = (result[i-1] * (period-1) + arr[i]) / period
-            return result
-        
-        atr = smooth_avg(tr, period)
-        plus_di = smooth_avg(plus_dm, period)
-        minus_di = smooth_avg(minus_dm, period)
-        
-        # Avoid division by zero
-        atr = np.where(atr == 0, 1e-10, atr)
-        
-        plus_di = 100 * plus_di / atr
-        minus_di = 100 * minus_di / atr
-        
-        # DX and ADX
-        di_sum = plus_di + minus_di
-        di_sum = np.where(di_sum == 0, 1e-10, di_sum)
-        dx = 100 * np.abs(plus_di - minus_di) / di_sum
-        
-        adx = smooth_avg(dx, period)
-        
-        return float(adx[-1]) if len(adx) > 0 else 0.0
+        prices = np.asarray(prices, dtype=np.float64)
+        return float(_TrendState(prices[None, :], period).value[0])
     
     def detect_regime(self, prices: np.ndarray) -> RegimeAnalysis:
         """
@@ -216,51 +409,55 @@ class MarketRegimeDetector:
         3. Calculate Trend Strength → Strong vs Weak
         4. Combine into regime classification
         """
-        prices = np.array(prices)
-        
-        # Calculate metrics
-        hurst = self.calculate_hurst_exponent(prices[-self.lookback_hurst:])
-        vol_pct = self.calculate_volatility_percentile(prices)
-        trend_str = self.calculate_trend_strength(prices)
-        
-        # Determine regime
-        if vol_pct > 80:
-            regime = MarketRegime.VOLATILE
-            strategies = ["Volatility Trading", "Options", "Hedging"]
-            position_mult = 0.5
-            confidence = min(vol_pct / 100, 0.95)
-            
-        elif vol_pct < 20:
-            regime = MarketRegime.QUIET
-            strategies = ["Range Trading", "Mean Reversion", "Premium Selling"]
-            position_mult = 1.2
-            confidence = min((100 - vol_pct) / 100, 0.90)
-            
-        elif hurst > 0.55:
-            regime = MarketRegime.TRENDING
-            strategies = ["Momentum", "Trend Following", "Breakout"]
-            position_mult = 1.0
-            confidence = min(hurst, 0.95)
-            
-        elif hurst < 0.45:
-            regime = MarketRegime.MEAN_REVERTING
-            strategies = ["Mean Reversion", "Pairs Trading", "RSI Oversold/Overbought"]
-            position_mult = 1.0
-            confidence = min(1 - hurst, 0.90)
-            
-        else:
-            regime = MarketRegime.NEUTRAL
-            strategies = ["Balanced", "Diversified", "Wait for Signal"]
-            position_mult = 0.8
-            confidence = 0.5
-        
-        return RegimeAnalysis(
+        prices = np.asarray(prices, dtype=np.float64)
+        return self.detect_regime_batch(prices[None, :]).analysis(0)
+
+    def detect_regime_batch(self, prices, symbols: Optional[Sequence] = None) -> RegimeBatch:
+        """
+        Regimes of a whole universe at its last bar
+
+        Args:
+            prices: (symbols x time) closes; a DataFrame indexed by date
+                    with one column per symbol is also accepted. NaN mark
+                    missing bars (e.g. before listing).
+            symbols: Row labels (default: DataFrame columns or 0..n-1)
+
+        Returns:
+            RegimeBatch, same results as detect_regime per symbol
+        """
+        return self.rolling(prices, symbols).regimes()
+
+    def rolling(self, prices, symbols: Optional[Sequence] = None) -> 'RegimeTracker':
+        """
+        Tracker seeded with a (symbols x time) history that updates the
+        regimes incrementally as each new bar arrives
+        """
+        return RegimeTracker(self, prices, symbols)
+
+    def classify(self, hurst: np.ndarray, vol_pct: np.ndarray, trend_strength: np.ndarray,
+                 symbols: Optional[Sequence] = None) -> RegimeBatch:
+        """Regime classification of per-symbol metric arrays"""
+        hurst = np.asarray(hurst, dtype=np.float64)
+        vol_pct = np.asarray(vol_pct, dtype=np.float64)
+
+        # First matching rule wins, as in detect_regime
+        conditions = [vol_pct > 80, vol_pct < 20, hurst > 0.55, hurst < 0.45]
+        regime = np.select(conditions, [MarketRegime.VOLATILE.value, MarketRegime.QUIET.value,
+                                        MarketRegime.TRENDING.value, MarketRegime.MEAN_REVERTING.value],
+                           MarketRegime.NEUTRAL.value)
+        confidence = np.select(conditions, [np.minimum(vol_pct / 100, 0.95),
+                                            np.minimum((100 - vol_pct) / 100, 0.90),
+                                            np.minimum(hurst, 0.95),
+                                            np.minimum(1 - hurst, 0.90)], 0.5)
+        position_mult = np.select(conditions, [0.5, 1.2, 1.0, 1.0], 0.8)
+
+        return RegimeBatch(
+            symbols=list(symbols) if symbols is not None else list(range(len(hurst))),
             regime=regime,
-            hurst_exponent=round(hurst, 4),
-            volatility_percentile=round(vol_pct, 2),
-            trend_strength=round(trend_str, 2),
-            confidence=round(confidence, 4),
-            recommended_strategies=strategies,
+            hurst_exponent=hurst,
+            volatility_percentile=vol_pct,
+            trend_strength=np.asarray(trend_strength, dtype=np.float64),
+            confidence=confidence,
             position_multiplier=position_mult
         )
     
@@ -270,40 +467,136 @@ class MarketRegimeDetector:
         
         Returns dict of strategy_name: weight (0-1)
         """
-        weights = {
-            MarketRegime.TRENDING: {
-                "momentum": 0.70,
-                "mean_reversion": 0.10,
-                "volatility": 0.10,
-                "hedging": 0.10
-            },
-            MarketRegime.MEAN_REVERTING: {
-                "momentum": 0.10,
-                "mean_reversion": 0.70,
-                "volatility": 0.10,
-                "hedging": 0.10
-            },
-            MarketRegime.VOLATILE: {
-                "momentum": 0.15,
-                "mean_reversion": 0.15,
-                "volatility": 0.40,
-                "hedging": 0.30
-            },
-            MarketRegime.QUIET: {
-                "momentum": 0.30,
-                "mean_reversion": 0.40,
-                "volatility": 0.20,
-                "hedging": 0.10
-            },
-            MarketRegime.NEUTRAL: {
-                "momentum": 0.25,
-                "mean_reversion": 0.25,
-                "volatility": 0.25,
-                "hedging": 0.25
-            }
-        }
-        
-        return weights.get(regime, weights[MarketRegime.NEUTRAL])
+        return self.STRATEGY_WEIGHTS.get(regime, self.STRATEGY_WEIGHTS[MarketRegime.NEUTRAL])
+
+
+class RegimeTracker:
+    """
+    Per-symbol regime state for a universe, advanced one bar at a time
+
+    Keeps the last lookback_hurst prices, the last lookback_vol returns,
+    the rolling volatility history and the ADX smoothing state of every
+    symbol, so a new bar costs one window update instead of a full pass
+    over each history.
+
+    Usage:
+        tracker = detector.rolling(history)      # (symbols x time)
+        batch = tracker.update(today_closes)     # one close per symbol
+        batch.analysis(i), batch.to_frame(), batch.strategy_weights()
+    """
+
+    def __init__(self, detector: MarketRegimeDetector, prices, symbols: Optional[Sequence] = None,
+                 trend_period: int = 14):
+        """
+        Args:
+            detector: Supplies lookbacks and classification
+            prices: (symbols x time) closes or DataFrame (dates x symbols)
+            symbols: Row labels
+            trend_period: Trend strength smoothing period
+        """
+        if isinstance(prices, pd.DataFrame):
+            symbols = list(prices.columns) if symbols is None else symbols
+            prices = prices.to_numpy(dtype=np.float64).T
+        prices = _right_align(np.atleast_2d(np.asarray(prices, dtype=np.float64)))
+
+        self.detector = detector
+        n_rows, n_bars = prices.shape
+        self.symbols = list(symbols) if symbols is not None else list(range(n_rows))
+        if len(self.symbols) != n_rows:
+            raise ValueError(f"{len(self.symbols)} symbols for {n_rows} price rows")
+
+        H, V = detector.lookback_hurst, detector.lookback_vol
+        self.window = self._tail(prices, H)
+        returns = np.diff(np.log(prices), axis=1)
+        self.returns = self._tail(returns, V)
+
+        # Rolling volatility: current window plus everything before it
+        vols = _window_std(returns, V) * np.sqrt(252)
+        self.current_vol = vols[:, -1].copy() if vols.shape[1] else np.full(n_rows, np.nan)
+        history = vols[:, :-1]
+        self._vol_history = np.full((n_rows, max(2 * history.shape[1], 64)), np.nan)
+        self._vol_history[:, :history.shape[1]] = history
+        self._n_history = history.shape[1]
+
+        self.trend = _TrendState(prices, trend_period)
+
+    @staticmethod
+    def _tail(values: np.ndarray, width: int) -> np.ndarray:
+        """Last `width` columns, NaN-padded on the left"""
+        out = np.full((values.shape[0], width), np.nan)
+        take = min(width, values.shape[1])
+        if take:
+            out[:, width - take:] = values[:, values.shape[1] - take:]
+        return out
+
+    @property
+    def n_bars(self) -> np.ndarray:
+        """Bars seen per symbol"""
+        return self.trend.bars
+
+    def update(self, prices) -> RegimeBatch:
+        """
+        Add one bar and return the new regimes
+
+        Args:
+            prices: One close per symbol (NaN = no bar for that symbol);
+                    a Series is aligned on the tracker's symbols
+        """
+        if isinstance(prices, pd.Series):
+            prices = prices.reindex(self.symbols)
+        prices = np.asarray(prices, dtype=np.float64).reshape(-1)
+        if len(prices) != len(self.symbols):
+            raise ValueError(f"Expected {len(self.symbols)} prices, got {len(prices)}")
+
+        active = np.flatnonzero(np.isfinite(prices))
+        previous = self.window[active, -1]
+        moved = active[np.isfinite(previous)]
+
+        self.window[active] = np.concatenate([self.window[active, 1:], prices[active, None]], axis=1)
+
+        if len(moved):
+            ret = np.log(prices[moved]) - np.log(self.trend.last[moved])
+            self.returns[moved] = np.concatenate([self.returns[moved, 1:], ret[:, None]], axis=1)
+
+            full = moved[np.isfinite(self.returns[moved, 0])]
+            if len(full):
+                # The current volatility becomes history when a new window completes
+                retired = full[np.isfinite(self.current_vol[full])]
+                if len(retired):
+                    self._append_history(retired, self.current_vol[retired])
+                self.current_vol[full] = np.std(self.returns[full], axis=1) * np.sqrt(252)
+
+        self.trend.step(prices)
+        return self.regimes()
+
+    def _append_history(self, rows: np.ndarray, vols: np.ndarray):
+        if self._n_history == self._vol_history.shape[1]:
+            grown = np.full((self._vol_history.shape[0], 2 * self._n_history), np.nan)
+            grown[:, :self._n_history] = self._vol_history
+            self._vol_history = grown
+        self._vol_history[rows, self._n_history] = vols
+        self._n_history += 1
+
+    def hurst_exponent(self) -> np.ndarray:
+        """Hurst exponent over each symbol's last lookback_hurst prices"""
+        H = self.window.shape[1]
+        lengths = np.minimum(self.n_bars, H)
+        hurst = np.full(len(lengths), 0.5)
+        # Rows with the same history length share one batched pass
+        for length in np.unique(lengths[lengths >= 20]):
+            rows = np.flatnonzero(lengths == length)
+            hurst[rows] = _hurst_rs(self.window[rows, H - length:])
+        return hurst
+
+    def volatility_percentile(self) -> np.ndarray:
+        """Current volatility percentile per symbol"""
+        pct = _volatility_percentile(self.current_vol, self._vol_history[:, :self._n_history])
+        return np.where(self.n_bars >= self.detector.lookback_vol + 1, pct, 50.0)
+
+    def regimes(self) -> RegimeBatch:
+        """Regimes of all symbols at the latest bar"""
+        return self.detector.classify(self.hurst_exponent(), self.volatility_percentile(),
+                                      self.trend.value, self.symbols)
 
 
 # Singleton instance
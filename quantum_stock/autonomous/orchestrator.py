@@ -15,7 +15,6 @@ Chức năng:
 """
 
 import asyncio
-import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
@@ -36,6 +35,7 @@ from quantum_stock.agents.agent_coordinator import AgentCoordinator, TeamDiscuss
 from quantum_stock.agents.base_agent import StockData
 from quantum_stock.core.execution_engine import ExecutionEngine
 from quantum_stock.core.broker_api import BrokerFactory
+from quantum_stock.data.market_store import load_history, get_market_store
 
 
 @dataclass
@@ -141,6 +141,7 @@ class AutonomousOrchestrator:
         self.paper_trading = paper_trading
         self.last_model_scan: Optional[datetime] = None
         self.last_news_scan: Optional[datetime] = None
+        self.market_store_refresh = 3600  # seconds between store updates
 
         # Statistics
         self.stats = {
@@ -188,11 +189,12 @@ class AutonomousOrchestrator:
         """
         Start autonomous trading system
 
-        Runs 4 concurrent tasks:
+        Runs 5 concurrent tasks:
         1. Model prediction pathway
         2. News alert pathway
         3. Position exit monitoring
         4. WebSocket broadcaster
+        5. Market store refresh (packs new daily parquet data)
         """
         self.is_running = True
 
@@ -209,7 +211,8 @@ class AutonomousOrchestrator:
                 self.model_scanner.start(),       # Path A: Model-based
                 self.news_scanner.start(),        # Path B: News-based
                 self.exit_scheduler.start(),      # Exit monitor
-                self._websocket_broadcaster()     # Real-time broadcast
+                self._websocket_broadcaster(),    # Real-time broadcast
+                self._market_store_updater()      # Memory-mapped history
             )
         except asyncio.CancelledError:
             logger.info("Autonomous system cancelled")
@@ -544,6 +547,21 @@ class AutonomousOrchestrator:
             except Exception as e:
                 logger.error(f"Broadcast error: {e}")
 
+    async def _market_store_updater(self):
+        """Pack new / changed parquet files into the market store"""
+        loop = asyncio.get_running_loop()
+        store = get_market_store()
+
+        while self.is_running:
+            try:
+                count = await loop.run_in_executor(None, store.update)
+                if count:
+                    logger.info(f"Market store: {count} symbols packed")
+            except Exception as e:
+                logger.error(f"Market store update error: {e}")
+
+            await asyncio.sleep(self.market_store_refresh)
+
     # ========================================
     # Helper Methods
     # ========================================
@@ -551,14 +569,8 @@ class AutonomousOrchestrator:
     async def _load_stock_data(self, symbol: str) -> Optional[StockData]:
         """Load stock data for agents"""
         try:
-            data_file = Path(f"data/historical/{symbol}.parquet")
-            if not data_file.exists():
-                return None
-
-            df = pd.read_parquet(data_file)
-            df = df.sort_values('date').reset_index(drop=True)
-
-            if len(df) < 30:
+            df = load_history(symbol)
+            if df is None or len(df) < 30:
                 return None
 
             latest = df.iloc[-1]
@@ -20,7 +20,7 @@ Walk-Forward Process:
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional, Callable, Any
+from typing import Dict, List, Tuple, Optional, Callable, Any, Union
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import json
@@ -88,6 +88,178 @@ class BacktestResult:
         )
 
 
+class StatefulStrategy:
+    """
+    Incremental strategy protocol
+
+    init(history) is called once per evaluated segment with the bars
+    preceding it, then update(bar) once per new bar. Implementations keep
+    whatever running state they need, so a run is O(n) instead of
+    recomputing over the whole prefix on every bar.
+    """
+
+    def init(self, history: np.ndarray) -> None:
+        raise NotImplementedError
+
+    def update(self, bar: float) -> Tuple[int, float]:
+        """Consume one bar, return (signal, confidence)"""
+        raise NotImplementedError
+
+
+class _BarBuffer:
+    """Contiguous price buffer with amortized O(1) append"""
+
+    def __init__(self, window: Optional[int] = None):
+        self.window = window
+        self._data = np.empty(0)
+        self._start = 0
+        self._end = 0
+
+    def reset(self, history: np.ndarray):
+        history = np.asarray(history, dtype=np.float64)
+        if self.window is not None:
+            history = history[-self.window:]
+        capacity = max(2 * len(history), 2 * (self.window or 0), 64)
+        self._data = np.empty(capacity)
+        self._data[:len(history)] = history
+        self._start = 0
+        self._end = len(history)
+
+    def append(self, bar: float):
+        if self._end == len(self._data):
+            kept = self._data[self._start:self._end]
+            if self.window is None or 2 * len(kept) > len(self._data):
+                data = np.empty(2 * len(self._data))
+            else:
+                data = self._data
+            data[:len(kept)] = kept
+            self._data = data
+            self._start = 0
+            self._end = len(kept)
+
+        self._data[self._end] = bar
+        self._end += 1
+        if self.window is not None and self._end - self._start > self.window:
+            self._start += 1
+
+    def view(self) -> np.ndarray:
+        return self._data[self._start:self._end]
+
+
+class PrefixStrategyAdapter(StatefulStrategy):
+    """
+    Fallback for prefix callables: func(prices[:i+1], params) -> (signal, conf)
+
+    Calls the function on the full history every bar, exactly like the
+    original loops (O(n^2) for functions that scan the whole prefix).
+    """
+
+    def __init__(self, strategy_func: Callable[[np.ndarray, Dict], Tuple[int, float]],
+                 params: Dict = None):
+        self.strategy_func = strategy_func
+        self.params = params or {}
+        self._buffer = _BarBuffer()
+
+    def init(self, history: np.ndarray) -> None:
+        self._buffer.reset(history)
+
+    def update(self, bar: float) -> Tuple[int, float]:
+        self._buffer.append(bar)
+        return self.strategy_func(self._buffer.view(), self.params)
+
+
+class WindowedStrategyAdapter(PrefixStrategyAdapter):
+    """
+    Adapter for momentum-style callables that only look at the last
+    `window` bars (e.g. a moving average over params['lookback']).
+
+    The function receives the last `window` bars instead of the whole
+    prefix, so signals are identical while each bar costs O(window).
+    """
+
+    def __init__(self, strategy_func: Callable[[np.ndarray, Dict], Tuple[int, float]],
+                 params: Dict = None, window: int = 50):
+        super().__init__(strategy_func, params)
+        self.window = window
+        self._buffer = _BarBuffer(window)
+
+
+def as_stateful_strategy(
+    strategy: Union[StatefulStrategy, Callable],
+    params: Dict = None,
+    window: Optional[int] = None
+) -> StatefulStrategy:
+    """Wrap a prefix callable (windowed if window is given) as a StatefulStrategy"""
+    if isinstance(strategy, StatefulStrategy):
+        return strategy
+    if window is not None:
+        return WindowedStrategyAdapter(strategy, params, window)
+    return PrefixStrategyAdapter(strategy, params)
+
+
+def momentum_strategy(prices: np.ndarray, params: Dict) -> Tuple[int, float]:
+    """Simple momentum: price vs its params['lookback'] moving average, ±2% bands"""
+    lookback = params.get("lookback", 20)
+
+    if len(prices) < lookback + 1:
+        return 0, 0.0
+
+    ma = np.mean(prices[-lookback:])
+    current = prices[-1]
+
+    if current > ma * 1.02:
+        return 1, 0.7  # Buy signal
+    elif current < ma * 0.98:
+        return -1, 0.7  # Sell signal
+    else:
+        return 0, 0.0  # Hold
+
+
+class MomentumStrategy(StatefulStrategy):
+    """
+    Incremental momentum_strategy
+
+    Keeps the last `lookback` bars in a ring with their running sum, so
+    each bar is O(1) and a walk-forward run is O(n). The sum is re-added
+    from the ring once per lap to drop accumulated rounding.
+    """
+
+    def __init__(self, lookback: int = 20):
+        self.lookback = lookback
+        self._ring = np.zeros(lookback)
+        self._pos = 0
+        self._count = 0
+        self._sum = 0.0
+
+    def init(self, history: np.ndarray) -> None:
+        history = np.asarray(history, dtype=np.float64)
+        tail = history[-self.lookback:]
+        self._ring[:] = 0.0
+        self._ring[:len(tail)] = tail
+        self._pos = len(tail) % self.lookback
+        self._count = len(history)
+        self._sum = float(tail.sum())
+
+    def update(self, bar: float) -> Tuple[int, float]:
+        bar = float(bar)
+        self._sum += bar - self._ring[self._pos]
+        self._ring[self._pos] = bar
+        self._pos = (self._pos + 1) % self.lookback
+        self._count += 1
+        if self._pos == 0:
+            self._sum = float(self._ring.sum())
+
+        if self._count < self.lookback + 1:
+            return 0, 0.0
+
+        ma = self._sum / self.lookback
+        if bar > ma * 1.02:
+            return 1, 0.7
+        elif bar < ma * 0.98:
+            return -1, 0.7
+        return 0, 0.0
+
+
 class WalkForwardBacktester:
     """
     Walk-Forward Optimization Backtester
@@ -120,19 +292,22 @@ class WalkForwardBacktester:
     def run_walk_forward(
         self,
         prices: np.ndarray,
-        strategy_func: Callable[[np.ndarray, Dict], Tuple[int, float]],
+        strategy_func: Union[StatefulStrategy, Callable[[np.ndarray, Dict], Tuple[int, float]]],
         strategy_params: Dict = None,
-        initial_capital: float = 1_000_000_000
+        initial_capital: float = 1_000_000_000,
+        signal_window: Optional[int] = None
     ) -> BacktestResult:
         """
         Run walk-forward backtest
         
         Args:
             prices: Array of close prices
-            strategy_func: Function(prices, params) -> (signal, confidence)
+            strategy_func: StatefulStrategy, or Function(prices, params) -> (signal, confidence)
                            signal: 1=buy, -1=sell, 0=hold
             strategy_params: Strategy parameters
             initial_capital: Starting capital (VND)
+            signal_window: Bars a callable strategy needs; if given it only
+                           receives the last signal_window bars per call
         
         Returns:
             BacktestResult with comprehensive metrics
@@ -140,6 +315,8 @@ class WalkForwardBacktester:
         if strategy_params is None:
             strategy_params = {}
         
+        strategy = as_stateful_strategy(strategy_func, strategy_params, signal_window)
+        
         n_periods = len(prices)
         all_trades = []
         in_sample_returns = []
@@ -153,7 +330,7 @@ class WalkForwardBacktester:
         
         if actual_folds < 1:
             # Not enough data for walk-forward
-            return self._simple_backtest(prices, strategy_func, strategy_params, initial_capital)
+            return self._simple_backtest(prices, strategy, strategy_params, initial_capital)
         
         current_capital = initial_capital
         position = 0
@@ -174,8 +351,9 @@ class WalkForwardBacktester:
             is_prices = prices[fold_start:train_end]
             is_returns = []
             
+            strategy.init(is_prices[:50])
             for i in range(50, len(is_prices)):
-                signal, conf = strategy_func(is_prices[:i+1], strategy_params)
+                signal, conf = strategy.update(is_prices[i])
                 daily_return = is_prices[i] / is_prices[i-1] - 1 if i > 0 else 0
                 
                 if position != 0:
@@ -195,10 +373,10 @@ class WalkForwardBacktester:
             oos_prices = prices[train_end:test_end]
             oos_returns = []
             
+            # Full history up to the test period, then one bar at a time
+            strategy.init(prices[:train_end])
             for i in range(len(oos_prices)):
-                # Use full history up to this point for signal
-                history = prices[:train_end + i + 1]
-                signal, conf = strategy_func(history, strategy_params)
+                signal, conf = strategy.update(oos_prices[i])
                 
                 daily_return = oos_prices[i] / oos_prices[i-1] - 1 if i > 0 else 0
                 
@@ -321,7 +499,7 @@ class WalkForwardBacktester:
     def _simple_backtest(
         self,
         prices: np.ndarray,
-        strategy_func: Callable,
+        strategy_func: Union[StatefulStrategy, Callable],
         params: Dict,
         initial_capital: float
     ) -> BacktestResult:
@@ -329,8 +507,10 @@ class WalkForwardBacktester:
         returns = []
         position = 0
         
+        strategy = as_stateful_strategy(strategy_func, params)
+        strategy.init(prices[:50])
         for i in range(50, len(prices)):
-            signal, conf = strategy_func(prices[:i+1], params)
+            signal, conf = strategy.update(prices[i])
             daily_return = prices[i] / prices[i-1] - 1 if i > 0 else 0
             
             if position != 0:
@@ -403,16 +583,18 @@ class WalkForwardBacktester:
     def monte_carlo_validation(
         self,
         prices: np.ndarray,
-        strategy_func: Callable,
+        strategy_func: Union[StatefulStrategy, Callable],
         params: Dict,
-        n_simulations: int = 100
+        n_simulations: int = 100,
+        signal_window: Optional[int] = None
     ) -> Dict:
         """
         Monte Carlo validation to test strategy robustness
         
         Shuffles trade order to test if strategy is truly predictive
         """
-        baseline_result = self.run_walk_forward(prices, strategy_func, params)
+        strategy = as_stateful_strategy(strategy_func, params, signal_window)
+        baseline_result = self.run_walk_forward(prices, strategy, params)
         
         # Run simulations with randomized returns
         random_sharpes = []
@@ -423,7 +605,7 @@ class WalkForwardBacktester:
             np.random.shuffle(returns)
             shuffled_prices[1:] = shuffled_prices[0] * np.exp(np.cumsum(returns))
             
-            result = self._simple_backtest(shuffled_prices, strategy_func, params, 1e9)
+            result = self._simple_backtest(shuffled_prices, strategy, params, 1e9)
             random_sharpes.append(result.sharpe_ratio)
         
         # Calculate p-value
@@ -500,31 +682,14 @@ if __name__ == "__main__":
     np.random.seed(42)
     prices = 50000 * np.exp(np.cumsum(0.0005 + 0.015 * np.random.randn(500)))
     
-    # Simple momentum strategy for testing
-    def momentum_strategy(prices: np.ndarray, params: Dict) -> Tuple[int, float]:
-        lookback = params.get("lookback", 20)
-        
-        if len(prices) < lookback + 1:
-            return 0, 0.0
-        
-        ma = np.mean(prices[-lookback:])
-        current = prices[-1]
-        
-        if current > ma * 1.02:
-            return 1, 0.7  # Buy signal
-        elif current < ma * 0.98:
-            return -1, 0.7  # Sell signal
-        else:
-            return 0, 0.0  # Hold
-    
-    # Run backtest
+    # Run backtest (MomentumStrategy is the O(1)-per-bar momentum_strategy)
     bt = WalkForwardBacktester(train_period=200, test_period=50, n_folds=4)
-    result = bt.run_walk_forward(prices, momentum_strategy, {"lookback": 20})
+    result = bt.run_walk_forward(prices, MomentumStrategy(lookback=20))
     
     print(bt.generate_report())
     
     # Monte Carlo validation
-    mc = bt.monte_carlo_validation(prices, momentum_strategy, {"lookback": 20}, n_simulations=50)
+    mc = bt.monte_carlo_validation(prices, MomentumStrategy(lookback=20), {}, n_simulations=50)
     print("\nMonte Carlo Validation:")
     print(f"  P-Value: {mc['p_value']:.4f}")
     print(f"  Significant: {mc['is_significant']}")
@@ -8,6 +8,7 @@ from .backtest_engine import BacktestEngine, BacktestResult, Strategy
 from .monte_carlo import MonteCarloSimulator, SimulationResult
 from .kelly_criterion import KellyCriterion, PositionSizeResult
 from .walk_forward import WalkForwardOptimizer, WFOResult
+from .parallel_optimizer import ParallelGridOptimizer, GridSearchResult
 
 # Agentic Level 4-5 Components
 from .forecasting import (
@@ -25,8 +26,9 @@ from .broker_api import (
 try:
     from .portfolio_optimizer import (
         PortfolioOptimizer, OptimizationResult,
-        PortfolioRiskAnalyzer
+        PortfolioRiskAnalyzer, optimize_portfolios
     )
+    from .covariance_engine import CovarianceEngine, PortfolioView
 except ImportError:
     pass
 
@@ -55,6 +57,8 @@ __all__ = [
     # Walk Forward
     'WalkForwardOptimizer',
     'WFOResult',
+    'ParallelGridOptimizer',
+    'GridSearchResult',
     # Forecasting (L4)
     'ForecastingEngine',
     'ForecastResult',
@@ -9,9 +9,21 @@ from typing import Dict, Any, List, Optional, Callable, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
+import logging
 import warnings
 warnings.filterwarnings('ignore')
 
+from .indicator_cache import get_indicator_cache
+
+logger = logging.getLogger(__name__)
+
+# Optional JIT for the array backtest kernel
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 
 class StrategyType(Enum):
     """Pre-built strategy types"""
@@ -152,6 +164,9 @@ SQN: {self.sqn:.2f} | Expectancy: {self.expectancy:,.0f} VND
 class Strategy:
     """Base strategy class"""
 
+    # Serve causal indicators from the shared IndicatorCache
+    use_indicator_cache: bool = True
+
     def __init__(self, name: str, strategy_type: StrategyType, params: Dict[str, Any] = None):
         self.name = name
         self.strategy_type = strategy_type
@@ -161,6 +176,25 @@ class Strategy:
         """Generate buy/sell signals. Returns DataFrame with 'signal' column."""
         raise NotImplementedError
 
+    def indicator(self, series: pd.Series, name: str, params: Tuple,
+                  compute: Callable[[pd.Series], pd.Series]) -> pd.Series:
+        """Causal indicator, computed once per history and parameter set"""
+        if not self.use_indicator_cache:
+            return compute(series)
+        return get_indicator_cache().get(series, name, params, compute)
+
+    def ema(self, series: pd.Series, span: int) -> pd.Series:
+        return self.indicator(series, 'ema', (span,),
+                              lambda s: s.ewm(span=span, adjust=False).mean())
+
+    def sma(self, series: pd.Series, window: int) -> pd.Series:
+        return self.indicator(series, 'sma', (window,),
+                              lambda s: s.rolling(window=window).mean())
+
+    def rolling_std(self, series: pd.Series, window: int) -> pd.Series:
+        return self.indicator(series, 'rolling_std', (window,),
+                              lambda s: s.rolling(window=window).std())
+
 
 class MACrossoverStrategy(Strategy):
     """Moving Average Crossover Strategy"""
@@ -178,8 +212,8 @@ class MACrossoverStrategy(Strategy):
         df = df.copy()
 
         # Calculate MAs
-        df['ma_fast'] = df['close'].ewm(span=self.fast_period, adjust=False).mean()
-        df['ma_slow'] = df['close'].ewm(span=self.slow_period, adjust=False).mean()
+        df['ma_fast'] = self.ema(df['close'], self.fast_period)
+        df['ma_slow'] = self.ema(df['close'], self.slow_period)
 
         # Generate signals
         df['signal'] = 0
@@ -212,11 +246,7 @@ class RSIReversalStrategy(Strategy):
         df = df.copy()
 
         # Calculate RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.period).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
+        df['rsi'] = self.indicator(df['close'], 'rsi_sma', (self.period,), self._rsi)
 
         # Generate signals
         df['signal'] = 0
@@ -230,6 +260,13 @@ class RSIReversalStrategy(Strategy):
 
         return df
 
+    def _rsi(self, close: pd.Series) -> pd.Series:
+        delta = close.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=self.period).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=self.period).mean()
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+
 
 class MACDStrategy(Strategy):
     """MACD Signal Line Crossover"""
@@ -248,10 +285,12 @@ class MACDStrategy(Strategy):
         df = df.copy()
 
         # Calculate MACD
-        ema_fast = df['close'].ewm(span=self.fast, adjust=False).mean()
-        ema_slow = df['close'].ewm(span=self.slow, adjust=False).mean()
-        df['macd'] = ema_fast - ema_slow
-        df['macd_signal'] = df['macd'].ewm(span=self.signal_period, adjust=False).mean()
+        df['macd'] = self.ema(df['close'], self.fast) - self.ema(df['close'], self.slow)
+        df['macd_signal'] = self.indicator(
+            df['close'], 'macd_signal', (self.fast, self.slow, self.signal_period),
+            lambda close: (self.ema(close, self.fast) - self.ema(close, self.slow))
+            .ewm(span=self.signal_period, adjust=False).mean()
+        )
         df['macd_hist'] = df['macd'] - df['macd_signal']
 
         # Generate signals
@@ -280,8 +319,8 @@ class BollingerBreakoutStrategy(Strategy):
         df = df.copy()
 
         # Calculate Bollinger Bands
-        df['bb_mid'] = df['close'].rolling(window=self.period).mean()
-        df['bb_std'] = df['close'].rolling(window=self.period).std()
+        df['bb_mid'] = self.sma(df['close'], self.period)
+        df['bb_std'] = self.rolling_std(df['close'], self.period)
         df['bb_upper'] = df['bb_mid'] + (df['bb_std'] * self.std_dev)
         df['bb_lower'] = df['bb_mid'] - (df['bb_std'] * self.std_dev)
 
@@ -295,18 +334,186 @@ class BollingerBreakoutStrategy(Strategy):
         return df
 
 
+
+# Exit reason codes used by the array kernel
+EXIT_REASONS = ("SIGNAL", "STOP_LOSS", "TAKE_PROFIT", "END_OF_DATA")
+
+
+def _backtest_kernel(high, low, close, signal, initial_capital, position_size,
+                     stop_loss_pct, take_profit_pct, commission_rate, slippage):
+    """
+    Array state machine equivalent to the BacktestEngine.run loop.
+
+    run() only ever opens long positions, so the kernel tracks a single
+    long/flat state. stop_loss_pct / take_profit_pct of 0 disable the check.
+
+    Returns:
+        equity: (n+1,) equity curve
+        trades: (n_trades, 5) float array of
+                entry_idx, exit_idx, entry_price, exit_price, shares
+        reasons: (n_trades,) exit reason codes (index into EXIT_REASONS)
+    """
+    n = len(close)
+    equity = np.empty(n + 1)
+    equity[0] = initial_capital
+    trades = np.empty((n + 1, 5))
+    reasons = np.empty(n + 1, dtype=np.int64)
+    n_trades = 0
+
+    capital = initial_capital
+    position = 0
+    shares = 0
+    entry_price = 0.0
+    entry_idx = 0
+
+    for i in range(n):
+        price = close[i]
+        sig = signal[i]
+
+        # Check stop loss / take profit if in position
+        if position == 1:
+            exit_price = -1.0
+            reason = 0
+            if stop_loss_pct != 0.0:
+                sl_price = entry_price * (1 - stop_loss_pct)
+                if low[i] <= sl_price:
+                    exit_price = sl_price * (1 - slippage)
+                    reason = 1
+            if reason == 0 and take_profit_pct != 0.0:
+                tp_price = entry_price * (1 + take_profit_pct)
+                if high[i] >= tp_price:
+                    exit_price = tp_price * (1 - slippage)
+                    reason = 2
+            if reason != 0:
+                pnl = (exit_price - entry_price) * shares
+                trades[n_trades, 0] = entry_idx
+                trades[n_trades, 1] = i
+                trades[n_trades, 2] = entry_price
+                trades[n_trades, 3] = exit_price
+                trades[n_trades, 4] = shares
+                reasons[n_trades] = reason
+                n_trades += 1
+                capital += pnl - (exit_price * shares * commission_rate)
+                position = 0
+                shares = 0
+                equity[i + 1] = capital
+                continue
+
+        # Process signals
+        if sig == 1 and position <= 0:
+            position_value = capital * position_size
+            entry_price = price * (1 + slippage)
+            shares = int(position_value / entry_price)
+            if shares > 0:
+                position = 1
+                capital -= shares * entry_price * (1 + commission_rate)
+                entry_idx = i
+
+        elif sig == -1 and position >= 0:
+            if position == 1:
+                exit_price = price * (1 - slippage)
+                trades[n_trades, 0] = entry_idx
+                trades[n_trades, 1] = i
+                trades[n_trades, 2] = entry_price
+                trades[n_trades, 3] = exit_price
+                trades[n_trades, 4] = shares
+                reasons[n_trades] = 0
+                n_trades += 1
+                capital += shares * exit_price * (1 - commission_rate)
+                position = 0
+                shares = 0
+
+        # Update equity curve
+        if position == 1:
+            equity[i + 1] = capital + (shares * price)
+        else:
+            equity[i + 1] = capital
+
+    # Close any open position at end
+    if position == 1:
+        trades[n_trades, 0] = entry_idx
+        trades[n_trades, 1] = n - 1
+        trades[n_trades, 2] = entry_price
+        trades[n_trades, 3] = close[n - 1]
+        trades[n_trades, 4] = shares
+        reasons[n_trades] = 3
+        n_trades += 1
+
+    return equity, trades[:n_trades], reasons[:n_trades]
+
+
+if NUMBA_AVAILABLE:
+    _backtest_kernel_jit = njit(cache=True)(_backtest_kernel)
+else:
+    _backtest_kernel_jit = None
+
+
+def run_backtest_arrays(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                        signal: np.ndarray,
+                        initial_capital: float = 100000000,
+                        position_size: float = 1.0,
+                        stop_loss_pct: float = None,
+                        take_profit_pct: float = None,
+                        commission_rate: float = 0.0015,
+                        slippage: float = 0.001) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run the backtest state machine on plain arrays.
+
+    Uses the numba-compiled kernel when available, otherwise the same
+    kernel in pure Python over native lists.
+
+    Returns:
+        (equity_curve, trades, exit_reason_codes) - see _backtest_kernel
+    """
+    args = (float(initial_capital), float(position_size),
+            float(stop_loss_pct or 0.0), float(take_profit_pct or 0.0),
+            float(commission_rate), float(slippage))
+
+    if _backtest_kernel_jit is not None:
+        return _backtest_kernel_jit(
+            np.ascontiguousarray(high, dtype=np.float64),
+            np.ascontiguousarray(low, dtype=np.float64),
+            np.ascontiguousarray(close, dtype=np.float64),
+            np.ascontiguousarray(signal, dtype=np.float64),
+            *args
+        )
+
+    return _backtest_kernel(
+        np.asarray(high, dtype=np.float64).tolist(),
+        np.asarray(low, dtype=np.float64).tolist(),
+        np.asarray(close, dtype=np.float64).tolist(),
+        np.asarray(signal, dtype=np.float64).tolist(),
+        *args
+    )
+
+
 class BacktestEngine:
     """
     Advanced Backtesting Engine with comprehensive metrics
     """
 
+    MODES = ("loop", "array")
+
     def __init__(self, initial_capital: float = 100000000,
                  commission_rate: float = 0.0015,
-                 slippage: float = 0.001):
+                 slippage: float = 0.001,
+                 mode: str = "loop"):
+        """
+        Args:
+            mode: 'loop' walks the frame bar by bar with Trade objects,
+                  'array' runs the same state machine on NumPy arrays
+                  (numba-compiled when available) and builds Trade
+                  objects only for the closed trades
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown backtest mode: {mode}")
+
         self.initial_capital = initial_capital
         self.commission_rate = commission_rate
         self.slippage = slippage
+        self.mode = mode
         self.risk_free_rate = 0.05  # 5% annual risk-free rate (Vietnam)
+        self.last_optimization_errors: List[Tuple[Dict, str]] = []
 
     def run(self, df: pd.DataFrame, strategy: Strategy,
             symbol: str = "UNKNOWN",
@@ -330,6 +537,66 @@ class BacktestEngine:
         if 'trade_signal' not in df.columns:
             raise ValueError("Strategy must generate 'trade_signal' column")
 
+        if self.mode == "array":
+            trades, equity_curve = self._run_arrays(
+                df, position_size, stop_loss_pct, take_profit_pct
+            )
+        else:
+            trades, equity_curve = self._run_loop(
+                df, position_size, stop_loss_pct, take_profit_pct
+            )
+
+        # Calculate metrics
+        result = self._calculate_metrics(
+            trades=trades,
+            equity_curve=equity_curve,
+            strategy_name=strategy.name,
+            symbol=symbol,
+            start_date=df.index[0] if isinstance(df.index[0], datetime) else datetime.now(),
+            end_date=df.index[-1] if isinstance(df.index[-1], datetime) else datetime.now()
+        )
+
+        return result
+
+    def _run_arrays(self, df: pd.DataFrame, position_size: float,
+                    stop_loss_pct: Optional[float],
+                    take_profit_pct: Optional[float]) -> Tuple[List[Trade], List[float]]:
+        """Array-kernel backtest over a frame with 'trade_signal' column"""
+        equity, trade_rows, reasons = run_backtest_arrays(
+            df['high'].values, df['low'].values, df['close'].values,
+            df['trade_signal'].values,
+            initial_capital=self.initial_capital,
+            position_size=position_size,
+            stop_loss_pct=stop_loss_pct,
+            take_profit_pct=take_profit_pct,
+            commission_rate=self.commission_rate,
+            slippage=self.slippage
+        )
+
+        index = df.index
+        now = datetime.now()
+
+        trades: List[Trade] = []
+        for (entry_idx, exit_idx, entry_price, exit_price, shares), reason in zip(
+                trade_rows.tolist(), reasons.tolist()):
+            entry_date = index[int(entry_idx)]
+            exit_date = index[int(exit_idx)]
+            trade = Trade(
+                entry_date=entry_date if isinstance(entry_date, datetime) else now,
+                entry_price=entry_price,
+                shares=int(shares),
+                side="LONG"
+            )
+            trade.close(exit_date if isinstance(exit_date, datetime) else now,
+                        exit_price, EXIT_REASONS[reason])
+            trades.append(trade)
+
+        return trades, equity.tolist()
+
+    def _run_loop(self, df: pd.DataFrame, position_size: float,
+                  stop_loss_pct: Optional[float],
+                  take_profit_pct: Optional[float]) -> Tuple[List[Trade], List[float]]:
+        """Bar-by-bar backtest over a frame with 'trade_signal' column"""
         # Initialize tracking
         capital = self.initial_capital
         position = 0
@@ -439,17 +706,7 @@ class BacktestEngine:
             else:
                 capital += shares * (entry_price - final_price) - (final_price * shares * self.commission_rate)
 
-        # Calculate metrics
-        result = self._calculate_metrics(
-            trades=trades,
-            equity_curve=equity_curve,
-            strategy_name=strategy.name,
-            symbol=symbol,
-            start_date=df.index[0] if isinstance(df.index[0], datetime) else datetime.now(),
-            end_date=df.index[-1] if isinstance(df.index[-1], datetime) else datetime.now()
-        )
-
-        return result
+        return trades, equity_curve
 
     def _calculate_metrics(self, trades: List[Trade], equity_curve: List[float],
                           strategy_name: str, symbol: str,
@@ -576,7 +833,9 @@ class BacktestEngine:
 
     def optimize_parameters(self, df: pd.DataFrame, strategy_class: type,
                            param_grid: Dict[str, List], symbol: str = "UNKNOWN",
-                           metric: str = "sharpe_ratio") -> Tuple[Dict, BacktestResult]:
+                           metric: str = "sharpe_ratio",
+                           n_jobs: int = 1,
+                           successive_halving: bool = False) -> Tuple[Dict, BacktestResult]:
         """
         Grid search optimization for strategy parameters
 
@@ -586,15 +845,31 @@ class BacktestEngine:
             param_grid: Dict of parameter name -> list of values to test
             symbol: Stock symbol
             metric: Metric to optimize ('sharpe_ratio', 'total_return_pct', 'profit_factor')
+            n_jobs: Worker processes (1 = in-process, None/0 = all CPUs)
+            successive_halving: Prune on shorter sub-windows first (parallel only)
 
         Returns:
             (best_params, best_result)
+
+        Failed combinations are logged and kept in last_optimization_errors.
         """
+        if n_jobs != 1:
+            from .parallel_optimizer import ParallelGridOptimizer
+
+            with ParallelGridOptimizer(df, self, n_jobs=n_jobs) as optimizer:
+                search = optimizer.optimize(
+                    strategy_class, param_grid, symbol, metric,
+                    successive_halving=successive_halving
+                )
+            self.last_optimization_errors = search.errors
+            return search.best_params, search.best_result
+
         from itertools import product
 
         best_result = None
         best_params = None
         best_metric = float('-inf')
+        errors = []
 
         # Generate all parameter combinations
         param_names = list(param_grid.keys())
@@ -613,8 +888,16 @@ class BacktestEngine:
                     best_result = result
                     best_params = params
             except Exception as e:
+                errors.append((params, f"{type(e).__name__}: {e}"))
                 continue
 
+        if errors:
+            logger.warning(
+                f"{strategy_class.__name__}: {len(errors)} parameter combinations "
+                f"failed, first: {errors[0][1]}"
+            )
+        self.last_optimization_errors = errors
+
         return best_params, best_result
 
     def compare_strategies(self, df: pd.DataFrame, strategies: List[Strategy],
@@ -8,10 +8,14 @@ from dataclasses import dataclass, field
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from enum import Enum
-import json
 import os
 import logging
 
+try:
+    from ..utils.journal import Journal
+except ImportError:
+    from utils.journal import Journal
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -212,6 +216,9 @@ class PaperTradingBroker(BrokerAPI):
     """
     Paper trading broker for simulation and testing.
     Implements all broker functionality without real money.
+    
+    State is persisted as a snapshot plus an append-only journal with one
+    record per order event (see utils.journal).
     """
     
     # Vietnam market constants
@@ -222,12 +229,14 @@ class PaperTradingBroker(BrokerAPI):
     CEILING_PCT = 0.07        # 7% for HOSE
     FLOOR_PCT = 0.07          # -7% for HOSE
     
-    def __init__(self, initial_balance: float = 100_000_000):
+    def __init__(self, initial_balance: float = 100_000_000,
+                 storage_path: str = None):
         """
         Initialize paper trading broker.
         
         Args:
             initial_balance: Initial cash balance in VND (default 100M)
+            storage_path: State file (default data/paper_trading_state.json)
         """
         super().__init__()
         self.initial_balance = initial_balance
@@ -238,59 +247,77 @@ class PaperTradingBroker(BrokerAPI):
         # Simulated market prices (in production, fetch from data provider)
         self.market_prices: Dict[str, Dict[str, float]] = {}
         
-        self._load_state()
-    
-    def _load_state(self):
-        """Load state from file if exists"""
-        state_file = os.path.join(
+        state_file = storage_path or os.path.join(
             os.path.dirname(__file__), 
             '..', '..', 'data', 'paper_trading_state.json'
         )
+        # Order events are committed (and fsynced) as they happen
+        self._journal = Journal(state_file, snapshot=self._snapshot, commit_interval=0)
         
-        if os.path.exists(state_file):
-            try:
-                with open(state_file, 'r') as f:
-                    state = json.load(f)
-                    self.cash_balance = state.get('cash_balance', self.initial_balance)
-                    self.order_counter = state.get('order_counter', 0)
-                    
-                    # Restore positions
-                    for pos_data in state.get('positions', []):
-                        self.positions[pos_data['symbol']] = Position(**pos_data)
+        self._load_state()
+    
+    @staticmethod
+    def _order_from_dict(order_data: Dict[str, Any]) -> Order:
+        order_data = dict(order_data)
+        order_data['side'] = OrderSide(order_data['side'])
+        order_data['order_type'] = OrderType(order_data['order_type'])
+        order_data['status'] = OrderStatus(order_data['status'])
+        order_data['created_at'] = datetime.fromisoformat(order_data['created_at'])
+        order_data['updated_at'] = datetime.fromisoformat(order_data['updated_at'])
+        return Order(**order_data)
+    
+    def _load_state(self):
+        """Load state from snapshot and journal if they exist"""
+        try:
+            state, records = self._journal.load()
+            
+            if state is not None:
+                self.cash_balance = state.get('cash_balance', self.initial_balance)
+                self.order_counter = state.get('order_counter', 0)
+                
+                # Restore positions
+                for pos_data in state.get('positions', []):
+                    self.positions[pos_data['symbol']] = Position(**pos_data)
+                
+                # Restore orders
+                for order_data in state.get('orders', []):
+                    self.orders[order_data['order_id']] = self._order_from_dict(order_data)
+            
+            # Replay order events after the snapshot
+            for record in records:
+                order = self._order_from_dict(record['order'])
+                self.orders[order.order_id] = order
+                self.cash_balance = record['cash_balance']
+                self.order_counter = record['order_counter']
+                if record['position'] is not None:
+                    self.positions[order.symbol] = Position(**record['position'])
+                else:
+                    self.positions.pop(order.symbol, None)
                     
-                    # Restore orders
-                    for order_data in state.get('orders', []):
-                        order_data['side'] = OrderSide(order_data['side'])
-                        order_data['order_type'] = OrderType(order_data['order_type'])
-                        order_data['status'] = OrderStatus(order_data['status'])
-                        order_data['created_at'] = datetime.fromisoformat(order_data['created_at'])
-                        order_data['updated_at'] = datetime.fromisoformat(order_data['updated_at'])
-                        self.orders[order_data['order_id']] = Order(**order_data)
-                        
-            except Exception as e:
-                logger.error(f"Error loading state: {e}")
-    
-    def _save_state(self):
-        """Save state to file"""
-        state_file = os.path.join(
-            os.path.dirname(__file__), 
-            '..', '..', 'data', 'paper_trading_state.json'
-        )
-        
-        os.makedirs(os.path.dirname(state_file), exist_ok=True)
+        except Exception as e:
+            logger.error(f"Error loading state: {e}")
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """Full state for journal compaction"""
+        return {
+            'cash_balance': self.cash_balance,
+            'order_counter': self.order_counter,
+            'positions': [pos.to_dict() for pos in self.positions.values()],
+            'orders': [order.to_dict() for order in self.orders.values()],
+            'last_updated': datetime.now().isoformat()
+        }
+    
+    def _save_state(self, order: Order):
+        """Journal an order event with the cash and position it changed"""
+        position = self.positions.get(order.symbol)
         
         try:
-            state = {
+            self._journal.append({
+                'order': order.to_dict(),
                 'cash_balance': self.cash_balance,
                 'order_counter': self.order_counter,
-                'positions': [pos.to_dict() for pos in self.positions.values()],
-                'orders': [order.to_dict() for order in self.orders.values()],
-                'last_updated': datetime.now().isoformat()
-            }
-            
-            with open(state_file, 'w') as f:
-                json.dump(state, f, indent=2)
-                
+                'position': position.to_dict() if position else None
+            })
         except Exception as e:
             logger.error(f"Error saving state: {e}")
     
@@ -402,6 +429,7 @@ class PaperTradingBroker(BrokerAPI):
                 order.status = OrderStatus.REJECTED
                 order.metadata['reject_reason'] = "Insufficient buying power"
                 self.orders[order_id] = order
+                self._save_state(order)
                 return order
         else:
             # Check position
@@ -410,13 +438,14 @@ class PaperTradingBroker(BrokerAPI):
                 order.status = OrderStatus.REJECTED
                 order.metadata['reject_reason'] = "Insufficient position"
                 self.orders[order_id] = order
+                self._save_state(order)
                 return order
         
         # Simulate immediate fill at limit price (for paper trading)
         order = await self._execute_order(order, market_price)
         
         self.orders[order_id] = order
-        self._save_state()
+        self._save_state(order)
         
         logger.info(f"Order placed: {order_id} {side.value} {quantity} {symbol} @ {price}")
         
@@ -505,7 +534,7 @@ class PaperTradingBroker(BrokerAPI):
         order.status = OrderStatus.CANCELLED
         order.updated_at = datetime.now()
         
-        self._save_state()
+        self._save_state(order)
         logger.info(f"Order cancelled: {order_id}")
         
         return True
@@ -628,7 +657,10 @@ class PaperTradingBroker(BrokerAPI):
         self.orders.clear()
         self.trade_history.clear()
         self.order_counter = 0
-        self._save_state()
+        try:
+            self._journal.compact()
+        except Exception as e:
+            logger.error(f"Error saving state: {e}")
         logger.info("Paper trading account reset")
 
 
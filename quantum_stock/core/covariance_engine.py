@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming Covariance Engine
+Keeps a sample, Ledoit-Wolf shrunk or exponentially weighted covariance of
+asset returns up to date with one rank-one update per bar, and serves
+parametric VaR and its decomposition (marginal / component / incremental).
+Each consumer holding a portfolio keeps its own PortfolioView, so sharing
+one engine never mixes up portfolios.
+"""
+
+import weakref
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Union
+from scipy import stats
+
+Weights = Union[Dict[str, float], pd.Series, np.ndarray, List[float]]
+
+
+@lru_cache(maxsize=16)
+def _z(confidence: float) -> float:
+    """|z| of the normal quantile for a VaR confidence level"""
+    return abs(float(stats.norm.ppf(1 - confidence)))
+
+
+class CovarianceEngine:
+    """
+    Streaming covariance of asset returns with cached portfolio exposure
+
+    Methods:
+    - 'sample': equal-weight sample covariance (ddof=1, as DataFrame.cov)
+    - 'ledoit_wolf': sample covariance shrunk towards a scaled identity
+      (Ledoit & Wolf 2004, same estimate as sklearn's LedoitWolf)
+    - 'ewma': exponentially weighted covariance (RiskMetrics decay)
+
+    A new bar costs O(N²). Portfolios tracked with portfolio() keep
+    their product Σw updated with it in O(N) each, so their VaR and its
+    decomposition read cached values instead of rebuilding the matrix.
+    The engine's own var / marginal_var / ... take the weights explicitly
+    and keep no portfolio state (O(N²) per call).
+
+    Usage:
+        engine = CovarianceEngine.from_returns(daily_returns, method='ledoit_wolf')
+        book = engine.portfolio({'HPG': 0.4, 'VNM': 0.6})
+        engine.update(todays_returns)               # each new bar
+        book.var(0.99), book.component_var(0.99)
+        engine.var(0.99, weights={'HPG': 1.0})      # one-off, stateless
+    """
+
+    METHODS = ('sample', 'ledoit_wolf', 'ewma')
+
+    def __init__(self, assets: Iterable[str], method: str = 'ledoit_wolf',
+                 decay: float = 0.94, annualization: int = 252):
+        """
+        Args:
+            assets: Asset names (column order of every update)
+            method: One of METHODS
+            decay: EWMA decay λ (weight of the previous estimate)
+            annualization: Bars per year; covariance and VaR are annualized
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown method '{method}', expected one of {self.METHODS}")
+        self.assets = list(assets)
+        self.method = method
+        self.decay = decay
+        self.annualization = annualization
+        self._index = {a: i for i, a in enumerate(self.assets)}
+
+        n = len(self.assets)
+        self.n_obs = 0
+
+        # sample / ledoit_wolf: power sums of returns shifted by the first bar
+        self._shift: Optional[np.ndarray] = None
+        self._sum = np.zeros(n)                # Σ x
+        self._cross = np.zeros((n, n))         # Σ x x'
+        self._sq = 0.0                         # Σ |x|²
+        self._sq_x = np.zeros(n)               # Σ |x|² x
+        self._quad = 0.0                       # Σ |x|⁴
+        self._cross_norm = 0.0                 # ||Σ x x'||²_F
+
+        # ewma
+        self._mean = np.zeros(n)
+        self._ewma = np.zeros((n, n))
+
+        # Tracked portfolios, refreshed on every update
+        self._views: "weakref.WeakSet[PortfolioView]" = weakref.WeakSet()
+
+        # Per-bar caches, cleared by updates
+        self._cov: Optional[np.ndarray] = None
+        self._stats: Optional[tuple] = None
+
+    @classmethod
+    def from_returns(cls, returns: pd.DataFrame, method: str = 'ledoit_wolf',
+                     **kwargs) -> 'CovarianceEngine':
+        """Engine seeded with a (bars x assets) returns history"""
+        engine = cls(returns.columns, method, **kwargs)
+        engine.update_many(returns.to_numpy(dtype=np.float64))
+        return engine
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def _vector(self, values: Weights) -> np.ndarray:
+        """Array in asset order from a dict / Series / sequence"""
+        if isinstance(values, (dict, pd.Series)):
+            out = np.zeros(len(self.assets))
+            for asset, value in values.items():
+                if asset in self._index:
+                    out[self._index[asset]] = value
+            return out
+        out = np.asarray(values, dtype=np.float64)
+        if out.shape != (len(self.assets),):
+            raise ValueError(f"Expected {len(self.assets)} values, got shape {out.shape}")
+        return out
+
+    def update(self, returns: Weights):
+        """
+        Add one bar of returns (missing assets / NaN count as 0)
+
+        O(N²) for the covariance, O(N) for the cached portfolio product
+        """
+        r = np.nan_to_num(self._vector(returns))
+        self._cov = self._stats = None
+        self.n_obs += 1
+
+        if self.method == 'ewma':
+            if self.n_obs == 1:
+                self._mean = r.copy()
+                for view in self._views:
+                    view._product = np.zeros(len(r))
+                return
+            lam = self.decay
+            d = r - self._mean
+            self._mean += (1 - lam) * d
+            self._ewma = lam * (self._ewma + (1 - lam) * np.outer(d, d))
+            for view in self._views:
+                view._product = lam * (view._product + (1 - lam) * d * (d @ view._weights))
+            return
+
+        if self._shift is None:
+            self._shift = r.copy()
+        x = r - self._shift
+        a = x @ x
+        self._cross_norm += 2 * (x @ self._cross @ x) + a * a
+        self._sum += x
+        self._cross += np.outer(x, x)
+        self._sq += a
+        self._sq_x += a * x
+        self._quad += a * a
+        for view in self._views:
+            view._product += x * (x @ view._weights)
+
+    def update_many(self, returns: np.ndarray):
+        """Add a block of bars (bars x assets)"""
+        returns = np.nan_to_num(np.atleast_2d(np.asarray(returns, dtype=np.float64)))
+        if len(returns) == 0:
+            return
+        if self.method == 'ewma':
+            for r in returns:
+                self.update(r)
+            return
+
+        if self._shift is None:
+            self._shift = returns[0].copy()
+        x = returns - self._shift
+        a = np.einsum('ti,ti->t', x, x)
+        block = x.T @ x
+        self._cross_norm += 2 * np.sum(self._cross * block) + np.sum(block * block)
+        self._cross += block
+        self._sum += x.sum(axis=0)
+        self._sq += a.sum()
+        self._sq_x += a @ x
+        self._quad += a @ a
+        for view in self._views:
+            view._product += x.T @ (x @ view._weights)
+        self.n_obs += len(returns)
+        self._cov = self._stats = None
+
+    # ------------------------------------------------------------------
+    # Covariance
+    # ------------------------------------------------------------------
+
+    def _moments(self):
+        """
+        (shifted mean, shrinkage, target μ) for the 1/T covariance S,
+        computed once per bar in O(N²)
+        """
+        if self._stats is None:
+            self._stats = self._compute_moments()
+        return self._stats
+
+    def _compute_moments(self):
+        T = self.n_obs
+        m = self._sum / T
+        mm = m @ m
+        trace = self._sq / T - mm
+        norm = self._cross_norm / T ** 2 - 2 * (m @ self._cross @ m) / T + mm * mm
+        mu = trace / len(m)
+        shrinkage = 0.0
+        if self.method == 'ledoit_wolf':
+            dispersion = max(norm - len(m) * mu * mu, 0.0)
+            # Σ_t |x_t - m|⁴ from the power sums
+            fourth = (self._quad - 4 * (m @ self._sq_x) + 2 * mm * self._sq
+                      + 4 * (m @ self._cross @ m) - 4 * mm * (self._sum @ m) + T * mm * mm)
+            noise = max((fourth / T - norm) / T, 0.0)
+            shrinkage = min(noise, dispersion) / dispersion if dispersion > 0 else 0.0
+        return m, shrinkage, mu
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """Annualized covariance matrix (cached until the next update)"""
+        if self._cov is not None:
+            return self._cov
+        n = len(self.assets)
+        if self.n_obs < 2:
+            cov = np.full((n, n), np.nan)
+        elif self.method == 'ewma':
+            cov = self._ewma.copy()
+        else:
+            T = self.n_obs
+            m, shrinkage, mu = self._moments()
+            scatter = self._cross - T * np.outer(m, m)
+            if self.method == 'sample':
+                cov = scatter / (T - 1)
+            else:
+                cov = (1 - shrinkage) * scatter / T
+                cov[np.diag_indices(n)] += shrinkage * mu
+        self._cov = cov * self.annualization
+        return self._cov
+
+    @property
+    def covariance_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.covariance, index=self.assets, columns=self.assets)
+
+    @property
+    def shrinkage(self) -> float:
+        """Ledoit-Wolf shrinkage intensity (0 for other methods)"""
+        if self.method != 'ledoit_wolf' or self.n_obs < 2:
+            return 0.0
+        return self._moments()[1]
+
+    # ------------------------------------------------------------------
+    # Portfolio exposure
+    # ------------------------------------------------------------------
+
+    def portfolio(self, weights: Weights = None) -> 'PortfolioView':
+        """Tracked portfolio whose Σw is kept up to date by each update"""
+        view = PortfolioView(self, weights)
+        self._views.add(view)
+        return view
+
+    def _raw_product(self, w: np.ndarray) -> np.ndarray:
+        """(Σ x x') w, or (EWMA Σ) w, from the current state (O(N²))"""
+        return self._ewma @ w if self.method == 'ewma' else self._cross @ w
+
+    def _asset_variance(self, k: int) -> float:
+        """Annualized variance of asset k in O(1)"""
+        if self.method == 'ewma':
+            return self._ewma[k, k] * self.annualization
+        T = self.n_obs
+        m, shrinkage, mu = self._moments()
+        scatter = self._cross[k, k] - T * m[k] ** 2
+        if self.method == 'sample':
+            return scatter / (T - 1) * self.annualization
+        return ((1 - shrinkage) * scatter / T + shrinkage * mu) * self.annualization
+
+    def portfolio_volatility(self, weights: Weights) -> float:
+        """Annualized volatility of a portfolio (stateless)"""
+        return PortfolioView(self, weights).portfolio_volatility()
+
+    def var(self, confidence: float = 0.95, weights: Weights = None,
+            days: Optional[float] = None) -> float:
+        """Parametric VaR of `weights` (stateless, see PortfolioView.var)"""
+        return PortfolioView(self, self._required(weights)).var(confidence, days=days)
+
+    def marginal_var(self, confidence: float = 0.95, weights: Weights = None) -> Dict[str, float]:
+        """Marginal VaR of `weights` by asset (stateless)"""
+        return PortfolioView(self, self._required(weights)).marginal_var(confidence)
+
+    def component_var(self, confidence: float = 0.95, weights: Weights = None) -> Dict[str, float]:
+        """Component VaR of `weights` by asset (stateless)"""
+        return PortfolioView(self, self._required(weights)).component_var(confidence)
+
+    def incremental_var(self, asset: str, weight: float, confidence: float = 0.95,
+                        weights: Weights = None) -> float:
+        """Incremental VaR of holding `asset` at `weight` in `weights` (stateless)"""
+        return PortfolioView(self, self._required(weights)).incremental_var(asset, weight, confidence)
+
+    @staticmethod
+    def _required(weights: Weights) -> Weights:
+        if weights is None:
+            raise ValueError("Pass weights, or track the portfolio with engine.portfolio()")
+        return weights
+
+
+class PortfolioView:
+    """
+    One consumer's portfolio on a CovarianceEngine
+
+    Holds the weights and the cached product Σw. A view created with
+    engine.portfolio() is refreshed by every engine update in O(N), and
+    changing one position (adjust_weight) is O(N) as well, so VaR and its
+    decomposition never rebuild the covariance matrix. Weights can be
+    fractions or money amounts (VaR then comes out in money).
+    """
+
+    def __init__(self, engine: CovarianceEngine, weights: Weights = None):
+        self.engine = engine
+        self._weights = np.zeros(len(engine.assets))
+        self._product = np.zeros(len(engine.assets))
+        if weights is not None:
+            self.set_weights(weights)
+
+    def set_weights(self, weights: Weights):
+        """Replace the weights (O(N²))"""
+        weights = self.engine._vector(weights)
+        if np.array_equal(weights, self._weights):
+            return
+        self._weights = weights.copy()
+        self._product = self.engine._raw_product(self._weights)
+
+    def adjust_weight(self, asset: str, delta: float):
+        """Change one asset's weight by delta (O(N))"""
+        engine = self.engine
+        k = engine._index[asset]
+        self._weights[k] += delta
+        column = engine._ewma[:, k] if engine.method == 'ewma' else engine._cross[:, k]
+        self._product += column * delta
+
+    @property
+    def weights(self) -> Dict[str, float]:
+        return dict(zip(self.engine.assets, self._weights))
+
+    def _exposure(self):
+        """(weights, annualized Σw, portfolio volatility) in O(N)"""
+        engine = self.engine
+        w = self._weights
+        if engine.n_obs < 2:
+            cov_w = np.full(len(w), np.nan)
+        elif engine.method == 'ewma':
+            cov_w = self._product.copy()
+        else:
+            T = engine.n_obs
+            m, shrinkage, mu = engine._moments()
+            scatter_w = self._product - T * m * (m @ w)
+            if engine.method == 'sample':
+                cov_w = scatter_w / (T - 1)
+            else:
+                cov_w = (1 - shrinkage) * scatter_w / T + shrinkage * mu * w
+        cov_w = cov_w * engine.annualization
+        return w, cov_w, float(np.sqrt(max(w @ cov_w, 0.0)))
+
+    def portfolio_volatility(self) -> float:
+        """Annualized portfolio volatility"""
+        return self._exposure()[2]
+
+    def var(self, confidence: float = 0.95, days: Optional[float] = None) -> float:
+        """
+        Parametric VaR as a positive fraction of portfolio value
+
+        Args:
+            confidence: VaR confidence level
+            days: Horizon in bars (default: annualized, like marginal_var)
+        """
+        scale = 1.0 if days is None else np.sqrt(days / self.engine.annualization)
+        return _z(confidence) * self._exposure()[2] * scale
+
+    def marginal_var(self, confidence: float = 0.95) -> Dict[str, float]:
+        """Marginal VaR = (Σw) / σ_p * |z| by asset (0 for an empty portfolio)"""
+        _, cov_w, port_std = self._exposure()
+        if port_std == 0:
+            return dict.fromkeys(self.engine.assets, 0.0)
+        marginal = cov_w / port_std * _z(confidence)
+        return dict(zip(self.engine.assets, marginal))
+
+    def component_var(self, confidence: float = 0.95) -> Dict[str, float]:
+        """Component VaR = weight * marginal VaR; sums to the portfolio VaR"""
+        marginal = self.marginal_var(confidence)
+        return {asset: w * marginal[asset] for asset, w in zip(self.engine.assets, self._weights)}
+
+    def incremental_var(self, asset: str, weight: float, confidence: float = 0.95) -> float:
+        """
+        Change in VaR when `asset` is held at `weight` and the portfolio is
+        rescaled to the same total weight (as indicators.additional.incremental_var)
+
+        O(1) from the cached Σw
+        """
+        w, cov_w, port_std = self._exposure()
+        k = self.engine._index[asset]
+        delta = weight - w[k]
+        total = w.sum() + delta
+        new_var = (port_std ** 2 + 2 * delta * cov_w[k] + delta ** 2 * self.engine._asset_variance(k)) / total ** 2
+        return _z(confidence) * (np.sqrt(max(new_var, 0.0)) - port_std)
@@ -0,0 +1,148 @@
+"""
+Indicator Cache for Strategy Signals
+Computes each indicator once over the full history and serves any prefix
+of that history (anchored walk-forward folds, grid search windows) by slicing
+"""
+
+import hashlib
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class IndicatorCache:
+    """
+    Indicator cache keyed by (data fingerprint, indicator name, parameters)
+
+    All cached indicators must be causal (value at bar i depends only on
+    bars <= i, e.g. EWM / rolling windows), so a series computed over a
+    base history is exact for every prefix of that history. Windows that
+    do not start at the beginning of a known history are registered as
+    their own base and computed from scratch.
+    """
+
+    def __init__(self, max_bases: int = 8, max_entries: int = 512):
+        self.max_bases = max_bases
+        self.max_entries = max_entries
+
+        # fingerprint -> (series, float64 values)
+        self._bases: "OrderedDict[str, Tuple[pd.Series, np.ndarray]]" = OrderedDict()
+
+        # (fingerprint, name, params) -> indicator values over the base
+        self._entries: "OrderedDict[Tuple[str, str, Tuple], np.ndarray]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(series: pd.Series) -> str:
+        """Content hash of index and values"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(np.asarray(series.index.values).tobytes())
+        h.update(series.to_numpy(dtype=np.float64).tobytes())
+        return h.hexdigest()
+
+    def register(self, series: pd.Series) -> str:
+        """Register a full history so later prefixes can slice into it"""
+        values = series.to_numpy(dtype=np.float64)
+        key = self.fingerprint(series)
+
+        if key in self._bases:
+            self._bases.move_to_end(key)
+            return key
+
+        self._bases[key] = (series, values)
+        while len(self._bases) > self.max_bases:
+            old, _ = self._bases.popitem(last=False)
+            for entry in [k for k in self._entries if k[0] == old]:
+                del self._entries[entry]
+
+        return key
+
+    def _find_base(self, series: pd.Series) -> str:
+        """Most recent base history that series is a prefix of"""
+        n = len(series)
+        values = series.to_numpy(dtype=np.float64)
+        index = series.index
+
+        for key in reversed(self._bases):
+            base, base_values = self._bases[key]
+            if len(base_values) < n:
+                continue
+            if base.index[0] != index[0] or base.index[n - 1] != index[-1]:
+                continue
+            if not np.array_equal(base_values[:n], values, equal_nan=True):
+                continue
+            if not base.index[:n].equals(index):
+                continue
+
+            self._bases.move_to_end(key)
+            return key
+
+        return self.register(series)
+
+    def get(self, series: pd.Series, name: str, params: Tuple,
+            compute: Callable[[pd.Series], Any]) -> pd.Series:
+        """
+        Indicator values for series
+
+        Args:
+            series: Input data (e.g. close prices)
+            name: Indicator name
+            params: Hashable indicator parameters
+            compute: Function computing the indicator over a full series
+
+        Returns:
+            pd.Series aligned with series.index
+        """
+        n = len(series)
+        if n == 0:
+            return compute(series)
+
+        base_key = self._find_base(series)
+        entry_key = (base_key, name, tuple(params))
+
+        values = self._entries.get(entry_key)
+        if values is None:
+            self.misses += 1
+            base, _ = self._bases[base_key]
+            values = np.asarray(compute(base), dtype=np.float64)
+            self._entries[entry_key] = values
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(entry_key)
+
+        return pd.Series(values[:n], index=series.index, name=series.name)
+
+    def clear(self):
+        """Drop all cached histories and indicators"""
+        self._bases.clear()
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        total = self.hits + self.misses
+        return {
+            'bases': len(self._bases),
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total * 100) if total else 0.0
+        }
+
+
+# Shared instance used by the built-in strategies
+_indicator_cache: Optional[IndicatorCache] = None
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """Get the shared indicator cache"""
+    global _indicator_cache
+    if _indicator_cache is None:
+        _indicator_cache = IndicatorCache()
+    return _indicator_cache
@@ -132,10 +132,22 @@ class MonteCarloSimulator:
     Monte Carlo Simulation for stock price forecasting and risk assessment
     """
 
-    def __init__(self, num_simulations: int = 10000, random_seed: int = None):
+    def __init__(self, num_simulations: int = 10000, random_seed: int = None,
+                 dtype: type = np.float64, chunk_size: int = None,
+                 rng: np.random.Generator = None):
+        """
+        Args:
+            num_simulations: Number of simulated paths
+            random_seed: Seed for the simulator's own random generator
+            dtype: np.float64 or np.float32 (halves memory for large runs)
+            chunk_size: If set, paths are generated this many at a time and
+                        only final prices / drawdowns are kept (streaming mode)
+            rng: Explicit numpy Generator (overrides random_seed)
+        """
         self.num_simulations = num_simulations
-        if random_seed:
-            np.random.seed(random_seed)
+        self.dtype = np.dtype(dtype)
+        self.chunk_size = chunk_size
+        self.rng = rng if rng is not None else np.random.default_rng(random_seed)
 
     def simulate(self, df: pd.DataFrame, symbol: str = "UNKNOWN",
                 forecast_days: int = 10, leverage: float = 1.0,
@@ -155,105 +167,161 @@ class MonteCarloSimulator:
         Returns:
             SimulationResult with comprehensive metrics
         """
-        prices = df['close'].values if isinstance(df, pd.DataFrame) else df
+        prices, returns = self._prepare_returns(df)
+        final_prices, drawdowns, sample_paths = self._run_paths(
+            prices[-1], returns, forecast_days, method
+        )
+
+        return self._leveraged_result(
+            symbol, strategy_name, prices[-1], final_prices, drawdowns,
+            sample_paths, forecast_days, leverage, returns
+        )
+
+    def _prepare_returns(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Close prices and simple historical returns"""
+        prices = df['close'].values if isinstance(df, pd.DataFrame) else np.asarray(df)
 
         # Calculate historical returns
         returns = np.diff(prices) / prices[:-1]
+        return prices, returns
 
-        # Run simulation based on method
-        if method == "gbm":
-            paths, final_prices = self._simulate_gbm(prices[-1], returns, forecast_days)
-        elif method == "bootstrap":
-            paths, final_prices = self._simulate_bootstrap(prices[-1], returns, forecast_days)
-        else:  # historical
-            paths, final_prices = self._simulate_historical(prices[-1], returns, forecast_days)
-
-        # Apply leverage
-        initial_price = prices[-1]
+    def _leveraged_result(self, symbol: str, strategy_name: str, initial_price: float,
+                          final_prices: np.ndarray, drawdowns: np.ndarray,
+                          sample_paths: np.ndarray, forecast_days: int,
+                          leverage: float, returns: np.ndarray) -> SimulationResult:
+        """Apply leverage to simulated final prices and compute metrics"""
         leveraged_returns = ((final_prices / initial_price) - 1) * leverage
         leveraged_prices = initial_price * (1 + leveraged_returns)
 
-        # Calculate result metrics
-        result = self._calculate_metrics(
+        return self._calculate_metrics(
             symbol=symbol,
             strategy_name=strategy_name,
             initial_price=initial_price,
             final_prices=leveraged_prices,
-            paths=paths,
+            paths=sample_paths,
             forecast_days=forecast_days,
             leverage=leverage,
-            historical_returns=returns
+            historical_returns=returns,
+            drawdowns=drawdowns
         )
 
-        return result
-
-    def _simulate_gbm(self, initial_price: float, returns: np.ndarray,
-                     days: int) -> Tuple[np.ndarray, np.ndarray]:
+    def _run_paths(self, initial_price: float, returns: np.ndarray, days: int,
+                   method: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Geometric Brownian Motion simulation
+        Simulate num_simulations paths, chunk by chunk if chunk_size is set
+
+        Each method draws its random numbers path by path in row-major
+        order, so chunked and unchunked runs with the same seed give the
+        same paths.
+
+        Returns:
+            (final_prices, max_drawdown_pct per path, first 100 paths)
         """
+        n = self.num_simulations
+        chunk = self.chunk_size or n
+
+        final_prices = np.empty(n, dtype=self.dtype)
+        drawdowns = np.empty(n, dtype=self.dtype)
+        sample_paths = []
+
+        for start in range(0, n, chunk):
+            size = min(chunk, n - start)
+            paths = self._simulate_paths(method, initial_price, returns, days, size)
+
+            final_prices[start:start + size] = paths[:, -1]
+            drawdowns[start:start + size] = self._path_drawdowns(paths)
+            if start < 100:
+                sample_paths.append(paths[:100 - start].copy())
+
+        return final_prices, drawdowns, np.concatenate(sample_paths)
+
+    def _simulate_paths(self, method: str, initial_price: float, returns: np.ndarray,
+                        days: int, size: int) -> np.ndarray:
+        """Generate (size, days+1) price paths in one vectorized pass"""
+        if method == "gbm":
+            growth = self._gbm_growth(returns, days, size)
+        elif method == "bootstrap":
+            growth = self._bootstrap_growth(returns, days, size)
+        else:  # historical
+            growth = self._historical_growth(returns, days, size)
+
+        # Cumulative product of per-step growth factors
+        paths = np.empty((size, days + 1), dtype=self.dtype)
+        paths[:, 0] = initial_price
+        np.cumprod(growth, axis=1, out=paths[:, 1:])
+        paths[:, 1:] *= self.dtype.type(initial_price)
+        return paths
+
+    def _gbm_growth(self, returns: np.ndarray, days: int, size: int) -> np.ndarray:
+        """Geometric Brownian Motion step factors"""
         mu = np.mean(returns)  # Drift
         sigma = np.std(returns)  # Volatility
-
-        # Generate random walks
         dt = 1  # Daily
-        paths = np.zeros((self.num_simulations, days + 1))
-        paths[:, 0] = initial_price
 
-        for t in range(1, days + 1):
-            z = np.random.standard_normal(self.num_simulations)
-            paths[:, t] = paths[:, t-1] * np.exp((mu - 0.5 * sigma**2) * dt + sigma * np.sqrt(dt) * z)
+        growth = self.rng.standard_normal((size, days), dtype=self.dtype)
+        growth *= self.dtype.type(sigma * np.sqrt(dt))
+        growth += self.dtype.type((mu - 0.5 * sigma**2) * dt)
+        np.exp(growth, out=growth)
+        return growth
+
+    def _bootstrap_growth(self, returns: np.ndarray, days: int, size: int) -> np.ndarray:
+        """Step factors sampled i.i.d. from historical returns"""
+        idx = self.rng.integers(0, len(returns), size=(size, days))
+        growth = returns.astype(self.dtype)[idx]
+        growth += 1
+        return growth
+
+    def _historical_growth(self, returns: np.ndarray, days: int, size: int) -> np.ndarray:
+        """Step factors from contiguous historical windows (random start)"""
+        n_returns = len(returns)
+        if n_returns > days:
+            starts = self.rng.integers(0, n_returns - days, size=size)
+            idx = starts[:, None] + np.arange(days)
+        else:
+            # History shorter than the horizon: the whole history, then
+            # random historical returns for the remaining steps
+            fill = self.rng.integers(0, n_returns, size=(size, days - n_returns))
+            idx = np.hstack([np.broadcast_to(np.arange(n_returns), (size, n_returns)), fill])
 
-        final_prices = paths[:, -1]
-        return paths, final_prices
+        growth = returns.astype(self.dtype)[idx]
+        growth += 1
+        return growth
+
+    @staticmethod
+    def _path_drawdowns(paths: np.ndarray) -> np.ndarray:
+        """Max drawdown (%) of each path"""
+        peak = np.maximum.accumulate(paths, axis=1)
+        return ((paths - peak) / peak * 100).min(axis=1)
+
+    def _simulate_gbm(self, initial_price: float, returns: np.ndarray,
+                     days: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Geometric Brownian Motion simulation
+        """
+        paths = self._simulate_paths("gbm", initial_price, returns, days, self.num_simulations)
+        return paths, paths[:, -1]
 
     def _simulate_bootstrap(self, initial_price: float, returns: np.ndarray,
                            days: int) -> Tuple[np.ndarray, np.ndarray]:
         """
         Bootstrap simulation - sample from historical returns
         """
-        paths = np.zeros((self.num_simulations, days + 1))
-        paths[:, 0] = initial_price
-
-        for t in range(1, days + 1):
-            # Random sample from historical returns
-            sampled_returns = np.random.choice(returns, size=self.num_simulations, replace=True)
-            paths[:, t] = paths[:, t-1] * (1 + sampled_returns)
-
-        final_prices = paths[:, -1]
-        return paths, final_prices
+        paths = self._simulate_paths("bootstrap", initial_price, returns, days, self.num_simulations)
+        return paths, paths[:, -1]
 
     def _simulate_historical(self, initial_price: float, returns: np.ndarray,
                             days: int) -> Tuple[np.ndarray, np.ndarray]:
         """
         Historical simulation - use rolling windows
         """
-        n_returns = len(returns)
-        paths = np.zeros((self.num_simulations, days + 1))
-        paths[:, 0] = initial_price
-
-        for i in range(self.num_simulations):
-            # Random starting point
-            start_idx = np.random.randint(0, max(1, n_returns - days))
-            window_returns = returns[start_idx:start_idx + days]
-
-            # Pad if not enough data
-            if len(window_returns) < days:
-                window_returns = np.concatenate([
-                    window_returns,
-                    np.random.choice(returns, size=days - len(window_returns))
-                ])
-
-            for t in range(days):
-                paths[i, t+1] = paths[i, t] * (1 + window_returns[t])
-
-        final_prices = paths[:, -1]
-        return paths, final_prices
+        paths = self._simulate_paths("historical", initial_price, returns, days, self.num_simulations)
+        return paths, paths[:, -1]
 
     def _calculate_metrics(self, symbol: str, strategy_name: str,
                           initial_price: float, final_prices: np.ndarray,
                           paths: np.ndarray, forecast_days: int,
-                          leverage: float, historical_returns: np.ndarray) -> SimulationResult:
+                          leverage: float, historical_returns: np.ndarray,
+                          drawdowns: np.ndarray = None) -> SimulationResult:
         """Calculate comprehensive simulation metrics"""
 
         final_returns = (final_prices / initial_price - 1) * 100  # Percentage returns
@@ -303,11 +371,8 @@ class MonteCarloSimulator:
             result.cvar_95 = -np.mean(losses_below_var)
 
         # Max Drawdown from paths
-        drawdowns = []
-        for path in paths:
-            peak = np.maximum.accumulate(path)
-            dd = (path - peak) / peak * 100
-            drawdowns.append(np.min(dd))
+        if drawdowns is None:
+            drawdowns = self._path_drawdowns(paths)
 
         result.max_drawdown_mean = np.mean(drawdowns)
         result.max_drawdown_worst = np.min(drawdowns)
@@ -378,15 +443,23 @@ class MonteCarloSimulator:
         """
         results = []
 
+        # Leverage only rescales final prices, so simulate once per horizon
+        prices, returns = self._prepare_returns(df)
+        simulated = {}
+        for days in days_range:
+            try:
+                simulated[days] = self._run_paths(prices[-1], returns, days, "gbm")
+            except Exception as e:
+                print(f"Error with days={days}: {e}")
+
         for leverage in leverage_range:
             for days in days_range:
+                if days not in simulated:
+                    continue
                 try:
-                    sim_result = self.simulate(
-                        df=df,
-                        symbol=symbol,
-                        forecast_days=days,
-                        leverage=leverage,
-                        strategy_name=f"Long {leverage}x"
+                    sim_result = self._leveraged_result(
+                        symbol, f"Long {leverage}x", prices[-1], *simulated[days],
+                        days, leverage, returns
                     )
 
                     results.append({
@@ -418,13 +491,18 @@ class MonteCarloSimulator:
         """
         results = []
 
+        # Scenarios sharing a horizon reuse the same simulated paths
+        prices, returns = self._prepare_returns(df)
+        simulated = {}
+
         for scenario in scenarios:
-            result = self.simulate(
-                df=df,
-                symbol=symbol,
-                forecast_days=scenario.get('days', 10),
-                leverage=scenario.get('leverage', 1.0),
-                strategy_name=scenario.get('name', 'Scenario')
+            days = scenario.get('days', 10)
+            if days not in simulated:
+                simulated[days] = self._run_paths(prices[-1], returns, days, "gbm")
+
+            result = self._leveraged_result(
+                symbol, scenario.get('name', 'Scenario'), prices[-1], *simulated[days],
+                days, scenario.get('leverage', 1.0), returns
             )
             results.append(result)
 
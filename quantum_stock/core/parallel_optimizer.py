@@ -0,0 +1,270 @@
+"""
+Parallel Parameter Grid Optimizer
+Spreads strategy parameter combinations across a process pool with the
+OHLCV data placed once in shared memory
+"""
+
+import os
+import math
+import logging
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, field
+from itertools import product
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .backtest_engine import BacktestEngine, BacktestResult
+from .indicator_cache import get_indicator_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class GridSearchResult:
+    """Parameter grid search results"""
+    best_params: Optional[Dict[str, Any]] = None
+    best_result: Optional[BacktestResult] = None
+    best_metric: float = float('-inf')
+    scores: List[Tuple[Dict[str, Any], float]] = field(default_factory=list)
+    errors: List[Tuple[Dict[str, Any], str]] = field(default_factory=list)
+    evaluations: int = 0
+    rounds: int = 1
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_df: Optional[pd.DataFrame] = None
+_worker_engine: Optional[BacktestEngine] = None
+
+
+def _frame_from_buffer(buf, n: int, columns: Tuple[str, ...],
+                       datetime_index: bool) -> pd.DataFrame:
+    """Zero-copy DataFrame over a shared buffer laid out as [index | columns...]"""
+    index_values = np.ndarray((n,), dtype=np.int64, buffer=buf)
+    data = np.ndarray((len(columns), n), dtype=np.float64, buffer=buf, offset=n * 8)
+
+    if datetime_index:
+        index = pd.DatetimeIndex(index_values.view('datetime64[ns]'))
+    else:
+        index = pd.RangeIndex(n)
+
+    return pd.DataFrame({col: data[j] for j, col in enumerate(columns)},
+                        index=index, copy=False)
+
+
+def _init_worker(shm_name: str, n: int, columns: Tuple[str, ...],
+                 datetime_index: bool, engine_config: Dict[str, Any]):
+    """Process pool initializer: attach shared data once per worker"""
+    global _worker_shm, _worker_df, _worker_engine
+
+    # Workers are children of the optimizer and share its resource tracker,
+    # so the parent's unlink in close() is the only cleanup needed
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_df = _frame_from_buffer(_worker_shm.buf, n, columns, datetime_index)
+    if 'close' in _worker_df.columns:
+        get_indicator_cache().register(_worker_df['close'])
+    _worker_engine = BacktestEngine(mode="array", **engine_config)
+
+
+def _evaluate(task: Tuple[type, Dict[str, Any], int, int, str, str]) -> Tuple[Optional[float], Optional[str]]:
+    """Run one parameter combination on a window of the shared frame"""
+    strategy_class, params, start, end, symbol, metric = task
+    try:
+        strategy = strategy_class(**params)
+        result = _worker_engine.run(_worker_df.iloc[start:end], strategy, symbol)
+        return float(getattr(result, metric, 0)), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+class ParallelGridOptimizer:
+    """
+    Process-pool grid search over one shared OHLCV frame
+
+    The frame is copied into shared memory once; tasks only carry the
+    parameter dict and the (start, end) window, so many searches over
+    different windows (walk-forward folds, CPCV paths) reuse the same
+    pool and data.
+
+    Usage:
+        with ParallelGridOptimizer(df, engine, n_jobs=8) as opt:
+            search = opt.optimize(MACrossoverStrategy, grid, end=500)
+    """
+
+    def __init__(self, df: pd.DataFrame, engine: BacktestEngine = None,
+                 n_jobs: int = None):
+        """
+        Args:
+            df: OHLCV data (numeric columns are shared with workers)
+            engine: BacktestEngine whose settings are used in workers and
+                    which re-runs the winning combination for the full result
+            n_jobs: Worker processes (None = all CPUs)
+        """
+        self.df = df
+        self.engine = engine or BacktestEngine()
+        self.n_jobs = n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        """Copy data to shared memory and start the worker pool"""
+        if self._pool is not None:
+            return
+
+        # Numeric columns go to shared memory column-major, one contiguous
+        # float64 array each, after the int64 index
+        n = len(self.df)
+        columns = tuple(c for c in self.df.columns
+                        if pd.api.types.is_numeric_dtype(self.df[c]))
+        datetime_index = isinstance(self.df.index, pd.DatetimeIndex)
+
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=max(n * 8 * (len(columns) + 1), 1)
+        )
+
+        index_values = np.ndarray((n,), dtype=np.int64, buffer=self._shm.buf)
+        if datetime_index:
+            index_values[:] = self.df.index.values.astype('datetime64[ns]').view(np.int64)
+        else:
+            index_values[:] = np.arange(n)
+
+        data = np.ndarray((len(columns), n), dtype=np.float64,
+                          buffer=self._shm.buf, offset=n * 8)
+        for j, col in enumerate(columns):
+            data[j] = self.df[col].values.astype(np.float64)
+        del index_values, data
+
+        engine_config = {
+            'initial_capital': self.engine.initial_capital,
+            'commission_rate': self.engine.commission_rate,
+            'slippage': self.engine.slippage
+        }
+
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.n_jobs,
+            initializer=_init_worker,
+            initargs=(self._shm.name, n, columns, datetime_index, engine_config)
+        )
+
+    def close(self):
+        """Shut down workers and release shared memory"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+        if self._shm is not None:
+            self._shm.close()
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            self._shm = None
+
+    def optimize(self, strategy_class: type, param_grid: Dict[str, List],
+                 symbol: str = "UNKNOWN", metric: str = "sharpe_ratio",
+                 start: int = 0, end: int = None,
+                 successive_halving: bool = False, eta: int = 3,
+                 min_bars: int = 100) -> GridSearchResult:
+        """
+        Grid search over df.iloc[start:end]
+
+        Args:
+            strategy_class: Strategy class to optimize (must be picklable)
+            param_grid: Dict of parameter name -> list of values to test
+            symbol: Stock symbol
+            metric: Metric to maximize
+            start, end: Positional window of the shared frame
+            successive_halving: Score all combinations on short trailing
+                sub-windows first and keep the top 1/eta for each longer
+                window, finishing on the full window
+            eta: Halving rate
+            min_bars: Shortest sub-window used by successive halving
+
+        Returns:
+            GridSearchResult (best combination re-run with the full engine)
+        """
+        self.start()
+
+        end = len(self.df) if end is None else end
+        length = end - start
+
+        param_names = list(param_grid.keys())
+        candidates = [dict(zip(param_names, combination))
+                      for combination in product(*param_grid.values())]
+
+        search = GridSearchResult()
+
+        # Window lengths, shortest first, always ending with the full window
+        windows = [length]
+        if successive_halving and eta > 1:
+            rounds = int(math.floor(math.log(max(len(candidates), 1), eta)))
+            for k in range(1, rounds + 1):
+                sub_length = int(length / eta ** k)
+                if sub_length < min_bars:
+                    break
+                windows.insert(0, sub_length)
+        search.rounds = len(windows)
+
+        for r, window in enumerate(windows):
+            window_start = end - window
+            tasks = [(strategy_class, params, window_start, end, symbol, metric)
+                     for params in candidates]
+            chunksize = max(1, len(tasks) // (self.n_jobs * 4))
+
+            scores = []
+            for params, (value, error) in zip(
+                    candidates, self._pool.map(_evaluate, tasks, chunksize=chunksize)):
+                search.evaluations += 1
+                if error is not None:
+                    search.errors.append((params, error))
+                    continue
+                scores.append((params, value))
+
+            if r == len(windows) - 1:
+                search.scores = scores
+                break
+
+            # Keep the top 1/eta (NaN scores rank last)
+            ranked = sorted(scores, key=lambda s: s[1] if s[1] == s[1] else float('-inf'),
+                            reverse=True)
+            keep = max(1, int(math.ceil(len(candidates) / eta)))
+            candidates = [params for params, _ in ranked[:keep]]
+            if not candidates:
+                break
+
+        # First combination with the strictly highest metric (grid order)
+        for params, value in search.scores:
+            if value > search.best_metric:
+                search.best_metric = value
+                search.best_params = params
+
+        if search.errors:
+            logger.warning(
+                f"{strategy_class.__name__}: {len(search.errors)}/{search.evaluations} "
+                f"parameter evaluations failed, first: {search.errors[0][1]}"
+            )
+
+        if search.best_params is not None:
+            strategy = strategy_class(**search.best_params)
+            search.best_result = self.engine.run(
+                self.df.iloc[start:end], strategy, symbol
+            )
+
+        return search
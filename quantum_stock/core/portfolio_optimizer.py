@@ -8,12 +8,20 @@
 P2 Implementation - Portfolio optimization for VN-QUANT
 """
 
+import os
 import logging
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 from scipy import optimize
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from .covariance_engine import CovarianceEngine
+except ImportError:
+    from covariance_engine import CovarianceEngine
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -41,6 +49,326 @@ class OptimizationResult:
         })
 
 
+# ============================================
+# SOLVERS
+# ============================================
+# Array-level solvers shared by PortfolioOptimizer and the batch API.
+# Long-only problems without a weight cap are convex QPs and go through
+# an active-set solver; the rest use SLSQP with analytic gradients.
+
+METHODS = ('max_sharpe', 'min_variance', 'risk_parity', 'kelly', 'equal_weight')
+
+
+def _portfolio_stats(weights: np.ndarray, mean_returns: np.ndarray, cov: np.ndarray,
+                     risk_free_rate: float) -> Tuple[float, float, float]:
+    """(expected return, volatility, Sharpe ratio)"""
+    port_return = float(weights @ mean_returns)
+    port_vol = float(np.sqrt(weights @ cov @ weights))
+    sharpe = (port_return - risk_free_rate) / port_vol if port_vol > 0 else 0.0
+    return port_return, port_vol, sharpe
+
+
+def _active_set_qp(cov: np.ndarray, A: np.ndarray, b: np.ndarray, x0: np.ndarray,
+                   c: np.ndarray = None, max_iter: int = None) -> Optional[np.ndarray]:
+    """
+    Solve  min 1/2 x'Σx - c'x  s.t.  A x = b, x >= 0  (primal active set)
+
+    Args:
+        cov: Σ (positive definite)
+        A, b: Equality constraints (k x n, k)
+        x0: Feasible starting point; a warm start from a nearby problem
+            (previous date or frontier point) usually needs few iterations
+        c: Linear term (default 0)
+
+    Returns:
+        Optimal x, or None when a reduced KKT system is singular or the
+        solver does not converge (callers fall back to SLSQP)
+    """
+    n = len(x0)
+    A = np.atleast_2d(A)
+    b = np.atleast_1d(b).astype(np.float64)
+    k = len(b)
+    c = np.zeros(n) if c is None else c
+    x = np.array(x0, dtype=np.float64)
+    free = x > 0
+    b_scale = max(1.0, float(np.abs(b).max()))
+
+    for _ in range(max_iter or 10 * n + 10):
+        F = np.flatnonzero(free)
+        m = len(F)
+        if m == 0:
+            return None
+
+        # Equality-constrained optimum over the free variables
+        kkt = np.zeros((m + k, m + k))
+        kkt[:m, :m] = cov[np.ix_(F, F)]
+        kkt[:m, m:] = -A[:, F].T
+        kkt[m:, :m] = A[:, F]
+        try:
+            sol = np.linalg.solve(kkt, np.concatenate([c[F], b]))
+        except np.linalg.LinAlgError:
+            return None
+        y, lam = sol[:m], sol[m:]
+        if not np.all(np.isfinite(sol)) or np.abs(A[:, F] @ y - b).max() > 1e-8 * b_scale:
+            return None
+
+        blocking = y < 0
+        if blocking.any():
+            # Step towards y until the first free variable reaches zero
+            xF = x[F]
+            ratios = xF[blocking] / (xF[blocking] - y[blocking])
+            alpha = ratios.min()
+            x[F] = xF + alpha * (y - xF)
+            hit = F[blocking][ratios <= alpha * (1 + 1e-12)]
+            x[hit] = 0.0
+            free[hit] = False
+            continue
+
+        x[F] = y
+        # Multipliers of the bounds x_i >= 0 must be non-negative
+        grad = cov @ x - c - A.T @ lam
+        bound = np.flatnonzero(~free)
+        if len(bound) == 0:
+            return x
+        worst = bound[np.argmin(grad[bound])]
+        if grad[worst] >= -1e-12 * (1.0 + np.abs(grad).max()):
+            return x
+        free[worst] = True
+
+    return None
+
+
+def _slsqp(fun, x0: np.ndarray, bounds, constraints) -> Tuple[np.ndarray, bool]:
+    """SLSQP with the objective returning (value, gradient)"""
+    result = optimize.minimize(fun, x0, jac=True, method='SLSQP',
+                               bounds=bounds, constraints=constraints)
+    return result.x, bool(result.success)
+
+
+def _budget_constraint(n: int) -> Dict:
+    """sum(w) = 1 with its Jacobian"""
+    ones = np.ones(n)
+    return {'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: ones}
+
+
+def _neg_sharpe(weights: np.ndarray, mean_returns: np.ndarray, cov: np.ndarray,
+                risk_free_rate: float) -> Tuple[float, np.ndarray]:
+    cov_w = cov @ weights
+    port_vol = np.sqrt(weights @ cov_w)
+    excess = weights @ mean_returns - risk_free_rate
+    grad = -(mean_returns / port_vol - excess * cov_w / port_vol ** 3)
+    return -excess / port_vol, grad
+
+
+def _variance(weights: np.ndarray, cov: np.ndarray) -> Tuple[float, np.ndarray]:
+    cov_w = cov @ weights
+    return weights @ cov_w, 2 * cov_w
+
+
+def _volatility(weights: np.ndarray, cov: np.ndarray) -> Tuple[float, np.ndarray]:
+    cov_w = cov @ weights
+    port_vol = np.sqrt(weights @ cov_w)
+    return port_vol, cov_w / port_vol
+
+
+def _risk_parity_objective(weights: np.ndarray, cov: np.ndarray) -> Tuple[float, np.ndarray]:
+    """
+    Squared deviation of risk contributions from equal shares, relative to
+    the portfolio variance (absolute contributions are ~1e-4, below the
+    SLSQP tolerance, which left the equal-weight start unchanged)
+    """
+    n = len(weights)
+    cov_w = cov @ weights                       # marginal risk contribution
+    port_var = weights @ cov_w
+    error = weights * cov_w - port_var / n
+    value = np.sum(error ** 2)
+    grad = 2 * (error * cov_w + cov @ (error * weights) - (2 / n) * error.sum() * cov_w)
+    return value / port_var ** 2, grad / port_var ** 2 - 4 * value * cov_w / port_var ** 3
+
+
+def _min_variance(cov: np.ndarray, max_weight: float = None,
+                  x0: np.ndarray = None) -> Tuple[np.ndarray, bool]:
+    n = len(cov)
+    x0 = np.full(n, 1 / n) if x0 is None else x0
+    if max_weight is None or max_weight >= 1:
+        weights = _active_set_qp(cov, np.ones((1, n)), np.ones(1), x0)
+        if weights is not None:
+            return weights, True
+    upper = 1 if max_weight is None else max_weight
+    return _slsqp(lambda w: _variance(w, cov), x0, [(0, upper)] * n, [_budget_constraint(n)])
+
+
+def _max_sharpe(mean_returns: np.ndarray, cov: np.ndarray, risk_free_rate: float,
+                max_weight: float = None, x0: np.ndarray = None) -> Tuple[np.ndarray, bool]:
+    n = len(cov)
+    excess = mean_returns - risk_free_rate
+    if (max_weight is None or max_weight >= 1) and excess.max() > 0:
+        # Max Sharpe = min y'Σy s.t. excess'y = 1, y >= 0, then w = y / sum(y)
+        if x0 is not None and x0 @ excess > 0:
+            y0 = x0 / (x0 @ excess)
+        else:
+            y0 = np.zeros(n)
+            best = int(np.argmax(excess))
+            y0[best] = 1 / excess[best]
+        y = _active_set_qp(cov, excess[None, :], np.ones(1), y0)
+        if y is not None and y.sum() > 0:
+            return y / y.sum(), True
+
+    x0 = np.full(n, 1 / n) if x0 is None else x0
+    upper = 1 if max_weight is None else max_weight
+    return _slsqp(lambda w: _neg_sharpe(w, mean_returns, cov, risk_free_rate), x0,
+                  [(0, upper)] * n, [_budget_constraint(n)])
+
+
+def _risk_parity(cov: np.ndarray, x0: np.ndarray = None) -> Tuple[np.ndarray, bool]:
+    n = len(cov)
+    x0 = np.full(n, 1 / n) if x0 is None else np.clip(x0, 0.01, 1)
+    return _slsqp(lambda w: _risk_parity_objective(w, cov), x0,
+                  [(0.01, 1)] * n, [_budget_constraint(n)])  # Min 1% per asset
+
+
+def _kelly(mean_returns: np.ndarray, cov: np.ndarray, risk_free_rate: float,
+           max_leverage: float = 1.0) -> Tuple[np.ndarray, bool]:
+    """Kelly = Σ^-1 (μ - r_f), long-only and normalized"""
+    n = len(cov)
+    kelly_weights = np.linalg.solve(cov, mean_returns - risk_free_rate)
+
+    # Apply leverage constraint
+    kelly_sum = np.sum(kelly_weights)
+    if kelly_sum > max_leverage:
+        kelly_weights = kelly_weights * (max_leverage / kelly_sum)
+
+    # Long-only, normalized to sum to 1
+    kelly_weights = np.maximum(kelly_weights, 0)
+    if np.sum(kelly_weights) > 0:
+        return kelly_weights / np.sum(kelly_weights), True
+    return np.full(n, 1 / n), True
+
+
+def _frontier_point(mean_returns: np.ndarray, cov: np.ndarray, target: float,
+                    x0: np.ndarray) -> Tuple[np.ndarray, bool]:
+    """Minimum volatility for a target return, started from feasible x0"""
+    n = len(cov)
+    A = np.vstack([np.ones(n), mean_returns])
+    weights = _active_set_qp(cov, A, np.array([1.0, target]), x0)
+    if weights is not None:
+        return weights, True
+    cons = [
+        _budget_constraint(n),
+        {'type': 'eq', 'fun': lambda x: x @ mean_returns - target, 'jac': lambda x: mean_returns}
+    ]
+    return _slsqp(lambda w: _volatility(w, cov), x0, [(0, 1)] * n, cons)
+
+
+def _solve(method: str, mean_returns: np.ndarray, cov: np.ndarray, risk_free_rate: float,
+           x0: np.ndarray = None, max_weight: float = None,
+           max_leverage: float = 1.0) -> Tuple[np.ndarray, bool]:
+    """Weights for one problem by method name"""
+    if method == 'max_sharpe':
+        return _max_sharpe(mean_returns, cov, risk_free_rate, max_weight, x0)
+    if method == 'min_variance':
+        return _min_variance(cov, max_weight, x0)
+    if method == 'risk_parity':
+        return _risk_parity(cov, x0)
+    if method == 'kelly':
+        return _kelly(mean_returns, cov, risk_free_rate, max_leverage)
+    if method == 'equal_weight':
+        return np.full(len(cov), 1 / len(cov)), True
+    raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+
+
+def _solve_sequence(task: Tuple) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Solve consecutive problems, warm-starting each from the previous
+    solution (process pool worker)
+    """
+    method, means, covs, risk_free_rate, options, warm_start = task
+    weights = np.full(means.shape, np.nan)
+    success = np.zeros(len(means), dtype=bool)
+    previous = None
+    for i, (mean_returns, cov) in enumerate(zip(means, covs)):
+        if not (np.all(np.isfinite(mean_returns)) and np.all(np.isfinite(cov))):
+            continue
+        x0 = previous if warm_start and previous is not None and len(previous) == len(cov) else None
+        try:
+            weights[i], success[i] = _solve(method, mean_returns, cov, risk_free_rate, x0, **options)
+        except np.linalg.LinAlgError as e:
+            logger.warning(f"{method} failed for problem {i}: {e}")
+            continue
+        previous = weights[i]
+    return weights, success
+
+
+def optimize_portfolios(mean_returns: np.ndarray, cov_matrices: np.ndarray,
+                        method: str = 'max_sharpe', risk_free_rate: float = 0.05,
+                        max_weight: float = None, max_leverage: float = 1.0,
+                        warm_start: bool = True, n_jobs: int = 1
+                        ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Optimize a batch of portfolios (universes or rebalancing dates)
+
+    Args:
+        mean_returns: (batch x assets) annualized expected returns
+        cov_matrices: (batch x assets x assets) annualized covariances
+        method: One of METHODS
+        risk_free_rate: Annual risk-free rate
+        max_weight: Weight cap for max_sharpe / min_variance
+        max_leverage: Kelly leverage cap
+        warm_start: Start each problem from the previous solution (best
+                    when consecutive problems are close, e.g. daily dates)
+        n_jobs: Worker processes; the batch is split into contiguous
+                chunks, each warm-started on its own (None = all CPUs)
+
+    Returns:
+        (weights (batch x assets), success (batch,)); problems with
+        non-finite inputs get NaN weights
+    """
+    means = np.asarray(mean_returns, dtype=np.float64)
+    covs = np.asarray(cov_matrices, dtype=np.float64)
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of {METHODS}")
+    options = {'max_weight': max_weight, 'max_leverage': max_leverage}
+
+    n_jobs = n_jobs if n_jobs and n_jobs > 0 else (os.cpu_count() or 1)
+    n_jobs = min(n_jobs, len(means))
+    if n_jobs <= 1:
+        return _solve_sequence((method, means, covs, risk_free_rate, options, warm_start))
+
+    bounds = np.linspace(0, len(means), n_jobs + 1).astype(int)
+    tasks = [(method, means[lo:hi], covs[lo:hi], risk_free_rate, options, warm_start)
+             for lo, hi in zip(bounds[:-1], bounds[1:])]
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        parts = list(pool.map(_solve_sequence, tasks))
+    return np.concatenate([w for w, _ in parts]), np.concatenate([ok for _, ok in parts])
+
+
+def rolling_moments(returns: np.ndarray, window: int, step: int = 1,
+                    chunk: int = 256) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Annualized mean and covariance of each trailing window of returns
+
+    Returns:
+        (row index of each window's last row, means (dates x assets),
+         covariances (dates x assets x assets)); windows with NaN give NaN
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    ends = np.arange(window - 1, len(returns), step)
+    n = returns.shape[1]
+    means = np.empty((len(ends), n))
+    covs = np.empty((len(ends), n, n))
+    if len(ends) == 0:
+        return ends, means, covs
+
+    windows = sliding_window_view(returns, window, axis=0)[::step]   # dates x assets x window
+    for lo in range(0, len(ends), chunk):
+        block = windows[lo:lo + chunk]
+        mean = block.mean(axis=2)
+        centered = block - mean[:, :, None]
+        means[lo:lo + chunk] = mean * 252
+        covs[lo:lo + chunk] = np.einsum('dit,djt->dij', centered, centered) * (252 / (window - 1))
+    return ends, means, covs
+
+
 # ============================================
 # PORTFOLIO OPTIMIZER
 # ============================================
@@ -58,13 +386,17 @@ class PortfolioOptimizer:
     - Black-Litterman
     """
     
-    def __init__(self, returns: pd.DataFrame, risk_free_rate: float = 0.05):
+    def __init__(self, returns: pd.DataFrame, risk_free_rate: float = 0.05,
+                 covariance: str = 'sample', engine: CovarianceEngine = None):
         """
         Initialize optimizer
         
         Args:
             returns: DataFrame of asset returns (columns = assets)
             risk_free_rate: Annual risk-free rate (default 5%)
+            covariance: 'sample', 'ledoit_wolf' or 'ewma' estimate
+            engine: Live CovarianceEngine over the same assets; its cached
+                    covariance is used instead of re-estimating
         """
         self.returns = returns
         self.risk_free_rate = risk_free_rate
@@ -72,135 +404,69 @@ class PortfolioOptimizer:
         
         # Calculate statistics
         self.mean_returns = returns.mean() * 252
-        self.cov_matrix = returns.cov() * 252
+        if engine is None and covariance != 'sample':
+            engine = CovarianceEngine.from_returns(returns.dropna(), covariance)
+        self.engine = engine
+        if engine is not None:
+            self.cov_matrix = engine.covariance_frame.loc[returns.columns, returns.columns]
+        else:
+            self.cov_matrix = returns.cov() * 252
         self.assets = list(returns.columns)
         self.n_assets = len(self.assets)
     
-    def optimize_max_sharpe(self, constraints: Dict = None) -> OptimizationResult:
-        """
-        Maximum Sharpe Ratio Portfolio
-        
-        Markowitz mean-variance optimization targeting highest Sharpe ratio
-        """
-        def neg_sharpe(weights):
-            port_return = np.dot(weights, self.mean_returns)
-            port_vol = np.sqrt(np.dot(weights.T, np.dot(self.cov_matrix, weights)))
-            return -(port_return - self.risk_free_rate) / port_vol
-        
-        # Constraints
-        cons = [
-            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1}  # Weights sum to 1
-        ]
-        
-        # Bounds
-        bounds = [(0, 1) for _ in range(self.n_assets)]  # Long only
-        
-        if constraints:
-            if 'max_weight' in constraints:
-                bounds = [(0, constraints['max_weight']) for _ in range(self.n_assets)]
-        
-        # Initial guess (equal weight)
-        x0 = np.array([1 / self.n_assets] * self.n_assets)
-        
-        # Optimize
-        result = optimize.minimize(
-            neg_sharpe, x0,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=cons
-        )
-        
-        weights = result.x
-        port_return = np.dot(weights, self.mean_returns)
-        port_vol = np.sqrt(np.dot(weights.T, np.dot(self.cov_matrix, weights)))
-        sharpe = (port_return - self.risk_free_rate) / port_vol
-        
+    def _moments(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Mean returns and covariance as arrays"""
+        return (np.asarray(self.mean_returns, dtype=np.float64),
+                np.asarray(self.cov_matrix, dtype=np.float64))
+
+    def _result(self, weights: np.ndarray, method: str, metadata: Dict = None) -> OptimizationResult:
+        mean_returns, cov = self._moments()
+        port_return, port_vol, sharpe = _portfolio_stats(weights, mean_returns, cov, self.risk_free_rate)
         return OptimizationResult(
             weights=dict(zip(self.assets, weights)),
             expected_return=port_return,
             volatility=port_vol,
             sharpe_ratio=sharpe,
-            method='Max Sharpe',
-            metadata={'success': result.success}
+            method=method,
+            metadata=metadata or {}
         )
+
+    def optimize_max_sharpe(self, constraints: Dict = None,
+                            initial_weights: np.ndarray = None) -> OptimizationResult:
+        """
+        Maximum Sharpe Ratio Portfolio
+        
+        Markowitz mean-variance optimization targeting highest Sharpe ratio.
+        Long-only without a weight cap it is solved as a QP; otherwise by
+        SLSQP with the analytic gradient.
+
+        Args:
+            constraints: {'max_weight': cap per asset}
+            initial_weights: Warm start (e.g. the previous rebalance)
+        """
+        max_weight = constraints.get('max_weight') if constraints else None
+        mean_returns, cov = self._moments()
+        weights, success = _max_sharpe(mean_returns, cov, self.risk_free_rate,
+                                       max_weight, initial_weights)
+        return self._result(weights, 'Max Sharpe', {'success': success})
     
-    def optimize_min_variance(self) -> OptimizationResult:
+    def optimize_min_variance(self, initial_weights: np.ndarray = None) -> OptimizationResult:
         """
         Minimum Variance Portfolio
         
-        Lowest risk portfolio on the efficient frontier
+        Lowest risk portfolio on the efficient frontier (long-only QP)
         """
-        def portfolio_variance(weights):
-            return np.dot(weights.T, np.dot(self.cov_matrix, weights))
-        
-        cons = [{'type': 'eq', 'fun': lambda x: np.sum(x) - 1}]
-        bounds = [(0, 1) for _ in range(self.n_assets)]
-        x0 = np.array([1 / self.n_assets] * self.n_assets)
-        
-        result = optimize.minimize(
-            portfolio_variance, x0,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=cons
-        )
-        
-        weights = result.x
-        port_return = np.dot(weights, self.mean_returns)
-        port_vol = np.sqrt(portfolio_variance(weights))
-        sharpe = (port_return - self.risk_free_rate) / port_vol
-        
-        return OptimizationResult(
-            weights=dict(zip(self.assets, weights)),
-            expected_return=port_return,
-            volatility=port_vol,
-            sharpe_ratio=sharpe,
-            method='Min Variance'
-        )
+        weights, _ = _min_variance(self._moments()[1], x0=initial_weights)
+        return self._result(weights, 'Min Variance')
     
-    def optimize_risk_parity(self) -> OptimizationResult:
+    def optimize_risk_parity(self, initial_weights: np.ndarray = None) -> OptimizationResult:
         """
         Risk Parity Portfolio
         
         Equal risk contribution from each asset
         """
-        def risk_parity_objective(weights):
-            # Portfolio variance
-            port_var = np.dot(weights.T, np.dot(self.cov_matrix, weights))
-            
-            # Marginal risk contribution
-            mrc = np.dot(self.cov_matrix, weights)
-            
-            # Risk contribution
-            rc = weights * mrc
-            
-            # Target: equal risk contribution
-            target_rc = port_var / self.n_assets
-            
-            return np.sum((rc - target_rc) ** 2)
-        
-        cons = [{'type': 'eq', 'fun': lambda x: np.sum(x) - 1}]
-        bounds = [(0.01, 1) for _ in range(self.n_assets)]  # Min 1% per asset
-        x0 = np.array([1 / self.n_assets] * self.n_assets)
-        
-        result = optimize.minimize(
-            risk_parity_objective, x0,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=cons
-        )
-        
-        weights = result.x
-        port_return = np.dot(weights, self.mean_returns)
-        port_vol = np.sqrt(np.dot(weights.T, np.dot(self.cov_matrix, weights)))
-        sharpe = (port_return - self.risk_free_rate) / port_vol
-        
-        return OptimizationResult(
-            weights=dict(zip(self.assets, weights)),
-            expected_return=port_return,
-            volatility=port_vol,
-            sharpe_ratio=sharpe,
-            method='Risk Parity'
-        )
+        weights, _ = _risk_parity(self._moments()[1], initial_weights)
+        return self._result(weights, 'Risk Parity')
     
     def optimize_kelly(self, max_leverage: float = 1.0) -> OptimizationResult:
         """
@@ -211,41 +477,9 @@ class PortfolioOptimizer:
         Kelly = Σ (Cov^-1 * (μ - r_f))
         """
         try:
-            # Inverse covariance matrix
-            cov_inv = np.linalg.inv(self.cov_matrix)
-            
-            # Excess returns
-            excess_returns = self.mean_returns - self.risk_free_rate
-            
-            # Raw Kelly weights
-            kelly_weights = np.dot(cov_inv, excess_returns)
-            
-            # Normalize and apply leverage constraint
-            kelly_sum = np.sum(kelly_weights)
-            if kelly_sum > max_leverage:
-                kelly_weights = kelly_weights * (max_leverage / kelly_sum)
-            
-            # Handle negative weights (short positions) - set to 0 for long-only
-            kelly_weights = np.maximum(kelly_weights, 0)
-            
-            # Normalize to sum to 1
-            if np.sum(kelly_weights) > 0:
-                kelly_weights = kelly_weights / np.sum(kelly_weights)
-            else:
-                kelly_weights = np.array([1 / self.n_assets] * self.n_assets)
-            
-            port_return = np.dot(kelly_weights, self.mean_returns)
-            port_vol = np.sqrt(np.dot(kelly_weights.T, np.dot(self.cov_matrix, kelly_weights)))
-            sharpe = (port_return - self.risk_free_rate) / port_vol if port_vol > 0 else 0
-            
-            return OptimizationResult(
-                weights=dict(zip(self.assets, kelly_weights)),
-                expected_return=port_return,
-                volatility=port_vol,
-                sharpe_ratio=sharpe,
-                method='Kelly Criterion',
-                metadata={'max_leverage': max_leverage}
-            )
+            mean_returns, cov = self._moments()
+            weights, _ = _kelly(mean_returns, cov, self.risk_free_rate, max_leverage)
+            return self._result(weights, 'Kelly Criterion', {'max_leverage': max_leverage})
             
         except np.linalg.LinAlgError:
             logger.warning("Kelly optimization failed, falling back to equal weight")
@@ -345,45 +579,68 @@ class PortfolioOptimizer:
         """
         Calculate efficient frontier
         
+        Each point starts from the previous one, moved towards the
+        highest-return asset just enough to reach its target return.
+
         Returns DataFrame of (risk, return) points
         """
+        mean_returns, cov = self._moments()
+
         # Find min and max returns
-        min_ret = self.optimize_min_variance().expected_return
-        max_ret = self.mean_returns.max()
+        weights = self.optimize_min_variance()
+        previous = np.array([weights.weights[a] for a in self.assets])
+        min_ret = weights.expected_return
+        top = int(np.argmax(mean_returns))
+        max_ret = mean_returns[top]
         
         target_returns = np.linspace(min_ret, max_ret, n_points)
         
         frontier = []
         
         for target in target_returns:
-            def portfolio_vol(weights):
-                return np.sqrt(np.dot(weights.T, np.dot(self.cov_matrix, weights)))
-            
-            cons = [
-                {'type': 'eq', 'fun': lambda x: np.sum(x) - 1},
-                {'type': 'eq', 'fun': lambda x, t=target: np.dot(x, self.mean_returns) - t}
-            ]
-            bounds = [(0, 1) for _ in range(self.n_assets)]
-            x0 = np.array([1 / self.n_assets] * self.n_assets)
+            # Feasible warm start: mix the previous point with the top asset
+            prev_ret = previous @ mean_returns
+            gap = max_ret - prev_ret
+            theta = np.clip((target - prev_ret) / gap, 0, 1) if gap > 0 else 1.0
+            x0 = (1 - theta) * previous
+            x0[top] += theta
             
             try:
-                result = optimize.minimize(
-                    portfolio_vol, x0,
-                    method='SLSQP',
-                    bounds=bounds,
-                    constraints=cons
-                )
-                
-                if result.success:
-                    frontier.append({
-                        'return': target,
-                        'volatility': result.fun,
-                        'sharpe': (target - self.risk_free_rate) / result.fun
-                    })
-            except:
+                weights, success = _frontier_point(mean_returns, cov, target, x0)
+            except (ValueError, np.linalg.LinAlgError):
                 continue
+                
+            if success:
+                vol = float(np.sqrt(weights @ cov @ weights))
+                frontier.append({
+                    'return': target,
+                    'volatility': vol,
+                    'sharpe': (target - self.risk_free_rate) / vol
+                })
+                previous = weights
         
         return pd.DataFrame(frontier)
+
+    def rolling_weights(self, window: int = 60, step: int = 1, method: str = 'max_sharpe',
+                        n_jobs: int = 1, **options) -> pd.DataFrame:
+        """
+        Rebalancing weights over rolling windows of the returns
+
+        Args:
+            window: Return rows per estimation window
+            step: Rows between rebalancing dates
+            method: One of METHODS
+            n_jobs: Worker processes (see optimize_portfolios)
+            **options: max_weight, max_leverage, warm_start
+
+        Returns:
+            DataFrame (rebalancing dates x assets) indexed by each window's
+            last row; windows with missing returns are NaN
+        """
+        ends, means, covs = rolling_moments(self.returns.to_numpy(dtype=np.float64), window, step)
+        weights, _ = optimize_portfolios(means, covs, method, self.risk_free_rate,
+                                         n_jobs=n_jobs, **options)
+        return pd.DataFrame(weights, index=self.returns.index[ends], columns=self.assets)
     
     def compare_strategies(self) -> pd.DataFrame:
         """Compare all optimization strategies"""
@@ -414,10 +671,19 @@ class PortfolioOptimizer:
 class PortfolioRiskAnalyzer:
     """Portfolio risk analysis"""
     
-    def __init__(self, returns: pd.DataFrame, weights: Dict[str, float]):
+    def __init__(self, returns: pd.DataFrame, weights: Dict[str, float],
+                 engine: CovarianceEngine = None):
+        """
+        Args:
+            returns: DataFrame of asset returns
+            weights: Portfolio weights by asset
+            engine: CovarianceEngine for the parametric VaR decomposition
+                    (default: Ledoit-Wolf over `returns`, built on first use)
+        """
         self.returns = returns
         self.weights = np.array([weights.get(a, 0) for a in returns.columns])
         self.portfolio_returns = returns.dot(self.weights)
+        self.engine = engine
     
     def var(self, confidence: float = 0.95, method: str = 'historical') -> float:
         """
@@ -472,6 +738,22 @@ class PortfolioRiskAnalyzer:
         
         return marginal
 
+    def var_decomposition(self, confidence: float = 0.95) -> pd.DataFrame:
+        """
+        Parametric marginal and component VaR by asset from the covariance
+        engine (component VaR sums to the portfolio VaR)
+        """
+        if self.engine is None:
+            self.engine = CovarianceEngine.from_returns(self.returns.dropna())
+        weights = dict(zip(self.returns.columns, self.weights))
+        marginal = self.engine.marginal_var(confidence, weights)
+        component = self.engine.component_var(confidence, weights)
+        return pd.DataFrame({
+            'weight': self.weights,
+            'marginal_var': [marginal[a] for a in self.returns.columns],
+            'component_var': [component[a] for a in self.returns.columns]
+        }, index=self.returns.columns)
+
 
 # ============================================
 # TESTING
@@ -98,12 +98,55 @@ class WalkForwardOptimizer:
     Walk-Forward Analysis for robust strategy validation
     """
 
-    def __init__(self, backtest_engine):
+    def __init__(self, backtest_engine, n_jobs: int = 1,
+                 successive_halving: bool = False):
         """
         Args:
             backtest_engine: BacktestEngine instance
+            n_jobs: Worker processes for the per-fold grid search
+                    (1 = in-process, None/0 = all CPUs)
+            successive_halving: Prune the grid on shorter sub-windows
+                    first (parallel search only)
         """
         self.backtest_engine = backtest_engine
+        self.n_jobs = n_jobs
+        self.successive_halving = successive_halving
+        self.last_optimization_errors: List[Tuple[Dict, str]] = []
+
+    def _grid_optimizer(self, df: pd.DataFrame):
+        """Shared-memory process pool over the full frame (None when serial)"""
+        self.last_optimization_errors = []
+        if self.n_jobs == 1:
+            return None
+
+        from .parallel_optimizer import ParallelGridOptimizer
+        optimizer = ParallelGridOptimizer(df, self.backtest_engine, n_jobs=self.n_jobs)
+        optimizer.start()
+        return optimizer
+
+    def _prime_indicator_cache(self, df: pd.DataFrame, strategy_class: type):
+        """Register the full history so anchored training folds slice cached indicators"""
+        if getattr(strategy_class, 'use_indicator_cache', False) and 'close' in df.columns:
+            from .indicator_cache import get_indicator_cache
+            get_indicator_cache().register(df['close'])
+
+    def _optimize_window(self, optimizer, train_data: pd.DataFrame, train_end: int,
+                         strategy_class: type, param_grid: Dict[str, List],
+                         symbol: str, metric: str) -> Tuple[Optional[Dict], Any]:
+        """Grid search on df.iloc[:train_end], in the shared pool if available"""
+        if optimizer is None:
+            best = self.backtest_engine.optimize_parameters(
+                train_data, strategy_class, param_grid, symbol, metric
+            )
+            self.last_optimization_errors.extend(self.backtest_engine.last_optimization_errors)
+            return best
+
+        search = optimizer.optimize(
+            strategy_class, param_grid, symbol, metric,
+            end=train_end, successive_halving=self.successive_halving
+        )
+        self.last_optimization_errors.extend(search.errors)
+        return search.best_params, search.best_result
 
     def optimize(self, df: pd.DataFrame, strategy_class: type,
                 param_grid: Dict[str, List], symbol: str = "UNKNOWN",
@@ -125,54 +168,64 @@ class WalkForwardOptimizer:
             WFOResult with comprehensive analysis
         """
         # Split data into folds
-        folds = self._create_folds(df, num_folds)
+        bounds = self._fold_bounds(len(df), num_folds)
+        self._prime_indicator_cache(df, strategy_class)
+        optimizer = self._grid_optimizer(df)
 
         fold_results = []
         is_metrics = []  # In-sample metrics
         oos_metrics = []  # Out-of-sample metrics
         all_params = []
 
-        for i, (train_data, test_data) in enumerate(folds):
-            # Phase 1: Optimize on training data (in-sample)
-            best_params, is_result = self.backtest_engine.optimize_parameters(
-                train_data, strategy_class, param_grid, symbol, optimization_metric
-            )
-
-            if not best_params or not is_result:
-                continue
-
-            # Phase 2: Test on out-of-sample data with best params
-            strategy = strategy_class(**best_params)
-            oos_result = self.backtest_engine.run(test_data, strategy, symbol)
-
-            # Record results
-            fold_results.append({
-                'fold': i + 1,
-                'train_start': str(train_data.index[0]),
-                'train_end': str(train_data.index[-1]),
-                'test_start': str(test_data.index[0]),
-                'test_end': str(test_data.index[-1]),
-                'best_params': best_params,
-                'is_return': is_result.total_return_pct,
-                'is_sharpe': is_result.sharpe_ratio,
-                'oos_return': oos_result.total_return_pct,
-                'oos_sharpe': oos_result.sharpe_ratio,
-                'oos_win_rate': oos_result.win_rate,
-                'oos_trades': oos_result.total_trades
-            })
-
-            is_metrics.append({
-                'return': is_result.total_return_pct,
-                'sharpe': is_result.sharpe_ratio
-            })
-
-            oos_metrics.append({
-                'return': oos_result.total_return_pct,
-                'sharpe': oos_result.sharpe_ratio,
-                'win_rate': oos_result.win_rate
-            })
-
-            all_params.append(best_params)
+        try:
+            for i, (train_end, test_start, test_end) in enumerate(bounds):
+                train_data = df.iloc[:train_end].copy()
+                test_data = df.iloc[test_start:test_end].copy()
+
+                # Phase 1: Optimize on training data (in-sample)
+                best_params, is_result = self._optimize_window(
+                    optimizer, train_data, train_end, strategy_class, param_grid,
+                    symbol, optimization_metric
+                )
+
+                if not best_params or not is_result:
+                    continue
+
+                # Phase 2: Test on out-of-sample data with best params
+                strategy = strategy_class(**best_params)
+                oos_result = self.backtest_engine.run(test_data, strategy, symbol)
+
+                # Record results
+                fold_results.append({
+                    'fold': i + 1,
+                    'train_start': str(train_data.index[0]),
+                    'train_end': str(train_data.index[-1]),
+                    'test_start': str(test_data.index[0]),
+                    'test_end': str(test_data.index[-1]),
+                    'best_params': best_params,
+                    'is_return': is_result.total_return_pct,
+                    'is_sharpe': is_result.sharpe_ratio,
+                    'oos_return': oos_result.total_return_pct,
+                    'oos_sharpe': oos_result.sharpe_ratio,
+                    'oos_win_rate': oos_result.win_rate,
+                    'oos_trades': oos_result.total_trades
+                })
+
+                is_metrics.append({
+                    'return': is_result.total_return_pct,
+                    'sharpe': is_result.sharpe_ratio
+                })
+
+                oos_metrics.append({
+                    'return': oos_result.total_return_pct,
+                    'sharpe': oos_result.sharpe_ratio,
+                    'win_rate': oos_result.win_rate
+                })
+
+                all_params.append(best_params)
+        finally:
+            if optimizer is not None:
+                optimizer.close()
 
         if not fold_results:
             return WFOResult(
@@ -189,18 +242,16 @@ class WalkForwardOptimizer:
 
         return result
 
-    def _create_folds(self, df: pd.DataFrame, num_folds: int,
-                     train_pct: float = 0.7) -> List[Tuple[pd.DataFrame, pd.DataFrame]]:
+    def _fold_bounds(self, n: int, num_folds: int) -> List[Tuple[int, int, int]]:
         """
-        Create walk-forward folds with anchored training
+        Positional (train_end, test_start, test_end) for anchored folds
 
         Each fold:
         - Training: Growing window from start
         - Testing: Fixed window after training
         """
-        n = len(df)
         fold_size = n // num_folds
-        folds = []
+        bounds = []
 
         for i in range(num_folds):
             # Anchored walk-forward: training always starts from beginning
@@ -211,13 +262,16 @@ class WalkForwardOptimizer:
             if test_end <= test_start:
                 continue
 
-            train_data = df.iloc[:train_end].copy()
-            test_data = df.iloc[test_start:test_end].copy()
+            if train_end > 50 and (test_end - test_start) > 10:  # Minimum data requirements
+                bounds.append((train_end, test_start, test_end))
 
-            if len(train_data) > 50 and len(test_data) > 10:  # Minimum data requirements
-                folds.append((train_data, test_data))
+        return bounds
 
-        return folds
+    def _create_folds(self, df: pd.DataFrame, num_folds: int,
+                     train_pct: float = 0.7) -> List[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """Create walk-forward folds with anchored training"""
+        return [(df.iloc[:train_end].copy(), df.iloc[test_start:test_end].copy())
+                for train_end, test_start, test_end in self._fold_bounds(len(df), num_folds)]
 
     def _calculate_wfo_metrics(self, fold_results: List[Dict],
                               is_metrics: List[Dict], oos_metrics: List[Dict],
@@ -325,39 +379,46 @@ class WalkForwardOptimizer:
 
         # Generate multiple random train/test splits
         path_results = []
-
-        for path in range(num_paths):
-            # Random split point
-            split = np.random.randint(int(n * 0.3), int(n * 0.7))
-
-            # Create purged train/test sets
-            train_end = split - embargo_size
-            test_start = split + embargo_size
-
-            if train_end < 50 or (n - test_start) < 20:
-                continue
-
-            train_data = df.iloc[:train_end].copy()
-            test_data = df.iloc[test_start:].copy()
-
-            # Optimize on training
-            best_params, is_result = self.backtest_engine.optimize_parameters(
-                train_data, strategy_class, param_grid, symbol
-            )
-
-            if not best_params:
-                continue
-
-            # Test on OOS
-            strategy = strategy_class(**best_params)
-            oos_result = self.backtest_engine.run(test_data, strategy, symbol)
-
-            path_results.append({
-                'is_sharpe': is_result.sharpe_ratio if is_result else 0,
-                'oos_sharpe': oos_result.sharpe_ratio,
-                'is_return': is_result.total_return_pct if is_result else 0,
-                'oos_return': oos_result.total_return_pct
-            })
+        optimizer = self._grid_optimizer(df)
+        self._prime_indicator_cache(df, strategy_class)
+
+        try:
+            for path in range(num_paths):
+                # Random split point
+                split = np.random.randint(int(n * 0.3), int(n * 0.7))
+
+                # Create purged train/test sets
+                train_end = split - embargo_size
+                test_start = split + embargo_size
+
+                if train_end < 50 or (n - test_start) < 20:
+                    continue
+
+                train_data = df.iloc[:train_end].copy()
+                test_data = df.iloc[test_start:].copy()
+
+                # Optimize on training
+                best_params, is_result = self._optimize_window(
+                    optimizer, train_data, train_end, strategy_class, param_grid,
+                    symbol, "sharpe_ratio"
+                )
+
+                if not best_params:
+                    continue
+
+                # Test on OOS
+                strategy = strategy_class(**best_params)
+                oos_result = self.backtest_engine.run(test_data, strategy, symbol)
+
+                path_results.append({
+                    'is_sharpe': is_result.sharpe_ratio if is_result else 0,
+                    'oos_sharpe': oos_result.sharpe_ratio,
+                    'is_return': is_result.total_return_pct if is_result else 0,
+                    'oos_return': oos_result.total_return_pct
+                })
+        finally:
+            if optimizer is not None:
+                optimizer.close()
 
         if not path_results:
             return WFOResult(strategy_name=strategy_class.__name__, symbol=symbol, num_folds=num_paths)
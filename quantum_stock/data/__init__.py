@@ -10,6 +10,7 @@ from .realtime_provider import (
     TickData,
     QuoteData
 )
+from .market_store import MarketDataStore, get_market_store, load_history
 
 __all__ = [
     'VCIDataProvider',
@@ -20,5 +21,8 @@ __all__ = [
     'get_current_price',
     'get_data_manager',
     'TickData',
-    'QuoteData'
+    'QuoteData',
+    'MarketDataStore',
+    'get_market_store',
+    'load_history'
 ]
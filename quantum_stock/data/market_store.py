@@ -0,0 +1,504 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar Market Data Store
+==========================
+All symbols packed into one memory-mapped file per field plus an offset index.
+
+Layout (default: data/historical/_store/):
+- date.bin    int64 (ns since epoch)
+- open.bin, high.bin, low.bin, close.bin, volume.bin   float64
+- <column>.bin  float64 for extra numeric source columns (e.g. market_cap)
+- index.json  {symbol: {offset, length, capacity, source_mtime, columns}}
+
+Each symbol owns a contiguous segment [offset, offset + capacity) with
+spare rows, so appending the new daily bar writes in place. A symbol that
+outgrows its segment is moved to the end of the files; history of the
+other symbols is never rewritten. Reads are zero-copy slices of the
+mapped files, so every process shares the same pages from the OS cache;
+they are read-only, so copy a frame before modifying it in place.
+
+Extra numeric columns are packed too and returned only for the symbols
+whose source file has them; non-numeric columns are not stored. Sources
+are per-symbol parquet files by default (CSV with source_format='csv').
+
+Writes (build / update / put / append_bar) are expected from a single
+updater process (`python -m quantum_stock.data.market_store` or the
+autonomous orchestrator); readers pick up changes when index.json changes.
+"""
+
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Optional, Any, List
+
+logger = logging.getLogger(__name__)
+
+FIELDS = {
+    'date': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+}
+
+INDEX_FILE = "index.json"
+STORE_DIR = "_store"
+
+# Readers for per-symbol source files (<symbol>.<format>)
+SOURCE_READERS = {
+    'parquet': pd.read_parquet,
+    'csv': pd.read_csv,
+}
+
+
+class MarketDataStore:
+    """
+    Memory-mapped columnar OHLCV store
+
+    Usage:
+        store = MarketDataStore("data/historical")
+        store.build()                             # pack all *.parquet
+        store.update()                            # repack new / changed files
+        arrays = store.get_arrays("FPT", start="2024-01-01")
+        df = store.get_frame("FPT", tail=180)
+        store.append_bar("FPT", {"date": ..., "close": ...})
+    """
+
+    def __init__(self, data_dir: str = "data/historical", store_dir: str = None,
+                 slack: int = 64, source_format: str = 'parquet'):
+        """
+        Args:
+            data_dir: Directory with per-symbol source files
+            store_dir: Store location (default: <data_dir>/_store)
+            slack: Spare rows reserved per symbol for in-place appends
+            source_format: Source file format, one of SOURCE_READERS
+        """
+        if source_format not in SOURCE_READERS:
+            raise ValueError(f"Unknown source format: {source_format}")
+        self.data_dir = Path(data_dir)
+        self.store_dir = Path(store_dir) if store_dir else self.data_dir / STORE_DIR
+        self.slack = slack
+        self.source_format = source_format
+
+        self._lock = Lock()
+        self._fields: Dict[str, type] = dict(FIELDS)
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._rows = 0
+        self._maps: Dict[str, np.memmap] = {}
+        self._index_mtime: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _field_path(self, field: str) -> Path:
+        return self.store_dir / f"{field}.bin"
+
+    def _source_path(self, symbol: str) -> Path:
+        return self.data_dir / f"{symbol}.{self.source_format}"
+
+    def _source_files(self) -> List[Path]:
+        return sorted(self.data_dir.glob(f"*.{self.source_format}"))
+
+    def _read_source(self, path: Path) -> pd.DataFrame:
+        return SOURCE_READERS[self.source_format](path)
+
+    def _refresh(self):
+        """(Re)open maps if index.json changed since last read"""
+        index_path = self.store_dir / INDEX_FILE
+        try:
+            mtime = index_path.stat().st_mtime
+        except OSError:
+            self._index, self._rows, self._maps = {}, 0, {}
+            self._fields = dict(FIELDS)
+            self._index_mtime = None
+            return
+
+        if mtime == self._index_mtime:
+            return
+
+        with open(index_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        self._index = meta.get('symbols', {})
+        self._rows = meta.get('rows', 0)
+        self._fields = {field: FIELDS.get(field, np.float64)
+                        for field in meta.get('fields', list(FIELDS))}
+        self._maps = {}
+        if self._rows > 0:
+            for field, dtype in self._fields.items():
+                self._maps[field] = np.memmap(
+                    self._field_path(field), dtype=dtype, mode='r', shape=(self._rows,)
+                )
+        self._index_mtime = mtime
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return sorted(self._index)
+
+    def has(self, symbol: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return symbol in self._index
+
+    def is_stale(self, symbol: str) -> bool:
+        """True if the symbol's source file changed after it was packed"""
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(symbol)
+        if entry is None:
+            return True
+
+        source = self._source_path(symbol)
+        try:
+            return source.stat().st_mtime > entry.get('source_mtime', 0)
+        except OSError:
+            return False
+
+    def get_arrays(self, symbol: str, start=None, end=None,
+                   tail: int = None) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Zero-copy views of one symbol's fields
+
+        Args:
+            symbol: Ticker
+            start, end: Optional inclusive date bounds (anything pd.Timestamp accepts)
+            tail: Keep only the last N bars (applied after the date range)
+
+        Returns:
+            {field: read-only array view} (OHLCV plus the symbol's extra
+            columns) or None if symbol not stored
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(symbol)
+            if entry is None:
+                return None
+            lo = entry['offset']
+            hi = lo + entry['length']
+            fields = list(FIELDS) + entry.get('columns', [])
+            maps = {field: self._maps[field] for field in fields}
+
+        dates = maps['date'][lo:hi]
+        if start is not None:
+            lo += int(np.searchsorted(dates, pd.Timestamp(start).value, side='left'))
+        if end is not None:
+            hi = entry['offset'] + int(np.searchsorted(dates, pd.Timestamp(end).value, side='right'))
+        if tail is not None and hi - lo > tail:
+            lo = hi - tail
+        lo = min(lo, hi)
+
+        return {field: m[lo:hi] for field, m in maps.items()}
+
+    def get_frame(self, symbol: str, start=None, end=None,
+                  tail: int = None) -> Optional[pd.DataFrame]:
+        """
+        One symbol as a DataFrame sorted by date: date, OHLCV and the
+        symbol's extra numeric columns, backed by read-only views
+        """
+        arrays = self.get_arrays(symbol, start, end, tail)
+        if arrays is None:
+            return None
+
+        data = {field: values for field, values in arrays.items() if field != 'date'}
+        df = pd.DataFrame(data, copy=False)
+        df.insert(0, 'date', pd.to_datetime(arrays['date']))
+        return df
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _write_index(self):
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        index_path = self.store_dir / INDEX_FILE
+        tmp_path = index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'rows': self._rows, 'fields': list(self._fields), 'symbols': self._index}, f)
+        os.replace(tmp_path, index_path)
+        self._index_mtime = None
+
+    def _open_writable(self, rows: int) -> Dict[str, np.memmap]:
+        """Writable maps, growing the field files to `rows` if needed"""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        maps = {}
+        for field, dtype in self._fields.items():
+            path = self._field_path(field)
+            size = rows * np.dtype(dtype).itemsize
+            with open(path, 'ab') as f:
+                if f.tell() < size:
+                    f.truncate(size)
+            maps[field] = np.memmap(path, dtype=dtype, mode='r+', shape=(rows,))
+        return maps
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Sorted field arrays (OHLCV + extra numeric columns) from a raw frame"""
+        df = df.rename(columns={c: c.lower() for c in df.columns})
+        if 'date' not in df.columns and 'time' in df.columns:
+            df = df.rename(columns={'time': 'date'})
+
+        dates = pd.to_datetime(df['date'])
+        if getattr(dates.dt, 'tz', None) is not None:
+            dates = dates.dt.tz_localize(None)
+        order = np.argsort(dates.values.astype('datetime64[ns]').view(np.int64), kind='stable')
+
+        arrays = {'date': dates.values.astype('datetime64[ns]').view(np.int64)[order]}
+        for field in FIELDS:
+            if field == 'date':
+                continue
+            if field in df.columns:
+                arrays[field] = df[field].to_numpy(dtype=np.float64)[order]
+            else:
+                arrays[field] = np.full(len(df), np.nan)
+        for column in df.columns:
+            if (column not in arrays and isinstance(column, str) and column != 'index'
+                    and pd.api.types.is_numeric_dtype(df[column])):
+                arrays[column] = df[column].to_numpy(dtype=np.float64)[order]
+        return arrays
+
+    @staticmethod
+    def _entry(offset: int, length: int, capacity: int, source_mtime: float,
+               arrays: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        return {
+            'offset': offset,
+            'length': length,
+            'capacity': capacity,
+            'source_mtime': source_mtime,
+            'columns': [field for field in arrays if field not in FIELDS]
+        }
+
+    def build(self, symbols: List[str] = None) -> int:
+        """
+        Pack source files into the store (replaces any existing store)
+
+        Returns:
+            Number of symbols packed
+        """
+        files = self._source_files()
+        if symbols is not None:
+            wanted = set(symbols)
+            files = [f for f in files if f.stem in wanted]
+
+        packed = []
+        for path in files:
+            try:
+                arrays = self._normalize(self._read_source(path))
+            except Exception as e:
+                logger.warning(f"Skipping {path.name}: {e}")
+                continue
+            packed.append((path.stem, path.stat().st_mtime, arrays))
+
+        index = {}
+        fields = dict(FIELDS)
+        offset = 0
+        for symbol, mtime, arrays in packed:
+            length = len(arrays['date'])
+            index[symbol] = self._entry(offset, length, length + self.slack, mtime, arrays)
+            fields.update((field, np.float64) for field in arrays if field not in fields)
+            offset += length + self.slack
+
+        with self._lock:
+            for path in self.store_dir.glob("*.bin"):
+                path.unlink()
+            self._maps = {}
+            self._fields = fields
+
+            maps = self._open_writable(max(offset, 1))
+            for symbol, _, arrays in packed:
+                lo = index[symbol]['offset']
+                for field, values in arrays.items():
+                    maps[field][lo:lo + len(values)] = values
+            for m in maps.values():
+                m.flush()
+
+            self._index = index
+            self._rows = max(offset, 1)
+            self._write_index()
+
+        logger.info(f"Market store built: {len(index)} symbols, {offset} rows")
+        return len(index)
+
+    def update(self) -> int:
+        """
+        Pack source files that are new or changed since they were packed
+
+        Builds the store on first use; afterwards only the changed symbols
+        are rewritten (in place while their segment has room). Run it after
+        the daily data download.
+
+        Returns:
+            Number of symbols packed
+        """
+        with self._lock:
+            self._refresh()
+            empty = not self._index
+        if empty:
+            return self.build()
+
+        updated = 0
+        for path in self._source_files():
+            symbol = path.stem
+            if self.has(symbol) and not self.is_stale(symbol):
+                continue
+            try:
+                self.put(symbol, self._read_source(path), source_mtime=path.stat().st_mtime)
+                updated += 1
+            except Exception as e:
+                logger.warning(f"Skipping {path.name}: {e}")
+
+        if updated:
+            logger.info(f"Market store updated: {updated} symbols")
+        return updated
+
+    def put(self, symbol: str, df: pd.DataFrame, source_mtime: float = None):
+        """Store (or replace) one symbol's full history"""
+        arrays = self._normalize(df)
+        length = len(arrays['date'])
+
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(symbol)
+
+            if entry is None or entry['capacity'] < length:
+                # New segment at the end of the files
+                offset = self._rows
+                capacity = length + self.slack
+                rows = offset + capacity
+            else:
+                offset = entry['offset']
+                capacity = entry['capacity']
+                rows = self._rows
+
+            self._fields.update((field, np.float64) for field in arrays if field not in self._fields)
+            maps = self._open_writable(rows)
+            for field, values in arrays.items():
+                maps[field][offset:offset + length] = values
+            for m in maps.values():
+                m.flush()
+
+            if source_mtime is None:
+                source_mtime = (entry or {}).get('source_mtime', 0)
+            self._index[symbol] = self._entry(offset, length, capacity, source_mtime, arrays)
+            self._rows = rows
+            self._write_index()
+
+    def append_bar(self, symbol: str, bar: Dict[str, Any]):
+        """
+        Append the latest bar without rewriting history
+
+        A bar with the same date as the last stored bar replaces it
+        (intraday update of today's candle).
+        """
+        date_value = pd.Timestamp(bar['date']).value
+
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(symbol)
+            if entry is None:
+                raise KeyError(f"{symbol} not in market store")
+
+            offset, length, capacity = entry['offset'], entry['length'], entry['capacity']
+            last_date = int(self._maps['date'][offset + length - 1]) if length else None
+
+            if last_date is not None and date_value < last_date:
+                raise ValueError(f"{symbol}: bar date is before last stored bar")
+
+            if last_date is not None and date_value == last_date:
+                pos = offset + length - 1
+                maps = self._open_writable(self._rows)
+            elif length < capacity:
+                pos = offset + length
+                length += 1
+                maps = self._open_writable(self._rows)
+            else:
+                # Segment full: move this symbol to the end with fresh slack
+                history = {field: np.array(m[offset:offset + length])
+                           for field, m in self._maps.items()}
+                offset = self._rows
+                capacity = length + 1 + self.slack
+                maps = self._open_writable(offset + capacity)
+                for field, values in history.items():
+                    maps[field][offset:offset + length] = values
+                pos = offset + length
+                length += 1
+                self._rows = offset + capacity
+
+            replacing = int(maps['date'][pos]) == date_value
+            maps['date'][pos] = date_value
+            for field in list(FIELDS) + entry.get('columns', []):
+                if field == 'date':
+                    continue
+                if field in bar:
+                    maps[field][pos] = float(bar[field])
+                elif not replacing:
+                    maps[field][pos] = np.nan
+            for m in maps.values():
+                m.flush()
+
+            entry.update({'offset': offset, 'length': length, 'capacity': capacity})
+            self._write_index()
+
+
+# Shared stores per data directory
+_stores: Dict[str, MarketDataStore] = {}
+
+
+def get_market_store(data_dir: str = "data/historical") -> MarketDataStore:
+    """Get the shared MarketDataStore for a data directory"""
+    key = str(Path(data_dir).resolve())
+    if key not in _stores:
+        _stores[key] = MarketDataStore(data_dir)
+    return _stores[key]
+
+
+def load_history(symbol: str, data_dir: str = "data/historical",
+                 days: int = None) -> Optional[pd.DataFrame]:
+    """
+    Load one symbol's OHLCV history sorted by date
+
+    Served from the memory-mapped store when the symbol is packed and up
+    to date, otherwise read from its parquet file. Store frames carry the
+    numeric columns only and are read-only views: copy before modifying
+    values in place (adding or replacing columns is fine).
+
+    Args:
+        symbol: Ticker
+        data_dir: Directory with per-symbol parquet files
+        days: Keep only the last N bars
+
+    Returns:
+        DataFrame with date/open/high/low/close/volume (+ extra columns),
+        or None if unavailable
+    """
+    store = get_market_store(data_dir)
+    if store.has(symbol) and not store.is_stale(symbol):
+        return store.get_frame(symbol, tail=days)
+
+    path = Path(data_dir) / f"{symbol}.parquet"
+    if not path.exists():
+        return None
+
+    df = pd.read_parquet(path)
+    if 'date' in df.columns and not df['date'].is_monotonic_increasing:
+        df = df.sort_values('date')
+    df = df.reset_index(drop=True)
+
+    if days is not None and len(df) > days:
+        df = df.tail(days).reset_index(drop=True)
+    return df
+
+
+if __name__ == "__main__":
+    # Daily update: python -m quantum_stock.data.market_store [data_dir]
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "data/historical"
+    count = MarketDataStore(data_dir).update()
+    print(f"Market store: {count} symbols packed into {Path(data_dir) / STORE_DIR}")
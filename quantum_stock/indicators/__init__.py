@@ -9,6 +9,7 @@ from .volatility import VolatilityIndicators
 from .volume import VolumeIndicators
 from .pattern import PatternRecognition
 from .custom import CustomIndicators
+from .panel import PanelIndicatorEngine, rolling_mean
 
 # Advanced Charts
 try:
@@ -23,7 +24,8 @@ except ImportError:
 try:
     from .footprint import (
         FootprintCalculator, MarketProfileCalculator,
-        FootprintBar, TPOProfile, plot_footprint, plot_market_profile
+        FootprintBar, TPOProfile, FootprintGrid, TPOGrid,
+        plot_footprint, plot_market_profile
     )
 except ImportError:
     pass
@@ -46,6 +48,8 @@ __all__ = [
     'VolumeIndicators',
     'PatternRecognition',
     'CustomIndicators',
+    'PanelIndicatorEngine',
+    'rolling_mean',
     # Advanced Charts
     'HeikinAshiCalculator',
     'RenkoCalculator',
@@ -55,6 +59,8 @@ __all__ = [
     # Footprint
     'FootprintCalculator',
     'MarketProfileCalculator',
+    'FootprintGrid',
+    'TPOGrid',
     # Additional
     'anchored_vwap',
     'vwap_bands',
@@ -130,7 +130,7 @@ def vwap_deviation(df: pd.DataFrame) -> pd.Series:
 # ============================================
 
 def marginal_var(returns: pd.DataFrame, weights: Dict[str, float],
-                 confidence: float = 0.95) -> Dict[str, float]:
+                 confidence: float = 0.95, engine=None) -> Dict[str, float]:
     """
     Marginal VaR - risk contribution per 1% increase in weight
     
@@ -138,11 +138,18 @@ def marginal_var(returns: pd.DataFrame, weights: Dict[str, float],
         returns: DataFrame of asset returns
         weights: Current portfolio weights
         confidence: VaR confidence level
+        engine: core.covariance_engine.CovarianceEngine kept up to date by
+                the caller; its cached covariance is used instead of
+                recomputing it from `returns`
     
     Returns:
         Dict of marginal VaR by asset
     """
     assets = list(weights.keys())
+    if engine is not None:
+        marginal = engine.marginal_var(confidence, weights)
+        return {asset: marginal[asset] for asset in assets}
+
     w = np.array([weights[a] for a in assets])
     
     # Covariance matrix
@@ -162,7 +169,7 @@ def marginal_var(returns: pd.DataFrame, weights: Dict[str, float],
 
 
 def component_var(returns: pd.DataFrame, weights: Dict[str, float],
-                  confidence: float = 0.95) -> Dict[str, float]:
+                  confidence: float = 0.95, engine=None) -> Dict[str, float]:
     """
     Component VaR - absolute risk contribution by asset
     
@@ -170,7 +177,7 @@ def component_var(returns: pd.DataFrame, weights: Dict[str, float],
     
     Sum of component VaRs = Total Portfolio VaR
     """
-    marginal = marginal_var(returns, weights, confidence)
+    marginal = marginal_var(returns, weights, confidence, engine)
     
     return {
         asset: weights[asset] * mvar
@@ -180,7 +187,7 @@ def component_var(returns: pd.DataFrame, weights: Dict[str, float],
 
 def incremental_var(returns: pd.DataFrame, weights: Dict[str, float],
                     new_asset: str, new_weight: float,
-                    confidence: float = 0.95) -> float:
+                    confidence: float = 0.95, engine=None) -> float:
     """
     Incremental VaR - change in VaR from adding a new position
     
@@ -190,10 +197,17 @@ def incremental_var(returns: pd.DataFrame, weights: Dict[str, float],
         new_asset: Asset to add
         new_weight: Weight of new asset
         confidence: VaR confidence level
+        engine: CovarianceEngine covering new_asset; gives the parametric
+                change from its cached exposure in O(1) instead of
+                re-aggregating the return history
     
     Returns:
-        Change in portfolio VaR
+        Change in portfolio VaR (VaR as a return quantile, so negative =
+        more risk)
     """
+    if engine is not None:
+        return -engine.incremental_var(new_asset, new_weight, confidence, weights)
+
     if new_asset not in returns.columns:
         raise ValueError(f"Asset {new_asset} not in returns data")
     
@@ -10,7 +10,7 @@ P1 Implementation - Advanced order flow visualization
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 from dataclasses import dataclass, field
 from datetime import datetime
 import plotly.graph_objects as go
@@ -130,6 +130,123 @@ class TPOProfile:
         return (min(prices), max(prices)) if prices else (0, 0)
 
 
+@dataclass
+class FootprintGrid:
+    """
+    Footprints of many bars as (bars x levels) arrays
+    
+    Bars without a range (High == Low) are dropped. When several levels of
+    a bar round to the same price only the last is kept, as in the per-bar
+    dict; valid marks the kept levels and the others hold zero volume.
+    FootprintBar views are built on demand (bar(), to_bars()).
+    """
+    timestamps: List[datetime]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    price: np.ndarray      # (bars, levels)
+    bid: np.ndarray        # (bars, levels) int64
+    ask: np.ndarray
+    delta: np.ndarray
+    trades: np.ndarray
+    valid: np.ndarray      # (bars, levels) bool
+    poc: np.ndarray        # (bars,)
+    vah: np.ndarray
+    val: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    @property
+    def total_volume(self) -> np.ndarray:
+        return self.bid + self.ask
+    
+    @property
+    def total_delta(self) -> np.ndarray:
+        return self.delta.sum(axis=1)
+    
+    def bar(self, i: int) -> FootprintBar:
+        """FootprintBar view of bar i"""
+        levels = {}
+        for j in np.flatnonzero(self.valid[i]):
+            price = self.price[i, j].item()
+            levels[price] = FootprintLevel(
+                price=price,
+                bid_volume=int(self.bid[i, j]),
+                ask_volume=int(self.ask[i, j]),
+                delta=int(self.delta[i, j]),
+                trades=int(self.trades[i, j])
+            )
+        return FootprintBar(
+            timestamp=self.timestamps[i],
+            open=self.open[i],
+            high=self.high[i],
+            low=self.low[i],
+            close=self.close[i],
+            levels=levels
+        )
+    
+    def to_bars(self) -> List[FootprintBar]:
+        return [self.bar(i) for i in range(len(self))]
+
+
+@dataclass
+class TPOGrid:
+    """
+    Market Profile as arrays
+    
+    touched[s, p, l] is True when letter l of session s traded at prices[p].
+    Prices are in the order they were first touched, which is the key order
+    of TPOProfile.levels and decides ties for POC and value area.
+    """
+    date: datetime
+    prices: np.ndarray     # (levels,)
+    touched: np.ndarray    # (sessions, levels, letters) bool
+    letters: str
+    poc: float = 0
+    val: float = 0
+    vah: float = 0
+    
+    @property
+    def counts(self) -> np.ndarray:
+        """TPOs per price level"""
+        return self.touched.sum(axis=(0, 2))
+    
+    @property
+    def value_area(self) -> Tuple[float, float]:
+        return (self.val, self.vah)
+    
+    def to_profile(self) -> TPOProfile:
+        """TPOProfile view (letters per price, session by session)"""
+        prices = self.prices.tolist()
+        levels: Dict[float, List[str]] = {price: [] for price in prices}
+        for p, s, l in zip(*np.nonzero(self.touched.transpose(1, 0, 2))):
+            levels[prices[p]].append(self.letters[l])
+        return TPOProfile(date=self.date, levels=levels)
+
+
+def _poc_value_area(prices: np.ndarray, volumes: np.ndarray,
+                    pct: float = 0.70) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    POC, VAL and VAH for each row of (rows x levels) arrays
+    
+    Ties go to the earlier level, as in FootprintBar and TPOProfile.
+    """
+    poc = np.take_along_axis(prices, volumes.argmax(axis=1)[:, None], axis=1)[:, 0]
+    
+    # Largest levels first until pct of the volume is covered
+    order = np.argsort(-volumes, axis=1, kind='stable')
+    accumulated = np.cumsum(np.take_along_axis(volumes, order, axis=1), axis=1)
+    last = (accumulated >= volumes.sum(axis=1, keepdims=True) * pct).argmax(axis=1)
+    inside = np.arange(volumes.shape[1]) <= last[:, None]
+    
+    sorted_prices = np.take_along_axis(prices, order, axis=1)
+    val = np.where(inside, sorted_prices, np.inf).min(axis=1)
+    vah = np.where(inside, sorted_prices, -np.inf).max(axis=1)
+    return poc, val, vah
+
+
 # ============================================
 # FOOTPRINT CALCULATOR
 # ============================================
@@ -153,66 +270,76 @@ class FootprintCalculator:
             df: OHLCV DataFrame
             n_levels: Number of price levels per bar
         """
-        footprints = []
-        
-        for idx, row in df.iterrows():
-            # Create price levels
-            price_range = row['High'] - row['Low']
-            if price_range == 0:
-                continue
-            
-            level_size = price_range / n_levels
-            levels = {}
-            
-            # Estimate volume distribution (simplified)
-            # In reality, this requires tick data
-            for i in range(n_levels):
-                price = row['Low'] + i * level_size + level_size / 2
-                price = round(price / self.tick_size) * self.tick_size
-                
-                # Estimate volume at this level
-                # Distribute based on proximity to OHLC
-                weight = self._estimate_weight(price, row)
-                level_volume = int(row['Volume'] * weight / n_levels)
-                
-                # Estimate bid/ask split
-                if row['Close'] >= row['Open']:  # Bullish bar
-                    ask_ratio = 0.6
-                else:  # Bearish bar
-                    ask_ratio = 0.4
-                
-                # Adjust for price position
-                if price > (row['Open'] + row['Close']) / 2:
-                    ask_ratio += 0.1
-                else:
-                    ask_ratio -= 0.1
-                
-                ask_vol = int(level_volume * ask_ratio)
-                bid_vol = level_volume - ask_vol
-                
-                levels[price] = FootprintLevel(
-                    price=price,
-                    bid_volume=bid_vol,
-                    ask_volume=ask_vol,
-                    delta=ask_vol - bid_vol,
-                    trades=max(1, level_volume // 100)
-                )
-            
-            footprints.append(FootprintBar(
-                timestamp=idx if isinstance(idx, datetime) else datetime.now(),
-                open=row['Open'],
-                high=row['High'],
-                low=row['Low'],
-                close=row['Close'],
-                levels=levels
-            ))
-        
-        return footprints
-    
-    def _estimate_weight(self, price: float, row: pd.Series) -> float:
-        """Estimate volume weight at price level"""
-        mid = (row['High'] + row['Low']) / 2
-        distance = abs(price - mid) / (row['High'] - row['Low']) if row['High'] != row['Low'] else 0
+        return self.calculate_grid(df, n_levels).to_bars()
+    
+    def calculate_grid(self, df: pd.DataFrame, n_levels: int = 10) -> FootprintGrid:
+        """
+        Calculate footprints of all bars at once
+        
+        Args:
+            df: OHLCV DataFrame
+            n_levels: Number of price levels per bar
+        """
+        high = df['High'].to_numpy(dtype=float)
+        low = df['Low'].to_numpy(dtype=float)
+        price_range = high - low
+        keep = price_range != 0
+        
+        open_ = df['Open'].to_numpy(dtype=float)[keep]
+        close = df['Close'].to_numpy(dtype=float)[keep]
+        volume = df['Volume'].to_numpy(dtype=float)[keep]
+        high, low, price_range = high[keep], low[keep], price_range[keep]
+        
+        # Create price levels
+        level_size = (price_range / n_levels)[:, None]
+        price = low[:, None] + np.arange(n_levels) * level_size + level_size / 2
+        price = np.round(price / self.tick_size) * self.tick_size
+        
+        # Estimate volume distribution (simplified)
+        # In reality, this requires tick data
+        weight = self._estimate_weight(price, high[:, None], low[:, None])
+        level_volume = (volume[:, None] * weight / n_levels).astype(np.int64)
+        
+        # Estimate bid/ask split: bullish bars lean to the ask,
+        # adjusted for price position
+        ask_ratio = np.where(close >= open_, 0.6, 0.4)[:, None] + \
+            np.where(price > ((open_ + close) / 2)[:, None], 0.1, -0.1)
+        
+        # Levels rounded onto the next level's price are overwritten by it
+        valid = np.ones(price.shape, dtype=bool)
+        valid[:, :-1] = price[:, :-1] != price[:, 1:]
+        level_volume[~valid] = 0
+        
+        ask = (level_volume * ask_ratio).astype(np.int64)
+        bid = level_volume - ask
+        trades = np.where(valid, np.maximum(1, level_volume // 100), 0)
+        
+        poc, val, vah = _poc_value_area(price, bid + ask)
+        
+        index = df.index[keep]
+        return FootprintGrid(
+            timestamps=[idx if isinstance(idx, datetime) else datetime.now() for idx in index],
+            open=open_,
+            high=high,
+            low=low,
+            close=close,
+            price=price,
+            bid=bid,
+            ask=ask,
+            delta=ask - bid,
+            trades=trades,
+            valid=valid,
+            poc=poc,
+            vah=vah,
+            val=val
+        )
+    
+    def _estimate_weight(self, price, high, low):
+        """Estimate volume weight at price level (scalars or arrays)"""
+        price_range = high - low
+        mid = (high + low) / 2
+        distance = np.abs(price - mid) / np.where(price_range != 0, price_range, 1)
+        distance = np.where(price_range != 0, distance, 0)
         # Normal distribution-like weight
         return np.exp(-2 * distance ** 2)
 
@@ -241,61 +368,95 @@ class MarketProfileCalculator:
             df: OHLCV DataFrame (intraday data recommended)
             periods_per_day: Number of 30-min periods in trading day
         """
-        levels: Dict[float, List[str]] = {}
-        
-        # Group into TPO periods
-        rows_per_period = max(1, len(df) // periods_per_day)
-        
-        for i, (idx, row) in enumerate(df.iterrows()):
-            period_idx = min(i // rows_per_period, len(self.TPO_LETTERS) - 1)
-            letter = self.TPO_LETTERS[period_idx]
-            
-            # Add TPO at each price level touched
-            high = round(row['High'] / self.tick_size) * self.tick_size
-            low = round(row['Low'] / self.tick_size) * self.tick_size
-            
-            price = low
-            while price <= high:
-                if price not in levels:
-                    levels[price] = []
-                if letter not in levels[price]:
-                    levels[price].append(letter)
-                price += self.tick_size
-        
-        return TPOProfile(
-            date=df.index[0] if len(df) > 0 else datetime.now(),
-            levels=levels
-        )
+        return self.calculate_daily_grid(df, periods_per_day).to_profile()
     
     def calculate_composite(self, df: pd.DataFrame, lookback_days: int = 20) -> TPOProfile:
         """Calculate composite profile over multiple days"""
-        levels: Dict[float, List[str]] = {}
-        
-        # Process each day
-        if not df.empty:
-            for date, group in df.groupby(df.index.date):
-                daily_profile = self.calculate_daily(group)
-                
-                for price, letters in daily_profile.levels.items():
-                    if price not in levels:
-                        levels[price] = []
-                    levels[price].extend(letters)
-        
-        return TPOProfile(
-            date=datetime.now(),
-            levels=levels
+        return self.calculate_composite_grid(df, lookback_days).to_profile()
+    
+    def calculate_daily_grid(self, df: pd.DataFrame, periods_per_day: int = 13) -> TPOGrid:
+        """Daily Market Profile as a TPOGrid"""
+        ticks, touched = self._session_levels(df, periods_per_day)
+        return self._grid(
+            df.index[0] if len(df) > 0 else datetime.now(),
+            ticks, touched[None]
         )
+    
+    def calculate_composite_grid(self, df: pd.DataFrame, lookback_days: int = 20) -> TPOGrid:
+        """Composite profile over multiple days as a TPOGrid"""
+        n_letters = len(self.TPO_LETTERS)
+        sessions = [self._session_levels(group) for _, group in df.groupby(df.index.date)] \
+            if not df.empty else []
+        
+        if not sessions:
+            return self._grid(datetime.now(), np.zeros(0, dtype=np.int64),
+                              np.zeros((0, 0, n_letters), dtype=bool))
+        
+        # Levels in the order they were first touched across sessions
+        all_ticks = np.concatenate([ticks for ticks, _ in sessions])
+        unique, first = np.unique(all_ticks, return_index=True)
+        rank = np.empty(len(unique), dtype=np.int64)
+        rank[np.argsort(first, kind='stable')] = np.arange(len(unique))
+        
+        touched = np.zeros((len(sessions), len(unique), n_letters), dtype=bool)
+        for s, (ticks, session_touched) in enumerate(sessions):
+            touched[s, rank[np.searchsorted(unique, ticks)]] = session_touched
+        
+        return self._grid(datetime.now(), unique[np.argsort(first, kind='stable')], touched)
+    
+    def _session_levels(self, df: pd.DataFrame,
+                        periods_per_day: int = 13) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tick levels touched in one session
+        
+        Returns:
+            (tick indices in first-touch order, (levels x letters) touched)
+        """
+        n_letters = len(self.TPO_LETTERS)
+        
+        # Group into TPO periods
+        rows_per_period = max(1, len(df) // periods_per_day)
+        letter = np.minimum(np.arange(len(df)) // rows_per_period, n_letters - 1)
+        
+        # Tick range touched by each row
+        high = np.round(df['High'].to_numpy(dtype=float) / self.tick_size)
+        low = np.round(df['Low'].to_numpy(dtype=float) / self.tick_size)
+        rows = np.isfinite(high) & np.isfinite(low) & (low <= high)
+        if not rows.any():
+            return np.zeros(0, dtype=np.int64), np.zeros((0, n_letters), dtype=bool)
+        high, low, letter = high[rows].astype(np.int64), low[rows].astype(np.int64), letter[rows]
+        
+        ticks = np.arange(low.min(), high.max() + 1)
+        cover = (low[:, None] <= ticks) & (ticks <= high[:, None])   # rows x levels
+        
+        # Rows add their levels low to high
+        first_row = np.where(cover.any(axis=0), cover.argmax(axis=0), len(low))
+        order = np.lexsort((ticks, first_row))[:np.count_nonzero(first_row < len(low))]
+        
+        letters = np.zeros((len(low), n_letters), dtype=np.int64)
+        letters[np.arange(len(low)), letter] = 1
+        touched = (cover.T.astype(np.int64) @ letters) > 0
+        
+        return ticks[order], touched[order]
+    
+    def _grid(self, date, ticks: np.ndarray, touched: np.ndarray) -> TPOGrid:
+        grid = TPOGrid(date=date, prices=ticks * self.tick_size, touched=touched,
+                       letters=self.TPO_LETTERS)
+        if len(ticks):
+            poc, val, vah = _poc_value_area(grid.prices[None], grid.counts[None])
+            grid.poc, grid.val, grid.vah = poc[0].item(), val[0].item(), vah[0].item()
+        return grid
 
 
 # ============================================
 # VISUALIZATION
 # ============================================
 
-def plot_footprint(footprints: List[FootprintBar], 
+def plot_footprint(footprints: Union[List[FootprintBar], FootprintGrid], 
                    title: str = "Footprint Chart") -> go.Figure:
     """Create footprint chart visualization"""
     
-    if not footprints:
+    if not len(footprints):
         return go.Figure()
     
     fig = make_subplots(
@@ -306,11 +467,19 @@ def plot_footprint(footprints: List[FootprintBar],
     )
     
     # Candlestick
-    dates = [fp.timestamp for fp in footprints]
-    opens = [fp.open for fp in footprints]
-    highs = [fp.high for fp in footprints]
-    lows = [fp.low for fp in footprints]
-    closes = [fp.close for fp in footprints]
+    if isinstance(footprints, FootprintGrid):
+        dates = footprints.timestamps
+        opens, highs, lows, closes = footprints.open, footprints.high, footprints.low, footprints.close
+        deltas = footprints.total_delta.tolist()
+        pocs = footprints.poc.tolist()
+    else:
+        dates = [fp.timestamp for fp in footprints]
+        opens = [fp.open for fp in footprints]
+        highs = [fp.high for fp in footprints]
+        lows = [fp.low for fp in footprints]
+        closes = [fp.close for fp in footprints]
+        deltas = [fp.total_delta for fp in footprints]
+        pocs = [fp.poc for fp in footprints]
     
     fig.add_trace(go.Candlestick(
         x=dates,
@@ -324,7 +493,6 @@ def plot_footprint(footprints: List[FootprintBar],
     ), row=1, col=1)
     
     # Delta bars
-    deltas = [fp.total_delta for fp in footprints]
     colors = ['#00ff88' if d > 0 else '#ff4444' for d in deltas]
     
     fig.add_trace(go.Bar(
@@ -335,8 +503,7 @@ def plot_footprint(footprints: List[FootprintBar],
     ), row=2, col=1)
     
     # Add POC lines
-    for i, fp in enumerate(footprints):
-        poc = fp.poc
+    for i, poc in enumerate(pocs):
         fig.add_shape(
             type="line",
             x0=i - 0.3, x1=i + 0.3,
@@ -359,10 +526,13 @@ def plot_footprint(footprints: List[FootprintBar],
     return fig
 
 
-def plot_market_profile(profile: TPOProfile,
+def plot_market_profile(profile: Union[TPOProfile, TPOGrid],
                         title: str = "Market Profile") -> go.Figure:
     """Create Market Profile (TPO) visualization"""
     
+    if isinstance(profile, TPOGrid):
+        profile = profile.to_profile()
+    
     if not profile.levels:
         return go.Figure()
     
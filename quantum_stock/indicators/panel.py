@@ -0,0 +1,348 @@
+"""
+Panel Indicators
+Cross-sectional indicator engine computing one indicator for every symbol
+of the universe in a single vectorized pass, plus ranking and screening
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Union
+
+from .trend import TrendIndicators
+from .momentum import MomentumIndicators
+from .volatility import VolatilityIndicators
+from .volume import VolumeIndicators
+from .pattern import PatternRecognition
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def rolling_mean(frame: pd.DataFrame, period: int) -> pd.DataFrame:
+    """
+    Rolling mean of every column at once
+
+    Same as frame.rolling(period).mean() up to rounding (NaN until the
+    window is full or while it contains NaN), computed from cumulative
+    sums over the whole panel instead of one pandas kernel call per
+    column. Like pandas, a window of identical values returns that value
+    exactly, so flat prices compare equal to their moving average and
+    all-zero gains/losses stay exactly zero.
+    """
+    values = frame.to_numpy(dtype=np.float64)
+    n = len(values)
+    out = np.full(values.shape, np.nan)
+
+    if period > 0 and n >= period:
+        missing = np.isnan(values)
+        sums = np.cumsum(np.where(missing, 0.0, values), axis=0)
+        gaps = np.cumsum(missing, axis=0)
+
+        window_sum = sums[period - 1:].copy()
+        window_sum[1:] -= sums[:-period]
+        window_gaps = gaps[period - 1:].copy()
+        window_gaps[1:] -= gaps[:-period]
+
+        # Start row of the run of equal values ending at each row
+        rows = np.arange(n)[:, None]
+        changed = np.ones(values.shape, dtype=bool)
+        changed[1:] = values[1:] != values[:-1]
+        run_start = np.maximum.accumulate(np.where(changed, rows, 0), axis=0)
+        constant = (rows - run_start)[period - 1:] >= period - 1
+
+        last = values[period - 1:]
+        mean = np.where(constant, last, window_sum / period)
+        out[period - 1:] = np.where(window_gaps > 0, np.nan, mean)
+
+    return pd.DataFrame(out, index=frame.index, columns=frame.columns)
+
+
+class PanelIndicatorEngine:
+    """
+    Indicators over a (bars x symbols) panel
+
+    Each field is a wide DataFrame with one column per symbol. The
+    indicator library is built from column-wise pandas operations
+    (rolling, ewm, shift, diff), so its functions run unchanged on these
+    frames and cover every symbol in one call instead of one call per
+    symbol. Rolling means go through rolling_mean(), since pandas applies
+    rolling windows one column at a time.
+
+    Panels built with from_frames(align='bars') are right-aligned: the last
+    row holds each symbol's latest bar and shorter histories are padded
+    with leading NaN, which rolling/ewm windows skip. Indicator values are
+    therefore the same as computing each symbol on its own history.
+
+    Usage:
+        engine = PanelIndicatorEngine.load(symbols, lookback=250)
+        table = engine.latest(rsi=engine.rsi(14), vol=engine.volume_ratio(20))
+        picks = engine.screen(table, where="rsi < 30", rank_by="vol", top=20)
+    """
+
+    def __init__(self, close: pd.DataFrame, high: pd.DataFrame = None,
+                 low: pd.DataFrame = None, volume: pd.DataFrame = None,
+                 open_: pd.DataFrame = None):
+        """
+        Args:
+            close: Close prices (rows = bars/dates, columns = symbols)
+            high, low, volume, open_: Optional fields with the same shape
+        """
+        self.close = close
+        self.high = high
+        self.low = low
+        self.volume = volume
+        self.open = open_
+
+        # Bars of real data per symbol
+        self.bars = close.notna().sum()
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], lookback: int = None,
+                    align: str = 'bars') -> 'PanelIndicatorEngine':
+        """
+        Build a panel from per-symbol OHLCV frames
+
+        Args:
+            frames: {symbol: DataFrame sorted by date}
+            lookback: Keep only the last N bars of each symbol
+            align: 'bars' right-aligns by bar count (exact per-symbol
+                   results); 'date' outer-joins on the date column/index
+                   (symbols missing a date get NaN on that row)
+        """
+        symbols = list(frames)
+
+        if align == 'date':
+            fields = {}
+            for field in FIELDS:
+                columns = {}
+                for symbol, df in frames.items():
+                    if field not in df.columns:
+                        continue
+                    index = pd.to_datetime(df['date']) if 'date' in df.columns else df.index
+                    values = pd.Series(df[field].to_numpy(dtype=np.float64), index=index)
+                    columns[symbol] = values[~values.index.duplicated(keep='last')]
+                if columns:
+                    panel = pd.DataFrame(columns).sort_index().reindex(columns=symbols)
+                    fields[field] = panel.iloc[-lookback:] if lookback else panel
+            close = fields.get('close', pd.DataFrame(columns=symbols))
+            return cls(close, fields.get('high'), fields.get('low'),
+                       fields.get('volume'), fields.get('open'))
+
+        if align != 'bars':
+            raise ValueError(f"Unknown align: {align}")
+
+        n = max((len(df) for df in frames.values()), default=0)
+        if lookback is not None:
+            n = min(n, lookback)
+
+        fields = {}
+        for field in FIELDS:
+            if not any(field in df.columns for df in frames.values()):
+                continue
+            data = np.full((n, len(symbols)), np.nan)
+            for j, symbol in enumerate(symbols):
+                df = frames[symbol]
+                if field in df.columns and n > 0:
+                    values = df[field].to_numpy(dtype=np.float64)[-n:]
+                    data[n - len(values):, j] = values
+            fields[field] = pd.DataFrame(data, columns=symbols)
+
+        close = fields.get('close', pd.DataFrame(np.full((n, len(symbols)), np.nan),
+                                                 columns=symbols))
+        return cls(close, fields.get('high'), fields.get('low'),
+                   fields.get('volume'), fields.get('open'))
+
+    @classmethod
+    def load(cls, symbols: List[str], data_dir: str = "data/historical",
+             lookback: int = None, min_bars: int = 1) -> 'PanelIndicatorEngine':
+        """Build a bar-aligned panel from the local market data"""
+        from ..data.market_store import load_history
+
+        frames = {}
+        for symbol in symbols:
+            df = load_history(symbol, data_dir, days=lookback)
+            if df is not None and len(df) >= min_bars:
+                df.columns = [c.lower() for c in df.columns]
+                frames[symbol] = df
+        return cls.from_frames(frames, lookback=lookback)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self.close.columns)
+
+    def _field(self, name: str) -> pd.DataFrame:
+        frame = getattr(self, name)
+        if frame is None:
+            raise ValueError(f"Panel has no '{name}' field")
+        return frame
+
+    # ------------------------------------------------------------------
+    # Trend
+    # ------------------------------------------------------------------
+
+    def sma(self, period: int = 20, field: str = 'close') -> pd.DataFrame:
+        """Simple moving average (TrendIndicators.sma over the panel)"""
+        return rolling_mean(self._field(field), period)
+
+    def ema(self, period: int = 20, field: str = 'close',
+            adjust: bool = False) -> pd.DataFrame:
+        """EMA (adjust=True gives pandas' default bias-corrected weights)"""
+        if adjust:
+            return self._field(field).ewm(span=period).mean()
+        return TrendIndicators.ema(self._field(field), period)
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = 9,
+             adjust: bool = False) -> Dict[str, pd.DataFrame]:
+        if not adjust:
+            return TrendIndicators.macd(self.close, fast, slow, signal)
+
+        macd_line = self.close.ewm(span=fast).mean() - self.close.ewm(span=slow).mean()
+        signal_line = macd_line.ewm(span=signal).mean()
+        return {
+            'macd': macd_line,
+            'signal': signal_line,
+            'histogram': macd_line - signal_line
+        }
+
+    def linear_regression(self, period: int = 14, field: str = 'close') -> Dict[str, pd.DataFrame]:
+        """Rolling regression line, slope and R^2 (closed form over the panel)"""
+        return TrendIndicators.linear_regression(self._field(field), period)
+
+    def atr(self, period: int = 14) -> pd.DataFrame:
+        """Average True Range (max of the three ranges, skipping NaN)"""
+        high, low, close = self._field('high'), self._field('low'), self.close
+        prev_close = close.shift(1)
+        tr = np.fmax(np.fmax(high - low, (high - prev_close).abs()),
+                     (low - prev_close).abs())
+        return tr.ewm(span=period, adjust=False).mean()
+
+    # ------------------------------------------------------------------
+    # Momentum
+    # ------------------------------------------------------------------
+
+    def rsi(self, period: int = 14, smoothing: str = 'ewm') -> pd.DataFrame:
+        """
+        RSI
+
+        smoothing='ewm' is MomentumIndicators.rsi; 'sma' averages gains and
+        losses over a plain rolling window and leaves warm-up bars as NaN.
+        Gains/losses on padding rows stay NaN (the library's where(..., 0)
+        would turn them into zeros that enter the averages).
+        """
+        if smoothing not in ('ewm', 'sma'):
+            raise ValueError(f"Unknown RSI smoothing: {smoothing}")
+
+        padding = self.close.isna()
+        delta = self.close.diff()
+        gain = delta.where(delta > 0, 0).mask(padding)
+        loss = (-delta.where(delta < 0, 0)).mask(padding)
+
+        if smoothing == 'sma':
+            gain = rolling_mean(gain, period)
+            loss = rolling_mean(loss, period)
+            return 100 - (100 / (1 + gain / loss))
+
+        avg_gain = gain.ewm(span=period, adjust=False).mean()
+        avg_loss = loss.ewm(span=period, adjust=False).mean()
+
+        rs = avg_gain / avg_loss.replace(0, np.nan)
+        rsi = 100 - (100 / (1 + rs))
+
+        return rsi.fillna(50).mask(padding)
+
+    def stochastic(self, k_period: int = 14, d_period: int = 3) -> Dict[str, pd.DataFrame]:
+        return MomentumIndicators.stochastic(self._field('high'), self._field('low'),
+                                             self.close, k_period, d_period)
+
+    def williams_r(self, period: int = 14) -> pd.DataFrame:
+        return MomentumIndicators.williams_r(self._field('high'), self._field('low'),
+                                             self.close, period)
+
+    def roc(self, period: int = 10) -> pd.DataFrame:
+        return MomentumIndicators.roc(self.close, period)
+
+    def momentum(self, period: int = 10) -> pd.DataFrame:
+        return MomentumIndicators.momentum(self.close, period)
+
+    def divergence(self, indicator: pd.DataFrame, window: int = 14) -> Dict[str, pd.DataFrame]:
+        """Bullish/bearish price vs indicator divergence (0/1 per bar)"""
+        return PatternRecognition.detect_divergence(self.close, indicator, window)
+
+    # ------------------------------------------------------------------
+    # Volatility
+    # ------------------------------------------------------------------
+
+    def bollinger_bands(self, period: int = 20, std_dev: float = 2.0) -> Dict[str, pd.DataFrame]:
+        return VolatilityIndicators.bollinger_bands(self.close, period, std_dev)
+
+    def historical_volatility(self, period: int = 20, annualize: bool = True) -> pd.DataFrame:
+        return VolatilityIndicators.historical_volatility(self.close, period, annualize)
+
+    # ------------------------------------------------------------------
+    # Volume
+    # ------------------------------------------------------------------
+
+    def obv(self) -> pd.DataFrame:
+        return VolumeIndicators.obv(self.close, self._field('volume'))
+
+    def volume_ratio(self, period: int = 20) -> pd.DataFrame:
+        """Volume vs its rolling average (VolumeIndicators.volume_ratio)"""
+        volume = self._field('volume')
+        return volume / rolling_mean(volume, period)
+
+    # ------------------------------------------------------------------
+    # Cross-section
+    # ------------------------------------------------------------------
+
+    def latest(self, **indicators: pd.DataFrame) -> pd.DataFrame:
+        """
+        Latest value of each indicator per symbol
+
+        Returns:
+            DataFrame indexed by symbol with one column per keyword
+        """
+        table = pd.DataFrame(
+            {name: frame.iloc[-1] if len(frame) else np.nan
+             for name, frame in indicators.items()},
+            index=self.close.columns
+        )
+        table.index.name = 'symbol'
+        return table
+
+    @staticmethod
+    def cross_sectional_rank(frame: pd.DataFrame, pct: bool = True) -> pd.DataFrame:
+        """Rank symbols against each other on every bar"""
+        return frame.rank(axis=1, pct=pct)
+
+    @staticmethod
+    def screen(table: pd.DataFrame, where: Union[str, pd.Series, None] = None,
+               rank_by: Union[str, pd.Series, None] = None,
+               ascending: bool = False, top: int = None) -> pd.DataFrame:
+        """
+        Filter and rank a per-symbol table
+
+        Args:
+            table: Output of latest() (or any table indexed by symbol)
+            where: DataFrame.query expression or boolean Series
+            rank_by: Column name or Series to sort by
+            ascending: Sort direction
+            top: Keep only the first N rows after sorting
+
+        Returns:
+            Filtered, sorted table
+        """
+        if where is not None:
+            if isinstance(where, str):
+                table = table.query(where)
+            else:
+                table = table[where.reindex(table.index, fill_value=False).astype(bool)]
+
+        if rank_by is not None:
+            key = table[rank_by] if isinstance(rank_by, str) else rank_by.reindex(table.index)
+            order = np.argsort(-key.to_numpy(dtype=np.float64) if not ascending
+                               else key.to_numpy(dtype=np.float64), kind='stable')
+            table = table.iloc[order]
+
+        if top is not None:
+            table = table.head(top)
+
+        return table
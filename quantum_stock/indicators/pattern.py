@@ -5,7 +5,38 @@ Candlestick patterns and chart patterns
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
+
+
+def _prior_extremes(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Min and max of the `window` bars before each bar, per column
+
+    scipy's 1-D min/max filters use a monotonic deque (O(n) whatever the
+    window). Like rolling windows, bars without `window` prior bars or
+    whose prior window contains NaN get NaN.
+    """
+    low = np.full(values.shape, np.nan)
+    high = np.full(values.shape, np.nan)
+    if window < 1 or len(values) <= window:
+        return low, high
+
+    missing = np.isnan(values)
+    origin = (window - 1) // 2   # trailing window ending at each bar
+    trailing_low = minimum_filter1d(np.where(missing, np.inf, values), window,
+                                    axis=0, origin=origin)
+    trailing_high = maximum_filter1d(np.where(missing, -np.inf, values), window,
+                                     axis=0, origin=origin)
+    gaps = np.cumsum(missing, axis=0)
+    trailing_gaps = gaps[window - 1:].copy()
+    trailing_gaps[1:] -= gaps[:-window]
+
+    # Window ending at the previous bar
+    complete = trailing_gaps[:-1] == 0
+    low[window:] = np.where(complete, trailing_low[window - 1:-1], np.nan)
+    high[window:] = np.where(complete, trailing_high[window - 1:-1], np.nan)
+    return low, high
 
 
 class PatternRecognition:
@@ -266,34 +297,36 @@ class PatternRecognition:
     @staticmethod
     def detect_divergence(close: pd.Series, indicator: pd.Series,
                          window: int = 14) -> Dict[str, pd.Series]:
-        """Detect bullish and bearish divergence"""
-        bullish_div = pd.Series(0, index=close.index)
-        bearish_div = pd.Series(0, index=close.index)
-
-        for i in range(window, len(close)):
-            # Price lows
-            price_window = close.iloc[i-window:i+1]
-            ind_window = indicator.iloc[i-window:i+1]
-
-            # Find local minima/maxima
-            price_min_idx = price_window.idxmin()
-            price_max_idx = price_window.idxmax()
-            ind_min_idx = ind_window.idxmin()
-            ind_max_idx = ind_window.idxmax()
-
-            # Bullish divergence: Lower low in price, higher low in indicator
-            if (close.iloc[i] < close.loc[price_min_idx] and
-                indicator.iloc[i] > indicator.loc[ind_min_idx]):
-                bullish_div.iloc[i] = 1
-
-            # Bearish divergence: Higher high in price, lower high in indicator
-            if (close.iloc[i] > close.loc[price_max_idx] and
-                indicator.iloc[i] < indicator.loc[ind_max_idx]):
-                bearish_div.iloc[i] = 1
+        """
+        Detect bullish and bearish divergence
+
+        Each bar is compared with the `window` bars before it (no signal
+        while that window is incomplete or contains NaN). Accepts Series or
+        (bars x symbols) DataFrames, which are handled in one pass.
+        """
+        price = close.to_numpy(dtype=np.float64)
+        ind = np.asarray(indicator, dtype=np.float64)
+        shape = price.shape
+        price, ind = price.reshape(len(price), -1), ind.reshape(len(ind), -1)
+
+        price_low, price_high = _prior_extremes(price, window)
+        ind_low, ind_high = _prior_extremes(ind, window)
+
+        # Bullish divergence: Lower low in price, higher low in indicator
+        bullish = (price < price_low) & (ind > ind_low)
+
+        # Bearish divergence: Higher high in price, lower high in indicator
+        bearish = (price > price_high) & (ind < ind_high)
+
+        def wrap(result):
+            result = result.astype(np.int64).reshape(shape)
+            if isinstance(close, pd.DataFrame):
+                return pd.DataFrame(result, index=close.index, columns=close.columns)
+            return pd.Series(result, index=close.index)
 
         return {
-            'bullish': bullish_div,
-            'bearish': bearish_div
+            'bullish': wrap(bullish),
+            'bearish': wrap(bearish)
         }
 
     @staticmethod
@@ -7,6 +7,212 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Tuple, Optional
 
+# Optional JIT for the recursive indicator kernels
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# ---------------------------------------------------------------------------
+# Recursive kernels (plain loops over arrays, numba-compiled when available).
+# min/max are written out in the same comparison order as Python's builtins
+# so NaN inputs behave as in the original Series loops.
+# ---------------------------------------------------------------------------
+
+def _kama_kernel(values, sc, period):
+    n = len(values)
+    kama = np.full(n, np.nan)
+    if period < 1 or n < period:
+        return kama
+
+    prev = values[period - 1]
+    kama[period - 1] = prev
+    for i in range(period, n):
+        prev = prev + sc[i] * (values[i] - prev)
+        kama[i] = prev
+
+    return kama
+
+
+def _parabolic_sar_kernel(high, low, af_start, af_step, af_max):
+    n = len(high)
+    sar = np.full(n, np.nan)
+    if n == 0:
+        return sar
+
+    prev = low[0]
+    sar[0] = prev
+    trend = 1
+    ep = high[0]
+    af = af_start
+
+    for i in range(1, n):
+        if trend == 1:  # Uptrend
+            s = prev + af * (ep - prev)
+            if low[i - 1] < s:
+                s = low[i - 1]
+            if i >= 2 and low[i - 2] < s:
+                s = low[i - 2]
+
+            if low[i] < s:
+                trend = -1
+                s = ep
+                ep = low[i]
+                af = af_start
+            elif high[i] > ep:
+                ep = high[i]
+                af = min(af + af_step, af_max)
+        else:  # Downtrend
+            s = prev - af * (prev - ep)
+            if high[i - 1] > s:
+                s = high[i - 1]
+            if i >= 2 and high[i - 2] > s:
+                s = high[i - 2]
+
+            if high[i] > s:
+                trend = 1
+                s = ep
+                ep = high[i]
+                af = af_start
+            elif low[i] < ep:
+                ep = low[i]
+                af = min(af + af_step, af_max)
+
+        sar[i] = s
+        prev = s
+
+    return sar
+
+
+def _supertrend_kernel(close, upper_band, lower_band):
+    n = len(close)
+    supertrend = np.full(n, np.nan)
+    direction = np.full(n, np.nan)
+    if n == 0:
+        return supertrend, direction
+
+    prev = upper_band[0]
+    prev_dir = 1.0
+    supertrend[0] = prev
+    direction[0] = prev_dir
+
+    for i in range(1, n):
+        if close[i] > upper_band[i - 1]:
+            d = 1.0
+        elif close[i] < lower_band[i - 1]:
+            d = -1.0
+        else:
+            d = prev_dir
+
+        if d == 1:
+            s = lower_band[i]
+            if prev_dir == 1 and prev > s:
+                s = prev
+        else:
+            s = upper_band[i]
+            if prev_dir == -1 and prev < s:
+                s = prev
+
+        supertrend[i] = s
+        direction[i] = d
+        prev = s
+        prev_dir = d
+
+    return supertrend, direction
+
+
+if NUMBA_AVAILABLE:
+    _kama_kernel_jit = njit(cache=True)(_kama_kernel)
+    _parabolic_sar_kernel_jit = njit(cache=True)(_parabolic_sar_kernel)
+    _supertrend_kernel_jit = njit(cache=True)(_supertrend_kernel)
+else:
+    _kama_kernel_jit = None
+    _parabolic_sar_kernel_jit = None
+    _supertrend_kernel_jit = None
+
+
+def _run_kernel(kernel, kernel_jit, arrays, *args):
+    """Run the compiled kernel, or the same kernel over native lists"""
+    if kernel_jit is not None:
+        return kernel_jit(*(np.ascontiguousarray(a, dtype=np.float64) for a in arrays), *args)
+    return kernel(*(np.asarray(a, dtype=np.float64).tolist() for a in arrays), *args)
+
+
+def _rolling_regression(values: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Least-squares line over each trailing window of every column
+
+    Window sums of y, x*y and y*y come from cumulative sums, so the cost
+    is O(bars) whatever the period; x runs 0..period-1 in each window.
+    The sums restart every block of windows, with time and values taken
+    relative to the block start, so rounding error stays at the level of
+    a single block however long the series is. Windows containing NaN
+    give NaN. Constant windows give slope 0 and R^2 NaN, like np.polyfit
+    / np.corrcoef.
+
+    Returns:
+        (line value at the last bar, slope, R^2), each shaped like values
+    """
+    n = len(values)
+    lr_value = np.full(values.shape, np.nan)
+    lr_slope = np.full(values.shape, np.nan)
+    lr_r2 = np.full(values.shape, np.nan)
+    if period < 2 or n < period:
+        return lr_value, lr_slope, lr_r2
+
+    # Overlapping segments: block windows plus the period - 1 bars before them
+    windows = n - period + 1
+    block = max(4 * period, 256)
+    n_blocks = -(-windows // block)
+    padded = np.concatenate([values, np.full((n_blocks * block - windows, values.shape[1]), np.nan)])
+    segments = np.lib.stride_tricks.sliding_window_view(padded, block + period - 1, axis=0)[::block]
+    segments = np.moveaxis(segments, -1, 1)        # (blocks, bars, columns)
+
+    missing = np.isnan(segments)
+    ref = np.take_along_axis(segments, np.argmax(~missing, axis=1)[:, None], axis=1)
+    ref = np.where(np.isnan(ref), 0.0, ref)
+    y = np.where(missing, 0.0, segments - ref)
+    t = np.arange(block + period - 1, dtype=np.float64)[:, None]
+
+    def window_sum(a):
+        total = np.zeros((n_blocks, a.shape[1] + 1, a.shape[2]))
+        np.cumsum(a, axis=1, out=total[:, 1:])
+        out = total[:, period:] - total[:, :-period]
+        return out.reshape(n_blocks * block, -1)[:windows]
+
+    sy = window_sum(y)
+    sxy = window_sum(t * y) - np.tile(t[:block], (n_blocks, 1))[:windows] * sy   # x = t - window start
+    syy = window_sum(y * y)
+    gaps = window_sum(missing)
+    ref = np.repeat(ref[:, 0], block, axis=0)[:windows]
+
+    sx = period * (period - 1) / 2
+    sxx = (period - 1) * period * (2 * period - 1) / 6
+    var_x = period * sxx - sx * sx
+    cov = period * sxy - sx * sy
+    var_y = period * syy - sy * sy
+
+    # Windows of identical values (exact, unlike the differenced sums)
+    rows = np.arange(n)[:, None]
+    changed = np.ones(values.shape, dtype=bool)
+    changed[1:] = values[1:] != values[:-1]
+    run_start = np.maximum.accumulate(np.where(changed, rows, 0), axis=0)
+    constant = (rows - run_start)[period - 1:] >= period - 1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(constant, 0.0, cov / var_x)
+        intercept = (sy - slope * sx) / period
+        value = np.where(constant, values[period - 1:], intercept + slope * (period - 1) + ref)
+        r2 = np.where(constant | (var_y <= 0), np.nan, np.clip(cov * cov / (var_x * var_y), 0.0, 1.0))
+
+    valid = gaps == 0
+    lr_value[period - 1:] = np.where(valid, value, np.nan)
+    lr_slope[period - 1:] = np.where(valid, slope, np.nan)
+    lr_r2[period - 1:] = np.where(valid, r2, np.nan)
+    return lr_value, lr_slope, lr_r2
+
 
 class TrendIndicators:
     """Collection of trend-following indicators"""
@@ -57,13 +263,8 @@ class TrendIndicators:
         slow_sc = 2 / (slow + 1)
         sc = (er * (fast_sc - slow_sc) + slow_sc) ** 2
 
-        kama = pd.Series(index=series.index, dtype=float)
-        kama.iloc[period-1] = series.iloc[period-1]
-
-        for i in range(period, len(series)):
-            kama.iloc[i] = kama.iloc[i-1] + sc.iloc[i] * (series.iloc[i] - kama.iloc[i-1])
-
-        return kama
+        kama = _run_kernel(_kama_kernel, _kama_kernel_jit, (series, sc), int(period))
+        return pd.Series(kama, index=series.index, dtype=float)
 
     @staticmethod
     def hull_ma(series: pd.Series, period: int = 20) -> pd.Series:
@@ -129,55 +330,9 @@ class TrendIndicators:
     def parabolic_sar(high: pd.Series, low: pd.Series, af_start: float = 0.02,
                       af_step: float = 0.02, af_max: float = 0.2) -> pd.Series:
         """Parabolic SAR - Stop and Reverse"""
-        length = len(high)
-        sar = pd.Series(index=high.index, dtype=float)
-        trend = pd.Series(index=high.index, dtype=int)
-        ep = pd.Series(index=high.index, dtype=float)
-        af = pd.Series(index=high.index, dtype=float)
-
-        # Initialize
-        sar.iloc[0] = low.iloc[0]
-        trend.iloc[0] = 1
-        ep.iloc[0] = high.iloc[0]
-        af.iloc[0] = af_start
-
-        for i in range(1, length):
-            if trend.iloc[i-1] == 1:  # Uptrend
-                sar.iloc[i] = sar.iloc[i-1] + af.iloc[i-1] * (ep.iloc[i-1] - sar.iloc[i-1])
-                sar.iloc[i] = min(sar.iloc[i], low.iloc[i-1], low.iloc[i-2] if i >= 2 else low.iloc[i-1])
-
-                if low.iloc[i] < sar.iloc[i]:
-                    trend.iloc[i] = -1
-                    sar.iloc[i] = ep.iloc[i-1]
-                    ep.iloc[i] = low.iloc[i]
-                    af.iloc[i] = af_start
-                else:
-                    trend.iloc[i] = 1
-                    if high.iloc[i] > ep.iloc[i-1]:
-                        ep.iloc[i] = high.iloc[i]
-                        af.iloc[i] = min(af.iloc[i-1] + af_step, af_max)
-                    else:
-                        ep.iloc[i] = ep.iloc[i-1]
-                        af.iloc[i] = af.iloc[i-1]
-            else:  # Downtrend
-                sar.iloc[i] = sar.iloc[i-1] - af.iloc[i-1] * (sar.iloc[i-1] - ep.iloc[i-1])
-                sar.iloc[i] = max(sar.iloc[i], high.iloc[i-1], high.iloc[i-2] if i >= 2 else high.iloc[i-1])
-
-                if high.iloc[i] > sar.iloc[i]:
-                    trend.iloc[i] = 1
-                    sar.iloc[i] = ep.iloc[i-1]
-                    ep.iloc[i] = high.iloc[i]
-                    af.iloc[i] = af_start
-                else:
-                    trend.iloc[i] = -1
-                    if low.iloc[i] < ep.iloc[i-1]:
-                        ep.iloc[i] = low.iloc[i]
-                        af.iloc[i] = min(af.iloc[i-1] + af_step, af_max)
-                    else:
-                        ep.iloc[i] = ep.iloc[i-1]
-                        af.iloc[i] = af.iloc[i-1]
-
-        return sar
+        sar = _run_kernel(_parabolic_sar_kernel, _parabolic_sar_kernel_jit, (high, low),
+                          float(af_start), float(af_step), float(af_max))
+        return pd.Series(sar, index=high.index, dtype=float)
 
     @staticmethod
     def supertrend(high: pd.Series, low: pd.Series, close: pd.Series,
@@ -189,28 +344,13 @@ class TrendIndicators:
         upper_band = hl2 + (multiplier * atr)
         lower_band = hl2 - (multiplier * atr)
 
-        supertrend = pd.Series(index=close.index, dtype=float)
-        direction = pd.Series(index=close.index, dtype=int)
-
-        supertrend.iloc[0] = upper_band.iloc[0]
-        direction.iloc[0] = 1
-
-        for i in range(1, len(close)):
-            if close.iloc[i] > upper_band.iloc[i-1]:
-                direction.iloc[i] = 1
-            elif close.iloc[i] < lower_band.iloc[i-1]:
-                direction.iloc[i] = -1
-            else:
-                direction.iloc[i] = direction.iloc[i-1]
-
-            if direction.iloc[i] == 1:
-                supertrend.iloc[i] = max(lower_band.iloc[i], supertrend.iloc[i-1]) if direction.iloc[i-1] == 1 else lower_band.iloc[i]
-            else:
-                supertrend.iloc[i] = min(upper_band.iloc[i], supertrend.iloc[i-1]) if direction.iloc[i-1] == -1 else upper_band.iloc[i]
+        supertrend, direction = _run_kernel(
+            _supertrend_kernel, _supertrend_kernel_jit, (close, upper_band, lower_band)
+        )
 
         return {
-            'supertrend': supertrend,
-            'direction': direction,
+            'supertrend': pd.Series(supertrend, index=close.index, dtype=float),
+            'direction': pd.Series(direction, index=close.index, dtype=float),
             'upper_band': upper_band,
             'lower_band': lower_band
         }
@@ -275,33 +415,26 @@ class TrendIndicators:
 
     @staticmethod
     def linear_regression(series: pd.Series, period: int = 14) -> Dict[str, pd.Series]:
-        """Linear Regression Line and related indicators"""
-        def calc_lr(window):
-            x = np.arange(len(window))
-            slope, intercept = np.polyfit(x, window, 1)
-            return intercept + slope * (len(window) - 1)
-
-        lr_value = series.rolling(period).apply(calc_lr, raw=True)
-
-        def calc_slope(window):
-            x = np.arange(len(window))
-            slope, _ = np.polyfit(x, window, 1)
-            return slope
-
-        lr_slope = series.rolling(period).apply(calc_slope, raw=True)
-
-        # R-squared
-        def calc_r2(window):
-            x = np.arange(len(window))
-            correlation = np.corrcoef(x, window)[0, 1]
-            return correlation ** 2
+        """
+        Linear Regression Line and related indicators
+
+        Closed-form rolling fit (O(n) in the number of bars). A DataFrame
+        of symbols is fitted column by column in the same pass.
+        """
+        values = series.to_numpy(dtype=np.float64)
+        lr_value, lr_slope, lr_r2 = _rolling_regression(
+            values.reshape(len(values), -1), period
+        )
 
-        lr_r2 = series.rolling(period).apply(calc_r2, raw=True)
+        def wrap(result):
+            if isinstance(series, pd.DataFrame):
+                return pd.DataFrame(result, index=series.index, columns=series.columns)
+            return pd.Series(result[:, 0], index=series.index, name=series.name)
 
         return {
-            'lr_value': lr_value,
-            'lr_slope': lr_slope,
-            'lr_r2': lr_r2
+            'lr_value': wrap(lr_value),
+            'lr_slope': wrap(lr_slope),
+            'lr_r2': wrap(lr_r2)
         }
 
     @staticmethod
@@ -2,7 +2,9 @@
 from .training_pipeline import (
     MLPipeline, 
     FeatureEngineer, 
+    FeatureStore,
     GradientBoostingTrainer,
+    CrossSectionalTrainer,
     LSTMTrainer,
     TrainingResult,
     ModelMetadata
@@ -11,7 +13,9 @@ from .training_pipeline import (
 __all__ = [
     'MLPipeline',
     'FeatureEngineer',
+    'FeatureStore',
     'GradientBoostingTrainer',
+    'CrossSectionalTrainer',
     'LSTMTrainer',
     'TrainingResult',
     'ModelMetadata'
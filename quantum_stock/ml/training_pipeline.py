@@ -10,6 +10,7 @@ Features:
 - Hyperparameter tuning with Optuna
 - Model versioning and persistence
 - Feature engineering
+- Out-of-core multi-symbol feature store and cross-sectional training
 - Model evaluation and comparison
 """
 
@@ -19,11 +20,19 @@ import pickle
 import logging
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Iterable, Iterator
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
+# Optional: torch IterableDataset over the feature store
+try:
+    import torch
+    from torch.utils.data import IterableDataset, get_worker_info
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -99,32 +108,33 @@ class FeatureEngineer:
         - Volume: OBV, volume ratio
         - Lag features: past N days returns
         """
-        feat = df.copy()
+        close = df['Close']
+        feat = {}
         
         # Basic price features
-        feat['returns'] = feat['Close'].pct_change()
-        feat['log_returns'] = np.log(feat['Close'] / feat['Close'].shift(1))
-        feat['range'] = (feat['High'] - feat['Low']) / feat['Close']
-        feat['body'] = (feat['Close'] - feat['Open']) / feat['Open']
+        feat['returns'] = close.pct_change()
+        feat['log_returns'] = np.log(close / close.shift(1))
+        feat['range'] = (df['High'] - df['Low']) / close
+        feat['body'] = (close - df['Open']) / df['Open']
         
         # Trend features
         for period in [5, 10, 20, 50]:
-            feat[f'sma_{period}'] = feat['Close'].rolling(period).mean()
-            feat[f'ema_{period}'] = feat['Close'].ewm(span=period).mean()
-            feat[f'price_to_sma_{period}'] = feat['Close'] / feat[f'sma_{period}']
+            feat[f'sma_{period}'] = close.rolling(period).mean()
+            feat[f'ema_{period}'] = close.ewm(span=period).mean()
+            feat[f'price_to_sma_{period}'] = close / feat[f'sma_{period}']
         
         # Momentum features
-        feat['rsi'] = FeatureEngineer._calculate_rsi(feat['Close'], 14)
-        feat['macd'], feat['macd_signal'] = FeatureEngineer._calculate_macd(feat['Close'])
+        feat['rsi'] = FeatureEngineer._calculate_rsi(close, 14)
+        feat['macd'], feat['macd_signal'] = FeatureEngineer._calculate_macd(close)
         feat['macd_hist'] = feat['macd'] - feat['macd_signal']
         
         # Volatility features
-        feat['atr'] = FeatureEngineer._calculate_atr(feat, 14)
-        feat['bb_width'] = FeatureEngineer._calculate_bb_width(feat['Close'], 20)
+        feat['atr'] = FeatureEngineer._calculate_atr(df, 14)
+        feat['bb_width'] = FeatureEngineer._calculate_bb_width(close, 20)
         
         # Volume features
-        feat['volume_ratio'] = feat['Volume'] / feat['Volume'].rolling(20).mean()
-        feat['obv'] = (np.sign(feat['returns']) * feat['Volume']).cumsum()
+        feat['volume_ratio'] = df['Volume'] / df['Volume'].rolling(20).mean()
+        feat['obv'] = (np.sign(feat['returns']) * df['Volume']).cumsum()
         
         # Lag features
         for lag in range(1, lookback + 1):
@@ -133,6 +143,10 @@ class FeatureEngineer:
         # Target variable (next day return)
         feat['target'] = feat['returns'].shift(-1)
         
+        # One concat instead of ~40 single-column inserts
+        base = df.drop(columns=[c for c in feat if c in df.columns])
+        feat = pd.concat([base, pd.DataFrame(feat, index=df.index)], axis=1)
+        
         return feat.dropna()
     
     @staticmethod
@@ -166,6 +180,210 @@ class FeatureEngineer:
         return (4 * std) / sma
 
 
+# ============================================
+# FEATURE STORE
+# ============================================
+
+class FeatureStore:
+    """
+    Pooled multi-symbol feature matrix on disk
+    
+    Features are computed one symbol at a time and appended as float32
+    rows (feature columns + target last) to a flat file, so building a
+    store over the whole universe only ever holds one symbol's frame.
+    Training reads it back through a read-only memmap in shuffled blocks.
+    
+    Layout of the store directory:
+        meta.json       columns, row count, symbols
+        features.f32    (n_rows, n_features + 1) float32, target last
+        symbol_ids.i32  row -> index into meta['symbols']
+        dates.i64       row -> bar timestamp (ns)
+    """
+    
+    EXCLUDE_COLUMNS = ['target', 'Open', 'High', 'Low', 'Close', 'Volume']
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        with open(self.path / 'meta.json', 'r') as f:
+            self.meta = json.load(f)
+        
+        self.columns: List[str] = self.meta['columns']
+        self.feature_columns: List[str] = self.columns[:-1]
+        self.symbols: List[str] = self.meta['symbols']
+        self.n_rows: int = self.meta['n_rows']
+        
+        shape = (self.n_rows, len(self.columns))
+        self.data = self._open(self.path / 'features.f32', np.float32, shape)
+        self.symbol_ids = self._open(self.path / 'symbol_ids.i32', np.int32, (self.n_rows,))
+        self.dates = self._open(self.path / 'dates.i64', np.int64, (self.n_rows,))
+    
+    @staticmethod
+    def _open(path: Path, dtype, shape: Tuple[int, ...]) -> np.ndarray:
+        if shape[0] == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=shape)
+    
+    @classmethod
+    def build(cls, path: str, frames: Iterable[Tuple[str, pd.DataFrame]],
+              lookback: int = 20) -> 'FeatureStore':
+        """
+        Compute features for each symbol and write them to a new store
+        
+        Args:
+            path: Store directory (replaced if it exists)
+            frames: (symbol, OHLCV DataFrame) pairs; pass a generator that
+                    loads each frame lazily to keep memory flat
+            lookback: Return lags for FeatureEngineer.create_features
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        
+        columns = None
+        symbols = []
+        n_rows = 0
+        
+        with open(path / 'features.f32', 'wb') as f_data, \
+                open(path / 'symbol_ids.i32', 'wb') as f_ids, \
+                open(path / 'dates.i64', 'wb') as f_dates:
+            
+            for symbol, df in frames:
+                feat_df = FeatureEngineer.create_features(df, lookback=lookback)
+                
+                if columns is None:
+                    columns = [c for c in feat_df.columns if c not in cls.EXCLUDE_COLUMNS] + ['target']
+                
+                block = feat_df[columns].to_numpy(dtype=np.float32)
+                try:
+                    dates = pd.DatetimeIndex(feat_df.index).values.astype('datetime64[ns]').view(np.int64)
+                except (TypeError, ValueError):
+                    dates = np.arange(len(feat_df), dtype=np.int64)
+                
+                # dropna keeps inf (e.g. zero-volume bars); linear models can't use those rows
+                finite = np.isfinite(block).all(axis=1)
+                block, dates = block[finite], dates[finite]
+                if len(block) == 0:
+                    logger.warning(f"No usable feature rows for {symbol}, skipped")
+                    continue
+                
+                block.tofile(f_data)
+                np.full(len(block), len(symbols), dtype=np.int32).tofile(f_ids)
+                np.asarray(dates, dtype=np.int64).tofile(f_dates)
+                
+                symbols.append(symbol)
+                n_rows += len(block)
+        
+        meta = {
+            'columns': columns or ['target'],
+            'symbols': symbols,
+            'n_rows': n_rows,
+            'lookback': lookback,
+            'built_at': datetime.now().isoformat()
+        }
+        with open(path / 'meta.json', 'w') as f:
+            json.dump(meta, f, indent=2)
+        
+        logger.info(f"Feature store built: {n_rows} rows, {len(symbols)} symbols -> {path}")
+        return cls(path)
+    
+    def __len__(self) -> int:
+        return self.n_rows
+    
+    def split_by_date(self, val_fraction: float = 0.2) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Row indices before / from a common date cutoff
+        
+        The cutoff is shared by all symbols so validation rows never
+        precede training rows in time.
+        """
+        if self.n_rows == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        
+        dates = np.asarray(self.dates)
+        cutoff = np.sort(dates)[min(int(self.n_rows * (1 - val_fraction)), self.n_rows - 1)]
+        return np.flatnonzero(dates < cutoff), np.flatnonzero(dates >= cutoff)
+    
+    def load(self, rows: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Read rows into memory as (X, y)"""
+        data = np.asarray(self.data) if rows is None else self.data[np.asarray(rows)]
+        return data[:, :-1], data[:, -1]
+    
+    def iter_batches(self, batch_size: int = 1024, rows: np.ndarray = None,
+                     shuffle: bool = True, seed: int = None,
+                     block_rows: int = 65536, shard: int = 0,
+                     n_shards: int = 1) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yield (X, y) float32 mini-batches
+        
+        Rows are read one block at a time; with shuffle the block order and
+        the rows within each block are permuted, so reads stay sequential
+        while batches mix symbols and dates.
+        
+        Args:
+            batch_size: Rows per batch
+            rows: Row indices to draw from (default: all), e.g. from split_by_date
+            shuffle: Shuffle blocks and rows within blocks
+            seed: Shuffle seed (use the same seed in every shard)
+            block_rows: Rows read from disk at once
+            shard, n_shards: Take every n_shards-th block starting at shard
+        """
+        rows = np.arange(self.n_rows) if rows is None else np.sort(np.asarray(rows))
+        n_blocks = (len(rows) + block_rows - 1) // block_rows
+        
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(n_blocks) if shuffle else np.arange(n_blocks)
+        
+        for b in order[shard::n_shards]:
+            block = self.data[rows[b * block_rows:(b + 1) * block_rows]]
+            if shuffle:
+                block = block[rng.permutation(len(block))]
+            
+            for start in range(0, len(block), batch_size):
+                batch = block[start:start + batch_size]
+                yield batch[:, :-1], batch[:, -1]
+    
+    def torch_dataset(self, batch_size: int = 1024, rows: np.ndarray = None,
+                      shuffle: bool = True, seed: int = 0) -> 'FeatureStoreDataset':
+        """IterableDataset of (X, y) tensor batches; use DataLoader(dataset, batch_size=None)"""
+        if not TORCH_AVAILABLE:
+            raise ImportError("PyTorch not installed. Run: pip install torch")
+        return FeatureStoreDataset(self, batch_size=batch_size, rows=rows,
+                                   shuffle=shuffle, seed=seed)
+
+
+if TORCH_AVAILABLE:
+    
+    class FeatureStoreDataset(IterableDataset):
+        """
+        Streams FeatureStore mini-batches to a DataLoader
+        
+        Blocks are split across DataLoader workers; call set_epoch() each
+        epoch to draw a new shuffle that all workers agree on.
+        """
+        
+        def __init__(self, store: FeatureStore, batch_size: int = 1024,
+                     rows: np.ndarray = None, shuffle: bool = True, seed: int = 0):
+            super().__init__()
+            self.store = store
+            self.batch_size = batch_size
+            self.rows = rows
+            self.shuffle = shuffle
+            self.seed = seed
+            self.epoch = 0
+        
+        def set_epoch(self, epoch: int):
+            self.epoch = epoch
+        
+        def __iter__(self):
+            worker = get_worker_info()
+            shard, n_shards = (worker.id, worker.num_workers) if worker else (0, 1)
+            
+            for X, y in self.store.iter_batches(
+                self.batch_size, rows=self.rows, shuffle=self.shuffle,
+                seed=self.seed + self.epoch, shard=shard, n_shards=n_shards
+            ):
+                yield torch.from_numpy(X), torch.from_numpy(y)
+
+
 # ============================================
 # MODEL TRAINERS
 # ============================================
@@ -206,6 +424,24 @@ class BaseModelTrainer:
             metadata = ModelMetadata.from_dict(json.load(f))
         
         return model, metadata
+    
+    def _calculate_metrics(self, y_true: np.ndarray, y_pred: np.ndarray) -> Dict:
+        """Calculate regression metrics"""
+        from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+        
+        rmse = np.sqrt(mean_squared_error(y_true, y_pred))
+        mae = mean_absolute_error(y_true, y_pred)
+        r2 = r2_score(y_true, y_pred)
+        
+        # Direction accuracy
+        direction_correct = np.mean(np.sign(y_true) == np.sign(y_pred))
+        
+        return {
+            'rmse': round(rmse, 6),
+            'mae': round(mae, 6),
+            'r2': round(r2, 4),
+            'direction_accuracy': round(direction_correct, 4)
+        }
 
 
 class GradientBoostingTrainer(BaseModelTrainer):
@@ -342,24 +578,6 @@ class GradientBoostingTrainer(BaseModelTrainer):
                 'learning_rate': 0.1,
                 'min_samples_split': 5
             }
-    
-    def _calculate_metrics(self, y_true: np.ndarray, y_pred: np.ndarray) -> Dict:
-        """Calculate regression metrics"""
-        from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
-        
-        rmse = np.sqrt(mean_squared_error(y_true, y_pred))
-        mae = mean_absolute_error(y_true, y_pred)
-        r2 = r2_score(y_true, y_pred)
-        
-        # Direction accuracy
-        direction_correct = np.mean(np.sign(y_true) == np.sign(y_pred))
-        
-        return {
-            'rmse': round(rmse, 6),
-            'mae': round(mae, 6),
-            'r2': round(r2, 4),
-            'direction_accuracy': round(direction_correct, 4)
-        }
 
 
 class LSTMTrainer(BaseModelTrainer):
@@ -494,6 +712,111 @@ class LSTMTrainer(BaseModelTrainer):
             )
 
 
+class CrossSectionalTrainer(BaseModelTrainer):
+    """
+    One model for the whole universe, trained from a FeatureStore
+    
+    Streams mini-batches into a StandardScaler and an SGDRegressor via
+    partial_fit, so the universe never has to fit in memory.
+    """
+    
+    def train(self, store: FeatureStore, symbol: str = "UNIVERSE",
+              epochs: int = 3,
+              batch_size: int = 4096,
+              val_fraction: float = 0.2,
+              alpha: float = 1e-4,
+              seed: int = 42,
+              **kwargs) -> TrainingResult:
+        """
+        Train a pooled linear model on streamed batches
+        
+        Args:
+            store: Feature store built with FeatureStore.build
+            symbol: Name recorded in the model metadata
+            epochs: Passes over the training rows
+            batch_size: Rows per partial_fit call
+            val_fraction: Share of the date range held out for validation
+            alpha: L2 regularization strength
+            seed: Shuffle / model seed
+        """
+        try:
+            from sklearn.linear_model import SGDRegressor
+            from sklearn.preprocessing import StandardScaler
+            from sklearn.pipeline import make_pipeline
+            
+            train_rows, val_rows = store.split_by_date(val_fraction)
+            if len(train_rows) == 0 or len(val_rows) == 0:
+                raise ValueError(f"Not enough rows in feature store ({len(store)})")
+            
+            # Scaler statistics in one streaming pass
+            scaler = StandardScaler()
+            for X, _ in store.iter_batches(batch_size, rows=train_rows, shuffle=False):
+                scaler.partial_fit(X)
+            
+            model = SGDRegressor(alpha=alpha, learning_rate='invscaling', random_state=seed)
+            for epoch in range(epochs):
+                for X, y in store.iter_batches(batch_size, rows=train_rows, seed=seed + epoch):
+                    model.partial_fit(scaler.transform(X), y)
+            
+            pipeline = make_pipeline(scaler, model)
+            
+            train_metrics = self._calculate_metrics(*self._predict_rows(pipeline, store, train_rows, batch_size))
+            val_metrics = self._calculate_metrics(*self._predict_rows(pipeline, store, val_rows, batch_size))
+            
+            # Create metadata
+            dates = np.asarray(store.dates)
+            model_id = f"xs_{symbol}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            metadata = ModelMetadata(
+                model_id=model_id,
+                model_type="CrossSectional",
+                symbol=symbol,
+                trained_at=datetime.now(),
+                data_start=str(pd.Timestamp(dates.min())),
+                data_end=str(pd.Timestamp(dates.max())),
+                train_size=len(train_rows),
+                metrics=val_metrics,
+                hyperparameters={
+                    'epochs': epochs,
+                    'batch_size': batch_size,
+                    'alpha': alpha,
+                    'n_symbols': len(store.symbols)
+                },
+                feature_columns=store.feature_columns
+            )
+            
+            # Save model
+            self.save_model(pipeline, metadata)
+            
+            return TrainingResult(
+                success=True,
+                model=pipeline,
+                metadata=metadata,
+                train_metrics=train_metrics,
+                validation_metrics=val_metrics
+            )
+            
+        except Exception as e:
+            logger.error(f"Cross-sectional training failed: {e}")
+            return TrainingResult(
+                success=False,
+                model=None,
+                metadata=None,
+                train_metrics={},
+                validation_metrics={},
+                error_message=str(e)
+            )
+    
+    @staticmethod
+    def _predict_rows(model: Any, store: FeatureStore, rows: np.ndarray,
+                      batch_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(y_true, y_pred) for rows, predicted batch by batch"""
+        y_true, y_pred = [], []
+        for X, y in store.iter_batches(batch_size, rows=rows, shuffle=False):
+            y_true.append(y)
+            y_pred.append(model.predict(X))
+        return np.concatenate(y_true), np.concatenate(y_pred)
+
+
 # ============================================
 # TRAINING PIPELINE
 # ============================================
@@ -511,6 +834,9 @@ class MLPipeline:
             'gbm': GradientBoostingTrainer(model_dir),
             'lstm': LSTMTrainer(model_dir)
         }
+        
+        # Pooled model over many symbols (trained from a FeatureStore)
+        self.universe_trainer = CrossSectionalTrainer(model_dir)
     
     def train_all(self, df: pd.DataFrame, symbol: str,
                   models: List[str] = None) -> Dict[str, TrainingResult]:
@@ -540,6 +866,30 @@ class MLPipeline:
         
         return results
     
+    def train_universe(self, frames: Iterable[Tuple[str, pd.DataFrame]],
+                       store_path: str = None, **kwargs) -> TrainingResult:
+        """
+        Train one cross-sectional model over many symbols
+        
+        Args:
+            frames: (symbol, OHLCV DataFrame) pairs, ideally a generator
+                    that loads one frame at a time
+            store_path: Feature store directory (default: model_dir/feature_store)
+            **kwargs: Passed to CrossSectionalTrainer.train
+        """
+        store_path = store_path or self.model_dir / "feature_store"
+        store = FeatureStore.build(store_path, frames)
+        
+        logger.info(f"Training cross-sectional model on {len(store.symbols)} symbols...")
+        result = self.universe_trainer.train(store, **kwargs)
+        
+        if result.success:
+            logger.info(f"  ✅ universe: RMSE={result.validation_metrics.get('rmse', 'N/A')}")
+        else:
+            logger.error(f"  ❌ universe: {result.error_message}")
+        
+        return result
+    
     def get_best_model(self, symbol: str) -> Optional[Tuple[Any, ModelMetadata]]:
         """Get best model for a symbol based on validation metrics"""
         models = self.list_models(symbol)
@@ -13,11 +13,15 @@ Key Concepts:
 Training Labels:
 - WRONG: [T+1, T+2, T+3, T+4, T+5] (40% không trade được)
 - CORRECT: [T+3, T+4, T+5, T+6, T+7] (100% trade được)
+
+Sequences are built from strided window views and normalized in bulk;
+X can be written straight into a memory-mapped .npy file.
 """
 
 import numpy as np
 import pandas as pd
-from typing import Tuple, Optional, List
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Tuple, Optional, Dict
 from datetime import datetime, timedelta
 
 
@@ -39,13 +43,20 @@ class VietnamSettlementDataPrep:
         self.seq_len = seq_len
         self.forecast_len = forecast_len
 
+    def n_sequences(self, n_days: int) -> int:
+        """Number of samples prepare_sequences_vietnam builds from n_days of data"""
+        return max(0, n_days - (self.seq_len + self.SAFE_TRADING_DAY + self.forecast_len) + 1)
+
     def prepare_sequences_vietnam(
         self,
         prices: np.ndarray,
         volumes: Optional[np.ndarray] = None,
         news_sentiment: Optional[np.ndarray] = None,
-        normalize_per_sequence: bool = True
-    ) -> Tuple[np.ndarray, np.ndarray, List[dict]]:
+        normalize_per_sequence: bool = True,
+        out: Optional[np.ndarray] = None,
+        memmap_path: Optional[str] = None,
+        chunk_size: int = 4096
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
         """
         Chuẩn bị sequences aligned với T+2.5 settlement
 
@@ -61,11 +72,17 @@ class VietnamSettlementDataPrep:
             volumes: Historical volumes (optional, shape: [N])
             news_sentiment: News sentiment scores (optional, shape: [N])
             normalize_per_sequence: Normalize each sequence independently
+            out: Preallocated X (e.g. a slice of a larger np.memmap),
+                 shape [n_sequences(N), seq_len, n_features]
+            memmap_path: Write X to a new memory-mapped .npy file instead
+                         of RAM (ignored when out is given)
+            chunk_size: Samples normalized per block while filling X
 
         Returns:
             X: Input sequences (shape: [n_samples, seq_len, n_features])
             y: Target sequences (shape: [n_samples, forecast_len])
-            metadata: List of dicts with normalization params
+            metadata: Dict of per-sample arrays with normalization params
+                      ('min', 'max', 'range', 'start_idx', 'target_start_idx')
         """
         # Total days needed
         total_needed = self.seq_len + self.SAFE_TRADING_DAY + self.forecast_len
@@ -76,78 +93,90 @@ class VietnamSettlementDataPrep:
                 f"Got {len(prices)} days."
             )
 
-        X, y, metadata = [], [], []
-
-        # Create sequences
-        max_start = len(prices) - total_needed
-
-        for i in range(max_start + 1):
-            # Input: Historical data
-            input_prices = prices[i:i+self.seq_len]
+        prices = np.asarray(prices)
+        n_samples = self.n_sequences(len(prices))
+        target_offset = self.seq_len + self.SAFE_TRADING_DAY
+
+        # Strided views, no copies: row i is the window starting at day i
+        # Target skips T+1, T+2 and starts from T+3 (day i+seq_len+3)
+        input_windows = sliding_window_view(prices, self.seq_len)[:n_samples]
+        target_windows = sliding_window_view(prices[target_offset:], self.forecast_len)[:n_samples]
+
+        start_idx = np.arange(n_samples)
+        metadata = {'start_idx': start_idx, 'target_start_idx': start_idx + target_offset}
+
+        if normalize_per_sequence:
+            # Min-max normalization
+            input_min = input_windows.min(axis=1)
+            input_max = input_windows.max(axis=1)
+            price_range = input_max - input_min
+            metadata = {
+                'min': input_min.astype(np.float64),
+                'max': input_max.astype(np.float64),
+                'range': price_range.astype(np.float64),
+                **metadata
+            }
+            y = self._min_max(target_windows, input_min, price_range)
+        else:
+            y = target_windows.copy()
+
+        # Feature sources and the dtype they stack to
+        sources = [input_windows]
+        dtypes = [np.float64 if normalize_per_sequence else prices.dtype]
+        if volumes is not None:
+            sources.append(sliding_window_view(np.asarray(volumes), self.seq_len)[:n_samples])
+            dtypes.append(np.float64)
+        if news_sentiment is not None:
+            sources.append(sliding_window_view(np.asarray(news_sentiment), self.seq_len)[:n_samples])
+            dtypes.append(sources[-1].dtype)
+
+        shape = (n_samples, self.seq_len, len(sources))
+        if out is not None:
+            if out.shape != shape:
+                raise ValueError(f"out has shape {out.shape}, expected {shape}")
+            X = out
+        elif memmap_path is not None:
+            X = np.lib.format.open_memmap(memmap_path, mode='w+',
+                                          dtype=np.result_type(*dtypes), shape=shape)
+        else:
+            X = np.empty(shape, dtype=np.result_type(*dtypes))
 
-            # Target: Post-settlement tradeable window
-            # Skip T+1, T+2 (days i+seq_len and i+seq_len+1 and i+seq_len+2)
-            # Start from T+3 (day i+seq_len+3)
-            target_start = i + self.seq_len + self.SAFE_TRADING_DAY
-            target_end = target_start + self.forecast_len
-            target_prices = prices[target_start:target_end]
+        # Fill X block by block so temporaries stay bounded
+        for start in range(0, n_samples, chunk_size):
+            end = min(start + chunk_size, n_samples)
 
-            # Normalize (optional)
             if normalize_per_sequence:
-                # Min-max normalization
-                input_min = input_prices.min()
-                input_max = input_prices.max()
-                price_range = input_max - input_min
-
-                if price_range > 0:
-                    input_norm = (input_prices - input_min) / price_range
-                    target_norm = (target_prices - input_min) / price_range
-                else:
-                    input_norm = input_prices * 0  # All zeros if flat
-                    target_norm = target_prices * 0
-
-                meta = {
-                    'min': float(input_min),
-                    'max': float(input_max),
-                    'range': float(price_range),
-                    'start_idx': i,
-                    'target_start_idx': target_start
-                }
+                X[start:end, :, 0] = self._min_max(
+                    input_windows[start:end], input_min[start:end], price_range[start:end]
+                )
             else:
-                input_norm = input_prices
-                target_norm = target_prices
-                meta = {'start_idx': i, 'target_start_idx': target_start}
+                X[start:end, :, 0] = input_windows[start:end]
 
-            # Build feature matrix
-            features = [input_norm]
-
-            # Add volume features
+            feature = 1
             if volumes is not None:
-                input_volumes = volumes[i:i+self.seq_len]
-                # Normalize volumes
-                vol_mean = input_volumes.mean()
-                if vol_mean > 0:
-                    vol_norm = input_volumes / vol_mean
-                else:
-                    vol_norm = input_volumes * 0
-                features.append(vol_norm)
-
-            # Add news sentiment
+                # Normalize volumes by window mean
+                vol_windows = sources[feature][start:end]
+                vol_mean = vol_windows.mean(axis=1)[:, np.newaxis]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    X[start:end, :, feature] = np.where(vol_mean > 0, vol_windows / vol_mean,
+                                                        vol_windows * 0)
+                feature += 1
+
             if news_sentiment is not None:
-                input_sentiment = news_sentiment[i:i+self.seq_len]
-                features.append(input_sentiment)
+                X[start:end, :, feature] = sources[feature][start:end]
 
-            # Stack features
-            if len(features) > 1:
-                X_sample = np.column_stack(features)
-            else:
-                X_sample = input_norm.reshape(-1, 1)
+        if isinstance(X, np.memmap):
+            X.flush()
 
-            X.append(X_sample)
-            y.append(target_norm)
-            metadata.append(meta)
+        return X, y, metadata
 
-        return np.array(X), np.array(y), metadata
+    @staticmethod
+    def _min_max(windows: np.ndarray, window_min: np.ndarray, window_range: np.ndarray) -> np.ndarray:
+        """Scale rows by their input window's min/range; all zeros where the window is flat"""
+        window_min = window_min[:, np.newaxis]
+        window_range = window_range[:, np.newaxis]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(window_range > 0, (windows - window_min) / window_range, windows * 0)
 
     def denormalize_predictions(
         self,
@@ -158,26 +187,36 @@ class VietnamSettlementDataPrep:
         Chuyển predictions từ normalized về giá thực
 
         Args:
-            predictions: Normalized predictions
+            predictions: Normalized predictions (one sample, or [n_samples, ...]
+                         with columnar metadata)
             metadata: Normalization parameters
 
         Returns:
             Denormalized prices
         """
-        price_min = metadata['min']
-        price_range = metadata['range']
+        price_min = np.asarray(metadata['min'], dtype=np.float64)
+        price_range = np.asarray(metadata['range'], dtype=np.float64)
 
-        if price_range > 0:
-            return predictions * price_range + price_min
-        else:
-            return predictions + price_min
+        if price_min.ndim == 0:
+            if price_range > 0:
+                return predictions * price_range + price_min
+            else:
+                return predictions + price_min
+
+        # Columnar metadata: one row of predictions per sample
+        predictions = np.asarray(predictions)
+        extra = (1,) * (predictions.ndim - 1)
+        price_min = price_min.reshape(-1, *extra)
+        price_range = price_range.reshape(-1, *extra)
+        return np.where(price_range > 0, predictions * price_range, predictions) + price_min
 
     def create_training_data_with_features(
         self,
         df: pd.DataFrame,
         price_col: str = 'close',
         volume_col: str = 'volume',
-        sentiment_col: Optional[str] = None
+        sentiment_col: Optional[str] = None,
+        memmap_path: Optional[str] = None
     ) -> Tuple[np.ndarray, np.ndarray, pd.DataFrame]:
         """
         Tạo training data từ DataFrame với full features
@@ -187,6 +226,7 @@ class VietnamSettlementDataPrep:
             price_col: Tên cột giá
             volume_col: Tên cột volume
             sentiment_col: Tên cột sentiment (optional)
+            memmap_path: Write X to a memory-mapped .npy file (optional)
 
         Returns:
             X: Input features
@@ -201,7 +241,8 @@ class VietnamSettlementDataPrep:
             prices=prices,
             volumes=volumes,
             news_sentiment=sentiment,
-            normalize_per_sequence=True
+            normalize_per_sequence=True,
+            memmap_path=memmap_path
         )
 
         # Convert metadata to DataFrame
@@ -14,14 +14,18 @@ Features:
 - Positional encoding for time sequence
 - Ensemble of 3 models for robustness
 - GPU acceleration when available
+- Batched multi-symbol inference (predict_many)
+- TorchScript / ONNX export of the whole ensemble
 
 Reference: "Temporal Fusion Transformer" (Lim et al., 2021)
 """
 
 import numpy as np
 import math
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Sequence
 from dataclasses import dataclass
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -36,6 +40,13 @@ except ImportError:
     TORCH_AVAILABLE = False
     print("⚠️ PyTorch not installed. Run: pip install torch")
 
+# Optional: run exported ensembles with ONNX Runtime
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
 
 @dataclass
 class PredictionResult:
@@ -49,6 +60,15 @@ class PredictionResult:
     model_name: str = "Stockformer"
 
 
+def _rolling(x: np.ndarray, window: int, stat: str) -> np.ndarray:
+    """Trailing-window mean/std along the last axis (0 before the first full window)"""
+    out = np.zeros(x.shape)
+    if window <= x.shape[-1]:
+        windows = sliding_window_view(x, window, axis=-1)
+        out[..., window - 1:] = getattr(windows, stat)(axis=-1)
+    return out
+
+
 if TORCH_AVAILABLE:
     
     class PositionalEncoding(nn.Module):
@@ -214,6 +234,35 @@ if TORCH_AVAILABLE:
             """Predict returns instead of prices"""
             price_forecast, _ = self.forward(x)
             return price_forecast
+    
+    
+    class StackedStockformer(nn.Module):
+        """
+        Ensemble members behind a single module
+        
+        Members differ in depth, so they cannot share one set of stacked
+        weights; this runs each of them on the same batch and stacks the
+        outputs so the whole ensemble is one call (and one exported graph).
+        """
+        
+        def __init__(self, models: List[StockformerPredictor]):
+            super().__init__()
+            self.members = nn.ModuleList(models)
+        
+        def forward(self, x: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+            """
+            x: (batch, seq_len, input_size)
+            returns:
+                - price_forecasts: (n_models, batch, forecast_horizon)
+                - volatility_forecasts: (n_models, batch, forecast_horizon)
+            """
+            price_forecasts = []
+            volatility_forecasts = []
+            for model in self.members:
+                price_forecast, volatility_forecast = model(x)
+                price_forecasts.append(price_forecast)
+                volatility_forecasts.append(volatility_forecast)
+            return torch.stack(price_forecasts), torch.stack(volatility_forecasts)
 
 
 class StockformerEnsemble:
@@ -224,6 +273,10 @@ class StockformerEnsemble:
     - Random seeds
     - Dropout rates
     - Layer configurations
+    
+    All members run in one batched forward pass over many symbols
+    (predict_many); the stacked ensemble can be exported to TorchScript
+    or ONNX and served from the exported file (load_exported).
     """
     
     def __init__(
@@ -231,11 +284,13 @@ class StockformerEnsemble:
         input_size: int = 50,
         forecast_horizon: int = 5,
         n_models: int = 3,
-        device: str = None
+        device: str = None,
+        num_threads: int = None
     ):
         self.input_size = input_size
         self.forecast_horizon = forecast_horizon
         self.n_models = n_models
+        self.num_threads = num_threads
         
         # Device selection
         if device is None:
@@ -245,8 +300,14 @@ class StockformerEnsemble:
         
         # Create models with slightly different configs
         self.models: List[StockformerPredictor] = []
+        self.stacked = None
+        self._exported = None  # Runner for an exported ensemble
         
         if TORCH_AVAILABLE:
+            # Intra-op threads for CPU inference
+            if num_threads:
+                torch.set_num_threads(num_threads)
+            
             for i in range(n_models):
                 model = StockformerPredictor(
                     input_size=input_size,
@@ -258,6 +319,9 @@ class StockformerEnsemble:
                 )
                 model.to(self.device)
                 self.models.append(model)
+            
+            # Shares parameters with self.models
+            self.stacked = StackedStockformer(self.models)
         
         self.is_trained = False
     
@@ -272,72 +336,74 @@ class StockformerEnsemble:
         - RSI, MACD components
         - Volatility features
         """
-        n = len(prices)
+        prices = np.asarray(prices, dtype=np.float64)[np.newaxis]
+        if volumes is not None:
+            volumes = np.asarray(volumes, dtype=np.float64)[np.newaxis]
+        return self.prepare_features_batch(prices, volumes)[0]
+    
+    def prepare_features_batch(self, prices: np.ndarray, volumes: np.ndarray = None) -> np.ndarray:
+        """
+        prepare_features for many symbols with equal-length histories
+        
+        Args:
+            prices: (n_symbols, n_bars) close prices
+            volumes: (n_symbols, n_bars) volumes (optional)
+        
+        Returns:
+            (n_symbols, n_bars, input_size) feature tensor
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        n_symbols, n = prices.shape
         features = []
         
         # Returns
-        returns = np.zeros(n)
-        returns[1:] = np.diff(np.log(prices))
+        returns = np.zeros((n_symbols, n))
+        returns[:, 1:] = np.diff(np.log(prices), axis=1)
         features.append(returns)
         
         # Lagged returns
         for lag in [1, 2, 3, 5, 10, 20]:
-            lagged = np.zeros(n)
+            lagged = np.zeros((n_symbols, n))
             if lag < n:
-                lagged[lag:] = returns[:-lag] if lag > 0 else returns
+                lagged[:, lag:] = returns[:, :-lag]
             features.append(lagged)
         
         # Moving averages (normalized)
+        mask = prices > 0
         for window in [5, 10, 20, 50]:
-            ma = np.zeros(n)
-            for i in range(window-1, n):
-                ma[i] = np.mean(prices[i-window+1:i+1])
+            ma = _rolling(prices, window, 'mean')
             # Normalize: (price - ma) / price
-            ma_norm = np.zeros(n)
-            mask = prices > 0
+            ma_norm = np.zeros((n_symbols, n))
             ma_norm[mask] = (prices[mask] - ma[mask]) / prices[mask]
             features.append(ma_norm)
         
         # Volatility (rolling std of returns)
         for window in [5, 10, 20]:
-            vol = np.zeros(n)
-            for i in range(window-1, n):
-                vol[i] = np.std(returns[i-window+1:i+1])
-            features.append(vol)
+            features.append(_rolling(returns, window, 'std'))
         
         # RSI
         rsi = self._calculate_rsi(prices)
         features.append(rsi / 100)  # Normalize to 0-1
         
         # MACD components
-        ema12 = self._ema(prices, 12)
-        ema26 = self._ema(prices, 26)
-        macd = ema12 - ema26
-        signal = self._ema(macd, 9)
-        macd_norm = np.zeros(n)
-        mask = prices > 0
+        macd = self._ema(prices, 12) - self._ema(prices, 26)
+        macd_norm = np.zeros((n_symbols, n))
         macd_norm[mask] = macd[mask] / prices[mask]
         features.append(macd_norm)
         
         # Volume features (if available)
         if volumes is not None:
-            vol_ma = np.zeros(n)
-            for i in range(19, n):
-                vol_ma[i] = np.mean(volumes[i-19:i+1])
-            vol_ratio = np.ones(n)
-            mask = vol_ma > 0
-            vol_ratio[mask] = volumes[mask] / vol_ma[mask]
+            volumes = np.asarray(volumes, dtype=np.float64)
+            vol_ma = _rolling(volumes, 20, 'mean')
+            vol_ratio = np.ones((n_symbols, n))
+            vol_mask = vol_ma > 0
+            vol_ratio[vol_mask] = volumes[vol_mask] / vol_ma[vol_mask]
             features.append(np.clip(vol_ratio, 0, 5))
         
-        # Stack features
-        feature_matrix = np.column_stack(features)
-        
-        # Pad to input_size
-        if feature_matrix.shape[1] < self.input_size:
-            padding = np.zeros((n, self.input_size - feature_matrix.shape[1]))
-            feature_matrix = np.hstack([feature_matrix, padding])
-        elif feature_matrix.shape[1] > self.input_size:
-            feature_matrix = feature_matrix[:, :self.input_size]
+        # Stack features, padded / truncated to input_size
+        n_features = min(len(features), self.input_size)
+        feature_matrix = np.zeros((n_symbols, n, self.input_size))
+        feature_matrix[:, :, :n_features] = np.stack(features[:n_features], axis=-1)
         
         # Handle NaN/Inf
         feature_matrix = np.nan_to_num(feature_matrix, nan=0.0, posinf=1.0, neginf=-1.0)
@@ -345,35 +411,37 @@ class StockformerEnsemble:
         return feature_matrix
     
     def _calculate_rsi(self, prices: np.ndarray, period: int = 14) -> np.ndarray:
-        """Calculate RSI indicator"""
-        n = len(prices)
-        rsi = np.full(n, 50.0)
-        
-        deltas = np.diff(prices)
+        """Calculate RSI indicator (along the last axis)"""
+        prices = np.asarray(prices, dtype=np.float64)
+        n = prices.shape[-1]
+        rsi = np.full(prices.shape, 50.0)
+        if n <= period:
+            return rsi
+        
+        deltas = np.diff(prices, axis=-1)
         gains = np.where(deltas > 0, deltas, 0)
         losses = np.where(deltas < 0, -deltas, 0)
         
-        for i in range(period, n):
-            avg_gain = np.mean(gains[i-period:i])
-            avg_loss = np.mean(losses[i-period:i])
-            
-            if avg_loss == 0:
-                rsi[i] = 100
-            else:
-                rs = avg_gain / avg_loss
-                rsi[i] = 100 - (100 / (1 + rs))
+        # Window ending before bar i, for i in period..n-1
+        avg_gain = sliding_window_view(gains, period, axis=-1).mean(axis=-1)
+        avg_loss = sliding_window_view(losses, period, axis=-1).mean(axis=-1)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = avg_gain / avg_loss
+            rsi[..., period:] = np.where(avg_loss == 0, 100, 100 - (100 / (1 + rs)))
         
         return rsi
     
     def _ema(self, data: np.ndarray, period: int) -> np.ndarray:
-        """Calculate EMA"""
-        ema = np.zeros(len(data))
-        ema[0] = data[0]
+        """Calculate EMA (along the last axis), seeded with the first value"""
+        data = np.asarray(data, dtype=np.float64)
+        if data.shape[-1] == 0:
+            return np.zeros(data.shape)
         multiplier = 2 / (period + 1)
         
-        for i in range(1, len(data)):
-            ema[i] = (data[i] - ema[i-1]) * multiplier + ema[i-1]
-        
+        # ema[i] = m * x[i] + (1 - m) * ema[i-1], with ema[0] = x[0]
+        zi = (1 - multiplier) * data[..., :1]
+        ema, _ = lfilter([multiplier], [1, multiplier - 1], data, axis=-1, zi=zi)
         return ema
     
     def predict(
@@ -398,71 +466,149 @@ class StockformerEnsemble:
         if not TORCH_AVAILABLE:
             return self._fallback_prediction(symbol, prices)
         
-        # Prepare features
-        features = self.prepare_features(prices, volumes)
+        return self.predict_many(
+            [symbol], [prices], None if volumes is None else [volumes], seq_len
+        )[0]
+    
+    def predict_many(
+        self,
+        symbols: Sequence[str],
+        price_matrix,
+        volume_matrix=None,
+        seq_len: int = 60,
+        batch_size: int = 256
+    ) -> List[PredictionResult]:
+        """
+        Predict many symbols in batched ensemble passes
         
-        # Get last seq_len window
-        if len(features) < seq_len:
-            # Pad with zeros
-            padding = np.zeros((seq_len - len(features), features.shape[1]))
-            features = np.vstack([padding, features])
-        else:
-            features = features[-seq_len:]
+        Args:
+            symbols: Stock tickers
+            price_matrix: (n_symbols, n_bars) close prices, or one price
+                          history per symbol (lengths may differ)
+            volume_matrix: Volumes shaped like price_matrix (optional)
+            seq_len: Lookback window
+            batch_size: Symbols per forward pass
         
-        # Convert to tensor
-        x = torch.FloatTensor(features).unsqueeze(0).to(self.device)
+        Returns:
+            PredictionResult per symbol, in the order of symbols
+        """
+        if not TORCH_AVAILABLE:
+            return [self._fallback_prediction(symbol, np.asarray(prices))
+                    for symbol, prices in zip(symbols, price_matrix)]
         
-        # Ensemble prediction
-        all_price_preds = []
-        all_vol_preds = []
+        if len(symbols) == 0:
+            return []
         
-        for model in self.models:
-            model.eval()
-            with torch.no_grad():
-                price_pred, vol_pred = model(x)
-            all_price_preds.append(price_pred.cpu().numpy())
-            all_vol_preds.append(vol_pred.cpu().numpy())
+        windows, current_prices = self.prepare_windows(price_matrix, volume_matrix, seq_len)
+        price_preds, vol_preds = self._run_ensemble(windows, batch_size)  # (n_models, S, H)
         
         # Average ensemble
-        avg_returns = np.mean(all_price_preds, axis=0)[0]  # (forecast_horizon,)
-        avg_vol = np.mean(all_vol_preds, axis=0)[0]
+        avg_returns = price_preds.mean(axis=0)  # (S, forecast_horizon)
+        avg_vol = vol_preds.mean(axis=0)
         
         # Convert returns to prices
-        current_price = prices[-1]
-        predicted_prices = []
-        last_price = current_price
-        
-        for ret in avg_returns:
-            next_price = last_price * (1 + ret)
-            predicted_prices.append(float(next_price))
-            last_price = next_price
-        
-        # Calculate metrics
-        final_price = predicted_prices[-1]
-        expected_return = (final_price / current_price - 1) * 100
-        
-        # Direction
-        if expected_return > 1:
-            direction = "UP"
-        elif expected_return < -1:
-            direction = "DOWN"
-        else:
-            direction = "SIDEWAYS"
+        growth = np.concatenate([current_prices[:, np.newaxis], 1 + avg_returns], axis=1)
+        predicted_prices = np.cumprod(growth, axis=1)[:, 1:]
+        expected_returns = (predicted_prices[:, -1] / current_prices - 1) * 100
+        
+        # Confidence based on ensemble agreement
+        pred_std = price_preds.std(axis=(0, 2))
+        confidences = np.clip(1 - pred_std * 10, 0.3, 0.95)
+        vol_forecasts = avg_vol.mean(axis=1)
+        
+        results = []
+        for i, symbol in enumerate(symbols):
+            expected_return = expected_returns[i]
+            
+            # Direction
+            if expected_return > 1:
+                direction = "UP"
+            elif expected_return < -1:
+                direction = "DOWN"
+            else:
+                direction = "SIDEWAYS"
+            
+            results.append(PredictionResult(
+                symbol=symbol,
+                current_price=float(current_prices[i]),
+                predictions=predicted_prices[i].tolist(),
+                direction=direction,
+                confidence=float(confidences[i]),
+                expected_return=float(expected_return),
+                volatility_forecast=float(vol_forecasts[i]),
+                model_name="Stockformer Ensemble"
+            ))
+        
+        return results
+    
+    def prepare_windows(
+        self,
+        price_matrix,
+        volume_matrix=None,
+        seq_len: int = 60
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Model inputs for many symbols
         
-        # Confidence based on volatility and ensemble agreement
-        pred_std = np.std(all_price_preds)
-        confidence = max(0.3, min(0.95, 1 - pred_std * 10))
+        Histories of equal length are featurized together; shorter ones
+        than seq_len are left-padded with zeros.
         
-        return PredictionResult(
-            symbol=symbol,
-            current_price=float(current_price),
-            predictions=predicted_prices,
-            direction=direction,
-            confidence=float(confidence),
-            expected_return=float(expected_return),
-            volatility_forecast=float(np.mean(avg_vol)),
-            model_name="Stockformer Ensemble"
-        )
+        Returns:
+            (windows (n_symbols, seq_len, input_size) float32,
+             current prices (n_symbols,))
+        """
+        if isinstance(price_matrix, np.ndarray) and price_matrix.ndim == 2:
+            price_matrix = price_matrix.astype(np.float64, copy=False)
+            if volume_matrix is not None:
+                volume_matrix = np.asarray(volume_matrix, dtype=np.float64)
+            groups = {price_matrix.shape[1]: (np.arange(len(price_matrix)), price_matrix, volume_matrix)}
+            current_prices = price_matrix[:, -1].copy()
+        else:
+            histories = [np.asarray(p, dtype=np.float64) for p in price_matrix]
+            vol_histories = None
+            if volume_matrix is not None:
+                vol_histories = [np.asarray(v, dtype=np.float64) for v in volume_matrix]
+            
+            by_length: Dict[int, List[int]] = {}
+            for i, history in enumerate(histories):
+                by_length.setdefault(len(history), []).append(i)
+            
+            groups = {}
+            for length, idx in by_length.items():
+                volumes = None
+                if vol_histories is not None:
+                    volumes = np.stack([vol_histories[i] for i in idx])
+                groups[length] = (np.array(idx), np.stack([histories[i] for i in idx]), volumes)
+            current_prices = np.array([h[-1] for h in histories], dtype=np.float64)
+        
+        windows = np.zeros((len(current_prices), seq_len, self.input_size), dtype=np.float32)
+        for length, (idx, prices, volumes) in groups.items():
+            # Full history: EMA and rolling features depend on earlier bars
+            features = self.prepare_features_batch(prices, volumes)
+            take = min(length, seq_len)
+            windows[idx, seq_len - take:] = features[:, length - take:]
+        
+        return windows, current_prices
+    
+    def _run_ensemble(self, windows: np.ndarray, batch_size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Stacked ensemble outputs (n_models, n_symbols, forecast_horizon)"""
+        run = self._exported
+        if run is None:
+            self.stacked.eval()
+            run = self._run_stacked
+        
+        price_chunks, vol_chunks = [], []
+        for start in range(0, len(windows), batch_size):
+            price_pred, vol_pred = run(windows[start:start + batch_size])
+            price_chunks.append(price_pred)
+            vol_chunks.append(vol_pred)
+        
+        return np.concatenate(price_chunks, axis=1), np.concatenate(vol_chunks, axis=1)
+    
+    def _run_stacked(self, x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        with torch.inference_mode():
+            price_pred, vol_pred = self.stacked(torch.from_numpy(x).to(self.device))
+        return price_pred.cpu().numpy(), vol_pred.cpu().numpy()
     
     def _fallback_prediction(self, symbol: str, prices: np.ndarray) -> PredictionResult:
         """Simple fallback when PyTorch not available"""
@@ -515,6 +661,77 @@ class StockformerEnsemble:
                 pass
         
         self.is_trained = True
+    
+    def export(self, path: str, format: str = 'torchscript', seq_len: int = 60) -> str:
+        """
+        Export the stacked ensemble for serving
+        
+        Args:
+            path: Output file
+            format: 'torchscript' (traced module) or 'onnx' (dynamic batch axis)
+            seq_len: Lookback window used for tracing
+        
+        Returns:
+            path
+        """
+        if not TORCH_AVAILABLE:
+            raise ImportError("PyTorch not installed. Run: pip install torch")
+        
+        self.stacked.eval()
+        example = torch.zeros(1, seq_len, self.input_size, device=self.device)
+        
+        with torch.no_grad():
+            if format == 'torchscript':
+                traced = torch.jit.trace(self.stacked, example)
+                traced.save(path)
+            elif format == 'onnx':
+                # Needs the onnx package
+                torch.onnx.export(
+                    self.stacked, (example,), path,
+                    input_names=['features'],
+                    output_names=['returns', 'volatility'],
+                    dynamic_axes={
+                        'features': {0: 'batch'},
+                        'returns': {1: 'batch'},
+                        'volatility': {1: 'batch'}
+                    },
+                    opset_version=17
+                )
+            else:
+                raise ValueError(f"Unknown export format: {format}")
+        
+        return path
+    
+    def load_exported(self, path: str):
+        """
+        Serve predict/predict_many from an exported ensemble
+        
+        Files ending in .onnx run on ONNX Runtime, anything else is loaded
+        as TorchScript.
+        """
+        if path.endswith('.onnx'):
+            if not ONNXRUNTIME_AVAILABLE:
+                raise ImportError("onnxruntime not installed. Run: pip install onnxruntime")
+            
+            options = ort.SessionOptions()
+            if self.num_threads:
+                options.intra_op_num_threads = self.num_threads
+            session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+            
+            def run(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+                price_pred, vol_pred = session.run(None, {'features': x})
+                return price_pred, vol_pred
+        else:
+            module = torch.jit.load(path, map_location=self.device)
+            module.eval()
+            
+            def run(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+                with torch.inference_mode():
+                    price_pred, vol_pred = module(torch.from_numpy(x).to(self.device))
+                return price_pred.cpu().numpy(), vol_pred.cpu().numpy()
+        
+        self._exported = run
+        self.is_trained = True
 
 
 # Singleton
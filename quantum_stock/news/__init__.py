@@ -11,6 +11,7 @@ try:
         CafeFNewsSource,
         VietStockNewsSource
     )
+    from .keyword_matcher import KeywordMatch, KeywordMatcher
     
     __all__ = [
         'NewsArticle',
@@ -21,7 +22,9 @@ try:
         'NewsSignalGenerator',
         'NewsTradingEngine',
         'CafeFNewsSource',
-        'VietStockNewsSource'
+        'VietStockNewsSource',
+        'KeywordMatch',
+        'KeywordMatcher'
     ]
 except ImportError:
     __all__ = []
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Keyword Matcher for News Text
+=============================
+Finds stock symbols and weighted lexicon keywords in one pass
+
+All patterns are compiled once into a single regex whose alternation is
+laid out as a trie, so scanning an article costs O(text length) however
+many tickers (e.g. the full HOSE/HNX/UPCOM list) and keywords are loaded.
+
+Matching rules (same as the per-keyword checks it replaces):
+- symbols are case-insensitive whole words (like re.search(r'\\bFPT\\b'))
+- keywords are case-insensitive substrings; overlapping keywords all count
+  ('tăng trưởng' also hits 'tăng')
+- each distinct keyword counts once per text
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+
+@dataclass
+class KeywordMatch:
+    """Result of one pass over a text"""
+    symbols: List[str] = field(default_factory=list)          # in the matcher's symbol order
+    keywords: Dict[str, List[str]] = field(default_factory=dict)  # category -> hits in text order
+    scores: Dict[str, float] = field(default_factory=dict)     # category -> summed keyword weights
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation for `words` with shared prefixes factored out"""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        optional = '' in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')' + ('?' if optional else '')
+
+    return build(trie)
+
+
+def _is_word_char(ch: str) -> bool:
+    # Same definition as \w for str patterns
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordMatcher:
+    """
+    Single-pass matcher for tickers and keyword lexicons
+
+    Usage:
+        matcher = KeywordMatcher(
+            symbols=['VCB', 'FPT'],
+            lexicons={'bullish': ['tăng', 'lợi nhuận'],
+                      'bearish': {'giảm': 1.0, 'phá sản': 3.0}}
+        )
+        result = matcher.match(text)
+        result.symbols, result.keywords['bullish'], result.scores['bearish']
+    """
+
+    def __init__(self, symbols: Iterable[str] = (),
+                 lexicons: Optional[Mapping[str, Union[Iterable[str], Mapping[str, float]]]] = None):
+        """
+        Args:
+            symbols: Tickers, matched as whole words; results keep this order
+            lexicons: category -> keywords (weight 1 each) or keyword -> weight
+        """
+        self.symbols = list(dict.fromkeys(symbols))
+        self._symbol_rank = {s.lower(): i for i, s in reversed(list(enumerate(self.symbols)))}
+
+        self.lexicons: Dict[str, Dict[str, float]] = {}
+        for category, words in (lexicons or {}).items():
+            weights = words.items() if isinstance(words, Mapping) else ((w, 1.0) for w in words)
+            lexicon: Dict[str, float] = {}
+            for word, weight in weights:
+                lexicon[word.lower()] = lexicon.get(word.lower(), 0.0) + float(weight)
+            self.lexicons[category] = lexicon
+
+        # pattern -> [(category, weight)]; category None marks a symbol
+        self._entries: Dict[str, List[Tuple[Optional[str], float]]] = {}
+        for symbol in self._symbol_rank:
+            self._entries.setdefault(symbol, []).append((None, 1.0))
+        for category, lexicon in self.lexicons.items():
+            for word, weight in lexicon.items():
+                if word:
+                    self._entries.setdefault(word, []).append((category, weight))
+
+        # The regex reports the longest pattern at each position; every
+        # pattern that is a prefix of it matches there too
+        self._prefixes = {
+            entry: [entry[:i] for i in range(1, len(entry) + 1) if entry[:i] in self._entries]
+            for entry in self._entries
+        }
+        self._pattern = re.compile('(?=(' + _trie_pattern(self._entries) + '))') \
+            if self._entries else None
+
+    def match(self, text: str) -> KeywordMatch:
+        """Find symbols and keyword hits in `text` in one pass"""
+        keywords: Dict[str, List[str]] = {category: [] for category in self.lexicons}
+        result = KeywordMatch(keywords=keywords,
+                              scores={category: 0.0 for category in self.lexicons})
+        if self._pattern is None or not text:
+            return result
+
+        lowered = text.lower()
+        found_symbols = set()
+        found = set()
+
+        for m in self._pattern.finditer(lowered):
+            start = m.start()
+            for entry in self._prefixes[m.group(1)]:
+                for category, weight in self._entries[entry]:
+                    if category is None:
+                        end = start + len(entry)
+                        if (start == 0 or not _is_word_char(lowered[start - 1])) and \
+                                (end == len(lowered) or not _is_word_char(lowered[end])):
+                            found_symbols.add(entry)
+                    elif (category, entry) not in found:
+                        found.add((category, entry))
+                        keywords[category].append(entry)
+                        result.scores[category] += weight
+
+        result.symbols = [self.symbols[self._symbol_rank[s]]
+                          for s in sorted(found_symbols, key=self._symbol_rank.__getitem__)]
+        return result
+
+    def find_symbols(self, text: str) -> List[str]:
+        """Symbols mentioned in `text`"""
+        return self.match(text).symbols
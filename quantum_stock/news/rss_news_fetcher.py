@@ -3,15 +3,44 @@
 RSS News Fetcher for Vietnamese Stock Market
 =============================================
 Fetches real news from CafeF, VnExpress, VietStock RSS feeds
+
+Ingestion:
+- fetch_all_feeds_async() downloads all feeds concurrently (aiohttp when
+  installed, worker threads otherwise) without blocking the event loop
+- conditional GET: ETag / Last-Modified are sent back, a 304 reuses the
+  entries already parsed for that feed
+- entries are keyed by GUID (or URL hash); parsed items are cached so an
+  entry is scored once; only new_only=True calls move keys into the
+  persistent seen-set, so it returns each article once, across restarts,
+  however often plain fetches (e.g. /api/news) read the same feeds
 """
 
+import asyncio
 import feedparser
+import hashlib
 import re
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from pathlib import Path
 import logging
 
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    from ..utils.journal import Journal
+except ImportError:
+    from utils.journal import Journal
+
+try:
+    from .keyword_matcher import KeywordMatch, KeywordMatcher
+except ImportError:
+    from keyword_matcher import KeywordMatch, KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -61,50 +90,277 @@ class VNStockNewsFetcher:
         'giảm sút', 'yếu', 'mất', 'thiệt hại', 'vấn đề'
     ]
 
-    def __init__(self):
-        self.cache = {}
+    def __init__(self, feeds: Optional[Dict[str, str]] = None,
+                 state_path: Optional[str] = 'data/news/seen_entries.json',
+                 max_seen: int = 50000, max_cached: int = 2000,
+                 timeout: float = 15.0, symbols: Optional[List[str]] = None):
+        """
+        Args:
+            feeds: source name -> feed URL (default: RSS_FEEDS)
+            state_path: Seen-set snapshot file (None = keep it in memory)
+            max_seen: Entry keys remembered before the oldest are dropped
+            max_cached: Parsed entries kept in memory
+            timeout: Per-request timeout in seconds
+            symbols: Tickers to detect, e.g. the full exchange list
+                     (default: STOCK_KEYWORDS)
+        """
+        self.feeds = dict(feeds) if feeds is not None else dict(self.RSS_FEEDS)
+        self.max_seen = max_seen
+        self.max_cached = max_cached
+        self.timeout = timeout
+        self.matcher = KeywordMatcher(
+            symbols=symbols if symbols is not None else self.STOCK_KEYWORDS,
+            lexicons={
+                'stock': self.STOCK_RELATED_KEYWORDS,
+                'bullish': self.BULLISH_KEYWORDS,
+                'bearish': self.BEARISH_KEYWORDS,
+            }
+        )
+
+        self.cache: "OrderedDict[str, Optional[Dict]]" = OrderedDict()  # entry key -> parsed item
+        self.validators: Dict[str, Dict[str, str]] = {}  # feed url -> etag / modified
         self.last_fetch = None
+        self.stats = {'requests': 0, 'not_modified': 0, 'scored': 0, 'new': 0}
+
+        self._feed_keys: Dict[str, List[str]] = {}  # source -> entry keys of its last download
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._journal = Journal(state_path, snapshot=self._snapshot) if state_path else None
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Seen-set persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        """Load the seen-set from persistent storage"""
+        if self._journal is None:
+            return
+        try:
+            state, records = self._journal.load()
+            if state:
+                self._add_seen(state.get('seen', []))
+            for record in records:
+                if record.get('op') == 'seen':
+                    self._add_seen(record['keys'])
+        except Exception as e:
+            logger.error(f"Error loading news seen-set: {e}")
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """Full state for journal compaction"""
+        return {
+            'seen': list(self._seen),
+            'last_updated': datetime.now().isoformat()
+        }
+
+    def _add_seen(self, keys: List[str]):
+        for key in keys:
+            self._seen[key] = None
+        while len(self._seen) > self.max_seen:
+            self._seen.popitem(last=False)
+
+    def _mark_seen(self, keys: List[str]):
+        """Record newly seen entry keys"""
+        if not keys:
+            return
+        self._add_seen(keys)
+        if self._journal is not None:
+            try:
+                self._journal.append({'op': 'seen', 'keys': keys})
+            except Exception as e:
+                logger.error(f"Error saving news seen-set: {e}")
+
+    def close(self):
+        """Flush the seen-set journal"""
+        if self._journal is not None:
+            self._journal.close()
+
+    # ------------------------------------------------------------------
+    # Fetching
+    # ------------------------------------------------------------------
 
     def fetch_all_feeds(self, max_items: int = 20) -> List[Dict]:
         """Fetch news from all RSS feeds"""
-        all_news = []
+        all_news = {}
 
-        for source, feed_url in self.RSS_FEEDS.items():
+        for source, feed_url in self.feeds.items():
             try:
-                news_items = self._fetch_feed(source, feed_url, max_items)
-                all_news.extend(news_items)
+                news_items = self._fetch_feed_items(source, feed_url, max_items)
+                all_news.update(news_items)
                 logger.info(f"✅ Fetched {len(news_items)} items from {source}")
             except Exception as e:
                 logger.error(f"❌ Failed to fetch {source}: {e}")
                 continue
 
-        # Sort by publish date (newest first)
-        all_news.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
+        self.last_fetch = datetime.now()
+        return self._newest_first(list(all_news.values()))[:max_items]
+
+    async def fetch_all_feeds_async(self, max_items: int = 20, new_only: bool = False) -> List[Dict]:
+        """
+        Fetch news from all RSS feeds concurrently
+
+        Args:
+            max_items: Entries read per feed and, unless new_only, items returned
+            new_only: Return only items not seen before (all of them, so none
+                      are dropped between ticks)
+
+        Returns:
+            Parsed news items, newest first
+        """
+        sources = list(self.feeds.items())
+
+        if AIOHTTP_AVAILABLE:
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                downloads = await asyncio.gather(
+                    *(self._download_async(session, url) for _, url in sources),
+                    return_exceptions=True
+                )
+        else:
+            downloads = await asyncio.gather(
+                *(asyncio.to_thread(self._download, url) for _, url in sources),
+                return_exceptions=True
+            )
+
+        all_news, new_news = {}, []
+        for (source, feed_url), result in zip(sources, downloads):
+            if isinstance(result, BaseException):
+                logger.error(f"❌ Failed to fetch {source}: {result}")
+                continue
+            try:
+                news_items, new_items = self._ingest(source, feed_url, *result, max_items,
+                                                     mark_seen=new_only)
+            except Exception as e:
+                logger.error(f"Error parsing {source}: {e}")
+                continue
+            all_news.update(news_items)
+            new_news.extend(new_items)
+            logger.info(f"✅ Fetched {len(news_items)} items ({len(new_items)} new) from {source}")
 
-        return all_news[:max_items]
+        self.last_fetch = datetime.now()
+        if new_only:
+            return self._newest_first(new_news)
+        return self._newest_first(list(all_news.values()))[:max_items]
 
     def _fetch_feed(self, source: str, feed_url: str, max_items: int = 10) -> List[Dict]:
         """Fetch news from a single RSS feed"""
-        news_items = []
-
         try:
-            # Parse RSS feed
-            feed = feedparser.parse(feed_url)
+            return list(self._fetch_feed_items(source, feed_url, max_items).values())
+        except Exception as e:
+            logger.error(f"Error parsing {source}: {e}")
+            return []
 
-            if not feed.entries:
-                logger.warning(f"No entries found in {source}")
-                return []
+    def _fetch_feed_items(self, source: str, feed_url: str, max_items: int) -> Dict[str, Dict]:
+        news_items, _ = self._ingest(source, feed_url, *self._download(feed_url), max_items)
+        return news_items
 
-            # Process each entry
+    def _download(self, feed_url: str) -> Tuple[Optional[Any], Dict[str, str]]:
+        """
+        Conditional GET through feedparser
+
+        Returns:
+            (parsed feed or None when not modified, new validators)
+        """
+        validator = self.validators.get(feed_url, {})
+        self.stats['requests'] += 1
+        feed = feedparser.parse(feed_url, etag=validator.get('etag'),
+                                modified=validator.get('modified'))
+        if feed.get('status') == 304:
+            return None, validator
+        return feed, {'etag': feed.get('etag'), 'modified': feed.get('modified')}
+
+    async def _download_async(self, session, feed_url: str) -> Tuple[Optional[Any], Dict[str, str]]:
+        """Conditional GET through aiohttp; the body is parsed in a worker thread"""
+        validator = self.validators.get(feed_url, {})
+        headers = {}
+        if validator.get('etag'):
+            headers['If-None-Match'] = validator['etag']
+        if validator.get('modified'):
+            headers['If-Modified-Since'] = validator['modified']
+
+        self.stats['requests'] += 1
+        async with session.get(feed_url, headers=headers) as response:
+            if response.status == 304:
+                return None, validator
+            response.raise_for_status()
+            body = await response.read()
+            new_validator = {'etag': response.headers.get('ETag'),
+                             'modified': response.headers.get('Last-Modified')}
+            content_type = response.headers.get('Content-Type', '')
+            base_url = str(response.url)
+
+        # Same base URL as feedparser.parse(url), so relative GUIDs resolve
+        # (and key) identically on the sync and async paths
+        feed = await asyncio.to_thread(feedparser.parse, body,
+                                       response_headers={'content-type': content_type,
+                                                         'content-location': base_url})
+        return feed, new_validator
+
+    def _ingest(self, source: str, feed_url: str, feed, validator: Dict[str, str],
+                max_items: int, mark_seen: bool = False) -> Tuple[Dict[str, Dict], List[Dict]]:
+        """
+        Turn a downloaded feed into news items
+
+        Entries already in the cache are not parsed or scored again.
+
+        Args:
+            mark_seen: Add the entries to the seen-set (new_only consumers);
+                       plain fetches leave it untouched
+
+        Returns:
+            (entry key -> stock news item, items not seen before)
+        """
+        if feed is None:
+            # 304: the feed still holds the entries parsed last time, which
+            # may not have been marked seen yet (a plain fetch downloaded them)
+            self.stats['not_modified'] += 1
+            keys = self._feed_keys.get(source, [])
+        elif not feed.entries:
+            logger.warning(f"No entries found in {source}")
+            return {}, []
+        else:
+            keys = []
             for entry in feed.entries[:max_items]:
-                news_item = self._parse_entry(entry, source)
+                key = self._entry_key(entry)
+                keys.append(key)
+
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                else:
+                    self.cache[key] = self._parse_entry(entry, source)
+                    self.stats['scored'] += 1
+                    if len(self.cache) > self.max_cached:
+                        self.cache.popitem(last=False)
+
+            self._feed_keys[source] = keys
+            if validator.get('etag') or validator.get('modified'):
+                self.validators[feed_url] = validator
+
+        news_items, new_items, new_keys = {}, [], []
+        for key in keys:
+            news_item = self.cache.get(key)
+            if key not in self._seen:
+                new_keys.append(key)
                 if news_item:
-                    news_items.append(news_item)
+                    new_items.append(news_item)
+            if news_item:
+                news_items[key] = news_item
 
-        except Exception as e:
-            logger.error(f"Error parsing {source}: {e}")
+        if mark_seen:
+            self._mark_seen(new_keys)
+            self.stats['new'] += len(new_items)
 
-        return news_items
+        return news_items, new_items
+
+    @staticmethod
+    def _entry_key(entry) -> str:
+        """Stable entry key: hash of the GUID, else of the link (or title)"""
+        ident = entry.get('id') or entry.get('link') or entry.get('title', '')
+        return hashlib.sha1(ident.encode('utf-8')).hexdigest()[:20]
+
+    @staticmethod
+    def _newest_first(news: List[Dict]) -> List[Dict]:
+        # Sort by publish date (newest first)
+        return sorted(news, key=lambda x: x.get('timestamp', ''), reverse=True)
 
     def _parse_entry(self, entry, source: str) -> Optional[Dict]:
         """Parse a single RSS entry"""
@@ -118,14 +374,13 @@ class VNStockNewsFetcher:
             summary = re.sub(r'<[^>]+>', '', summary)
             summary = summary[:300]  # Limit length
 
-            # ===== STRICT FILTER: Stock-related news only =====
-            full_text = (title + ' ' + summary).lower()
-
-            # Check 1: Must have stock symbols OR stock-related keywords
-            has_stock_symbol = self._has_stock_symbols(full_text)
-            has_stock_keywords = self._has_stock_keywords(full_text)
+            # One pass finds symbols, stock keywords and sentiment words
+            text = title + ' ' + summary
+            match = self.matcher.match(text)
 
-            if not (has_stock_symbol or has_stock_keywords):
+            # ===== STRICT FILTER: Stock-related news only =====
+            # Must have stock symbols OR stock-related keywords
+            if not (match.symbols or match.keywords['stock']):
                 # Skip non-stock news (like "giá bạc", "mì ăn liền", etc.)
                 logger.debug(f"Skipping non-stock news: {title[:50]}")
                 return None
@@ -137,11 +392,11 @@ class VNStockNewsFetcher:
             except:
                 pub_date = datetime.now()
 
-            # Extract stock symbols mentioned
-            symbols = self._extract_symbols(title + ' ' + summary)
+            # Stock symbols mentioned
+            symbols = match.symbols
 
             # Analyze sentiment
-            sentiment_score = self._analyze_sentiment(title + ' ' + summary)
+            sentiment_score = self._sentiment_score(match)
             sentiment = 'bullish' if sentiment_score > 0.6 else 'bearish' if sentiment_score < 0.4 else 'neutral'
 
             # Calculate confidence based on keyword matches
@@ -174,40 +429,24 @@ class VNStockNewsFetcher:
 
     def _has_stock_symbols(self, text: str) -> bool:
         """Check if text contains any stock symbols"""
-        text_upper = text.upper()
-        for symbol in self.STOCK_KEYWORDS:
-            pattern = r'\b' + symbol + r'\b'
-            if re.search(pattern, text_upper):
-                return True
-        return False
+        return bool(self.matcher.find_symbols(text))
 
     def _has_stock_keywords(self, text: str) -> bool:
         """Check if text contains stock-related keywords"""
-        text_lower = text.lower()
-        for keyword in self.STOCK_RELATED_KEYWORDS:
-            if keyword in text_lower:
-                return True
-        return False
+        return bool(self.matcher.match(text).keywords['stock'])
 
     def _extract_symbols(self, text: str) -> List[str]:
         """Extract stock symbols from text"""
-        symbols = []
-        text_upper = text.upper()
-
-        for symbol in self.STOCK_KEYWORDS:
-            # Look for symbol as whole word
-            pattern = r'\b' + symbol + r'\b'
-            if re.search(pattern, text_upper):
-                symbols.append(symbol)
-
-        return symbols
+        return self.matcher.find_symbols(text)
 
     def _analyze_sentiment(self, text: str) -> float:
         """Analyze sentiment score (0.0 = bearish, 1.0 = bullish)"""
-        text_lower = text.lower()
+        return self._sentiment_score(self.matcher.match(text))
 
-        bullish_count = sum(1 for word in self.BULLISH_KEYWORDS if word in text_lower)
-        bearish_count = sum(1 for word in self.BEARISH_KEYWORDS if word in text_lower)
+    @staticmethod
+    def _sentiment_score(match: KeywordMatch) -> float:
+        bullish_count = match.scores['bullish']
+        bearish_count = match.scores['bearish']
 
         total_count = bullish_count + bearish_count
 
@@ -16,6 +16,11 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from enum import Enum
 
+try:
+    from .keyword_matcher import KeywordMatcher
+except ImportError:
+    from keyword_matcher import KeywordMatcher
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -249,17 +254,31 @@ class SentimentAnalyzer:
         self.use_llm = use_llm
         self.llm_api_key = llm_api_key
     
+    @classmethod
+    def _keyword_matcher(cls) -> KeywordMatcher:
+        """Matcher for the class lexicons, built once per class"""
+        if cls.__dict__.get('_matcher') is None:
+            def weights(keywords, strong):
+                # Strong keywords have extra weight
+                lexicon = dict.fromkeys(keywords, 1.0)
+                for kw in strong:
+                    lexicon[kw] = lexicon.get(kw, 0.0) + 2.0
+                return lexicon
+            
+            cls._matcher = KeywordMatcher(lexicons={
+                'positive': weights(cls.POSITIVE_KEYWORDS, cls.STRONG_POSITIVE),
+                'negative': weights(cls.NEGATIVE_KEYWORDS, cls.STRONG_NEGATIVE),
+            })
+        return cls._matcher
+    
     def analyze(self, article: NewsArticle, symbol: str = None) -> SentimentResult:
         """Analyze sentiment of article"""
-        text = f"{article.title} {article.content}".lower()
-        
-        # Count keyword matches
-        positive_count = sum(1 for kw in self.POSITIVE_KEYWORDS if kw in text)
-        negative_count = sum(1 for kw in self.NEGATIVE_KEYWORDS if kw in text)
+        text = f"{article.title} {article.content}"
         
-        # Strong keywords have extra weight
-        positive_count += sum(2 for kw in self.STRONG_POSITIVE if kw in text)
-        negative_count += sum(2 for kw in self.STRONG_NEGATIVE if kw in text)
+        # Weighted keyword matches, one pass over the text
+        match = self._keyword_matcher().match(text)
+        positive_count = match.scores['positive']
+        negative_count = match.scores['negative']
         
         # Calculate score (-1 to 1)
         total = positive_count + negative_count
@@ -282,11 +301,8 @@ class SentimentAnalyzer:
         else:
             level = SentimentLevel.NEUTRAL
         
-        # Extract matching keywords
-        matched_keywords = []
-        for kw in self.POSITIVE_KEYWORDS | self.NEGATIVE_KEYWORDS:
-            if kw in text:
-                matched_keywords.append(kw)
+        # Matching keywords
+        matched_keywords = list(dict.fromkeys(match.keywords['positive'] + match.keywords['negative']))
         
         return SentimentResult(
             article_id=article.id,
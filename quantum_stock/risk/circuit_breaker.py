@@ -12,6 +12,7 @@ Levels:
 
 Features:
 - Real-time P/L monitoring
+- Per-tick parametric VaR limit (with a covariance engine attached)
 - Auto position reduction
 - Agent rollback on poor performance
 - Human escalation for emergencies
@@ -61,6 +62,7 @@ class CircuitBreakerState:
     last_trigger_time: Optional[datetime] = None
     trigger_count_today: int = 0
     is_trading_allowed: bool = True
+    daily_var_percent: float = 0.0
     message: str = "System operating normally"
 
 
@@ -84,6 +86,10 @@ class CircuitBreakerSystem:
     EMERGENCY_DRAWDOWN = -0.10  # -10%
     SINGLE_POSITION_LOSS = -0.05  # -5%
     
+    # Parametric 1-day VaR limit (checked when a risk engine is attached)
+    CAUTION_DAILY_VAR = 0.04  # 4% of portfolio
+    VAR_CONFIDENCE = 0.99
+    
     # Position Size Multipliers
     CAUTION_POSITION_MULT = 0.5
     HALT_POSITION_MULT = 0.0
@@ -95,8 +101,17 @@ class CircuitBreakerSystem:
     def __init__(
         self,
         initial_portfolio_value: float = 1_000_000_000,  # 1 billion VND
-        state_file: Optional[str] = None
+        state_file: Optional[str] = None,
+        risk_engine=None
     ):
+        """
+        Args:
+            initial_portfolio_value: Start-of-day portfolio value (VND)
+            state_file: JSON file for persisted state
+            risk_engine: core.covariance_engine.CovarianceEngine over the
+                         traded symbols (may be shared); enables the VaR
+                         check on every position update
+        """
         self.initial_portfolio_value = initial_portfolio_value
         self.state = CircuitBreakerState(
             peak_portfolio_value=initial_portfolio_value,
@@ -107,6 +122,11 @@ class CircuitBreakerSystem:
         self.alert_callbacks: List[Callable] = []
         self.state_file = state_file or "circuit_breaker_state.json"
         
+        # Position values (VND) held in our own view on the (possibly shared) engine
+        self.risk_engine = risk_engine
+        self.risk_portfolio = risk_engine.portfolio() if risk_engine is not None else None
+        self._exposures: Dict[str, float] = {}
+        
         # Load previous state if exists
         self._load_state()
         
@@ -172,6 +192,28 @@ class CircuitBreakerSystem:
                 CircuitBreakerLevel.CAUTION,
                 f"Single position {symbol} loss exceeds {self.SINGLE_POSITION_LOSS*100}%"
             )
+        
+        if self.risk_engine is not None:
+            self._check_var(symbol)
+    
+    def _check_var(self, symbol: str):
+        """Update the symbol's exposure in the risk portfolio (O(N)) and check the VaR limit"""
+        if symbol not in self.risk_engine.assets:
+            return
+        pos = self.positions.get(symbol)
+        exposure = pos.quantity * pos.current_price if pos else 0.0
+        self.risk_portfolio.adjust_weight(symbol, exposure - self._exposures.get(symbol, 0.0))
+        self._exposures[symbol] = exposure
+        
+        if self.state.current_portfolio_value <= 0:
+            return
+        var_value = self.risk_portfolio.var(self.VAR_CONFIDENCE, days=1)
+        self.state.daily_var_percent = var_value / self.state.current_portfolio_value
+        if self.state.daily_var_percent > self.CAUTION_DAILY_VAR:
+            self._trigger_level(
+                CircuitBreakerLevel.CAUTION,
+                f"1-day VaR {self.state.daily_var_percent*100:.2f}% exceeds {self.CAUTION_DAILY_VAR*100}%"
+            )
     
     def record_trade(self, symbol: str, side: str, quantity: int, price: float, pnl: float):
         """Record completed trade"""
@@ -296,6 +338,9 @@ class CircuitBreakerSystem:
         
         # Mark positions as liquidated
         self.positions = {}
+        self._exposures = {}
+        if self.risk_portfolio is not None:
+            self.risk_portfolio.set_weights({})
     
     def _monitoring_loop(self):
         """Background monitoring loop"""
@@ -363,6 +408,7 @@ class CircuitBreakerSystem:
             "daily_pnl": round(self.state.daily_pnl, 2),
             "daily_pnl_percent": round(self.state.daily_pnl_percent * 100, 2),
             "max_drawdown": round(self.state.max_drawdown * 100, 2),
+            "daily_var_percent": round(self.state.daily_var_percent * 100, 2),
             "position_multiplier": self.state.position_multiplier,
             "is_trading_allowed": self.state.is_trading_allowed,
             "message": self.state.message
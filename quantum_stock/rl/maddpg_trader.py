@@ -15,6 +15,8 @@ Agents (8 total):
 8. Portfolio Optimizer - Asset allocation
 
 Framework: CTDE (Centralized Training, Decentralized Execution)
+Batched mode: BatchedMarketEnv + MADDPGTrader.run_batched step many
+symbols / episodes at once for offline training.
 Reference: "Improved MADDPG for Cooperative-Competitive" (Qi et al., 2024)
 """
 
@@ -22,11 +24,15 @@ import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass, field
 from enum import Enum
-from collections import deque
 import random
 import json
 from datetime import datetime
 
+try:
+    from .prioritized_replay import PrioritizedReplayBuffer, TransitionStorage, TransitionBatch
+except ImportError:
+    from prioritized_replay import PrioritizedReplayBuffer, TransitionStorage, TransitionBatch
+
 # Check for PyTorch
 try:
     import torch
@@ -73,11 +79,38 @@ class MarketState:
     timestamp: datetime = field(default_factory=datetime.now)
 
 
+@dataclass
+class MarketBatch:
+    """Market observations for many symbols / episodes at once"""
+    prices: np.ndarray      # (batch, time)
+    returns: np.ndarray     # (batch, time') - usually diff(log(prices))
+    volatility: np.ndarray  # (batch,)
+    trend: np.ndarray       # (batch,) -1 to 1
+    sentiment: np.ndarray   # (batch,) -1 to 1
+    
+    @classmethod
+    def from_states(cls, states: List[MarketState]) -> 'MarketBatch':
+        """Stack MarketStates whose price/return histories have equal lengths"""
+        return cls(
+            prices=np.stack([np.asarray(s.prices, dtype=np.float64) for s in states]),
+            returns=np.stack([np.asarray(s.returns, dtype=np.float64) for s in states]),
+            volatility=np.array([s.volatility for s in states], dtype=np.float64),
+            trend=np.array([s.trend for s in states], dtype=np.float64),
+            sentiment=np.array([s.sentiment for s in states], dtype=np.float64)
+        )
+    
+    def __len__(self):
+        return len(self.prices)
+
+
 class ReplayBuffer:
-    """Experience replay buffer for MADDPG training"""
+    """Experience replay buffer for MADDPG training (uniform sampling)"""
     
     def __init__(self, capacity: int = 100000):
-        self.buffer = deque(maxlen=capacity)
+        self.capacity = capacity
+        self.storage = TransitionStorage(capacity)
+        self.write_idx = 0
+        self.n_entries = 0
     
     def add(
         self,
@@ -87,13 +120,34 @@ class ReplayBuffer:
         next_states: Dict[str, np.ndarray],
         dones: Dict[str, bool]
     ):
-        self.buffer.append((states, actions, rewards, next_states, dones))
+        self.storage.write(self.write_idx, states, actions, rewards, next_states, dones)
+        self.write_idx = (self.write_idx + 1) % self.capacity
+        self.n_entries = min(self.n_entries + 1, self.capacity)
+    
+    def add_batch(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        dones: np.ndarray,
+        agent_names: List[str] = None
+    ):
+        """Add many flattened transitions (see TransitionStorage.write_batch)"""
+        n = min(len(rewards), self.capacity)
+        slots = (self.write_idx + np.arange(n)) % self.capacity
+        self.storage.write_batch(slots, states[-n:], actions[-n:], rewards[-n:],
+                                 next_states[-n:], dones[-n:], agent_names)
+        self.write_idx = (self.write_idx + n) % self.capacity
+        self.n_entries = min(self.n_entries + n, self.capacity)
     
-    def sample(self, batch_size: int) -> List[Tuple]:
-        return random.sample(self.buffer, min(batch_size, len(self.buffer)))
+    def sample(self, batch_size: int) -> TransitionBatch:
+        """Distinct transitions drawn uniformly"""
+        idx = np.random.choice(self.n_entries, min(batch_size, self.n_entries), replace=False)
+        return self.storage.gather(idx)
     
     def __len__(self):
-        return len(self.buffer)
+        return self.n_entries
 
 
 if TORCH_AVAILABLE:
@@ -198,68 +252,67 @@ class TradingAgent:
         
         Each role focuses on different aspects of the market
         """
-        base_features = []
+        return self.process_states(MarketBatch.from_states([market_state]))[0]
+    
+    def process_states(self, batch: MarketBatch) -> np.ndarray:
+        """
+        process_state for a whole batch
+        
+        Returns:
+            (batch, state_dim) float32 features
+        """
+        prices, returns = batch.prices, batch.returns
+        n_prices, n_returns = prices.shape[1], returns.shape[1]
+        features = np.zeros((len(batch), self.state_dim), dtype=np.float32)
+        base = np.zeros((len(batch), 6))
         
         # Common features
-        if len(market_state.returns) >= 20:
-            base_features.extend([
-                np.mean(market_state.returns[-5:]),   # Short-term return
-                np.mean(market_state.returns[-20:]),  # Medium-term return
-                market_state.volatility,
-                market_state.trend,
-                market_state.sentiment
-            ])
-        else:
-            base_features = [0.0] * 5
+        if n_returns >= 20:
+            base[:, 0] = returns[:, -5:].mean(axis=1)   # Short-term return
+            base[:, 1] = returns[:, -20:].mean(axis=1)  # Medium-term return
+            base[:, 2] = batch.volatility
+            base[:, 3] = batch.trend
+            base[:, 4] = batch.sentiment
         
         # Role-specific features
-        if self.role == AgentRole.MOMENTUM:
-            # Focus on trend indicators
-            if len(market_state.prices) >= 50:
-                ma20 = np.mean(market_state.prices[-20:])
-                ma50 = np.mean(market_state.prices[-50:])
-                momentum = (ma20 - ma50) / ma50 if ma50 > 0 else 0
-                base_features.append(momentum)
-            else:
-                base_features.append(0.0)
-                
-        elif self.role == AgentRole.MEAN_REVERSION:
-            # Focus on deviation from mean
-            if len(market_state.prices) >= 20:
-                mean_price = np.mean(market_state.prices[-20:])
-                std_price = np.std(market_state.prices[-20:])
-                z_score = (market_state.prices[-1] - mean_price) / (std_price + 1e-10)
-                base_features.append(np.clip(z_score, -3, 3) / 3)
-            else:
-                base_features.append(0.0)
-                
-        elif self.role == AgentRole.VOLATILITY:
-            # Focus on volatility regime
-            if len(market_state.returns) >= 50:
-                recent_vol = np.std(market_state.returns[-10:])
-                historical_vol = np.std(market_state.returns[-50:])
-                vol_ratio = recent_vol / (historical_vol + 1e-10)
-                base_features.append(np.clip(vol_ratio, 0.5, 2) - 1)
-            else:
-                base_features.append(0.0)
-                
-        elif self.role == AgentRole.RISK_MANAGER:
-            # Focus on drawdown and risk metrics
-            if len(market_state.prices) >= 20:
-                peak = np.max(market_state.prices[-20:])
-                drawdown = (market_state.prices[-1] - peak) / peak
-                base_features.append(drawdown)
-            else:
-                base_features.append(0.0)
-        else:
-            base_features.append(0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.role == AgentRole.MOMENTUM:
+                # Focus on trend indicators
+                if n_prices >= 50:
+                    ma20 = prices[:, -20:].mean(axis=1)
+                    ma50 = prices[:, -50:].mean(axis=1)
+                    base[:, 5] = np.where(ma50 > 0, (ma20 - ma50) / ma50, 0)
+                    
+            elif self.role == AgentRole.MEAN_REVERSION:
+                # Focus on deviation from mean
+                if n_prices >= 20:
+                    z_score = self._z_scores(prices)
+                    base[:, 5] = np.clip(z_score, -3, 3) / 3
+                    
+            elif self.role == AgentRole.VOLATILITY:
+                # Focus on volatility regime
+                if n_returns >= 50:
+                    recent_vol = returns[:, -10:].std(axis=1)
+                    historical_vol = returns[:, -50:].std(axis=1)
+                    vol_ratio = recent_vol / (historical_vol + 1e-10)
+                    base[:, 5] = np.clip(vol_ratio, 0.5, 2) - 1
+                    
+            elif self.role == AgentRole.RISK_MANAGER:
+                # Focus on drawdown and risk metrics
+                if n_prices >= 20:
+                    peak = prices[:, -20:].max(axis=1)
+                    base[:, 5] = (prices[:, -1] - peak) / peak
         
         # Pad to state_dim
-        features = np.array(base_features, dtype=np.float32)
-        if len(features) < self.state_dim:
-            features = np.pad(features, (0, self.state_dim - len(features)))
-        
-        return features[:self.state_dim]
+        n = min(6, self.state_dim)
+        features[:, :n] = base[:, :n]
+        return features
+    
+    @staticmethod
+    def _z_scores(prices: np.ndarray) -> np.ndarray:
+        """Last price vs. its 20-bar mean, in 20-bar standard deviations"""
+        window = prices[:, -20:]
+        return (prices[:, -1] - window.mean(axis=1)) / (window.std(axis=1) + 1e-10)
     
     def select_action(
         self,
@@ -295,41 +348,60 @@ class TradingAgent:
         Base: P/L
         Role-specific bonuses/penalties
         """
+        rewards = self.compute_rewards(
+            np.asarray(action, dtype=np.float64)[np.newaxis],
+            MarketBatch.from_states([market_state]),
+            MarketBatch.from_states([next_market_state]),
+            np.array([position_pnl], dtype=np.float64)
+        )
+        return float(rewards[0])
+    
+    def compute_rewards(
+        self,
+        actions: np.ndarray,
+        batch: MarketBatch,
+        next_batch: MarketBatch,
+        position_pnl: np.ndarray
+    ) -> np.ndarray:
+        """
+        compute_reward for a whole batch
+        
+        Args:
+            actions: (batch, action_dim)
+            position_pnl: (batch,)
+        
+        Returns:
+            (batch,) rewards
+        """
         # Base reward: P/L
-        reward = position_pnl / 1000  # Normalize
+        rewards = np.asarray(position_pnl, dtype=np.float64) / 1000  # Normalize
+        position = actions[:, 0]
         
         # Role-specific bonuses
         if self.role == AgentRole.MOMENTUM:
             # Bonus for riding trends correctly
-            if market_state.trend > 0.3 and action[0] > 0:
-                reward += 0.1
-            elif market_state.trend < -0.3 and action[0] < 0:
-                reward += 0.1
+            rewards = rewards + 0.1 * (((batch.trend > 0.3) & (position > 0)) |
+                                       ((batch.trend < -0.3) & (position < 0)))
                 
         elif self.role == AgentRole.MEAN_REVERSION:
             # Bonus for counter-trend trades at extremes
-            if len(market_state.prices) >= 20:
-                z_score = (market_state.prices[-1] - np.mean(market_state.prices[-20:])) / (np.std(market_state.prices[-20:]) + 1e-10)
-                if z_score > 2 and action[0] < 0:  # Sell at high
-                    reward += 0.1
-                elif z_score < -2 and action[0] > 0:  # Buy at low
-                    reward += 0.1
+            if batch.prices.shape[1] >= 20:
+                z_score = self._z_scores(batch.prices)
+                rewards = rewards + 0.1 * (((z_score > 2) & (position < 0)) |   # Sell at high
+                                           ((z_score < -2) & (position > 0)))   # Buy at low
                     
         elif self.role == AgentRole.RISK_MANAGER:
             # Penalty for excessive risk
-            if abs(action[0]) > 0.8:  # Large position
-                reward -= 0.05
+            rewards = rewards - 0.05 * (np.abs(position) > 0.8)  # Large position
             # Bonus for proper stop-loss
-            if action[1] > 0:  # Has stop-loss
-                reward += 0.02
+            rewards = rewards + 0.02 * (actions[:, 1] > 0)  # Has stop-loss
                 
         elif self.role == AgentRole.HEDGER:
             # Reward for reducing portfolio volatility
-            if market_state.volatility > 0.03:
-                if action[0] * position_pnl < 0:  # Offsetting position
-                    reward += 0.05
+            rewards = rewards + 0.05 * ((batch.volatility > 0.03) &
+                                        (position * position_pnl < 0))  # Offsetting position
         
-        return reward
+        return rewards
     
     def update_performance(self, pnl: float, was_winner: bool):
         """Update agent performance metrics"""
@@ -370,7 +442,8 @@ class MADDPGTrader:
         state_dim: int = 100,
         action_dim: int = 3,
         gamma: float = 0.99,
-        tau: float = 0.01
+        tau: float = 0.01,
+        prioritized_replay: bool = False
     ):
         self.state_dim = state_dim
         self.action_dim = action_dim
@@ -400,8 +473,12 @@ class MADDPGTrader:
                 self.critic_targets[name] = critic_target
                 self.critic_optimizers[name] = optim.Adam(critic.parameters(), lr=1e-3)
         
-        # Replay buffer
-        self.replay_buffer = ReplayBuffer()
+        # Replay buffer (prioritized: sample by critic TD error)
+        self.prioritized_replay = prioritized_replay
+        if prioritized_replay:
+            self.replay_buffer = PrioritizedReplayBuffer()
+        else:
+            self.replay_buffer = ReplayBuffer()
         
         # Training stats
         self.training_steps = 0
@@ -430,6 +507,17 @@ class MADDPGTrader:
         
         return boosted_rewards
     
+    def compute_cooperative_rewards_batch(self, raw_rewards: np.ndarray) -> np.ndarray:
+        """
+        compute_cooperative_rewards for many steps
+        
+        Args:
+            raw_rewards: (batch, n_agents) in agent order
+        """
+        positive = raw_rewards > 0
+        boost = (positive.sum(axis=1, keepdims=True) >= self.L) & positive
+        return np.where(boost, self.PHI * raw_rewards, raw_rewards)
+    
     def get_ensemble_action(
         self,
         market_state: MarketState,
@@ -487,6 +575,160 @@ class MADDPGTrader:
         
         return trading_action, all_actions
     
+    def process_states_batch(self, batch: MarketBatch) -> np.ndarray:
+        """All agents' features for a batch: (n_agents, batch, state_dim)"""
+        return np.stack([agent.process_states(batch) for agent in self.agents.values()])
+    
+    def _agent_weights(self) -> np.ndarray:
+        """Ensemble weight per agent: base weight + win-rate bonus"""
+        return np.array([
+            0.5 + agent.winning_trades / max(agent.total_trades, 1)
+            for agent in self.agents.values()
+        ])
+    
+    def select_actions_batch(self, states: np.ndarray, epsilon: float = 0.1) -> np.ndarray:
+        """
+        Actions of every agent for stacked states
+        
+        Args:
+            states: (n_agents, batch, state_dim)
+            epsilon: Per-row exploration probability
+        
+        Returns:
+            (n_agents, batch, action_dim)
+        """
+        n_agents, batch_size, _ = states.shape
+        
+        if TORCH_AVAILABLE:
+            # One batched forward per actor over its slice of the stacked input
+            states_tensor = torch.from_numpy(np.ascontiguousarray(states, dtype=np.float32))
+            with torch.inference_mode():
+                actions = torch.stack([
+                    agent.actor(states_tensor[i])
+                    for i, agent in enumerate(self.agents.values())
+                ]).numpy().astype(np.float64)
+            explore = np.random.random((n_agents, batch_size)) < epsilon
+        else:
+            # Random action fallback
+            actions = np.zeros((n_agents, batch_size, self.action_dim))
+            explore = np.ones((n_agents, batch_size), dtype=bool)
+        
+        # Exploration
+        random_actions = np.random.uniform(-1, 1, actions.shape)
+        return np.where(explore[..., np.newaxis], random_actions, actions)
+    
+    def get_ensemble_actions(
+        self,
+        batch: MarketBatch,
+        epsilon: float = 0.1
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        get_ensemble_action for many symbols / episodes
+        
+        Returns:
+            - Final actions (batch, action_dim), performance-weighted average
+            - Individual agent actions (n_agents, batch, action_dim)
+            - Agent states (n_agents, batch, state_dim), for storing experience
+        """
+        states = self.process_states_batch(batch)
+        actions = self.select_actions_batch(states, epsilon)
+        
+        weights = self._agent_weights()
+        final_actions = np.tensordot(weights, actions, axes=1) / weights.sum()
+        
+        return final_actions, actions, states
+    
+    def store_experience_batch(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        dones: np.ndarray
+    ):
+        """
+        Store many experiences in the replay buffer
+        
+        Args:
+            states, next_states: (n_agents, batch, state_dim)
+            actions: (n_agents, batch, action_dim)
+            rewards: (batch, n_agents) raw rewards (boosted here)
+            dones: (batch,) episode ends
+        """
+        n_agents, batch_size, _ = states.shape
+        boosted_rewards = self.compute_cooperative_rewards_batch(rewards)
+        
+        self.replay_buffer.add_batch(
+            states.transpose(1, 0, 2).reshape(batch_size, -1),
+            actions.transpose(1, 0, 2).reshape(batch_size, -1),
+            boosted_rewards,
+            next_states.transpose(1, 0, 2).reshape(batch_size, -1),
+            np.repeat(np.asarray(dones, dtype=bool)[:, np.newaxis], n_agents, axis=1),
+            agent_names=list(self.agents.keys())
+        )
+    
+    def run_batched(
+        self,
+        env: 'BatchedMarketEnv',
+        n_steps: int = None,
+        epsilon: float = 0.1,
+        train_every: int = 0,
+        batch_size: int = 64
+    ) -> Dict:
+        """
+        Roll all agents through a batched environment
+        
+        Every step acts on all symbols / episodes at once, computes each
+        agent's reward on its own position and stores the transitions.
+        
+        Args:
+            env: Batched environment
+            n_steps: Steps to run (default: until the price paths end)
+            epsilon: Exploration probability
+            train_every: Run train_step every N env steps (0 = never)
+            batch_size: train_step batch size
+        
+        Returns:
+            Rollout statistics
+        """
+        batch = env.reset()
+        _, actions, states = self.get_ensemble_actions(batch, epsilon)
+        
+        steps = 0
+        transitions = 0
+        reward_sum = np.zeros(self.n_agents)
+        
+        while n_steps is None or steps < n_steps:
+            next_batch, price_returns, done = env.step()
+            
+            # Each agent is rewarded on its own position
+            raw_rewards = np.stack([
+                agent.compute_rewards(actions[i], batch, next_batch,
+                                      actions[i, :, 0] * price_returns * env.capital)
+                for i, agent in enumerate(self.agents.values())
+            ], axis=1)
+            
+            _, next_actions, next_states = self.get_ensemble_actions(next_batch, epsilon)
+            self.store_experience_batch(states, actions, raw_rewards, next_states,
+                                        np.full(len(batch), done))
+            
+            steps += 1
+            transitions += len(batch)
+            reward_sum += raw_rewards.sum(axis=0)
+            
+            if train_every and steps % train_every == 0:
+                self.train_step(batch_size)
+            
+            if done:
+                break
+            batch, actions, states = next_batch, next_actions, next_states
+        
+        return {
+            'steps': steps,
+            'transitions': transitions,
+            'mean_rewards': dict(zip(self.agents.keys(), (reward_sum / max(transitions, 1)).round(6)))
+        }
+    
     def store_experience(
         self,
         market_state: MarketState,
@@ -526,34 +768,28 @@ class MADDPGTrader:
         if not TORCH_AVAILABLE:
             return
         
-        batch = self.replay_buffer.sample(batch_size)
+        if self.prioritized_replay:
+            batch, weights, indices = self.replay_buffer.sample(batch_size)
+            weights_tensor = torch.from_numpy(weights).unsqueeze(1)
+            td_errors = np.zeros(len(batch), dtype=np.float32)
+        else:
+            batch = self.replay_buffer.sample(batch_size)
+        
+        # All agent states/actions, concatenated in agent order
+        states_tensor = torch.from_numpy(batch.states)
+        actions_tensor = torch.from_numpy(batch.actions)
+        next_states_tensor = torch.from_numpy(batch.next_states)
+        storage = self.replay_buffer.storage
+        n_trained = 0
         
         for agent_name, agent in self.agents.items():
             # Skip if no actor
             if not hasattr(agent, 'actor'):
                 continue
+            n_trained += 1
             
-            # Prepare batch data
-            states_batch = []
-            actions_batch = []
-            rewards_batch = []
-            next_states_batch = []
-            
-            for states, actions, rewards, next_states, dones in batch:
-                # Flatten all agent states
-                all_states = np.concatenate([states[n] for n in self.agents.keys()])
-                all_actions = np.concatenate([actions[n] for n in self.agents.keys()])
-                all_next_states = np.concatenate([next_states[n] for n in self.agents.keys()])
-                
-                states_batch.append(all_states)
-                actions_batch.append(all_actions)
-                rewards_batch.append(rewards[agent_name])
-                next_states_batch.append(all_next_states)
-            
-            states_tensor = torch.FloatTensor(states_batch)
-            actions_tensor = torch.FloatTensor(actions_batch)
-            rewards_tensor = torch.FloatTensor(rewards_batch).unsqueeze(1)
-            next_states_tensor = torch.FloatTensor(next_states_batch)
+            reward_col = storage.agent_index(agent_name)
+            rewards_tensor = torch.from_numpy(batch.rewards[:, reward_col]).unsqueeze(1)
             
             # Update critic
             with torch.no_grad():
@@ -572,7 +808,12 @@ class MADDPGTrader:
                 y = rewards_tensor + self.gamma * target_q
             
             current_q = self.critics[agent_name](states_tensor, actions_tensor)
-            critic_loss = nn.MSELoss()(current_q, y)
+            if self.prioritized_replay:
+                # Importance-sampling weighted MSE
+                critic_loss = (weights_tensor * (current_q - y) ** 2).mean()
+                td_errors += np.abs((current_q - y).detach().numpy()[:, 0])
+            else:
+                critic_loss = nn.MSELoss()(current_q, y)
             
             self.critic_optimizers[agent_name].zero_grad()
             critic_loss.backward()
@@ -609,6 +850,10 @@ class MADDPGTrader:
             ):
                 target_param.data.copy_(self.tau * param.data + (1 - self.tau) * target_param.data)
         
+        if self.prioritized_replay and n_trained:
+            # Mean critic TD error across the agents trained this step
+            self.replay_buffer.update_priorities(indices, td_errors / n_trained)
+        
         self.training_steps += 1
     
     def get_all_stats(self) -> List[Dict]:
@@ -650,6 +895,77 @@ class MADDPGTrader:
             pass
 
 
+class BatchedMarketEnv:
+    """
+    Steps many symbols / episodes at once over price paths
+    
+    Observations are trailing windows of each path; each step returns
+    the next bar's price return so callers can mark positions to market.
+    """
+    
+    def __init__(
+        self,
+        prices: np.ndarray,
+        window: int = 100,
+        capital: float = 1_000_000,
+        sentiment: np.ndarray = None
+    ):
+        """
+        Args:
+            prices: (batch, n_bars) price paths, one row per symbol / episode
+            window: Bars per observation
+            capital: Notional per position, for P/L
+            sentiment: (batch, n_bars) sentiment scores (optional)
+        """
+        self.prices = np.asarray(prices, dtype=np.float64)
+        if self.prices.ndim != 2 or self.prices.shape[1] <= window:
+            raise ValueError(f"Need (batch, n_bars > {window}) prices, got {self.prices.shape}")
+        
+        self.window = window
+        self.capital = capital
+        self.sentiment = sentiment
+        self.log_returns = np.diff(np.log(self.prices), axis=1)
+        self.t = window
+    
+    def __len__(self):
+        return len(self.prices)
+    
+    def reset(self) -> MarketBatch:
+        self.t = self.window
+        return self.observe()
+    
+    def observe(self) -> MarketBatch:
+        """Window of bars ending at the current step"""
+        prices = self.prices[:, self.t - self.window:self.t]
+        returns = self.log_returns[:, self.t - self.window:self.t - 1]
+        
+        volatility = returns[:, -20:].std(axis=1)
+        ma20 = prices[:, -20:].mean(axis=1)
+        ma50 = prices[:, -50:].mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            trend = np.clip(np.nan_to_num((ma20 - ma50) / ma50) * 10, -1, 1)
+        
+        if self.sentiment is not None:
+            sentiment = np.asarray(self.sentiment[:, self.t - 1], dtype=np.float64)
+        else:
+            sentiment = np.zeros(len(self))
+        
+        return MarketBatch(prices=prices, returns=returns, volatility=volatility,
+                           trend=trend, sentiment=sentiment)
+    
+    def step(self) -> Tuple[MarketBatch, np.ndarray, bool]:
+        """
+        Advance one bar
+        
+        Returns:
+            (next observation, simple price return per row, done)
+        """
+        price_returns = self.prices[:, self.t] / self.prices[:, self.t - 1] - 1
+        self.t += 1
+        done = self.t >= self.prices.shape[1]
+        return self.observe(), price_returns, done
+
+
 # Singleton
 _maddpg_trader = None
 
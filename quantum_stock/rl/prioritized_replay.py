@@ -13,9 +13,8 @@ Reference: "Prioritized Experience Replay" (Schaul et al., 2016)
 """
 
 import numpy as np
-from collections import deque
-from typing import Dict, List, Tuple
-import random
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Union
 
 
 class SumTree:
@@ -27,7 +26,7 @@ class SumTree:
     - Internal nodes: Sum of children priorities
     - Root: Total priority sum
 
-    Operations (all O(log n)):
+    Operations (all O(log n), batched over NumPy arrays):
     - Update priority
     - Sample by cumulative priority
     - Get total priority
@@ -40,62 +39,57 @@ class SumTree:
         """
         self.capacity = capacity
         self.tree = np.zeros(2 * capacity - 1)  # Binary tree in array form
-        self.data = [None] * capacity  # Actual experience data
+        self.data = [None] * capacity  # Optional per-leaf payload (see get)
         self.write_idx = 0  # Next write position
         self.n_entries = 0  # Current number of entries
 
-    def _propagate(self, idx: int, change: float):
+    def retrieve(self, s: np.ndarray) -> np.ndarray:
         """
-        Propagate priority change up the tree to root
+        Find leaf nodes with cumulative sums s
 
-        Args:
-            idx: Tree node index
-            change: Priority delta
-        """
-        parent = (idx - 1) // 2
-        self.tree[parent] += change
-
-        if parent != 0:  # Not root yet
-            self._propagate(parent, change)
-
-    def _retrieve(self, idx: int, s: float) -> int:
-        """
-        Find leaf node with cumulative sum s
+        Walks all queries down the tree together, one level per step.
 
         Args:
-            idx: Current node index
-            s: Target cumulative sum
+            s: Target cumulative sums
 
         Returns:
-            Leaf node index containing s
+            Leaf node indices containing s
         """
-        left = 2 * idx + 1
-        right = left + 1
-
-        if left >= len(self.tree):  # Reached leaf node
-            return idx
-
-        # Decide left or right subtree
-        if s <= self.tree[left]:
-            return self._retrieve(left, s)
-        else:
-            return self._retrieve(right, s - self.tree[left])
+        s = np.array(s, dtype=np.float64, ndmin=1)
+        idx = np.zeros(len(s), dtype=np.int64)
+        n_nodes = len(self.tree)
+
+        while True:
+            left = 2 * idx + 1
+            active = left < n_nodes  # Not yet at a leaf
+            if not active.any():
+                return idx
+
+            left_sum = self.tree[np.minimum(left, n_nodes - 1)]
+            go_left = s <= left_sum
+            # Decide left or right subtree
+            idx = np.where(active, np.where(go_left, left, left + 1), idx)
+            s = np.where(active & ~go_left, s - left_sum, s)
 
     def total(self) -> float:
         """Get total priority (root node value)"""
         return self.tree[0]
 
-    def add(self, priority: float, data):
+    def add(self, priority: float, data=None) -> int:
         """
         Add new experience with priority
 
         Args:
             priority: Experience priority
-            data: Experience tuple
+            data: Experience payload (optional when stored elsewhere)
+
+        Returns:
+            Data index written
         """
-        idx = self.write_idx + self.capacity - 1  # Convert to tree leaf index
+        data_idx = self.write_idx
+        idx = data_idx + self.capacity - 1  # Convert to tree leaf index
 
-        self.data[self.write_idx] = data
+        self.data[data_idx] = data
         self.update(idx, priority)
 
         # Circular buffer
@@ -106,17 +100,34 @@ class SumTree:
         if self.n_entries < self.capacity:
             self.n_entries += 1
 
-    def update(self, idx: int, priority: float):
+        return data_idx
+
+    def update(self, idx: Union[int, np.ndarray], priority: Union[float, np.ndarray]):
         """
-        Update priority of a leaf node
+        Update priorities of leaf nodes
 
         Args:
-            idx: Tree node index (not data index!)
-            priority: New priority value
+            idx: Tree node index or indices (not data index!)
+            priority: New priority value(s); for repeated indices the
+                      last value wins
         """
+        idx = np.array(idx, dtype=np.int64, ndmin=1)
+        priority = np.broadcast_to(np.asarray(priority, dtype=np.float64), idx.shape)
+
+        if len(idx) > 1:
+            # Keep the last write per leaf
+            rev_unique, rev_pos = np.unique(idx[::-1], return_index=True)
+            keep = len(idx) - 1 - rev_pos
+            idx, priority = rev_unique, priority[keep]
+
         change = priority - self.tree[idx]
         self.tree[idx] = priority
-        self._propagate(idx, change)
+
+        # Propagate changes up to the root, one level per step
+        while len(idx):
+            active = idx > 0
+            idx, change = (idx[active] - 1) // 2, change[active]
+            np.add.at(self.tree, idx, change)
 
     def get(self, s: float) -> Tuple[int, float, any]:
         """
@@ -130,12 +141,124 @@ class SumTree:
             priority: Priority value
             data: Experience data
         """
-        idx = self._retrieve(0, s)
+        idx = int(self.retrieve(s)[0])
         data_idx = idx - self.capacity + 1
 
         return idx, self.tree[idx], self.data[data_idx]
 
 
+@dataclass
+class TransitionBatch:
+    """Sampled transitions, agents flattened in storage order"""
+    states: np.ndarray       # (batch, total_state_dim)
+    actions: np.ndarray      # (batch, total_action_dim)
+    rewards: np.ndarray      # (batch, n_agents)
+    next_states: np.ndarray  # (batch, total_state_dim)
+    dones: np.ndarray        # (batch, n_agents)
+
+    def __len__(self):
+        return len(self.rewards)
+
+
+class TransitionStorage:
+    """
+    Preallocated multi-agent transition arrays
+
+    Per-agent dicts are written in a fixed agent order (the key order of
+    the first transition): states, next_states and actions are
+    concatenated across agents, rewards and dones get one column per
+    agent. Arrays are allocated on the first write.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.agent_names: List[str] = []
+        self.states = None
+        self.actions = None
+        self.rewards = None
+        self.next_states = None
+        self.dones = None
+
+    def _allocate(self, agent_names: List[str], state_dim: int, action_dim: int):
+        self.agent_names = list(agent_names)
+        n_agents = len(self.agent_names)
+
+        self.states = np.zeros((self.capacity, state_dim), dtype=np.float32)
+        self.actions = np.zeros((self.capacity, action_dim), dtype=np.float32)
+        self.rewards = np.zeros((self.capacity, n_agents), dtype=np.float32)
+        self.next_states = np.zeros((self.capacity, state_dim), dtype=np.float32)
+        self.dones = np.zeros((self.capacity, n_agents), dtype=bool)
+
+    def write(
+        self,
+        i: int,
+        states: Dict[str, np.ndarray],
+        actions: Dict[str, np.ndarray],
+        rewards: Dict[str, float],
+        next_states: Dict[str, np.ndarray],
+        dones: Dict[str, bool]
+    ):
+        """Store one transition at slot i"""
+        if self.states is None:
+            names = list(states.keys())
+            self._allocate(names,
+                           sum(np.size(states[n]) for n in names),
+                           sum(np.size(actions[n]) for n in names))
+
+        names = self.agent_names
+        self.states[i] = np.concatenate([np.ravel(states[n]) for n in names])
+        self.actions[i] = np.concatenate([np.ravel(actions[n]) for n in names])
+        self.rewards[i] = [rewards[n] for n in names]
+        self.next_states[i] = np.concatenate([np.ravel(next_states[n]) for n in names])
+        self.dones[i] = [dones[n] for n in names]
+
+    def write_batch(
+        self,
+        idx: np.ndarray,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        dones: np.ndarray,
+        agent_names: List[str] = None
+    ):
+        """
+        Store already-flattened transitions at slots idx
+
+        Args:
+            states, next_states: (batch, total_state_dim) in agent order
+            actions: (batch, total_action_dim)
+            rewards, dones: (batch, n_agents)
+            agent_names: Agent order of the columns (needed on first write)
+        """
+        if self.states is None:
+            if agent_names is None:
+                agent_names = [f"agent_{i}" for i in range(rewards.shape[1])]
+            self._allocate(agent_names, states.shape[1], actions.shape[1])
+        elif agent_names is not None and list(agent_names) != self.agent_names:
+            raise ValueError(f"Agent order {agent_names} does not match storage {self.agent_names}")
+
+        self.states[idx] = states
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_states[idx] = next_states
+        self.dones[idx] = dones
+
+    def gather(self, idx: np.ndarray) -> TransitionBatch:
+        """Copy the transitions at slots idx"""
+        return TransitionBatch(
+            states=self.states[idx],
+            actions=self.actions[idx],
+            rewards=self.rewards[idx],
+            next_states=self.next_states[idx],
+            dones=self.dones[idx]
+        )
+
+    def agent_index(self, name: str) -> int:
+        """Column of an agent in rewards/dones"""
+        return self.agent_names.index(name)
+
+
 class PrioritizedReplayBuffer:
     """
     Prioritized Experience Replay Buffer for MADDPG
@@ -178,6 +301,7 @@ class PrioritizedReplayBuffer:
             epsilon: Small constant to ensure non-zero priority
         """
         self.tree = SumTree(capacity)
+        self.storage = TransitionStorage(capacity)
         self.capacity = capacity
         self.alpha = alpha
         self.beta = beta
@@ -198,54 +322,69 @@ class PrioritizedReplayBuffer:
 
         New experiences get max priority → ensures sampled at least once
         """
-        experience = (states, actions, rewards, next_states, dones)
-        self.tree.add(self.max_priority, experience)
+        self.storage.write(self.tree.write_idx, states, actions, rewards, next_states, dones)
+        self.tree.add(self.max_priority)
 
-    def sample(self, batch_size: int) -> Tuple[List, np.ndarray, np.ndarray]:
+    def add_batch(
+        self,
+        states: np.ndarray,
+        actions: np.ndarray,
+        rewards: np.ndarray,
+        next_states: np.ndarray,
+        dones: np.ndarray,
+        agent_names: List[str] = None
+    ):
+        """
+        Add many flattened transitions, all with max priority
+
+        Arrays as in TransitionStorage.write_batch.
+        """
+        n = min(len(rewards), self.capacity)
+        slots = (self.tree.write_idx + np.arange(n)) % self.capacity
+        self.storage.write_batch(slots, states[-n:], actions[-n:], rewards[-n:],
+                                 next_states[-n:], dones[-n:], agent_names)
+
+        self.tree.update(slots + self.capacity - 1, self.max_priority)
+        self.tree.write_idx = (self.tree.write_idx + n) % self.capacity
+        self.tree.n_entries = min(self.tree.n_entries + n, self.capacity)
+
+    def sample(self, batch_size: int) -> Tuple[TransitionBatch, np.ndarray, np.ndarray]:
         """
         Sample batch based on priorities
 
         Returns:
         --------
-        batch: List of (states, actions, rewards, next_states, dones)
+        batch: TransitionBatch of (states, actions, rewards, next_states, dones)
         weights: Importance sampling weights (for loss correction)
         indices: Tree indices (for priority update later)
         """
-        batch = []
-        indices = np.zeros(batch_size, dtype=np.int32)
-        weights = np.zeros(batch_size, dtype=np.float32)
+        total = self.tree.total()
+        n_entries = self.tree.n_entries
+
+        # Sample uniformly from each of batch_size equal priority segments
+        segment = total / batch_size
+        bounds = segment * np.arange(batch_size + 1)
+        s = np.random.uniform(bounds[:-1], bounds[1:])
 
-        # Divide priority range into segments
-        segment = self.tree.total() / batch_size
+        indices = self.tree.retrieve(s)
+        priorities = self.tree.tree[indices]
 
         # Anneal beta toward 1.0
         self.beta = min(1.0, self.beta + self.beta_increment)
 
-        # Min probability for IS weight normalization
-        min_prob = np.min(self.tree.tree[-self.tree.capacity:]) / self.tree.total()
+        # Min probability over stored experiences for IS weight normalization
+        leaves = self.tree.tree[self.capacity - 1:self.capacity - 1 + n_entries]
+        min_prob = leaves.min() / total
         if min_prob <= 0:
             min_prob = 1e-10
-        max_weight = (min_prob * self.tree.n_entries) ** (-self.beta)
-
-        for i in range(batch_size):
-            # Sample uniformly from segment
-            a = segment * i
-            b = segment * (i + 1)
-            s = random.uniform(a, b)
+        max_weight = (min_prob * n_entries) ** (-self.beta)
 
-            # Get experience
-            idx, priority, data = self.tree.get(s)
+        # Calculate importance sampling weights, normalized to [0, 1]
+        probs = priorities / total
+        weights = ((probs * n_entries) ** (-self.beta) / max_weight).astype(np.float32)
 
-            # Calculate importance sampling weight
-            prob = priority / self.tree.total()
-            weight = (prob * self.tree.n_entries) ** (-self.beta)
-            weight /= max_weight  # Normalize to [0, 1]
-
-            indices[i] = idx
-            weights[i] = weight
-            batch.append(data)
-
-        return batch, weights, indices
+        batch = self.storage.gather(indices - self.capacity + 1)
+        return batch, weights, indices.astype(np.int32)
 
     def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray):
         """
@@ -257,15 +396,11 @@ class PrioritizedReplayBuffer:
             indices: Tree indices from sample()
             td_errors: TD errors from critic
         """
-        for idx, error in zip(indices, td_errors):
-            # Compute priority
-            priority = (abs(error) + self.epsilon) ** self.alpha
-
-            # Update tree
-            self.tree.update(idx, priority)
+        priorities = (np.abs(np.asarray(td_errors, dtype=np.float64)) + self.epsilon) ** self.alpha
+        self.tree.update(indices, priorities)
 
-            # Track max priority
-            self.max_priority = max(self.max_priority, priority)
+        # Track max priority
+        self.max_priority = max(self.max_priority, float(priorities.max()))
 
     def __len__(self):
         return self.tree.n_entries
@@ -301,8 +436,7 @@ if __name__ == "__main__":
     for _ in range(50):  # 50 batches
         batch, weights, indices = buffer.sample(batch_size=20)
 
-        for exp in batch:
-            reward = exp[2]['agent1']  # Extract reward
+        for reward in batch.rewards[:, 0]:  # Extract agent1 rewards
             sample_counts[reward] = sample_counts.get(reward, 0) + 1
 
     print(f"  Sampled 50 batches of size 20")
@@ -324,14 +458,8 @@ if __name__ == "__main__":
     batch, weights, indices = buffer.sample(32)
 
     # Simulate TD errors (higher for higher rewards)
-    td_errors = []
-    for exp in batch:
-        reward = exp[2]['agent1']
-        # High reward → high TD error (model surprised)
-        td_error = reward / 10.0 + np.random.rand() * 0.1
-        td_errors.append(td_error)
-
-    td_errors = np.array(td_errors)
+    # High reward → high TD error (model surprised)
+    td_errors = batch.rewards[:, 0] / 10.0 + np.random.rand(len(batch)) * 0.1
     buffer.update_priorities(indices, td_errors)
 
     print(f"  Updated {len(indices)} priorities")
@@ -343,8 +471,7 @@ if __name__ == "__main__":
     for _ in range(50):
         batch, weights, indices = buffer.sample(batch_size=20)
 
-        for exp in batch:
-            reward = exp[2]['agent1']
+        for reward in batch.rewards[:, 0]:
             sample_counts_after[reward] = sample_counts_after.get(reward, 0) + 1
 
     print(f"  Sample distribution AFTER update:")
@@ -14,9 +14,11 @@ Path A: Model-based opportunity detection
 import asyncio
 import pandas as pd
 import numpy as np
+import copy
 import torch
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional, Callable
+from typing import Dict, List, Optional, Callable, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import logging
@@ -26,6 +28,7 @@ logger = logging.getLogger(__name__)
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from quantum_stock.models.stockformer import StockformerPredictor
+from quantum_stock.data.market_store import load_history
 from enhanced_features_simple import calculate_vn_market_features_simple, normalize_features_simple
 
 
@@ -68,6 +71,143 @@ class ModelPrediction:
         }
 
 
+class ModelRegistry:
+    """
+    Resident pool of per-symbol Stockformer weights
+
+    - Keeps every model loaded between scans
+    - Reloads a file only when its mtime changes
+    - Runs all models sharing an architecture as one batched forward pass
+      (parameters stacked and vectorized with torch.func.vmap); the last
+      max_stacked stacked model sets are kept, least recently used first out
+    """
+
+    def __init__(
+        self,
+        device: torch.device,
+        d_model: int = 64,
+        n_heads: int = 4,
+        n_layers: int = 2,
+        dropout: float = 0.5,
+        max_stacked: int = 8
+    ):
+        self.device = device
+        self.max_stacked = max_stacked
+        self.model_kwargs = dict(
+            d_model=d_model,
+            n_heads=n_heads,
+            n_layers=n_layers,
+            dropout=dropout
+        )
+
+        # path -> (mtime, input_size, model)
+        self._models: Dict[Path, Tuple[float, int, StockformerPredictor]] = {}
+
+        # model paths -> (mtimes, params, buffers, base_model), LRU order
+        self._stacked: "OrderedDict[Tuple[Path, ...], tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def get(self, model_file: Path, input_size: int) -> StockformerPredictor:
+        """Return resident model, loading it only if new or modified on disk"""
+        model_file = Path(model_file)
+        mtime = model_file.stat().st_mtime
+
+        cached = self._models.get(model_file)
+        if cached is not None and cached[0] == mtime and cached[1] == input_size:
+            return cached[2]
+
+        model = StockformerPredictor(input_size=input_size, **self.model_kwargs)
+        model.load_state_dict(torch.load(model_file, map_location=self.device))
+        model.to(self.device)
+        model.eval()
+
+        self._models[model_file] = (mtime, input_size, model)
+        logger.debug(f"Loaded model {model_file.name}")
+        return model
+
+    def evict(self, model_file: Path):
+        """Drop a model from the pool"""
+        model_file = Path(model_file)
+        self._models.pop(model_file, None)
+        for key in [k for k in self._stacked if model_file in k]:
+            del self._stacked[key]
+
+    def predict(
+        self,
+        model_files: List[Path],
+        windows: List[np.ndarray]
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Batched price forecast
+
+        Args:
+            model_files: One model file per window
+            windows: (seq_len, features) arrays
+
+        Returns:
+            Forecast array per window (None if the model failed to load)
+        """
+        results: List[Optional[np.ndarray]] = [None] * len(model_files)
+
+        # Group by architecture (input size)
+        groups: Dict[int, List[int]] = {}
+        for i, (model_file, X) in enumerate(zip(model_files, windows)):
+            input_size = X.shape[-1]
+            try:
+                self.get(model_file, input_size)
+            except Exception as e:
+                logger.warning(f"Failed to load {Path(model_file).name}: {e}")
+                continue
+            groups.setdefault(input_size, []).append(i)
+
+        for input_size, idx in groups.items():
+            X = torch.from_numpy(np.stack([windows[i] for i in idx])).to(self.device)
+            paths = [Path(model_files[i]) for i in idx]
+
+            with torch.inference_mode():
+                if len(idx) == 1:
+                    output, _ = self._models[paths[0]][2](X)
+                else:
+                    params, buffers, base = self._stack(paths)
+                    output, _ = torch.func.vmap(self._functional_forward(base))(
+                        params, buffers, X
+                    )
+                    output = output[:, 0, :]
+
+            output = output.cpu().numpy()
+            for row, i in enumerate(idx):
+                results[i] = output[row]
+
+        return results
+
+    def _stack(self, paths: List[Path]) -> tuple:
+        """Stack parameters of same-architecture models (cached per model set)"""
+        key = tuple(paths)
+        mtimes = tuple(self._models[p][0] for p in paths)
+        cached = self._stacked.get(key)
+        if cached is not None and cached[0] == mtimes:
+            self._stacked.move_to_end(key)
+            return cached[1:]
+
+        models = [self._models[p][2] for p in paths]
+        params, buffers = torch.func.stack_module_state(models)
+        base = copy.deepcopy(models[0]).to('meta')
+
+        self._stacked[key] = (mtimes, params, buffers, base)
+        self._stacked.move_to_end(key)
+        while len(self._stacked) > self.max_stacked:
+            self._stacked.popitem(last=False)
+        return params, buffers, base
+
+    @staticmethod
+    def _functional_forward(base: StockformerPredictor) -> Callable:
+        def forward(params, buffers, x):
+            return torch.func.functional_call(base, (params, buffers), (x.unsqueeze(0),))
+        return forward
+
+
 class ModelPredictionScanner:
     """
     Scanner dùng Stockformer models để tìm cơ hội
@@ -110,6 +250,14 @@ class ModelPredictionScanner:
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         logger.info(f"Using device: {self.device}")
 
+        # Resident model pool (weights stay loaded between scans)
+        self.seq_len = 60
+        self.model_registry = ModelRegistry(device=self.device)
+
+        # VN-Index context (re-read only when the file changes)
+        self._vn_index: Optional[pd.DataFrame] = None
+        self._vn_index_mtime: Optional[float] = None
+
     def _load_passed_stocks(self) -> List[str]:
         """Load 8 PASSED stocks from backtest"""
         if not self.passed_stocks_file.exists():
@@ -279,79 +427,108 @@ class ModelPredictionScanner:
         self.last_scan = datetime.now()
 
     async def _predict_batch(self, model_files: List[Path]) -> List[Optional[ModelPrediction]]:
-        """Predict batch of stocks"""
-        predictions = []
+        """
+        Predict batch of stocks
 
-        for model_file in model_files:
+        Features are prepared per symbol, then all 60-step windows are
+        stacked and scored through the resident model pool in one
+        forward pass per model architecture.
+        """
+        predictions: List[Optional[ModelPrediction]] = [None] * len(model_files)
+        vn_index = self._load_vn_index()
+
+        # Prepare inputs
+        prepared = []
+        for idx, model_file in enumerate(model_files):
+            symbol = model_file.stem.replace('_stockformer_simple_best', '')
             try:
-                pred = await self._predict_single(model_file)
-                predictions.append(pred)
+                inputs = self._prepare_input(symbol, vn_index)
             except Exception as e:
-                symbol = model_file.stem.replace('_stockformer_simple_best', '')
                 logger.warning(f"Prediction failed for {symbol}: {e}")
-                predictions.append(None)
+                continue
+            if inputs is not None:
+                prepared.append((idx, symbol, model_file) + inputs)
+
+        if not prepared:
+            return predictions
+
+        # Batched inference
+        try:
+            outputs = self.model_registry.predict(
+                [item[2] for item in prepared],
+                [item[3] for item in prepared]
+            )
+        except Exception as e:
+            logger.warning(f"Batched prediction failed: {e}")
+            return predictions
+
+        for (idx, symbol, model_file, X, current_price), output in zip(prepared, outputs):
+            if output is None:
+                logger.warning(f"Prediction failed for {symbol}: model not loaded")
+                continue
+            predictions[idx] = self._build_prediction(
+                symbol, current_price, output.tolist(), model_file, X.shape[1]
+            )
 
         return predictions
 
     async def _predict_single(self, model_file: Path) -> Optional[ModelPrediction]:
         """Predict single stock"""
-        symbol = model_file.stem.replace('_stockformer_simple_best', '')
+        return (await self._predict_batch([model_file]))[0]
 
-        # Load data
-        data_file = self.data_dir / f"{symbol}.parquet"
-        if not data_file.exists():
+    def _load_vn_index(self) -> Optional[pd.DataFrame]:
+        """Load VN-Index for context, re-reading the file only when it changes"""
+        vn_file = self.data_dir / 'VNINDEX.parquet'
+        try:
+            mtime = vn_file.stat().st_mtime
+        except OSError:
             return None
 
-        df = pd.read_parquet(data_file)
-        df = df.sort_values('date').reset_index(drop=True)
+        if self._vn_index is None or self._vn_index_mtime != mtime:
+            try:
+                vn_index = load_history('VNINDEX', str(self.data_dir))
+                self._vn_index = vn_index.set_index('date')
+                self._vn_index_mtime = mtime
+            except Exception:
+                return None
 
-        if len(df) < 100:
-            return None
+        return self._vn_index
 
-        # Load VN-Index for context
-        try:
-            vn_index = pd.read_parquet(self.data_dir / 'VNINDEX.parquet')
-            vn_index = vn_index.set_index('date')
-        except:
-            vn_index = None
+    def _prepare_input(
+        self,
+        symbol: str,
+        vn_index: Optional[pd.DataFrame]
+    ) -> Optional[tuple]:
+        """Build the normalized (seq_len, features) window for one symbol"""
+        # Load data
+        df = load_history(symbol, str(self.data_dir))
+        if df is None or len(df) < 100:
+            return None
 
         # Calculate features (15 simple features)
         df_features = calculate_vn_market_features_simple(df, vn_index)
 
         # Get recent data for prediction
-        recent_data = df_features.iloc[-60:].copy()
+        recent_data = df_features.iloc[-self.seq_len:].copy()
 
         # Normalize
         feature_cols = [c for c in recent_data.columns if c not in ['date', 'close']]
         recent_data[feature_cols] = normalize_features_simple(recent_data[feature_cols])
 
-        # Prepare input
         X = recent_data[feature_cols].values.astype(np.float32)
-        X = torch.tensor(X, dtype=torch.float32).unsqueeze(0)  # (1, seq_len, features)
-
-        # Load model
-        predictor = StockformerPredictor(
-            input_size=len(feature_cols),
-            d_model=64,
-            n_heads=4,
-            n_layers=2,
-            dropout=0.5,
-            device=self.device
-        )
+        current_price = float(df.iloc[-1]['close'])
 
-        predictor.model.load_state_dict(torch.load(model_file, map_location=self.device))
-        predictor.model.eval()
-
-        # Predict
-        with torch.no_grad():
-            X = X.to(self.device)
-            output = predictor.model(X)  # (1, 5)
-            predictions = output.cpu().numpy()[0]
-
-        # Denormalize predictions
-        current_price = df.iloc[-1]['close']
-        predicted_prices = predictions.tolist()
+        return X, current_price
 
+    def _build_prediction(
+        self,
+        symbol: str,
+        current_price: float,
+        predicted_prices: List[float],
+        model_file: Path,
+        features_used: int
+    ) -> ModelPrediction:
+        """Turn raw model output into a ModelPrediction"""
         # Calculate expected return
         expected_return_5d = (predicted_prices[-1] - current_price) / current_price
 
@@ -387,7 +564,7 @@ class ModelPredictionScanner:
             has_opportunity=has_opportunity,
             signal_strength=signal_strength,
             model_path=str(model_file),
-            features_used=len(feature_cols)
+            features_used=features_used
         )
 
     async def _notify_opportunity(self, prediction: ModelPrediction):
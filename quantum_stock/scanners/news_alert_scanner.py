@@ -193,7 +193,8 @@ class NewsAlertScanner:
         """
         Fetch news from real RSS sources (CafeF, VietStock, VnExpress)
 
-        Uses VNStockNewsFetcher to get live news with stock filtering
+        Uses VNStockNewsFetcher to get live news with stock filtering;
+        articles returned by an earlier scan are skipped
         """
         alerts = []
 
@@ -203,10 +204,10 @@ class NewsAlertScanner:
 
             fetcher = get_news_fetcher()
 
-            # Fetch latest news (limit to 20 for performance)
-            news_items = fetcher.fetch_all_feeds(max_items=20)
+            # Fetch feeds concurrently; only articles not alerted on before
+            news_items = await fetcher.fetch_all_feeds_async(max_items=20, new_only=True)
 
-            logger.info(f"📰 Fetched {len(news_items)} news items from RSS feeds")
+            logger.info(f"📰 Fetched {len(news_items)} new news items from RSS feeds")
 
             for item in news_items:
                 try:
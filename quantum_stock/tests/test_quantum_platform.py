@@ -100,6 +100,121 @@ def test_indicators():
     return True
 
 
+def _reference_kama(series, period=10, fast=2, slow=30):
+    """Original Series-loop KAMA"""
+    change = abs(series - series.shift(period))
+    volatility = abs(series - series.shift(1)).rolling(period).sum()
+    er = (change / volatility.replace(0, np.nan)).fillna(0)
+    sc = (er * (2 / (fast + 1) - 2 / (slow + 1)) + 2 / (slow + 1)) ** 2
+
+    kama = pd.Series(index=series.index, dtype=float)
+    kama.iloc[period-1] = series.iloc[period-1]
+    for i in range(period, len(series)):
+        kama.iloc[i] = kama.iloc[i-1] + sc.iloc[i] * (series.iloc[i] - kama.iloc[i-1])
+    return kama
+
+
+def _reference_parabolic_sar(high, low, af_start=0.02, af_step=0.02, af_max=0.2):
+    """Original Series-loop Parabolic SAR"""
+    sar = pd.Series(index=high.index, dtype=float)
+    trend = pd.Series(index=high.index, dtype=int)
+    ep = pd.Series(index=high.index, dtype=float)
+    af = pd.Series(index=high.index, dtype=float)
+    sar.iloc[0], trend.iloc[0], ep.iloc[0], af.iloc[0] = low.iloc[0], 1, high.iloc[0], af_start
+
+    for i in range(1, len(high)):
+        if trend.iloc[i-1] == 1:
+            sar.iloc[i] = sar.iloc[i-1] + af.iloc[i-1] * (ep.iloc[i-1] - sar.iloc[i-1])
+            sar.iloc[i] = min(sar.iloc[i], low.iloc[i-1], low.iloc[i-2] if i >= 2 else low.iloc[i-1])
+            if low.iloc[i] < sar.iloc[i]:
+                trend.iloc[i], sar.iloc[i], ep.iloc[i], af.iloc[i] = -1, ep.iloc[i-1], low.iloc[i], af_start
+            else:
+                trend.iloc[i] = 1
+                if high.iloc[i] > ep.iloc[i-1]:
+                    ep.iloc[i], af.iloc[i] = high.iloc[i], min(af.iloc[i-1] + af_step, af_max)
+                else:
+                    ep.iloc[i], af.iloc[i] = ep.iloc[i-1], af.iloc[i-1]
+        else:
+            sar.iloc[i] = sar.iloc[i-1] - af.iloc[i-1] * (sar.iloc[i-1] - ep.iloc[i-1])
+            sar.iloc[i] = max(sar.iloc[i], high.iloc[i-1], high.iloc[i-2] if i >= 2 else high.iloc[i-1])
+            if high.iloc[i] > sar.iloc[i]:
+                trend.iloc[i], sar.iloc[i], ep.iloc[i], af.iloc[i] = 1, ep.iloc[i-1], high.iloc[i], af_start
+            else:
+                trend.iloc[i] = -1
+                if low.iloc[i] < ep.iloc[i-1]:
+                    ep.iloc[i], af.iloc[i] = low.iloc[i], min(af.iloc[i-1] + af_step, af_max)
+                else:
+                    ep.iloc[i], af.iloc[i] = ep.iloc[i-1], af.iloc[i-1]
+    return sar
+
+
+def _reference_supertrend(high, low, close, period=10, multiplier=3.0):
+    """Original Series-loop Supertrend line and direction"""
+    from indicators import TrendIndicators
+
+    atr = TrendIndicators.atr(high, low, close, period)
+    upper_band = (high + low) / 2 + multiplier * atr
+    lower_band = (high + low) / 2 - multiplier * atr
+
+    supertrend = pd.Series(index=close.index, dtype=float)
+    direction = pd.Series(index=close.index, dtype=int)
+    supertrend.iloc[0], direction.iloc[0] = upper_band.iloc[0], 1
+
+    for i in range(1, len(close)):
+        if close.iloc[i] > upper_band.iloc[i-1]:
+            direction.iloc[i] = 1
+        elif close.iloc[i] < lower_band.iloc[i-1]:
+            direction.iloc[i] = -1
+        else:
+            direction.iloc[i] = direction.iloc[i-1]
+
+        if direction.iloc[i] == 1:
+            supertrend.iloc[i] = max(lower_band.iloc[i], supertrend.iloc[i-1]) if direction.iloc[i-1] == 1 else lower_band.iloc[i]
+        else:
+            supertrend.iloc[i] = min(upper_band.iloc[i], supertrend.iloc[i-1]) if direction.iloc[i-1] == -1 else upper_band.iloc[i]
+    return supertrend, direction
+
+
+def test_trend_kernels():
+    """Test array kernels for KAMA, Parabolic SAR and Supertrend"""
+    print("\n" + "="*60)
+    print("TEST: Recursive Trend Kernels")
+    print("="*60)
+
+    from indicators import TrendIndicators
+    import indicators.trend as trend
+
+    df = create_test_data(300)
+    # Gaps and a flat stretch exercise the NaN / tie branches
+    df.iloc[[40, 41, 150], :] = np.nan
+    df.iloc[200:230, :4] = 100.0
+
+    def check():
+        pd.testing.assert_series_equal(TrendIndicators.kama(df['close']),
+                                       _reference_kama(df['close']))
+        pd.testing.assert_series_equal(TrendIndicators.parabolic_sar(df['high'], df['low']),
+                                       _reference_parabolic_sar(df['high'], df['low']))
+        result = TrendIndicators.supertrend(df['high'], df['low'], df['close'])
+        supertrend, direction = _reference_supertrend(df['high'], df['low'], df['close'])
+        pd.testing.assert_series_equal(result['supertrend'], supertrend)
+        pd.testing.assert_series_equal(result['direction'], direction)
+
+    check()
+    print(f"  Compiled kernels: {trend.NUMBA_AVAILABLE}")
+
+    # Pure-Python fallback over the same kernels
+    saved = (trend._kama_kernel_jit, trend._parabolic_sar_kernel_jit, trend._supertrend_kernel_jit)
+    trend._kama_kernel_jit = trend._parabolic_sar_kernel_jit = trend._supertrend_kernel_jit = None
+    try:
+        check()
+    finally:
+        trend._kama_kernel_jit, trend._parabolic_sar_kernel_jit, trend._supertrend_kernel_jit = saved
+
+    print("  [PASS] Kernels match the original loops exactly")
+
+    return True
+
+
 def test_backtest_engine():
     """Test backtesting engine"""
     print("\n" + "="*60)
@@ -149,6 +264,1556 @@ def test_backtest_engine():
     return True
 
 
+def test_backtest_array_mode():
+    """Test array backtest kernel matches the bar-by-bar loop"""
+    print("\n" + "="*60)
+    print("TEST: Backtest Array Mode Equivalence")
+    print("="*60)
+
+    from core.backtest_engine import (
+        BacktestEngine, MACrossoverStrategy, RSIReversalStrategy,
+        MACDStrategy, BollingerBreakoutStrategy
+    )
+
+    df = create_test_data(500)
+    loop_engine = BacktestEngine(mode="loop")
+    array_engine = BacktestEngine(mode="array")
+
+    strategies = [
+        MACrossoverStrategy(5, 20),
+        RSIReversalStrategy(14, 30, 70),
+        MACDStrategy(12, 26, 9),
+        BollingerBreakoutStrategy(20, 2.0)
+    ]
+    exits = [(None, None), (0.03, None), (None, 0.05), (0.02, 0.04)]
+
+    def trade_key(t):
+        return (t.entry_date, t.exit_date, t.entry_price, t.exit_price,
+                t.shares, t.pnl, t.exit_reason)
+
+    for strategy in strategies:
+        for stop_loss, take_profit in exits:
+            expected = loop_engine.run(df, strategy, "TEST",
+                                       stop_loss_pct=stop_loss, take_profit_pct=take_profit)
+            actual = array_engine.run(df, strategy, "TEST",
+                                      stop_loss_pct=stop_loss, take_profit_pct=take_profit)
+
+            assert [trade_key(t) for t in actual.trades] == [trade_key(t) for t in expected.trades], \
+                f"Trades differ for {strategy.name} SL={stop_loss} TP={take_profit}"
+            assert np.allclose(actual.equity_curve, expected.equity_curve, rtol=0, atol=1e-6), \
+                "Equity curves differ"
+            assert actual.to_dict() == expected.to_dict(), "Metrics differ"
+
+        print(f"  {strategy.name}: {len(expected.trades)} trades match")
+
+    print("  [PASS] Array mode matches loop mode")
+
+    return True
+
+
+def test_indicator_cache():
+    """Test cached strategy indicators match direct computation"""
+    print("\n" + "="*60)
+    print("TEST: Indicator Cache")
+    print("="*60)
+
+    from core.backtest_engine import (
+        Strategy, MACrossoverStrategy, RSIReversalStrategy,
+        MACDStrategy, BollingerBreakoutStrategy
+    )
+    from core.indicator_cache import IndicatorCache
+    import core.backtest_engine as backtest_engine
+
+    df = create_test_data(500)
+    cache = IndicatorCache()
+    cache.register(df['close'])
+
+    strategies = [
+        MACrossoverStrategy(10, 50),
+        RSIReversalStrategy(14, 30, 70),
+        MACDStrategy(12, 26, 9),
+        BollingerBreakoutStrategy(20, 2.0)
+    ]
+    # Anchored prefixes slice the cache, other windows are computed fresh
+    windows = [slice(0, 500), slice(0, 250), slice(100, 400)]
+
+    original_getter = backtest_engine.get_indicator_cache
+    backtest_engine.get_indicator_cache = lambda: cache
+    try:
+        for strategy in strategies:
+            for window in windows:
+                data = df.iloc[window].copy()
+
+                Strategy.use_indicator_cache = False
+                expected = strategy.generate_signals(data)
+                Strategy.use_indicator_cache = True
+                actual = strategy.generate_signals(data)
+
+                pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+    finally:
+        Strategy.use_indicator_cache = True
+        backtest_engine.get_indicator_cache = original_getter
+
+    stats = cache.get_stats()
+    print(f"  Hits: {stats['hits']}, Misses: {stats['misses']}")
+    assert stats['hits'] > 0, "Prefix windows should reuse cached indicators"
+    print("  [PASS] Indicator cache matches direct computation")
+
+    return True
+
+
+def test_market_store():
+    """Test memory-mapped market store reads, appends and relocation"""
+    print("\n" + "="*60)
+    print("TEST: Market Data Store")
+    print("="*60)
+
+    import time
+    import tempfile
+    from data.market_store import MarketDataStore, load_history
+
+    df = create_test_data(300)
+    frame = df.reset_index().rename(columns={'index': 'date'})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MarketDataStore(tmp, slack=2)
+        store.put("AAA", frame.iloc[::-1])
+        store.put("BBB", frame.iloc[:100])
+
+        # Served sorted regardless of input order
+        out = store.get_frame("AAA")
+        assert out['date'].is_monotonic_increasing
+        np.testing.assert_array_equal(out['close'].values, frame['close'].values)
+
+        # Date range and tail are slices of the mapped arrays
+        arrays = store.get_arrays("AAA", start=frame['date'].iloc[50], end=frame['date'].iloc[59])
+        assert len(arrays['close']) == 10
+        assert arrays['close'][0] == frame['close'].iloc[50]
+        assert len(store.get_frame("AAA", tail=20)) == 20
+
+        # Appends fill the slack, then move the segment without touching others
+        last = frame['date'].iloc[-1]
+        for i in range(1, 5):
+            store.append_bar("AAA", {'date': last + pd.Timedelta(days=i), 'open': i,
+                                     'high': i, 'low': i, 'close': float(i), 'volume': 1})
+        store.append_bar("AAA", {'date': last + pd.Timedelta(days=4), 'close': 99.0})
+
+        out = store.get_frame("AAA")
+        assert len(out) == 304
+        assert out['close'].iloc[-2] == 3.0 and out['close'].iloc[-1] == 99.0
+
+        # A fresh reader sees the same data
+        reader = MarketDataStore(tmp)
+        np.testing.assert_array_equal(reader.get_frame("AAA")['close'].values, out['close'].values)
+        np.testing.assert_array_equal(reader.get_frame("BBB")['close'].values,
+                                      frame['close'].values[:100])
+
+    # Extra numeric columns are kept per symbol; frames are read-only views
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MarketDataStore(tmp, slack=1)
+        store.put("AAA", frame.assign(market_cap=frame['close'] * 1e6, symbol="AAA"))
+        store.put("BBB", frame.iloc[:50])
+        out = store.get_frame("AAA")
+        assert list(out.columns) == ['date', 'open', 'high', 'low', 'close', 'volume', 'market_cap']
+        np.testing.assert_allclose(out['market_cap'].values, frame['close'].values * 1e6)
+        assert 'market_cap' not in store.get_frame("BBB").columns
+        try:
+            out.loc[0, 'close'] = 0.0
+            raise AssertionError("store frame should be read-only")
+        except ValueError:
+            pass
+        out['sma'] = out['close'].rolling(5).mean()
+
+        last = frame['date'].iloc[-1]
+        for i in range(1, 3):   # second append moves the segment
+            store.append_bar("AAA", {'date': last + pd.Timedelta(days=i), 'close': 1.0, 'market_cap': 7.0})
+        assert MarketDataStore(tmp).get_frame("AAA")['market_cap'].iloc[-2:].tolist() == [7.0, 7.0]
+    print("  [OK] Extra numeric columns stored; frames are read-only views")
+
+    # Daily update entry point repacks only new / changed source files
+    # (CSV sources, so it runs without a parquet engine)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MarketDataStore(tmp, slack=8, source_format='csv')
+        source = os.path.join(tmp, "AAA.csv")
+        frame.to_csv(source, index=False)
+        assert store.update() == 1 and store.update() == 0
+
+        # Changed file is rewritten in place while read-only views are live
+        view = store.get_frame("AAA")
+        arrays = store.get_arrays("AAA", tail=10)
+        size = os.path.getsize(store.store_dir / "close.bin")
+        changed = frame.assign(close=frame['close'] * 2)
+        changed.to_csv(source, index=False)
+        os.utime(source, (time.time() + 5, time.time() + 5))
+        assert store.is_stale("AAA")
+        assert store.update() == 1 and store.update() == 0
+        assert os.path.getsize(store.store_dir / "close.bin") == size
+        np.testing.assert_allclose(store.get_frame("AAA")['close'].values, changed['close'].values)
+        np.testing.assert_allclose(view['close'].values, changed['close'].values)
+        np.testing.assert_allclose(arrays['close'], changed['close'].values[-10:])
+
+        # Outgrowing the segment moves it; new files are packed alongside
+        longer = pd.concat([changed, changed.tail(20).assign(date=changed['date'].iloc[-1] +
+                                                             pd.to_timedelta(np.arange(1, 21), unit='D'))])
+        longer.to_csv(source, index=False)
+        os.utime(source, (time.time() + 10, time.time() + 10))
+        frame.iloc[:100].to_csv(os.path.join(tmp, "BBB.csv"), index=False)
+        assert store.update() == 2
+        reader = MarketDataStore(tmp, source_format='csv')
+        assert len(reader.get_frame("AAA")) == 320 and len(reader.get_frame("BBB")) == 100
+        np.testing.assert_allclose(view['close'].values, changed['close'].values)
+    print("  [OK] store.update() repacks CSV sources in place under live views")
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("  [SKIP] pyarrow not installed, parquet sources not exercised")
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            frame.to_parquet(os.path.join(tmp, "AAA.parquet"))
+            store = MarketDataStore(tmp)
+            assert store.update() == 1 and store.update() == 0
+            frame.iloc[:100].to_parquet(os.path.join(tmp, "BBB.parquet"))
+            assert store.update() == 1
+            assert len(load_history("BBB", tmp)) == 100 and store.has("BBB")
+        print("  [OK] store.update() packs new and changed files only")
+
+    print("  [PASS] Market store round-trips, slices and appends")
+
+    return True
+
+
+def test_cache_tiers():
+    """Test bounded memory cache, persistent disk tier and request coalescing"""
+    print("\n" + "="*60)
+    print("TEST: Cache Tiers")
+    print("="*60)
+
+    import tempfile
+    import threading
+    import time
+    from utils.cache import MemoryCache, CacheManager
+
+    # LRU: the entry read most recently survives the eviction
+    memory = MemoryCache(max_bytes=3000)
+    for i in range(3):
+        memory.set(f"k{i}", np.zeros(100))
+    memory.get("k0")
+    memory.set("k3", np.zeros(100))
+    assert memory.get("k1") is None and memory.get("k0") is not None
+    assert memory.get_stats()['memory_bytes'] <= 3000
+
+    # LFU: the entry read most often survives
+    memory = MemoryCache(max_bytes=2500, policy='lfu')
+    for i in range(3):
+        memory.set(f"k{i}", np.zeros(100))
+    memory.get("k0")
+    memory.get("k0")
+    memory.get("k2")
+    memory.set("k3", np.zeros(100))
+    assert memory.get("k1") is None and memory.get("k0") is not None
+
+    df = create_test_data(300)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = CacheManager(disk_path=tmp)
+        cache.set_dataframe("ohlcv:AAA", df, ttl=60)
+
+        # A new process (fresh manager) reads the frame back from disk
+        restarted = CacheManager(disk_path=tmp)
+        out = restarted.get_dataframe("ohlcv:AAA")
+        pd.testing.assert_frame_equal(out, df)
+        assert restarted.get_stats()['backend']['l2_hits'] == 1
+
+        # Concurrent misses run the factory once
+        calls = []
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.1)
+            return 42
+
+        values = []
+        threads = [threading.Thread(target=lambda: values.append(cache.get_or_set("slow", factory)))
+                   for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert values == [42] * 6 and len(calls) == 1
+
+    print("  [PASS] Eviction, restart and coalescing work")
+    return True
+
+
+def test_state_journal():
+    """Test journal replay, compaction and recovery from torn writes"""
+    print("\n" + "="*60)
+    print("TEST: State Journal")
+    print("="*60)
+
+    import os
+    import tempfile
+    from utils.journal import Journal
+    from agents.memory_system import AgentMemorySystem, Memory, MemoryType
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'state.json')
+        state = {'n': 0}
+
+        journal = Journal(path, snapshot=lambda: dict(state), compact_every=5,
+                          commit_interval=0)
+        for _ in range(7):
+            state['n'] += 1
+            journal.append({'add': 1})
+        journal.close()
+
+        # Snapshot holds the first 5 records, the journal the remaining 2
+        loaded, records = Journal(path).load()
+        assert loaded == {'n': 5} and len(records) == 2
+
+        # A torn record at the tail is dropped and truncated
+        size = os.path.getsize(path + '.journal')
+        with open(path + '.journal', 'ab') as f:
+            f.write(b'\x40\x00\x00\x00partial')
+        loaded, records = Journal(path).load()
+        assert len(records) == 2 and os.path.getsize(path + '.journal') == size
+
+        # Records already folded into the snapshot are skipped (crash
+        # between snapshot rename and journal truncation)
+        with open(path + '.journal', 'rb') as f:
+            tail = f.read()
+        journal = Journal(path, snapshot=lambda: {'n': 7})
+        journal.load()
+        journal.compact()
+        with open(path + '.journal', 'wb') as f:
+            f.write(tail)
+        loaded, records = Journal(path).load()
+        assert loaded == {'n': 7} and records == []
+
+        # A store restores its state from snapshot + journal
+        memory_path = os.path.join(tmp, 'memory.json')
+        memory = AgentMemorySystem(memory_path)
+        memory.store("Analyst", Memory("m1", MemoryType.PREDICTION, "HPG",
+                                       {'direction': 'UP'}, 70), shared=True)
+        memory.record_outcome("m1", {'direction': 'UP'})
+        memory._journal.flush()
+
+        restored = AgentMemorySystem(memory_path)
+        assert restored.memories["Analyst"][0].outcome == {'direction': 'UP'}
+        assert restored.shared_memories[0] is restored.memories["Analyst"][0]
+
+    print("  [PASS] Journal replays, compacts and recovers")
+    return True
+
+
+def test_memory_recall():
+    """Test indexed memory recall, top-k order and heap expiry"""
+    print("\n" + "="*60)
+    print("TEST: Memory Recall")
+    print("="*60)
+
+    import os
+    import tempfile
+    from datetime import datetime, timedelta
+    from agents.memory_system import AgentMemorySystem, Memory, MemoryType
+
+    now = datetime.now()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = AgentMemorySystem(os.path.join(tmp, 'memory.json'))
+
+        # Stored out of time order; every third one has already expired
+        for i in [5, 1, 8, 3, 0, 7, 2, 6, 4, 9]:
+            memory.store("Bull", Memory(
+                f"m{i}", MemoryType.PREDICTION if i % 2 else MemoryType.ANALYSIS,
+                "HPG" if i < 5 else "FPT", {'direction': 'UP'}, 60,
+                timestamp=now - timedelta(hours=10 - i),
+                expires_at=now - timedelta(minutes=1) if i % 3 == 0 else None
+            ), shared=(i == 7))
+        memory.store("Bear", Memory("s1", MemoryType.ANALYSIS, "HPG", {}, 50,
+                                    timestamp=now), shared=True)
+
+        recalled = memory.recall("Bull", limit=4)
+        assert [m.memory_id for m in recalled] == ["s1", "m8", "m7", "m5"]
+
+        recalled = memory.recall("Bull", symbol="HPG", memory_type=MemoryType.PREDICTION,
+                                 include_shared=False)
+        assert [m.memory_id for m in recalled] == ["m1"]
+
+        context = memory.get_inter_agent_context("Bull", "HPG")
+        assert context["Bear"]['confidence'] == 50
+
+        # Expired memories are removed from every index
+        assert memory.cleanup_expired() == 4
+        assert len(memory.memories["Bull"]) == 6
+        recalled = memory.recall("Bull", symbol="FPT", include_shared=False)
+        assert [m.memory_id for m in recalled] == ["m8", "m7", "m5"]
+
+    print("  [PASS] Recall is ordered, filtered and expired entries are purged")
+    return True
+
+
+def test_stockformer_batch():
+    """Test batched Stockformer inference and TorchScript export"""
+    print("\n" + "="*60)
+    print("TEST: Stockformer Batch")
+    print("="*60)
+
+    import os
+    import tempfile
+    from models.stockformer import StockformerEnsemble, TORCH_AVAILABLE
+
+    if not TORCH_AVAILABLE:
+        print("  [SKIP] PyTorch not installed")
+        return True
+
+    import torch
+    torch.manual_seed(0)
+    ensemble = StockformerEnsemble(input_size=20, n_models=2, device='cpu', num_threads=1)
+
+    rng = np.random.default_rng(7)
+    histories = [10000 * np.exp(np.cumsum(0.02 * rng.standard_normal(n))) for n in (30, 80, 80, 120)]
+    symbols = ['VNM', 'FPT', 'HPG', 'VCB']
+
+    # Batched features match the single-symbol path
+    batch = ensemble.prepare_features_batch(np.stack(histories[1:3]))
+    assert np.allclose(batch[1], ensemble.prepare_features(histories[2]))
+
+    # Batched ensemble matches the per-symbol path: features, zero-padded
+    # window and one forward pass per model
+    results = ensemble.predict_many(symbols, histories, seq_len=40)
+    assert [r.symbol for r in results] == symbols
+    for history, result in zip(histories, results):
+        features = ensemble.prepare_features(history)[-40:]
+        features = np.vstack([np.zeros((40 - len(features), features.shape[1])), features])
+        x = torch.FloatTensor(features).unsqueeze(0)
+        with torch.no_grad():
+            outputs = [model.eval()(x) for model in ensemble.models]
+        price_preds = np.stack([p.numpy()[0] for p, _ in outputs])
+        expected = history[-1] * np.cumprod(1 + price_preds.mean(axis=0))
+        assert np.allclose(result.predictions, expected, rtol=1e-5)
+        assert np.isclose(result.volatility_forecast,
+                          np.mean([v.numpy() for _, v in outputs]), rtol=1e-5)
+        assert np.isclose(result.confidence, np.clip(1 - price_preds.std() * 10, 0.3, 0.95), rtol=1e-5)
+        assert len(result.predictions) == 5
+        assert np.allclose(ensemble.predict(result.symbol, history, seq_len=40).predictions,
+                           result.predictions, rtol=1e-5)
+    print(f"  [OK] predict_many matches per-symbol model calls for {len(symbols)} symbols")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = ensemble.export(os.path.join(tmp, 'stockformer.pt'), seq_len=40)
+        ensemble.load_exported(path)
+        exported = ensemble.predict_many(symbols, histories, seq_len=40)
+    for a, b in zip(results, exported):
+        assert np.allclose(a.predictions, b.predictions, rtol=1e-4)
+    print("  [OK] TorchScript export reproduces ensemble output")
+
+    print("  [PASS] Stockformer batch inference working")
+    return True
+
+
+def test_settlement_sequences():
+    """Test strided T+2.5 sequence builder"""
+    print("\n" + "="*60)
+    print("TEST: Settlement Sequences")
+    print("="*60)
+
+    import tempfile
+    from ml.vietnam_data_prep import VietnamSettlementDataPrep
+
+    df = create_test_data(200)
+    prices = df['close'].values
+    volumes = df['volume'].values
+    prep = VietnamSettlementDataPrep(seq_len=30, forecast_len=5)
+
+    X, y, metadata = prep.prepare_sequences_vietnam(prices, volumes, chunk_size=50)
+    n = prep.n_sequences(len(prices))
+    assert X.shape == (n, 30, 2) and y.shape == (n, 5)
+    assert set(metadata) == {'min', 'max', 'range', 'start_idx', 'target_start_idx'}
+
+    # Spot-check one sample against the per-window definition
+    i = 57
+    window = prices[i:i + 30]
+    lo, rng = window.min(), window.max() - window.min()
+    assert np.allclose(X[i, :, 0], (window - lo) / rng)
+    assert np.allclose(X[i, :, 1], volumes[i:i + 30] / volumes[i:i + 30].mean())
+    assert metadata['target_start_idx'][i] == i + 33
+    assert np.allclose(y[i], (prices[i + 33:i + 38] - lo) / rng)
+    assert np.allclose(prep.denormalize_predictions(y, metadata)[i], prices[i + 33:i + 38])
+    print(f"  [OK] {n} sequences with columnar metadata")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'X.npy')
+        X_mm, _, _ = prep.prepare_sequences_vietnam(prices, volumes, memmap_path=path)
+        assert isinstance(X_mm, np.memmap)
+        assert np.array_equal(np.load(path), X)
+        del X_mm
+    print("  [OK] Memory-mapped output matches")
+
+    print("  [PASS] Settlement sequence builder working")
+    return True
+
+
+def test_feature_store():
+    """Test out-of-core feature store and cross-sectional training"""
+    print("\n" + "="*60)
+    print("TEST: Feature Store")
+    print("="*60)
+
+    import tempfile
+    from ml.training_pipeline import FeatureStore, FeatureEngineer, CrossSectionalTrainer
+
+    def frames():
+        for i, symbol in enumerate(['VNM', 'FPT', 'HPG']):
+            df = create_test_data(200 + 20 * i)
+            df.columns = [c.capitalize() for c in df.columns]
+            yield symbol, df
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeatureStore.build(os.path.join(tmp, 'store'), frames())
+        assert store.symbols == ['VNM', 'FPT', 'HPG']
+        assert store.data.dtype == np.float32
+
+        # Rows for one symbol match the in-memory feature frame
+        expected = FeatureEngineer.create_features(next(frames())[1])
+        X, y = store.load(np.flatnonzero(np.asarray(store.symbol_ids) == 0))
+        assert np.allclose(X, expected[store.feature_columns].values.astype(np.float32))
+        assert np.allclose(y, expected['target'].values.astype(np.float32))
+        print(f"  [OK] {len(store)} rows x {len(store.feature_columns)} features on disk")
+
+        train_rows, val_rows = store.split_by_date(0.2)
+        assert store.dates[train_rows].max() < store.dates[val_rows].min()
+        batches = list(store.iter_batches(64, rows=train_rows, seed=1, block_rows=200))
+        assert sum(len(b[1]) for b in batches) == len(train_rows)
+        assert np.allclose(np.sort(np.concatenate([b[1] for b in batches])),
+                           np.sort(store.load(train_rows)[1]))
+        print(f"  [OK] {len(batches)} shuffled mini-batches cover the training rows")
+
+        result = CrossSectionalTrainer(os.path.join(tmp, 'models')).train(store, epochs=2, batch_size=128)
+        assert result.success, result.error_message
+        assert result.metadata.hyperparameters['n_symbols'] == 3
+        print(f"  [OK] Cross-sectional model val RMSE: {result.validation_metrics['rmse']}")
+
+    print("  [PASS] Feature store working")
+    return True
+
+
+def test_prioritized_replay():
+    """Test array-backed sum tree and batched prioritized sampling"""
+    print("\n" + "="*60)
+    print("TEST: Prioritized Replay")
+    print("="*60)
+
+    from rl.prioritized_replay import SumTree, PrioritizedReplayBuffer
+
+    # Batched updates keep every internal node equal to its children's sum
+    tree = SumTree(13)
+    for p in np.linspace(0.1, 1.3, 13):
+        tree.add(p)
+    leaves = np.arange(12, 25)
+    tree.update(leaves[[0, 3, 3, 7]], [2.0, 0.5, 0.25, 3.0])
+    for node in range(12):
+        assert np.isclose(tree.tree[node], tree.tree[2 * node + 1] + tree.tree[2 * node + 2])
+    assert np.isclose(tree.tree[leaves[3]], 0.25)
+
+    # Batched retrieve lands on the leaf covering each cumulative sum
+    # (leaves are in index order when the capacity is a power of two)
+    tree = SumTree(16)
+    for p in np.linspace(0.1, 1.6, 16):
+        tree.add(p)
+    leaves = np.arange(15, 31)
+    cumulative = np.cumsum(tree.tree[leaves])
+    s = np.random.default_rng(0).uniform(0, tree.total(), 200)
+    assert np.array_equal(tree.retrieve(s), leaves[np.searchsorted(cumulative, s)])
+    print("  [OK] Sum tree update/retrieve")
+
+    np.random.seed(1)
+    buffer = PrioritizedReplayBuffer(capacity=50)
+    for i in range(60):
+        states = {'a': np.full(4, i, dtype=float), 'b': np.full(4, -i, dtype=float)}
+        actions = {'a': np.array([0.1, 0.2]), 'b': np.array([0.3, 0.4])}
+        buffer.add(states, actions, {'a': float(i), 'b': 0.0}, states, {'a': False, 'b': i == 59})
+    assert len(buffer) == 50
+
+    batch, weights, indices = buffer.sample(32)
+    assert batch.states.shape == (32, 8) and batch.rewards.shape == (32, 2)
+    assert np.array_equal(batch.states[:, 0], batch.rewards[:, 0])
+    assert np.all((weights > 0) & (weights <= 1.0 + 1e-6))
+
+    # Only odd rewards stay likely after raising their TD errors
+    buffer.update_priorities(np.arange(49, 99), np.where(np.arange(50) % 2, 10.0, 0.0))
+    batch, _, _ = buffer.sample(256)
+    assert (batch.rewards[:, 0] % 2 == 1).mean() > 0.9
+    print("  [OK] Prioritized sampling follows updated priorities")
+
+    print("  [PASS] Prioritized replay working")
+    return True
+
+
+def test_maddpg_batch():
+    """Test batched MADDPG environment stepping"""
+    print("\n" + "="*60)
+    print("TEST: MADDPG Batch")
+    print("="*60)
+
+    from rl.maddpg_trader import MADDPGTrader, MarketState, MarketBatch, BatchedMarketEnv
+
+    np.random.seed(3)
+    trader = MADDPGTrader(state_dim=16)
+    paths = 100 * np.exp(np.cumsum(np.random.normal(0, 0.02, (32, 130)), axis=1))
+
+    # Batched features match per-state processing
+    states = [
+        MarketState(prices=p[:100], volumes=np.ones(100), returns=np.diff(np.log(p[:100])),
+                    volatility=0.02, trend=0.4, regime='TRENDING', sentiment=0.1)
+        for p in paths[:4]
+    ]
+    features = trader.process_states_batch(MarketBatch.from_states(states))
+    assert features.shape == (trader.n_agents, 4, 16)
+    for i, agent in enumerate(trader.agents.values()):
+        for j, state in enumerate(states):
+            assert np.array_equal(features[i, j], agent.process_state(state))
+    print("  [OK] Batched features match process_state")
+
+    env = BatchedMarketEnv(paths, window=100)
+    stats = trader.run_batched(env, epsilon=0.2)
+    assert stats['steps'] == 30
+    assert stats['transitions'] == 30 * 32 == len(trader.replay_buffer)
+    assert set(stats['mean_rewards']) == set(trader.agents)
+    print(f"  [OK] {stats['transitions']} transitions from {len(env)} parallel episodes")
+
+    trader.train_step(batch_size=64)
+    assert trader.training_steps == 1
+
+    from rl.maddpg_trader import TORCH_AVAILABLE
+    if TORCH_AVAILABLE:
+        # Prioritized replay: priorities are the mean TD error over the agents
+        # actually trained. Zeroed critics make each agent's TD error |reward|.
+        trader = MADDPGTrader(state_dim=16, prioritized_replay=True)
+        trader.run_batched(BatchedMarketEnv(paths, window=100), epsilon=0.2)
+        del next(iter(trader.agents.values())).actor
+        for critic in list(trader.critics.values()) + list(trader.critic_targets.values()):
+            for param in critic.parameters():
+                param.data.zero_()
+        buffer = trader.replay_buffer
+        captured = {}
+        sample, update = buffer.sample, buffer.update_priorities
+        buffer.sample = lambda n: captured.setdefault('sample', sample(n))
+        buffer.update_priorities = lambda idx, td: (captured.setdefault('td', td), update(idx, td))
+        trader.train_step(batch_size=64)
+        rewards = captured['sample'][0].rewards
+        trained = [buffer.storage.agent_index(name) for name, agent in trader.agents.items()
+                   if hasattr(agent, 'actor')]
+        assert len(trained) == trader.n_agents - 1
+        np.testing.assert_allclose(captured['td'], np.abs(rewards[:, trained]).mean(axis=1), rtol=1e-5)
+        print(f"  [OK] TD-error priorities averaged over {len(trained)} trained agents")
+
+    print("  [PASS] MADDPG batch stepping working")
+    return True
+
+
+def test_news_ingestion():
+    """Test concurrent RSS ingestion against a local feed server"""
+    print("\n" + "="*60)
+    print("TEST: News Ingestion")
+    print("="*60)
+
+    import time
+    import hashlib
+    import tempfile
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from news.rss_news_fetcher import VNStockNewsFetcher
+
+    def rss(items):
+        body = ''.join(
+            f"<item><title>{title}</title><link>http://local/{guid}</link>"
+            f"<guid>{guid}</guid><description>{title}</description>"
+            f"<pubDate>Mon, 0{day} Jun 2025 09:00:00 +0700</pubDate></item>"
+            for guid, title, day in items
+        )
+        return f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>t</title>{body}</channel></rss>'
+
+    shared = ('fpt-1', 'Cổ phiếu FPT tăng trưởng lợi nhuận kỷ lục', 3)
+    feeds = {
+        '/a.xml': rss([shared, ('hpg-1', 'HPG giảm mạnh do lo ngại giá thép', 2)]),
+        '/b.xml': rss([shared, ('gold-1', 'Giá vàng hôm nay', 1)]),
+        '/c.xml': rss([('vnm-1', 'VNM chia cổ tức tiền mặt', 1)]),
+    }
+    not_modified = []
+
+    class FeedHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(0.5)
+            body = feeds[self.path].encode('utf-8')
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                not_modified.append(self.path)
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', 'Mon, 02 Jun 2025 09:00:00 GMT')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = {name: f"http://127.0.0.1:{server.server_port}/{name.lower()}.xml" for name in 'ABC'}
+
+    async def fetch_while_ticking(fetcher):
+        ticks = 0
+        task = asyncio.ensure_future(fetcher.fetch_all_feeds_async(new_only=True))
+        while not task.done():
+            await asyncio.sleep(0.05)
+            ticks += 1
+        return task.result(), ticks
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            state_path = os.path.join(tmp, 'seen.json')
+            fetcher = VNStockNewsFetcher(feeds=urls, state_path=state_path)
+
+            # Three 0.5s feeds download concurrently without blocking the loop
+            start = time.time()
+            news, ticks = asyncio.run(fetch_while_ticking(fetcher))
+            elapsed = time.time() - start
+            assert elapsed < 1.2, elapsed
+            assert ticks >= 5
+            assert [n['symbol'] for n in news] == ['FPT', 'HPG', 'VNM']
+            assert fetcher.stats['scored'] == 4
+            print(f"  [OK] 3 feeds in {elapsed:.2f}s, {len(news)} new stock items (shared entry deduplicated)")
+
+            # Unchanged feeds answer 304 and nothing is scored again
+            assert asyncio.run(fetcher.fetch_all_feeds_async(new_only=True)) == []
+            assert sorted(not_modified) == ['/a.xml', '/b.xml', '/c.xml']
+            assert fetcher.stats['scored'] == 4
+            cached = asyncio.run(fetcher.fetch_all_feeds_async())
+            assert [n['symbol'] for n in cached] == ['FPT', 'HPG', 'VNM']
+            print("  [OK] Conditional GET reuses parsed entries")
+
+            # Only the added article is new
+            feeds['/c.xml'] = rss([('vcb-1', 'VCB tăng vốn điều lệ', 4), ('vnm-1', 'VNM chia cổ tức tiền mặt', 1)])
+            news = asyncio.run(fetcher.fetch_all_feeds_async(new_only=True))
+            assert [n['symbol'] for n in news] == ['VCB']
+            assert fetcher.stats['scored'] == 5
+            fetcher.close()
+
+            # The seen-set survives a restart
+            restarted = VNStockNewsFetcher(feeds=urls, state_path=state_path)
+            assert asyncio.run(restarted.fetch_all_feeds_async(new_only=True)) == []
+            assert len(restarted.fetch_all_feeds()) == 4
+            print("  [OK] Seen-set persisted across restarts")
+
+            # Plain fetches (the /api/news endpoints) don't consume new items
+            feeds['/a.xml'] = rss([('mwg-1', 'MWG lãi lớn quý 2', 5), shared])
+            assert [n['symbol'] for n in restarted.fetch_all_feeds()][0] == 'MWG'
+            assert [n['symbol'] for n in asyncio.run(restarted.fetch_all_feeds_async())][0] == 'MWG'
+            news = asyncio.run(restarted.fetch_all_feeds_async(new_only=True))   # 304 for a.xml
+            assert [n['symbol'] for n in news] == ['MWG']
+            assert [n['symbol'] for n in restarted.fetch_all_feeds()] == ['MWG', 'VCB', 'FPT', 'VNM']
+            assert asyncio.run(restarted.fetch_all_feeds_async(new_only=True)) == []
+            restarted.close()
+            print("  [OK] Sync fetches interleaved with new_only keep new items")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print("  [PASS] News ingestion working")
+    return True
+
+
+def test_keyword_matcher():
+    """Test single-pass symbol and keyword matching"""
+    print("\n" + "="*60)
+    print("TEST: Keyword Matcher")
+    print("="*60)
+
+    from news.keyword_matcher import KeywordMatcher
+    from news.rss_news_fetcher import VNStockNewsFetcher
+    from news.sentiment import SentimentAnalyzer, NewsArticle
+
+    matcher = KeywordMatcher(
+        symbols=['VCB', 'FPT', 'FPTS'],
+        lexicons={'bullish': ['tăng', 'tăng trưởng'], 'bearish': {'giảm': 1.0, 'phá sản': 3.0}}
+    )
+    result = matcher.match("Fpt tăng trưởng, FPTS giảm; xVCB và VCB_1 không phải mã, phá sản")
+    assert result.symbols == ['FPT', 'FPTS']
+    assert result.keywords['bullish'] == ['tăng', 'tăng trưởng']
+    assert result.scores == {'bullish': 2.0, 'bearish': 4.0}
+    print("  [OK] Whole-word symbols, overlapping keywords and weights in one pass")
+
+    # Same results as per-ticker regex search over a large ticker list
+    import re
+    import string
+    rng = np.random.default_rng(0)
+    tickers = sorted({''.join(rng.choice(list(string.ascii_uppercase), 3)) for _ in range(2500)})
+    fetcher = VNStockNewsFetcher(state_path=None, symbols=tickers)
+    for _ in range(50):
+        text = ' '.join(rng.choice(tickers + ['cổ phiếu', 'tăng', 'giảm', 'VN30', 'ab'], 12))
+        expected = [s for s in tickers if re.search(r'\b' + s + r'\b', text.upper())]
+        assert fetcher._extract_symbols(text) == expected
+    print(f"  [OK] Matches per-ticker regex search over {len(tickers)} tickers")
+
+    analyzer = SentimentAnalyzer()
+    article = NewsArticle(id='1', title='VNM lợi nhuận kỷ lục', content='', source='test',
+                          published_at=datetime.now())
+    sentiment = analyzer.analyze(article)
+    # lợi nhuận (1) + kỷ lục (1 + 2 strong)
+    assert sentiment.sentiment_score == 1.0 and sentiment.confidence == 0.8
+    assert set(sentiment.keywords) == {'lợi nhuận', 'kỷ lục'}
+    print("  [OK] SentimentAnalyzer scores through the shared matcher")
+
+    print("  [PASS] Keyword matcher working")
+    return True
+
+
+def test_footprint_grid():
+    """Test vectorized footprint and market profile"""
+    print("\n" + "="*60)
+    print("TEST: Footprint Grid")
+    print("="*60)
+
+    from indicators.footprint import FootprintCalculator, MarketProfileCalculator
+
+    df = create_test_data(60).rename(columns=str.capitalize)
+    df['High'] = df[['High', 'Open', 'Close']].max(axis=1)
+    df['Low'] = df[['Low', 'Open', 'Close']].min(axis=1)
+
+    calc = FootprintCalculator(tick_size=100)
+    grid = calc.calculate_grid(df, n_levels=8)
+    assert grid.bid.shape == (len(df), 8) and len(grid) == len(df)
+
+    # Lazy bar views agree with the one-pass POC / value area
+    for i in (0, len(grid) // 2, len(grid) - 1):
+        bar = grid.bar(i)
+        assert bar.poc == grid.poc[i] and bar.val == grid.val[i] and bar.vah == grid.vah[i]
+        assert bar.total_delta == grid.total_delta[i]
+        assert grid.val[i] <= grid.poc[i] <= grid.vah[i]
+    print(f"  [OK] {grid.bid.shape} bid/ask/delta grid, POC/VA per bar")
+
+    # Intraday sessions
+    index = pd.date_range('2025-01-02 09:00', periods=26 * 3, freq='10min')
+    intraday = pd.DataFrame({'High': np.repeat([25200, 25500, 25100], 26) + np.tile(np.arange(26) * 20, 3),
+                             'Low': np.repeat([24800, 25000, 24700], 26) + np.tile(np.arange(26) * 20, 3)},
+                            index=index + pd.to_timedelta(np.repeat([0, 1, 2], 26), unit='D'))
+    mp = MarketProfileCalculator(tick_size=100)
+    daily = mp.calculate_daily_grid(intraday.iloc[:26])
+    profile = daily.to_profile()
+    assert profile.poc == daily.poc and profile.value_area == daily.value_area
+    assert profile.levels[25000] == list('ABCDEFG')  # rows 0-12, two rows per letter
+
+    composite = mp.calculate_composite_grid(intraday)
+    assert composite.touched.shape[0] == 3
+    assert int(composite.counts.sum()) == sum(len(v) for v in composite.to_profile().levels.values())
+    print(f"  [OK] Composite profile over 3 sessions, POC {composite.poc:,.0f}")
+
+    print("  [PASS] Footprint grid working")
+    return True
+
+
+def test_rolling_regression():
+    """Test closed-form rolling regression and sliding-window divergence"""
+    print("\n" + "="*60)
+    print("TEST: Rolling Regression")
+    print("="*60)
+
+    from indicators import PanelIndicatorEngine, TrendIndicators, MomentumIndicators, PatternRecognition
+
+    close = create_test_data(200)['close']
+    close.iloc[50:70] = close.iloc[49]   # flat stretch
+    lr = TrendIndicators.linear_regression(close, 14)
+
+    for i in (13, 60, 120, 199):
+        window = close.values[i - 13:i + 1]
+        slope, intercept = np.polyfit(np.arange(14), window, 1)
+        assert np.isclose(lr['lr_slope'].iloc[i], slope, atol=1e-9)
+        assert np.isclose(lr['lr_value'].iloc[i], intercept + slope * 13)
+        if i != 60:
+            assert np.isclose(lr['lr_r2'].iloc[i], np.corrcoef(np.arange(14), window)[0, 1] ** 2)
+    assert lr['lr_slope'].iloc[:13].isna().all()
+    assert lr['lr_slope'].iloc[68] == 0 and np.isnan(lr['lr_r2'].iloc[68])
+    print("  [OK] Closed-form fit matches np.polyfit / np.corrcoef")
+
+    # Long series: precision doesn't degrade with length
+    rng = np.random.default_rng(3)
+    long_close = pd.Series(1000 * np.exp(np.cumsum(rng.normal(0, 0.01, 300_000))))
+    long_close.iloc[150_000] = np.nan
+    long_lr = TrendIndicators.linear_regression(long_close, 20)
+    for i in (19, 255, 256, 1_000, 150_019, 150_020, 299_999):
+        window = long_close.values[i - 19:i + 1]
+        if np.isnan(window).any():
+            assert np.isnan(long_lr['lr_slope'].iloc[i])
+            continue
+        slope, intercept = np.polyfit(np.arange(20), window, 1)
+        scale = window.std()
+        assert abs(long_lr['lr_slope'].iloc[i] - slope) <= 1e-9 * scale
+        assert abs(long_lr['lr_value'].iloc[i] - (intercept + slope * 19)) <= 1e-8 * scale
+    print("  [OK] 300k-bar series matches np.polyfit to 1e-9 of window scale")
+
+    # Divergence: each bar against the window before it
+    indicator = close.pct_change().rolling(5).mean()
+    div = PatternRecognition.detect_divergence(close, indicator, 10)
+    for i in range(10, len(close)):
+        prior_close, prior_ind = close.iloc[i - 10:i], indicator.iloc[i - 10:i]
+        complete = prior_ind.notna().all()
+        assert div['bullish'].iloc[i] == int(complete and close.iloc[i] < prior_close.min() and
+                                            indicator.iloc[i] > prior_ind.min())
+        assert div['bearish'].iloc[i] == int(complete and close.iloc[i] > prior_close.max() and
+                                            indicator.iloc[i] < prior_ind.max())
+    print(f"  [OK] {div['bullish'].sum()} bullish / {div['bearish'].sum()} bearish divergences")
+
+    # Whole panel in one call, same as per symbol
+    frames = {f"S{i}": create_test_data(days).reset_index() for i, days in enumerate([150, 80])}
+    engine = PanelIndicatorEngine.from_frames(frames)
+    panel_lr = engine.linear_regression(14)
+    panel_div = engine.divergence(engine.rsi(14), 10)
+    for symbol, df in frames.items():
+        n = len(df)
+        single = TrendIndicators.linear_regression(df['close'], 14)
+        np.testing.assert_allclose(panel_lr['lr_slope'][symbol].values[-n:], single['lr_slope'].values)
+        single_div = PatternRecognition.detect_divergence(df['close'], MomentumIndicators.rsi(df['close'], 14), 10)
+        assert np.array_equal(panel_div['bearish'][symbol].values[-n:], single_div['bearish'].values)
+    print("  [OK] Panel results match per-symbol results")
+
+    print("  [PASS] Rolling regression working")
+    return True
+
+
+def test_regime_batch():
+    """Test batched Hurst / regime detection and rolling updates"""
+    print("\n" + "="*60)
+    print("TEST: Regime Batch")
+    print("="*60)
+
+    from analysis.market_regime_detector import MarketRegimeDetector
+
+    detector = MarketRegimeDetector()
+    rng = np.random.default_rng(7)
+
+    # R/S reference: per-scale loop over blocks
+    prices = 100 * np.exp(np.cumsum(0.02 * rng.standard_normal(100)))
+    returns = np.diff(np.log(prices))
+    log_n, log_rs = [], []
+    for n in range(4, min(len(returns) // 2, 50)):
+        blocks = returns[:len(returns) // n * n].reshape(-1, n)
+        cumdev = np.cumsum(blocks - blocks.mean(axis=1, keepdims=True), axis=1)
+        rs = np.ptp(cumdev, axis=1) / blocks.std(axis=1, ddof=1)
+        log_n.append(np.log(n))
+        log_rs.append(np.log(rs.mean()))
+    expected = np.clip(np.polyfit(log_n, log_rs, 1)[0], 0, 1)
+    assert np.isclose(detector.calculate_hurst_exponent(prices), expected)
+    assert detector.calculate_hurst_exponent(prices[:15]) == 0.5
+    print(f"  [OK] Hurst {expected:.4f} matches per-block reference")
+
+    # Whole universe with ragged histories (NaN before listing)
+    history = 100 * np.exp(np.cumsum(0.02 * rng.standard_normal((30, 160)), axis=1))
+    starts = rng.integers(0, 150, 30)
+    for i, start in enumerate(starts):
+        history[i, :start] = np.nan
+    batch = detector.detect_regime_batch(history)
+    for i, start in enumerate(starts):
+        single = detector.detect_regime(history[i, start:])
+        result = batch.analysis(i)
+        assert result.regime == single.regime
+        assert result.hurst_exponent == single.hurst_exponent
+        assert result.volatility_percentile == single.volatility_percentile
+        assert np.isclose(result.trend_strength, single.trend_strength)
+    assert list(batch.strategy_weights().loc[0]) == list(detector.get_strategy_weights(batch.analysis(0).regime).values())
+    print(f"  [OK] Batch matches detect_regime for {len(batch)} symbols")
+
+    # Rolling mode: daily updates agree with a full recomputation
+    tracker = detector.rolling(history[:, :120])
+    for t in range(120, 160):
+        day = history[:, t].copy()
+        day[t % 7] = np.nan   # no bar for one symbol
+        history[t % 7, t] = np.nan
+        rolled = tracker.update(day)
+    full = detector.detect_regime_batch(history)
+    assert list(rolled.regime) == list(full.regime)
+    np.testing.assert_allclose(rolled.hurst_exponent, full.hurst_exponent)
+    np.testing.assert_array_equal(rolled.volatility_percentile, full.volatility_percentile)
+    np.testing.assert_allclose(rolled.trend_strength, full.trend_strength, rtol=1e-9)
+    print("  [OK] Rolling updates match full recomputation")
+
+    print("  [PASS] Regime batch working")
+    return True
+
+
+def test_portfolio_batch():
+    """Test QP / analytic-gradient portfolio optimizer and batch rebalancing"""
+    print("\n" + "="*60)
+    print("TEST: Portfolio Batch")
+    print("="*60)
+
+    from scipy import optimize
+    from core.portfolio_optimizer import PortfolioOptimizer, optimize_portfolios, rolling_moments
+
+    rng = np.random.default_rng(11)
+    n_assets = 8
+    returns = pd.DataFrame(0.0006 + rng.standard_normal((300, n_assets)) * rng.uniform(0.01, 0.03, n_assets),
+                           columns=[f"S{i}" for i in range(n_assets)],
+                           index=pd.bdate_range('2023-01-02', periods=300))
+    optimizer = PortfolioOptimizer(returns)
+    mean_returns, cov = optimizer._moments()
+    equal = np.full(n_assets, 1 / n_assets)
+
+    # QP solutions are at least as good as SLSQP with numeric gradients
+    def neg_sharpe(w):
+        return -(w @ mean_returns - optimizer.risk_free_rate) / np.sqrt(w @ cov @ w)
+    budget = [{'type': 'eq', 'fun': lambda x: np.sum(x) - 1}]
+    reference = optimize.minimize(neg_sharpe, equal, method='SLSQP', bounds=[(0, 1)] * n_assets, constraints=budget)
+    max_sharpe = optimizer.optimize_max_sharpe()
+    assert max_sharpe.sharpe_ratio >= -reference.fun - 1e-6
+    weights = np.array(list(max_sharpe.weights.values()))
+    assert np.isclose(weights.sum(), 1) and weights.min() >= 0
+
+    reference = optimize.minimize(lambda w: w @ cov @ w, equal, method='SLSQP', bounds=[(0, 1)] * n_assets, constraints=budget)
+    assert optimizer.optimize_min_variance().volatility <= np.sqrt(reference.fun) + 1e-9
+    capped = optimizer.optimize_max_sharpe({'max_weight': 0.2})
+    assert max(capped.weights.values()) <= 0.2 + 1e-9
+    print(f"  [OK] Max Sharpe {max_sharpe.sharpe_ratio:.3f}, min variance {optimizer.optimize_min_variance().volatility:.2%}")
+
+    # Risk parity: equal risk contributions
+    rp = np.array(list(optimizer.optimize_risk_parity().weights.values()))
+    contributions = rp * (cov @ rp)
+    assert np.allclose(contributions / contributions.sum(), 1 / n_assets, atol=1e-3)
+    print("  [OK] Risk parity contributions equal")
+
+    # Warm-started frontier is monotone in volatility
+    frontier = optimizer.efficient_frontier(20)
+    assert len(frontier) == 20
+    assert np.all(np.diff(frontier['volatility']) >= -1e-9)
+    print(f"  [OK] Efficient frontier {len(frontier)} points")
+
+    # Rolling rebalancing matches one optimizer per window
+    rolled = optimizer.rolling_weights(window=120, step=20, method='max_sharpe')
+    for date in rolled.index[::3]:
+        end = returns.index.get_loc(date) + 1
+        single = PortfolioOptimizer(returns.iloc[end - 120:end]).optimize_max_sharpe()
+        np.testing.assert_allclose(rolled.loc[date].values, list(single.weights.values()), atol=1e-8)
+
+    ends, means, covs = rolling_moments(returns.values, 120, 20)
+    sequential, ok = optimize_portfolios(means, covs, 'min_variance')
+    parallel, _ = optimize_portfolios(means, covs, 'min_variance', n_jobs=2)
+    assert ok.all()
+    np.testing.assert_allclose(sequential, parallel, atol=1e-10)
+    print(f"  [OK] {len(rolled)} rebalancing dates match per-window results")
+
+    print("  [PASS] Portfolio batch working")
+    return True
+
+
+def test_covariance_engine():
+    """Test streaming shrinkage / EWMA covariance and VaR decomposition"""
+    print("\n" + "="*60)
+    print("TEST: Covariance Engine")
+    print("="*60)
+
+    import tempfile
+    from scipy import stats
+    from core.covariance_engine import CovarianceEngine
+    from indicators.additional import marginal_var, incremental_var
+    from risk.circuit_breaker import CircuitBreakerSystem, CircuitBreakerLevel
+
+    rng = np.random.default_rng(17)
+    n_assets = 6
+    assets = [f"S{i}" for i in range(n_assets)]
+    mixing = rng.standard_normal((n_assets, n_assets)) * 0.008
+    returns = pd.DataFrame(0.0005 + rng.standard_normal((300, n_assets)) @ mixing, columns=assets)
+    weights = dict(zip(assets, rng.dirichlet(np.ones(n_assets))))
+    w = np.array(list(weights.values()))
+
+    # Seed with a block, then one rank-one update per bar
+    engines, views = {}, {}
+    for method in CovarianceEngine.METHODS:
+        engine = CovarianceEngine.from_returns(returns.iloc[:200], method)
+        views[method] = engine.portfolio(weights)
+        for i in range(200, len(returns)):
+            engine.update(returns.iloc[i])
+        engines[method] = engine
+
+    np.testing.assert_allclose(engines['sample'].covariance, returns.cov().values * 252, rtol=1e-9)
+    ewma = returns.ewm(alpha=0.06, adjust=False).cov(bias=True).loc[len(returns) - 1].values * 252
+    np.testing.assert_allclose(engines['ewma'].covariance, ewma, rtol=1e-9)
+
+    # Ledoit-Wolf: shrink the 1/T covariance towards mu * I
+    X = returns.values - returns.values.mean(axis=0)
+    S = X.T @ X / len(X)
+    mu = np.trace(S) / n_assets
+    delta = min(np.sum((np.einsum('ti,tj->tij', X, X) - S) ** 2) / len(X) ** 2,
+                np.sum((S - mu * np.eye(n_assets)) ** 2)) / np.sum((S - mu * np.eye(n_assets)) ** 2)
+    lw = engines['ledoit_wolf']
+    assert np.isclose(lw.shrinkage, delta)
+    np.testing.assert_allclose(lw.covariance, ((1 - delta) * S + delta * mu * np.eye(n_assets)) * 252, rtol=1e-9)
+    print(f"  [OK] Sample / EWMA / Ledoit-Wolf (shrinkage {delta:.3f}) match batch estimates")
+
+    # VaR decomposition from the tracked view's cached exposure
+    z = abs(stats.norm.ppf(0.05))
+    for method, engine in engines.items():
+        view = views[method]
+        cov = engine.covariance
+        assert np.isclose(view.var(0.95), z * np.sqrt(w @ cov @ w))
+        assert np.isclose(engine.var(0.95, weights=weights), view.var(0.95))
+        assert np.isclose(sum(view.component_var(0.95).values()), view.var(0.95))
+        new = w.copy()
+        new[2] = 0.3
+        new /= new.sum()
+        assert np.isclose(view.incremental_var('S2', 0.3), z * (np.sqrt(new @ cov @ new) - np.sqrt(w @ cov @ w)))
+        view.adjust_weight('S1', 0.05)
+        shifted = w + 0.05 * (np.arange(n_assets) == 1)
+        assert np.isclose(view.portfolio_volatility(), np.sqrt(shifted @ cov @ shifted))
+        view.set_weights(weights)
+
+    sample = engines['sample']
+    np.testing.assert_allclose(list(marginal_var(returns, weights, engine=sample).values()),
+                               list(marginal_var(returns, weights).values()))
+    assert np.isclose(incremental_var(None, weights, 'S2', 0.3, engine=sample), -views['sample'].incremental_var('S2', 0.3))
+    # An empty portfolio has no VaR to decompose
+    assert all(v == 0 for v in sample.component_var(0.95, weights={}).values())
+    print("  [OK] Marginal / component / incremental VaR from cached exposure")
+
+    # Circuit breaker checks VaR on each position update, on an engine shared
+    # with stateless weights= callers and another tracked portfolio
+    ewma_engine = engines['ewma']
+    with tempfile.TemporaryDirectory() as tmp:
+        breaker = CircuitBreakerSystem(1_000_000, state_file=os.path.join(tmp, 'cb.json'),
+                                       risk_engine=ewma_engine)
+        breaker.update_position('S0', 100, 100.0, 100.0)
+        assert breaker.state.level == CircuitBreakerLevel.NORMAL
+        expected = ewma_engine.var(0.99, weights={'S0': 10_000}, days=1) / 1_000_000
+        assert np.isclose(breaker.state.daily_var_percent, expected)
+
+        marginal_var(returns, weights, engine=ewma_engine)
+        ewma_engine.update(returns.iloc[-1])
+        marginal_var(returns, {'S5': 1.0}, engine=ewma_engine)
+        breaker.update_position('S0', 100, 100.0, 101.0)
+        expected = ewma_engine.var(0.99, weights={'S0': 10_100}, days=1) / 1_000_000
+        assert np.isclose(breaker.state.daily_var_percent, expected)
+        assert breaker.risk_portfolio.weights['S0'] == 10_100
+        assert np.isclose(views['ewma'].var(0.95), ewma_engine.var(0.95, weights=weights))
+
+        breaker.update_position('S3', 80_000, 100.0, 100.0)
+        assert breaker.state.level == CircuitBreakerLevel.CAUTION
+        breaker.stop()
+    print(f"  [OK] Circuit breaker VaR {breaker.state.daily_var_percent:.2%} triggers CAUTION on a shared engine")
+
+    print("  [PASS] Covariance engine working")
+    return True
+
+
+def test_news_aware_scan():
+    """Test chunked news-aware scans stream results within bounded concurrency"""
+    print("\n" + "="*60)
+    print("TEST: News-Aware Scan")
+    print("="*60)
+
+    import asyncio
+    import tempfile
+    from pathlib import Path
+    import time
+    import threading
+    from agents.news_aware_scanner import NewsAwareScanner, SCAN_STAGES
+    from data.market_store import get_market_store
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Symbols served from the packed store (placeholder parquet files)
+        store = get_market_store(tmp)
+        frames = {}
+        for i in range(7):
+            df = create_test_data(400 + 30 * i).reset_index().rename(columns={'index': 'date'})
+            df['close'] = df['close'] * (1 + 0.1 * i)
+            frames[f"S{i}"] = df
+        frames_short = {'SHORT': create_test_data(30).reset_index().rename(columns={'index': 'date'})}
+        for symbol, df in {**frames, **frames_short}.items():
+            (Path(tmp) / f"{symbol}.parquet").touch()
+            store.put(symbol, df, source_mtime=time.time() + 60)
+
+        scanner = NewsAwareScanner(data_dir=tmp, lookback=250, chunk_size=3)
+        events = []
+        load_frame = scanner._load_frame
+        scanner._load_frame = lambda symbol, path: (events.append(('load', symbol)), load_frame(symbol, path))[1]
+        scanner._combined_analysis = lambda *args: ("STRONG_BUY", 0.9, "test", "CRITICAL")
+
+        async def on_signal(result):
+            events.append(('signal', result.symbol))
+        scanner.add_signal_callback(on_signal)
+
+        results = asyncio.run(scanner._perform_scan())
+        scanner.stop()
+
+        # Loads never exceed max_concurrency in flight
+        limited = NewsAwareScanner(data_dir=tmp, max_concurrency=2, chunk_size=8)
+        lock, in_flight, peak = threading.Lock(), [0], [0]
+
+        def slow_load(symbol, path):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return load_frame(symbol, path)
+
+        limited._load_frame = slow_load
+        assert len(asyncio.run(limited._perform_scan())) == 7
+        limited.stop()
+
+    # Short history skipped; lookback window matches full-history indicators
+    assert sorted(r.symbol for r in results) == sorted(frames)
+    full = scanner._calculate_technical_panel({s: df.copy() for s, df in frames.items()})
+    for r in results:
+        assert np.isclose(r.price, full[r.symbol]['price'])
+        assert np.isclose(r.rsi, full[r.symbol]['rsi'])
+        assert (r.trend, r.macd_signal) == (full[r.symbol]['trend'], full[r.symbol]['macd_signal'])
+    print(f"  [OK] {len(results)} symbols scanned over a {scanner.lookback}-bar lookback")
+
+    # Callbacks for a chunk fire before the next chunk is loaded
+    kinds = [kind for kind, _ in events]
+    assert kinds == ['load'] * 3 + ['signal'] * 3 + ['load'] * 3 + ['signal'] * 3 + ['load'] * 2 + ['signal']
+    print("  [OK] Signal callbacks stream chunk by chunk")
+
+    assert peak[0] == 2
+    timings = limited.last_scan_timings
+    assert set(timings) == set(SCAN_STAGES) and all(v >= 0 for v in timings.values())
+    assert timings['load'] > 0 and limited.last_scan_duration >= 4 * 0.02   # 8 loads, 2 at a time
+    print(f"  [OK] Peak {peak[0]} concurrent loads, stage timings {sorted(timings)}")
+
+    print("  [PASS] News-aware scan working")
+    return True
+
+
+def test_parallel_grid():
+    """Test process-pool grid search against the in-process search"""
+    print("\n" + "="*60)
+    print("TEST: Parallel Grid Optimizer")
+    print("="*60)
+
+    from core.backtest_engine import BacktestEngine, MACrossoverStrategy
+    from core.parallel_optimizer import ParallelGridOptimizer
+    from core.walk_forward import WalkForwardOptimizer
+
+    df = create_test_data(600)
+    engine = BacktestEngine(mode="array")
+    grid = {'fast_period': [0, 5, 10], 'slow_period': [20, 30, 50]}   # fast 0 fails
+
+    # Same scores, winner and errors as the serial search
+    serial_params, serial_result = engine.optimize_parameters(df, MACrossoverStrategy, grid, "TEST")
+    serial_errors = engine.last_optimization_errors
+    with ParallelGridOptimizer(df, engine, n_jobs=2) as optimizer:
+        search = optimizer.optimize(MACrossoverStrategy, grid, "TEST")
+        halved = optimizer.optimize(MACrossoverStrategy, grid, "TEST",
+                                    successive_halving=True, eta=3, min_bars=100)
+
+    assert search.best_params == serial_params
+    assert search.best_result.to_dict() == serial_result.to_dict()
+    assert search.evaluations == 9 and len(search.scores) == 6
+    for params, value in search.scores:
+        assert np.isclose(value, engine.run(df, MACrossoverStrategy(**params), "TEST").sharpe_ratio)
+    assert [p for p, _ in search.errors] == [p for p, _ in serial_errors]
+    assert len(search.errors) == 3 and all('ValueError' in e for _, e in search.errors)
+    print(f"  [OK] Parallel search matches serial: best {search.best_params}, {len(search.errors)} errors reported")
+
+    # Successive halving: 9 combinations on the last 200 bars, top 3 on all 600
+    assert halved.rounds == 2 and halved.evaluations == 9 + 3
+    short = {tuple(p.items()): engine.run(df.iloc[-200:], MACrossoverStrategy(**p), "TEST").sharpe_ratio
+             for p in [dict(zip(grid, c)) for c in [(5, 20), (5, 30), (5, 50), (10, 20), (10, 30), (10, 50)]]}
+    top = sorted(short, key=short.get, reverse=True)[:3]
+    assert [tuple(p.items()) for p, _ in halved.scores] == top
+    assert tuple(halved.best_params.items()) in top
+    print(f"  [OK] Successive halving: {halved.evaluations} evaluations over {halved.rounds} rounds")
+
+    # Walk-forward collects failed combinations in both modes
+    for n_jobs in (1, 2):
+        wfo = WalkForwardOptimizer(engine, n_jobs=n_jobs)
+        wfo.optimize(df, MACrossoverStrategy, grid, "TEST", num_folds=3)
+        assert len(wfo.last_optimization_errors) == 3 * 3, n_jobs
+        assert all(p['fast_period'] == 0 for p, _ in wfo.last_optimization_errors)
+    print("  [OK] WalkForwardOptimizer reports errors serially and in parallel")
+
+    print("  [PASS] Parallel grid optimizer working")
+    return True
+
+
+def test_stateful_walk_forward():
+    """Test stateful, windowed and prefix walk-forward runs agree"""
+    print("\n" + "="*60)
+    print("TEST: Stateful Walk-Forward")
+    print("="*60)
+
+    import dataclasses
+    from backtest.walk_forward import (
+        WalkForwardBacktester, MomentumStrategy, momentum_strategy, _BarBuffer
+    )
+
+    # Buffer growth and windowing
+    bars = np.arange(1000, dtype=float)
+    full, windowed = _BarBuffer(), _BarBuffer(window=50)
+    full.reset(bars[:10])
+    windowed.reset(bars[:80])
+    assert np.array_equal(windowed.view(), bars[30:80])
+    for i in range(10, 1000):
+        full.append(bars[i])
+        if i >= 80:
+            windowed.append(bars[i])
+            assert np.array_equal(windowed.view(), bars[i - 49:i + 1])
+        assert full.view()[-1] == bars[i]
+    assert np.array_equal(full.view(), bars)
+    assert len(windowed._data) <= 128   # windowed buffer is reused, not grown
+    print(f"  [OK] Buffer grew to {len(full._data)} slots; window capped at {len(windowed._data)}")
+
+    # Prefix, windowed and native incremental runs give identical results
+    np.random.seed(42)
+    prices = 50000 * np.exp(np.cumsum(0.0005 + 0.015 * np.random.randn(600)))
+    bt = WalkForwardBacktester(train_period=200, test_period=50, n_folds=4)
+    runs = {
+        'prefix': bt.run_walk_forward(prices, momentum_strategy, {"lookback": 20}),
+        'windowed': bt.run_walk_forward(prices, momentum_strategy, {"lookback": 20}, signal_window=21),
+        'stateful': bt.run_walk_forward(prices, MomentumStrategy(lookback=20)),
+    }
+    expected = dataclasses.asdict(runs['prefix'])
+    for name, result in runs.items():
+        actual = dataclasses.asdict(result)
+        for key, value in expected.items():
+            if key in ('strategy_name', 'start_date', 'end_date'):
+                continue
+            np.testing.assert_allclose(actual[key], value, rtol=1e-12, err_msg=f"{name}: {key}")
+    assert runs['prefix'].total_trades > 0
+    print(f"  [OK] Prefix / windowed / stateful runs match ({runs['prefix'].total_trades} trades)")
+
+    # Short history falls back to the simple backtest, same for both
+    short = prices[:150]
+    simple_prefix = bt.run_walk_forward(short, momentum_strategy, {"lookback": 20})
+    simple_stateful = bt.run_walk_forward(short, MomentumStrategy(lookback=20))
+    assert simple_prefix.equity_curve == simple_stateful.equity_curve
+    print("  [OK] Simple backtest fallback matches")
+
+    print("  [PASS] Stateful walk-forward working")
+    return True
+
+
+def test_model_registry():
+    """Test resident model pool: batched vs single predictions, reloads, LRU"""
+    print("\n" + "="*60)
+    print("TEST: Model Registry")
+    print("="*60)
+
+    import tempfile
+    import time
+    from pathlib import Path
+    try:
+        import torch
+        from scanners.model_prediction_scanner import ModelPredictionScanner, ModelRegistry
+        from models.stockformer import StockformerPredictor
+    except ImportError as e:
+        print(f"  [SKIP] Model scanner dependencies not available: {e}")
+        return True
+
+    torch.manual_seed(0)
+    rng = np.random.default_rng(0)
+    kwargs = dict(d_model=16, n_heads=2, n_layers=1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for symbol in ("AAA", "BBB", "CCC"):
+            path = Path(tmp) / f"{symbol}_stockformer_simple_best.pt"
+            torch.save(StockformerPredictor(input_size=15, **kwargs).state_dict(), path)
+            files.append(path)
+        windows = {f.stem.split('_')[0]: rng.standard_normal((60, 15)).astype(np.float32) for f in files}
+
+        # Batched (vmapped) predictions match one model at a time
+        scanner = ModelPredictionScanner(model_dir=tmp, data_dir=tmp,
+                                         passed_stocks_file=os.path.join(tmp, "none.txt"))
+        scanner.model_registry = ModelRegistry(scanner.device, max_stacked=2, **kwargs)
+        scanner._load_vn_index = lambda: None
+        scanner._prepare_input = lambda symbol, vn_index: (windows[symbol], 100.0)
+
+        batch = asyncio.run(scanner._predict_batch(files))
+        single = [asyncio.run(scanner._predict_single(f)) for f in files]
+        for b, s in zip(batch, single):
+            np.testing.assert_allclose(b.predicted_prices, s.predicted_prices, rtol=1e-5)
+        print(f"  [OK] Batched predictions match single-model predictions ({len(files)} models)")
+
+        # A rewritten file is reloaded on its next mtime
+        registry = scanner.model_registry
+        before = registry.predict(files, list(windows.values()))
+        torch.save(StockformerPredictor(input_size=15, **kwargs).state_dict(), files[1])
+        os.utime(files[1], (time.time() + 10, time.time() + 10))
+        after = registry.predict(files, list(windows.values()))
+        fresh = StockformerPredictor(input_size=15, **kwargs)
+        fresh.load_state_dict(torch.load(files[1]))
+        fresh.eval()
+        with torch.inference_mode():
+            expected = fresh(torch.from_numpy(windows["BBB"][None]))[0][0].numpy()
+        np.testing.assert_allclose(after[1], expected, rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(after[0], before[0], rtol=1e-6)
+        assert not np.allclose(after[1], before[1])
+        print("  [OK] Modified model file reloaded by mtime")
+
+        # Stacked model sets are capped (least recently used evicted)
+        for subset in ([0, 1], [1, 2], [0, 2], [0, 1, 2]):
+            registry.predict([files[i] for i in subset], [windows["AAA"]] * len(subset))
+        assert list(registry._stacked) == [tuple(files[i] for i in [0, 2]), tuple(files)]
+        print(f"  [OK] Stacked cache capped at {registry.max_stacked} model sets")
+
+    print("  [PASS] Model registry working")
+    return True
+
+
+def test_auto_scanner_panel():
+    """Test AutoScanner panel scores match the per-symbol path"""
+    print("\n" + "="*60)
+    print("TEST: Auto Scanner Panel")
+    print("="*60)
+
+    import tempfile
+    import time
+    from pathlib import Path
+    from agents.auto_scanner import AutoScanner
+    from data.market_store import get_market_store, load_history
+
+    rng = np.random.default_rng(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = get_market_store(tmp)
+        full = {}
+        for i, days in enumerate([45, 80, 150, 260, 400, 400, 600]):
+            df = create_test_data(days).reset_index().rename(columns={'index': 'date'})
+            df['close'] = df['close'] * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+            full[f"S{i}"] = df
+            (Path(tmp) / f"S{i}.parquet").touch()
+            store.put(f"S{i}", df, source_mtime=time.time() + 60)
+
+        scanner = AutoScanner(data_dir=tmp, min_score=float('-inf'))
+        results = scanner._scan_universe(sorted(full))
+        assert sorted(r.symbol for r in results) == sorted(full)
+
+        for r in results:
+            history = load_history(r.symbol, tmp, days=scanner.lookback)
+            indicators = scanner._calculate_indicators(history)
+            assert r.score == scanner._calculate_score(indicators, history.iloc[-1])
+            for key, value in indicators.items():
+                assert np.isclose(r.indicators[key], value, rtol=1e-10, equal_nan=True), (r.symbol, key)
+
+            # Loaded window is long enough to agree with the full history
+            reference = scanner._calculate_indicators(full[r.symbol])
+            assert abs(indicators['macd_signal'] - reference['macd_signal']) < 1e-7 * reference['current_price']
+            assert np.isclose(indicators['ema_20'], reference['ema_20'], rtol=1e-9)
+            assert r.score == scanner._calculate_score(reference, full[r.symbol].iloc[-1])
+
+        scores = [abs(r.score) for r in results]
+        assert scores == sorted(scores, reverse=True)
+    print(f"  [OK] {len(results)} panel scores match _calculate_indicators + _calculate_score")
+
+    print("  [PASS] Auto scanner panel working")
+    return True
+
+
+def test_risk_doctor_portfolio_var():
+    """Test RiskDoctor's VaR concentration check on a live risk portfolio"""
+    print("\n" + "="*60)
+    print("TEST: RiskDoctor Portfolio VaR")
+    print("="*60)
+
+    import warnings
+    from agents.base_agent import StockData
+    from agents.risk_doctor import RiskDoctor
+    from core.covariance_engine import CovarianceEngine
+
+    rng = np.random.default_rng(5)
+    assets = ['AAA', 'BBB', 'CCC']
+    returns = pd.DataFrame(rng.normal(0, 0.01, (120, 3)) * [3.0, 1.0, 1.0], columns=assets)
+    engine = CovarianceEngine.from_returns(returns, method='ewma')
+    stock_data = StockData(symbol='AAA', current_price=100, open_price=99, high_price=101,
+                           low_price=98, volume=1_000_000, change_percent=0.5,
+                           indicators={'atr': 2, 'rsi': 50}, fundamentals={'market_cap': 10e12})
+    doctor = RiskDoctor()
+
+    def concentration(portfolio):
+        context = {} if portfolio is None else {'risk_portfolio': portfolio}
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            signal = asyncio.run(doctor.analyze(stock_data, context))
+        return [w for w in signal.metadata['risk_assessment']['warnings'] if 'VaR danh mục' in w]
+
+    assert concentration(None) == []
+    assert concentration(engine.portfolio({'AAA': 0.6, 'BBB': 0.2, 'CCC': 0.2}))
+    assert concentration(engine.portfolio({'AAA': 0.05, 'BBB': 0.5, 'CCC': 0.45})) == []
+    print("  [OK] Concentrated VaR share flagged, diversified book passes")
+
+    # Flat book and a cold engine carry no risk: no warning and no NaN / inf
+    assert concentration(engine.portfolio()) == []
+    cold = CovarianceEngine(assets, method='sample')
+    cold.update(returns.iloc[0])
+    assert concentration(cold.portfolio({'AAA': 1.0})) == []
+    print("  [OK] Zero-volatility portfolios skipped")
+
+    print("  [PASS] RiskDoctor portfolio VaR working")
+    return True
+
+
+def test_panel_indicators():
+    """Test panel indicators match per-symbol indicator functions"""
+    print("\n" + "="*60)
+    print("TEST: Panel Indicators")
+    print("="*60)
+
+    from indicators import (
+        PanelIndicatorEngine, TrendIndicators, MomentumIndicators,
+        VolatilityIndicators, VolumeIndicators
+    )
+
+    # Uneven histories, one with a flat stretch
+    frames = {}
+    for i, days in enumerate([300, 120, 60, 10]):
+        df = create_test_data(days)
+        df.index.name = 'date'
+        frames[f"S{i}"] = df.reset_index()
+    frames["S1"].loc[100:, 'close'] = frames["S1"]['close'].iloc[99]
+
+    engine = PanelIndicatorEngine.from_frames(frames)
+    rsi = engine.rsi(14)
+    sma = engine.sma(20)
+    macd = engine.macd()
+    bands = engine.bollinger_bands(20)
+    atr = engine.atr(14)
+    volume_ratio = engine.volume_ratio(20)
+
+    for symbol, df in frames.items():
+        n = len(df)
+        expected = {
+            'rsi': (MomentumIndicators.rsi(df['close'], 14), rsi),
+            'sma': (TrendIndicators.sma(df['close'], 20), sma),
+            'macd': (TrendIndicators.macd(df['close'])['macd'], macd['macd']),
+            'bb_upper': (VolatilityIndicators.bollinger_bands(df['close'], 20)['upper'], bands['upper']),
+            'atr': (VolatilityIndicators.atr(df['high'], df['low'], df['close'], 14), atr),
+            'volume_ratio': (VolumeIndicators.volume_ratio(df['volume'].astype(float), 20), volume_ratio)
+        }
+        for name, (single, panel) in expected.items():
+            np.testing.assert_allclose(
+                panel[symbol].values[-n:], single.values, rtol=1e-9, err_msg=f"{symbol} {name}"
+            )
+
+    # Flat prices equal their moving average exactly
+    assert sma["S1"].iloc[-1] == frames["S1"]['close'].iloc[-1]
+
+    # Screen: filter then rank
+    table = engine.latest(rsi=rsi, volume_ratio=volume_ratio)
+    picks = engine.screen(table, where="rsi > 0", rank_by="rsi", top=2)
+    assert len(picks) == 2
+    assert picks['rsi'].is_monotonic_decreasing
+    print(f"  Top RSI: {list(picks.index)}")
+    print("  [PASS] Panel indicators match per-symbol results")
+
+    return True
+
+
 def test_monte_carlo():
     """Test Monte Carlo simulation"""
     print("\n" + "="*60)
@@ -174,6 +1839,31 @@ def test_monte_carlo():
 
     assert 0 <= result.prob_profit <= 100, "Probability out of range"
     assert result.num_simulations == 1000, "Simulation count mismatch"
+
+    # Chunked runs reproduce unchunked ones; rng and random_seed agree
+    short = df.iloc[:8]   # 7 returns < 10-day horizon: windows are padded
+    for method in ("gbm", "bootstrap", "historical"):
+        for data in (df, short):
+            full = MonteCarloSimulator(1000, random_seed=7).simulate(data, forecast_days=10, method=method)
+            chunked = MonteCarloSimulator(1000, chunk_size=64, rng=np.random.default_rng(7)).simulate(
+                data, forecast_days=10, method=method)
+            np.testing.assert_array_equal(chunked.final_prices, full.final_prices)
+            assert chunked.max_drawdown_worst == full.max_drawdown_worst
+            np.testing.assert_array_equal(chunked.paths, full.paths)
+    print("  [OK] chunk_size=64 matches the unchunked run for every method")
+
+    # float32 keeps float32 paths; resampling methods match float64 closely
+    for method in ("gbm", "bootstrap", "historical"):
+        single = MonteCarloSimulator(1000, random_seed=7, dtype=np.float32, chunk_size=300)
+        result32 = single.simulate(df, forecast_days=10, method=method)
+        assert result32.paths.dtype == np.float32
+        result64 = MonteCarloSimulator(1000, random_seed=7).simulate(df, forecast_days=10, method=method)
+        if method == "gbm":
+            assert abs(result32.mean_return - result64.mean_return) < 1.0
+        else:
+            np.testing.assert_allclose(result32.final_prices, result64.final_prices, rtol=1e-5)
+    print("  [OK] float32 runs agree with float64")
+
     print("  [PASS] Monte Carlo simulation working")
 
     return True
@@ -340,12 +2030,168 @@ def run_all_tests():
         print(f"  [FAIL] Indicators test failed: {e}")
         results['Indicators'] = False
 
+    try:
+        results['Trend Kernels'] = test_trend_kernels()
+    except Exception as e:
+        print(f"  [FAIL] Trend kernels test failed: {e}")
+        results['Trend Kernels'] = False
+
     try:
         results['Backtest'] = test_backtest_engine()
     except Exception as e:
         print(f"  [FAIL] Backtest test failed: {e}")
         results['Backtest'] = False
 
+    try:
+        results['Backtest Array Mode'] = test_backtest_array_mode()
+    except Exception as e:
+        print(f"  [FAIL] Backtest array mode test failed: {e}")
+        results['Backtest Array Mode'] = False
+
+    try:
+        results['Indicator Cache'] = test_indicator_cache()
+    except Exception as e:
+        print(f"  [FAIL] Indicator cache test failed: {e}")
+        results['Indicator Cache'] = False
+
+    try:
+        results['Market Store'] = test_market_store()
+    except Exception as e:
+        print(f"  [FAIL] Market store test failed: {e}")
+        results['Market Store'] = False
+
+    try:
+        results['Panel Indicators'] = test_panel_indicators()
+    except Exception as e:
+        print(f"  [FAIL] Panel indicators test failed: {e}")
+        results['Panel Indicators'] = False
+
+    try:
+        results['Cache Tiers'] = test_cache_tiers()
+    except Exception as e:
+        print(f"  [FAIL] Cache tiers test failed: {e}")
+        results['Cache Tiers'] = False
+
+    try:
+        results['State Journal'] = test_state_journal()
+    except Exception as e:
+        print(f"  [FAIL] State journal test failed: {e}")
+        results['State Journal'] = False
+
+    try:
+        results['Memory Recall'] = test_memory_recall()
+    except Exception as e:
+        print(f"  [FAIL] Memory recall test failed: {e}")
+        results['Memory Recall'] = False
+
+    try:
+        results['Stockformer Batch'] = test_stockformer_batch()
+    except Exception as e:
+        print(f"  [FAIL] Stockformer batch test failed: {e}")
+        results['Stockformer Batch'] = False
+
+    try:
+        results['Settlement Sequences'] = test_settlement_sequences()
+    except Exception as e:
+        print(f"  [FAIL] Settlement sequences test failed: {e}")
+        results['Settlement Sequences'] = False
+
+    try:
+        results['Feature Store'] = test_feature_store()
+    except Exception as e:
+        print(f"  [FAIL] Feature store test failed: {e}")
+        results['Feature Store'] = False
+
+    try:
+        results['Prioritized Replay'] = test_prioritized_replay()
+    except Exception as e:
+        print(f"  [FAIL] Prioritized replay test failed: {e}")
+        results['Prioritized Replay'] = False
+
+    try:
+        results['MADDPG Batch'] = test_maddpg_batch()
+    except Exception as e:
+        print(f"  [FAIL] MADDPG batch test failed: {e}")
+        results['MADDPG Batch'] = False
+
+    try:
+        results['News Ingestion'] = test_news_ingestion()
+    except Exception as e:
+        print(f"  [FAIL] News ingestion test failed: {e}")
+        results['News Ingestion'] = False
+
+    try:
+        results['Keyword Matcher'] = test_keyword_matcher()
+    except Exception as e:
+        print(f"  [FAIL] Keyword matcher test failed: {e}")
+        results['Keyword Matcher'] = False
+
+    try:
+        results['Footprint Grid'] = test_footprint_grid()
+    except Exception as e:
+        print(f"  [FAIL] Footprint grid test failed: {e}")
+        results['Footprint Grid'] = False
+
+    try:
+        results['Rolling Regression'] = test_rolling_regression()
+    except Exception as e:
+        print(f"  [FAIL] Rolling regression test failed: {e}")
+        results['Rolling Regression'] = False
+
+    try:
+        results['Regime Batch'] = test_regime_batch()
+    except Exception as e:
+        print(f"  [FAIL] Regime batch test failed: {e}")
+        results['Regime Batch'] = False
+
+    try:
+        results['Portfolio Batch'] = test_portfolio_batch()
+    except Exception as e:
+        print(f"  [FAIL] Portfolio batch test failed: {e}")
+        results['Portfolio Batch'] = False
+
+    try:
+        results['Covariance Engine'] = test_covariance_engine()
+    except Exception as e:
+        print(f"  [FAIL] Covariance engine test failed: {e}")
+        results['Covariance Engine'] = False
+
+    try:
+        results['News-Aware Scan'] = test_news_aware_scan()
+    except Exception as e:
+        print(f"  [FAIL] News-aware scan test failed: {e}")
+        results['News-Aware Scan'] = False
+
+    try:
+        results['Parallel Grid'] = test_parallel_grid()
+    except Exception as e:
+        print(f"  [FAIL] Parallel grid test failed: {e}")
+        results['Parallel Grid'] = False
+
+    try:
+        results['Stateful Walk-Forward'] = test_stateful_walk_forward()
+    except Exception as e:
+        print(f"  [FAIL] Stateful walk-forward test failed: {e}")
+        results['Stateful Walk-Forward'] = False
+
+    try:
+        results['Model Registry'] = test_model_registry()
+    except Exception as e:
+        print(f"  [FAIL] Model registry test failed: {e}")
+        results['Model Registry'] = False
+
+    try:
+        results['Auto Scanner Panel'] = test_auto_scanner_panel()
+    except Exception as e:
+        print(f"  [FAIL] Auto scanner panel test failed: {e}")
+        results['Auto Scanner Panel'] = False
+
+    try:
+        results['RiskDoctor Portfolio VaR'] = test_risk_doctor_portfolio_var()
+    except Exception as e:
+        print(f"  [FAIL] RiskDoctor portfolio VaR test failed: {e}")
+        results['RiskDoctor Portfolio VaR'] = False
+
     try:
         results['Monte Carlo'] = test_monte_carlo()
     except Exception as e:
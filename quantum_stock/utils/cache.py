@@ -6,15 +6,30 @@
 ╚══════════════════════════════════════════════════════════════════════════════╝
 
 P0 Implementation - Caching layer for performance optimization
+
+Backends:
+- RedisCache: shared cache when a Redis server is reachable
+- MemoryCache: bounded in-process cache (LRU or LFU under a byte budget)
+- DiskCache: memory-mapped files that survive restarts
+- TieredCache: MemoryCache (L1) in front of DiskCache (L2)
 """
 
+import os
+import sys
 import json
+import mmap
+import heapq
 import pickle
+import struct
 import logging
 import hashlib
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Callable
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from functools import wraps
+import numpy as np
 import pandas as pd
 
 logging.basicConfig(level=logging.INFO)
@@ -29,6 +44,97 @@ except ImportError:
     logger.warning("Redis not installed. Run: pip install redis")
 
 
+# ============================================
+# SERIALIZATION
+# ============================================
+
+# Record layout: magic | uint32 meta length | JSON meta | pad | pickle | buffers
+# Array data (ndarray, DataFrame blocks) is pickled out-of-band (protocol 5)
+# into 64-byte aligned buffers, so decoding from a mmap or bytes object
+# rebuilds arrays as views of that memory instead of copying them
+_MAGIC = b'VQC1'
+_ALIGN = 64
+
+
+def _pad(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _encode(value: Any, meta: Dict = None) -> List:
+    """Serialize value into a list of byte chunks (see layout above)"""
+    buffers = []
+    payload = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+    raws = [b.raw() for b in buffers]
+
+    spans = []
+    offset = _pad(len(payload))
+    for raw in raws:
+        spans.append((offset, raw.nbytes))
+        offset = _pad(offset + raw.nbytes)
+
+    head = json.dumps(dict(meta or {}, pickle=len(payload), buffers=spans)).encode()
+    prefix = _MAGIC + struct.pack('<I', len(head)) + head
+    chunks = [prefix + b'\0' * (_pad(len(prefix)) - len(prefix)), payload]
+
+    position = len(payload)
+    for (offset, size), raw in zip(spans, raws):
+        chunks.append(b'\0' * (offset - position))
+        chunks.append(raw)
+        position = offset + size
+    return chunks
+
+
+def _read_meta(buf) -> Tuple[Dict, int]:
+    """Record meta and the offset of its data section"""
+    (length,) = struct.unpack_from('<I', buf, 4)
+    meta = json.loads(bytes(buf[8:8 + length]))
+    return meta, _pad(8 + length)
+
+
+def _decode(buf) -> Tuple[Dict, Any]:
+    """Deserialize a record; arrays reference buf without copying"""
+    buf = memoryview(buf)
+    if bytes(buf[:4]) != _MAGIC:
+        # Plain pickle written before records had a header
+        return {}, pickle.loads(buf)
+
+    meta, base = _read_meta(buf)
+    payload = buf[base:base + meta['pickle']]
+    buffers = [buf[base + offset:base + offset + size]
+               for offset, size in meta['buffers']]
+    return meta, pickle.loads(payload, buffers=buffers)
+
+
+def serialize(value: Any) -> bytes:
+    """Serialize value to bytes (zero-copy readable with deserialize)"""
+    return b''.join(_encode(value))
+
+
+def deserialize(data) -> Any:
+    """Inverse of serialize; arrays are read-only views of data"""
+    return _decode(data)[1]
+
+
+def _sizeof(value: Any) -> int:
+    """Approximate memory footprint of a cached value in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return sys.getsizeof(value)
+
+    # Containers: pickled size, without copying any arrays they hold
+    sizes = []
+    payload = pickle.dumps(value, protocol=5,
+                           buffer_callback=lambda b: sizes.append(b.raw().nbytes))
+    return len(payload) + sum(sizes)
+
+
 # ============================================
 # CACHE BACKENDS
 # ============================================
@@ -52,53 +158,166 @@ class CacheBackend:
         raise NotImplementedError
 
 
+class _Entry:
+    __slots__ = ('value', 'expires', 'size', 'hits')
+
+    def __init__(self, value: Any, expires: float, size: int):
+        self.value = value
+        self.expires = expires
+        self.size = size
+        self.hits = 1
+
+
 class MemoryCache(CacheBackend):
     """
     In-memory cache backend
     Fallback when Redis is not available
+
+    Bounded by max_bytes (and optionally max_entries). Expired entries are
+    dropped first (tracked in an expiry heap, so they go even if never read
+    again), then least recently used (policy='lru') or least frequently used
+    (policy='lfu', ties broken by recency). Values are stored as-is, so
+    cached objects must not be mutated by callers.
     """
-    
-    def __init__(self):
-        self._cache: Dict[str, Dict] = {}
-    
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, policy: str = 'lru',
+                 max_entries: int = None):
+        if policy not in ('lru', 'lfu'):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.policy = policy
+
+        # Recency order: least recently used first
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        # LFU: hit count -> keys in recency order
+        self._freq: Dict[int, "OrderedDict[str, None]"] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        self.evictions = 0
+        self.expirations = 0
+
     def get(self, key: str) -> Optional[Any]:
-        if key in self._cache:
-            entry = self._cache[key]
-            if entry['expires'] > datetime.now():
-                return entry['value']
-            else:
-                del self._cache[key]
-        return None
-    
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry.expires <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                return None
+            self._touch(key, entry)
+            return entry.value
+
     def set(self, key: str, value: Any, ttl: int = 300):
-        self._cache[key] = {
-            'value': value,
-            'expires': datetime.now() + timedelta(seconds=ttl)
-        }
-    
+        self._put(key, value, time.time() + ttl)
+
+    def _put(self, key: str, value: Any, expires: float):
+        """Insert with an absolute expiry time"""
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            if size > self.max_bytes:
+                logger.debug(f"Cache value too large for memory tier: {key} ({size} bytes)")
+                return
+
+            entry = _Entry(value, expires, size)
+            self._cache[key] = entry
+            if self.policy == 'lfu':
+                self._freq.setdefault(1, OrderedDict())[key] = None
+            self._bytes += size
+            heapq.heappush(self._expiry, (expires, key))
+
+            self._purge_expired()
+            self._evict()
+
     def delete(self, key: str):
-        if key in self._cache:
-            del self._cache[key]
-    
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+
     def exists(self, key: str) -> bool:
-        if key in self._cache:
-            if self._cache[key]['expires'] > datetime.now():
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return False
+            if entry.expires > time.time():
                 return True
-            del self._cache[key]
-        return False
-    
+            self._remove(key)
+            self.expirations += 1
+            return False
+
     def clear(self):
-        self._cache.clear()
-    
+        with self._lock:
+            self._cache.clear()
+            self._freq.clear()
+            self._expiry.clear()
+            self._bytes = 0
+
+    def _touch(self, key: str, entry: _Entry):
+        self._cache.move_to_end(key)
+        if self.policy == 'lfu':
+            bucket = self._freq[entry.hits]
+            del bucket[key]
+            if not bucket:
+                del self._freq[entry.hits]
+            entry.hits += 1
+            self._freq.setdefault(entry.hits, OrderedDict())[key] = None
+        else:
+            entry.hits += 1
+
+    def _remove(self, key: str) -> _Entry:
+        entry = self._cache.pop(key)
+        self._bytes -= entry.size
+        if self.policy == 'lfu':
+            bucket = self._freq[entry.hits]
+            del bucket[key]
+            if not bucket:
+                del self._freq[entry.hits]
+        return entry
+
+    def _purge_expired(self):
+        now = time.time()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires, key = heapq.heappop(self._expiry)
+            entry = self._cache.get(key)
+            # Heap items for overwritten or deleted keys are stale
+            if entry is not None and entry.expires == expires:
+                self._remove(key)
+                self.expirations += 1
+
+        if len(self._expiry) > 2 * len(self._cache) + 64:
+            self._expiry = [(e.expires, k) for k, e in self._cache.items()]
+            heapq.heapify(self._expiry)
+
+    def _evict(self):
+        while self._cache and (
+                self._bytes > self.max_bytes or
+                (self.max_entries is not None and len(self._cache) > self.max_entries)):
+            if self.policy == 'lfu':
+                key = next(iter(self._freq[min(self._freq)]))
+            else:
+                key = next(iter(self._cache))
+            self._remove(key)
+            self.evictions += 1
+
     def get_stats(self) -> Dict:
         """Get cache statistics"""
-        return {
-            'type': 'memory',
-            'keys': len(self._cache),
-            'memory_bytes': sum(
-                len(pickle.dumps(v)) for v in self._cache.values()
-            )
-        }
+        with self._lock:
+            self._purge_expired()
+            return {
+                'type': 'memory',
+                'policy': self.policy,
+                'keys': len(self._cache),
+                'memory_bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
 
 
 class RedisCache(CacheBackend):
@@ -137,7 +356,7 @@ class RedisCache(CacheBackend):
         try:
             data = self._client.get(self._key(key))
             if data:
-                return pickle.loads(data)
+                return deserialize(data)
             return None
         except Exception as e:
             logger.error(f"Redis get error: {e}")
@@ -145,7 +364,7 @@ class RedisCache(CacheBackend):
     
     def set(self, key: str, value: Any, ttl: int = 300):
         try:
-            data = pickle.dumps(value)
+            data = serialize(value)
             self._client.setex(self._key(key), ttl, data)
         except Exception as e:
             logger.error(f"Redis set error: {e}")
@@ -187,6 +406,251 @@ class RedisCache(CacheBackend):
             return {'type': 'redis', 'error': str(e)}
 
 
+class DiskCache(CacheBackend):
+    """
+    On-disk cache backend
+
+    One file per key, written atomically (temp file + rename) and read back
+    through mmap, so arrays and DataFrames come back as read-only views of
+    the page cache rather than copies. Entries survive restarts and can be
+    shared by processes using the same directory. Bounded by max_bytes with
+    least recently used files evicted first.
+    """
+
+    SUFFIX = '.vqc'
+
+    def __init__(self, path: str = 'data/cache', max_bytes: int = 2 * 1024 ** 3):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+
+        # file name -> (size, expires), least recently used first
+        self._index: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.evictions = 0
+
+        self._load_index()
+
+    def _file(self, key: str) -> str:
+        return hashlib.sha1(key.encode()).hexdigest() + self.SUFFIX
+
+    def _load_index(self):
+        """Rebuild the index from record headers, oldest file first"""
+        entries = []
+        for item in os.scandir(self.path):
+            if item.name.endswith('.tmp'):
+                self._unlink(item.name)
+                continue
+            if not item.name.endswith(self.SUFFIX):
+                continue
+            try:
+                with open(item.path, 'rb') as f:
+                    head = f.read(8)
+                    if head[:4] != _MAGIC:
+                        raise ValueError("bad magic")
+                    (length,) = struct.unpack_from('<I', head, 4)
+                    meta = json.loads(f.read(length))
+                stat = item.stat()
+                entries.append((stat.st_mtime, item.name, stat.st_size, meta['expires']))
+            except (OSError, ValueError, KeyError, struct.error) as e:
+                logger.warning(f"Dropping unreadable cache file {item.name}: {e}")
+                self._unlink(item.name)
+
+        for _, name, size, expires in sorted(entries):
+            self._index[name] = (size, expires)
+            self._bytes += size
+
+    def _unlink(self, name: str):
+        try:
+            os.remove(os.path.join(self.path, name))
+        except OSError:
+            pass
+
+    def _drop(self, name: str):
+        entry = self._index.pop(name, None)
+        if entry is not None:
+            self._bytes -= entry[0]
+        self._unlink(name)
+
+    def _load(self, key: str) -> Tuple[Optional[Any], float]:
+        """(value, expires) or (None, 0.0)"""
+        name = self._file(key)
+        path = os.path.join(self.path, name)
+
+        with self._lock:
+            entry = self._index.get(name)
+            if entry is not None and entry[1] <= time.time():
+                self._drop(name)
+                return None, 0.0
+
+        try:
+            with open(path, 'rb') as f:
+                # The mapping stays alive for as long as decoded arrays use it
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            meta, value = _decode(buf)
+        except FileNotFoundError:
+            with self._lock:
+                self._drop(name)
+            return None, 0.0
+        except Exception as e:
+            logger.warning(f"Disk cache read error for {key}: {e}")
+            with self._lock:
+                self._drop(name)
+            return None, 0.0
+
+        if meta.get('key') != key:
+            return None, 0.0
+
+        expires = meta['expires']
+        with self._lock:
+            if expires <= time.time():
+                self._drop(name)
+                return None, 0.0
+            if name not in self._index:
+                # Written by another process
+                self._index[name] = (len(buf), expires)
+                self._bytes += len(buf)
+            self._index.move_to_end(name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value, expires
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._load(key)[0]
+
+    def set(self, key: str, value: Any, ttl: int = 300):
+        self._put(key, value, time.time() + ttl)
+
+    def _put(self, key: str, value: Any, expires: float):
+        name = self._file(key)
+        path = os.path.join(self.path, name)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            chunks = _encode(value, {'key': key, 'expires': expires})
+            size = sum(memoryview(c).nbytes for c in chunks)
+            if size > self.max_bytes:
+                logger.debug(f"Cache value too large for disk tier: {key} ({size} bytes)")
+                return
+            with open(tmp, 'wb') as f:
+                f.writelines(chunks)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning(f"Disk cache set error for {key}: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            old = self._index.pop(name, None)
+            if old is not None:
+                self._bytes -= old[0]
+            self._index[name] = (size, expires)
+            self._bytes += size
+            self._evict()
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes:
+            return
+        now = time.time()
+        for name in [n for n, (_, expires) in self._index.items() if expires <= now]:
+            self._drop(name)
+        while self._bytes > self.max_bytes and self._index:
+            self._drop(next(iter(self._index)))
+            self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._drop(self._file(key))
+
+    def exists(self, key: str) -> bool:
+        name = self._file(key)
+        with self._lock:
+            entry = self._index.get(name)
+            if entry is None:
+                return os.path.exists(os.path.join(self.path, name)) and \
+                    self._load(key)[0] is not None
+            if entry[1] > time.time():
+                return True
+            self._drop(name)
+            return False
+
+    def clear(self):
+        with self._lock:
+            for item in os.scandir(self.path):
+                if item.name.endswith(self.SUFFIX):
+                    self._unlink(item.name)
+            self._index.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                'type': 'disk',
+                'path': self.path,
+                'keys': len(self._index),
+                'disk_bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions
+            }
+
+
+class TieredCache(CacheBackend):
+    """
+    Two-tier cache: MemoryCache (L1) in front of DiskCache (L2)
+
+    Writes go to both tiers. L2 hits are promoted to L1 with their
+    remaining TTL, so a restarted process warms up from disk.
+    """
+
+    def __init__(self, l1: MemoryCache = None, l2: DiskCache = None):
+        self.l1 = l1 or MemoryCache()
+        self.l2 = l2 or DiskCache()
+        self.l2_hits = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+
+        value, expires = self.l2._load(key)
+        if value is not None:
+            self.l2_hits += 1
+            self.l1._put(key, value, expires)
+        return value
+
+    def set(self, key: str, value: Any, ttl: int = 300):
+        expires = time.time() + ttl
+        self.l1._put(key, value, expires)
+        self.l2._put(key, value, expires)
+
+    def delete(self, key: str):
+        self.l1.delete(key)
+        self.l2.delete(key)
+
+    def exists(self, key: str) -> bool:
+        return self.l1.exists(key) or self.l2.exists(key)
+
+    def clear(self):
+        self.l1.clear()
+        self.l2.clear()
+
+    def get_stats(self) -> Dict:
+        """Get cache statistics"""
+        return {
+            'type': 'tiered',
+            'l2_hits': self.l2_hits,
+            'l1': self.l1.get_stats(),
+            'l2': self.l2.get_stats()
+        }
+
+
 # ============================================
 # CACHE MANAGER
 # ============================================
@@ -196,25 +660,42 @@ class CacheManager:
     Unified Cache Manager
     
     Features:
-    - Automatic backend selection (Redis or Memory)
+    - Automatic backend selection (Redis, or Memory with optional Disk tier)
     - TTL management
     - DataFrame caching
     - Decorator support
+    - Request coalescing (concurrent misses compute once)
     - Statistics tracking
     """
     
-    def __init__(self, redis_url: str = None, fallback_to_memory: bool = True):
+    def __init__(self, redis_url: str = None, fallback_to_memory: bool = True,
+                 max_memory_bytes: int = 256 * 1024 * 1024, eviction: str = 'lru',
+                 disk_path: str = None, max_disk_bytes: int = 2 * 1024 ** 3):
+        """
+        Args:
+            redis_url: Redis URL (default REDIS_URL env var)
+            fallback_to_memory: Use the local cache when Redis is unavailable
+            max_memory_bytes: Byte budget of the memory tier
+            eviction: Memory tier eviction policy ('lru' or 'lfu')
+            disk_path: Directory of the persistent disk tier
+                       (default VNQUANT_CACHE_DIR env var, None = memory only)
+            max_disk_bytes: Byte budget of the disk tier
+        """
         self.backend: CacheBackend = None
         self.stats = {
             'hits': 0,
             'misses': 0,
-            'sets': 0
+            'sets': 0,
+            'coalesced': 0
         }
         
+        # In-flight get_or_set computations: key -> Future
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
         # Try Redis first
         if redis_url or REDIS_AVAILABLE:
             try:
-                import os
                 redis_url = redis_url or os.getenv('REDIS_URL', 'redis://localhost:6379/0')
                 
                 # Parse URL
@@ -232,8 +713,14 @@ class CacheManager:
         
         # Fallback to memory cache
         if self.backend is None and fallback_to_memory:
-            self.backend = MemoryCache()
-            logger.info("Using in-memory cache backend")
+            memory = MemoryCache(max_bytes=max_memory_bytes, policy=eviction)
+            disk_path = disk_path or os.getenv('VNQUANT_CACHE_DIR')
+            if disk_path:
+                self.backend = TieredCache(memory, DiskCache(disk_path, max_disk_bytes))
+                logger.info(f"Using in-memory cache backend with disk tier: {disk_path}")
+            else:
+                self.backend = memory
+                logger.info("Using in-memory cache backend")
     
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
@@ -261,26 +748,72 @@ class CacheManager:
         """Clear all cached data"""
         self.backend.clear()
     
-    def get_dataframe(self, key: str) -> Optional[pd.DataFrame]:
-        """Get DataFrame from cache"""
-        data = self.get(key)
+    @staticmethod
+    def _as_dataframe(data: Any) -> Optional[pd.DataFrame]:
         if data is not None and isinstance(data, dict):
+            # Entries written in the old to_dict(orient='split') format
             return pd.DataFrame.from_dict(data, orient='split')
         return data if isinstance(data, pd.DataFrame) else None
     
+    def get_dataframe(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        Get DataFrame from cache
+        
+        Frames are shared with the cache (or are read-only views of its
+        storage); copy() before modifying them in place.
+        """
+        return self._as_dataframe(self.get(key))
+    
     def set_dataframe(self, key: str, df: pd.DataFrame, ttl: int = 300):
         """Cache a DataFrame"""
-        self.set(key, df.to_dict(orient='split'), ttl)
+        self.set(key, df, ttl)
     
-    def get_or_set(self, key: str, factory: Callable[[], Any], ttl: int = 300) -> Any:
-        """Get from cache or compute and cache"""
-        value = self.get(key)
+    def get_or_set(self, key: str, factory: Callable[[], Any], ttl: int = 300,
+                   dataframe: bool = False) -> Any:
+        """
+        Get from cache or compute and cache
+        
+        Concurrent misses on the same key are coalesced: one caller runs
+        factory and the others wait for its result (or its exception).
+        
+        Args:
+            key: Cache key
+            factory: Computes the value on a miss (None results are not cached)
+            ttl: Time to live in seconds
+            dataframe: Read like get_dataframe and only cache DataFrame results
+        """
+        value = self.get_dataframe(key) if dataframe else self.get(key)
         if value is not None:
             return value
         
-        value = factory()
-        self.set(key, value, ttl)
-        return value
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = Future()
+        
+        if not leader:
+            self.stats['coalesced'] += 1
+            return call.result()
+        
+        try:
+            # Another leader may have finished between the miss and now
+            value = self.backend.get(key)
+            if dataframe:
+                value = self._as_dataframe(value)
+            if value is None:
+                value = factory()
+                if value is not None and (not dataframe or isinstance(value, pd.DataFrame)):
+                    self.set(key, value, ttl)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(value)
+            return value
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
     
     def get_stats(self) -> Dict:
         """Get cache statistics"""
@@ -337,15 +870,7 @@ def cached(ttl: int = 300, key_prefix: str = ""):
             key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
             cache_key = hashlib.md5(":".join(key_parts).encode()).hexdigest()
             
-            # Try cache
-            result = cache.get(cache_key)
-            if result is not None:
-                return result
-            
-            # Compute and cache
-            result = func(*args, **kwargs)
-            cache.set(cache_key, result, ttl)
-            return result
+            return cache.get_or_set(cache_key, lambda: func(*args, **kwargs), ttl)
         
         return wrapper
     return decorator
@@ -371,16 +896,8 @@ def cached_dataframe(ttl: int = 300, key_prefix: str = ""):
             key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
             cache_key = f"df:{hashlib.md5(':'.join(key_parts).encode()).hexdigest()}"
             
-            # Try cache
-            result = cache.get_dataframe(cache_key)
-            if result is not None:
-                return result
-            
-            # Compute and cache
-            result = func(*args, **kwargs)
-            if isinstance(result, pd.DataFrame):
-                cache.set_dataframe(cache_key, result, ttl)
-            return result
+            return cache.get_or_set(cache_key, lambda: func(*args, **kwargs), ttl,
+                                    dataframe=True)
         
         return wrapper
     return decorator
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                    APPEND-ONLY STATE JOURNAL                                 ║
+║                    Embedded persistence for agent and broker state           ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+Stores keep their state in memory and persist it as:
+- a JSON snapshot at the store's path (the file the store used to rewrite)
+- an append-only binary journal of change records next to it (path + '.journal')
+
+Each event appends one small record instead of rewriting the whole file.
+Records are batched into a single write (group commit) and folded into a
+new snapshot every `compact_every` records.
+
+Crash safety:
+- every record is framed with its length, a CRC32 and a sequence number;
+  a torn tail left by a crash is detected and truncated on load
+- snapshots are written to a temp file, fsynced and renamed into place;
+  they record the last sequence number they contain, so records still in
+  the journal after a crash between rename and truncation are skipped
+
+Usage:
+    journal = Journal(path, snapshot=self._snapshot)
+    state, records = journal.load()
+    ...restore state, apply records...
+
+    def on_event(...):
+        record = {...}
+        self._apply(record)
+        journal.append(record)
+"""
+
+import os
+import json
+import zlib
+import struct
+import atexit
+import logging
+import threading
+import weakref
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# length | crc32(seq + payload) | seq
+_HEADER = struct.Struct('<IIQ')
+
+# Journals with records waiting for group commit, flushed at exit
+_open_journals: "weakref.WeakSet[Journal]" = weakref.WeakSet()
+
+
+def _json_default(obj: Any) -> Any:
+    """JSON fallback for numpy scalars, datetimes and other objects"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return str(obj)
+
+
+def _fsync_dir(path: str):
+    """Persist a rename (no-op where directories cannot be opened)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Journal:
+    """
+    Append-only journal with snapshot compaction and group commit
+
+    Records are JSON-serializable values (usually dicts describing one
+    change). The owner applies a record to its in-memory state and then
+    appends it; on startup it restores the snapshot and re-applies the
+    records returned by load().
+    """
+
+    def __init__(self, path: str, snapshot: Callable[[], Any] = None,
+                 compact_every: int = 1000, commit_interval: float = 1.0,
+                 group_size: int = 64, fsync: bool = True):
+        """
+        Args:
+            path: Snapshot file; the journal is written to path + '.journal'
+            snapshot: Returns the owner's full state for compaction
+            compact_every: Journal records before writing a new snapshot
+            commit_interval: Seconds a record may wait to be batched with
+                             later ones (0 = write on every append)
+            group_size: Pending records that force a write
+            fsync: fsync each group commit and snapshot
+        """
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.snapshot = snapshot
+        self.compact_every = compact_every
+        self.commit_interval = commit_interval
+        self.group_size = group_size
+        self.fsync = fsync
+
+        self._seq = 0
+        self._records_since_snapshot = 0
+        self._pending: List[bytes] = []
+        self._file = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(self) -> Tuple[Optional[Any], List[Any]]:
+        """
+        Read the snapshot and the journal records written after it
+
+        Returns:
+            (state, records); state is None when no snapshot exists. A
+            plain JSON file written before the store used a journal is
+            returned as the state.
+        """
+        with self._lock:
+            state = None
+            snapshot_seq = 0
+
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and set(data) == {'journal_seq', 'state'}:
+                    snapshot_seq = data['journal_seq']
+                    state = data['state']
+                else:
+                    state = data
+
+            records = []
+            self._seq = snapshot_seq
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path, 'rb') as f:
+                    buf = f.read()
+
+                offset = 0
+                while offset + _HEADER.size <= len(buf):
+                    length, crc, seq = _HEADER.unpack_from(buf, offset)
+                    start = offset + _HEADER.size
+                    payload = buf[start:start + length]
+                    if len(payload) < length or \
+                            zlib.crc32(payload, zlib.crc32(buf[offset + 8:start])) != crc:
+                        break
+                    offset = start + length
+                    if seq <= snapshot_seq:
+                        continue
+                    records.append(json.loads(payload.decode('utf-8')))
+                    self._seq = seq
+
+                if offset < len(buf):
+                    logger.warning(f"Truncating {len(buf) - offset} bytes of torn journal "
+                                   f"tail in {self.journal_path}")
+                    with open(self.journal_path, 'r+b') as f:
+                        f.truncate(offset)
+
+            self._records_since_snapshot = len(records)
+            return state, records
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, record: Any):
+        """Queue a record for the next group commit; compacts when due"""
+        payload = json.dumps(record, ensure_ascii=False, separators=(',', ':'),
+                             default=_json_default).encode('utf-8')
+
+        with self._lock:
+            self._seq += 1
+            seq_bytes = struct.pack('<Q', self._seq)
+            crc = zlib.crc32(payload, zlib.crc32(seq_bytes))
+            self._pending.append(_HEADER.pack(len(payload), crc, self._seq) + payload)
+            self._records_since_snapshot += 1
+
+            if self.snapshot is not None and self._records_since_snapshot >= self.compact_every:
+                self.compact()
+            elif self.commit_interval <= 0 or len(self._pending) >= self.group_size:
+                self.flush()
+            elif self._timer is None:
+                _open_journals.add(self)
+                self._timer = threading.Timer(self.commit_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write pending records in one group commit"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+
+            if self._file is None:
+                self._file = open(self.journal_path, 'ab')
+            self._file.write(b''.join(self._pending))
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._pending.clear()
+
+    def compact(self, state: Any = None):
+        """
+        Write a new snapshot and empty the journal
+
+        Args:
+            state: Full state to snapshot (default: the snapshot callback)
+        """
+        with self._lock:
+            if state is None:
+                if self.snapshot is None:
+                    raise ValueError("No state given and no snapshot callback set")
+                state = self.snapshot()
+
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'journal_seq': self._seq, 'state': state}, f,
+                          ensure_ascii=False, default=_json_default)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            if self.fsync:
+                _fsync_dir(os.path.dirname(os.path.abspath(self.path)))
+
+            # Pending records are covered by the snapshot
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending.clear()
+
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            with open(self.journal_path, 'wb'):
+                pass
+
+            self._records_since_snapshot = 0
+
+    def close(self):
+        """Flush pending records and close the journal file"""
+        with self._lock:
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        _open_journals.discard(self)
+
+    def get_stats(self) -> dict:
+        """Journal statistics"""
+        with self._lock:
+            size = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else 0
+            return {
+                'seq': self._seq,
+                'records_since_snapshot': self._records_since_snapshot,
+                'pending': len(self._pending),
+                'journal_bytes': size + sum(len(r) for r in self._pending)
+            }
+
+
+@atexit.register
+def _flush_open_journals():
+    for journal in list(_open_journals):
+        try:
+            journal.flush()
+        except Exception as e:
+            logger.error(f"Journal flush at exit failed for {journal.journal_path}: {e}")
@@ -28,6 +28,7 @@ from agents.market_regime_detector import MarketRegimeDetector
 from core.quantum_engine import QuantumEngine
 from core.forecasting import ForecastingEngine, ModelType
 from core.broker_api import BrokerFactory, OrderSide, OrderType
+from data.market_store import load_history
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -227,11 +228,8 @@ async def get_market_status():
     change_pct = 0.0
 
     try:
-        import pandas as pd
-        from pathlib import Path
-        parquet_path = Path("data/historical/VNINDEX.parquet")
-        if parquet_path.exists():
-            df = pd.read_parquet(parquet_path)
+        df = load_history("VNINDEX", days=2)
+        if df is not None and len(df) > 0:
             vnindex = round(float(df.iloc[-1]['close']), 2)
             if len(df) > 1:
                 prev_close = float(df.iloc[-2]['close'])
@@ -1085,12 +1083,12 @@ def _load_historical_data(symbol: str, days: int = 365):
     import numpy as np
     import os
 
-    # Try to load from parquet file
+    # Try to load from the market store / parquet file
     parquet_file = f"data/historical/{symbol}.parquet"
 
     if os.path.exists(parquet_file):
         try:
-            df = pd.read_parquet(parquet_file)
+            df = load_history(symbol)
 
             # Ensure required columns exist
             required_cols = ['date', 'open', 'high', 'low', 'close', 'volume']
@@ -1110,8 +1108,9 @@ def _load_historical_data(symbol: str, days: int = 365):
             if 'date' in df.columns:
                 df['date'] = pd.to_datetime(df['date'])
 
-            # Sort by date and get last N days
-            df = df.sort_values('date')
+            # Sort by date (already sorted when served from the store) and get last N days
+            if not df['date'].is_monotonic_increasing:
+                df = df.sort_values('date')
             if len(df) > days:
                 df = df.tail(days)
 